@@ -0,0 +1,111 @@
+"""Micro-benchmark for ticket description parsing.
+
+Compares the previous inline extraction (patterns compiled per call, full
+html.unescape) against mcp_server.common.description_parsers, cold and with
+the (issue key, updated) memo warm.
+
+Usage:
+    python benchmarks/bench_description_parsers.py [--issues 200] [--repeat 5]
+"""
+
+import argparse
+import html
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import unquote
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common import description_parsers
+
+PARAGRAPH = (
+    "<p>The nightly reconciliation job reported a mismatch between the ledger and the "
+    "warehouse totals. Row counts differ by &gt; 5% for region &quot;EMEA&quot; &amp; the "
+    "alert fired at 03:14 UTC. Previous occurrences were resolved by re-running the loader.</p>\n"
+)
+URL_TEMPLATES = (
+    '<a href="https://git.company.com/projects/DATA/repos/{repo}/browse/sql/{name}.sql?at=refs%2Fheads%2Fmaster">query</a>',
+    "Query: https://bitbucket.org/acme/{repo}/src/main/sql/{name}.sql",
+    "No code reference in this ticket.",
+)
+
+
+def build_corpus(count: int, seed: int = 7):
+    """Generate issues with 2-64 KB descriptions, like pasted alert payloads"""
+    rng = random.Random(seed)
+    issues = []
+    for i in range(count):
+        size = rng.choice([2, 8, 16, 32, 64]) * 1024
+        body = PARAGRAPH * (size // len(PARAGRAPH) + 1)
+        link = rng.choice(URL_TEMPLATES).format(repo=f"alerts-{i % 17}", name=f"check_{i}")
+        cut = rng.randrange(len(body))
+        issues.append({
+            'key': f"OPS-{i}",
+            'fields': {'updated': f"2024-05-01T00:{i % 60:02d}:00.000+0000", 'description': body[:cut] + link + body[cut:]}
+        })
+    return issues
+
+
+def legacy_extract(description):
+    """Extraction as previously inlined in the agent and check_troubleshooting"""
+    bitbucket_url = repo_slug = file_path = None
+    if description:
+        description = html.unescape(description)
+        bitbucket_patterns = [
+            r'https?://(?:[^\s<>"]*(?:bitbucket|git)[^\s<>"]+)',
+            r'href=["\']([^"\'>]+(?:bitbucket|git)[^"\'>]+)["\']',
+        ]
+        for pattern in bitbucket_patterns:
+            matches = re.findall(pattern, description, re.IGNORECASE)
+            if matches:
+                bitbucket_url = matches[0]
+                break
+        if bitbucket_url:
+            bitbucket_url = unquote(bitbucket_url)
+            browse_match = re.search(r'/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)', bitbucket_url)
+            if browse_match:
+                repo_slug = browse_match.group(1)
+                file_path = browse_match.group(2).rstrip()
+    return bitbucket_url, repo_slug, file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--issues', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.issues)
+    total_kb = sum(len(i['fields']['description']) for i in corpus) / 1024
+    print(f"Corpus: {len(corpus)} descriptions, {total_kb:,.0f} KB total")
+
+    def run_legacy():
+        for issue in corpus:
+            legacy_extract(issue['fields']['description'])
+
+    def run_cold():
+        description_parsers.clear_memo()
+        for issue in corpus:
+            description_parsers.parse_issue_description(issue)
+
+    def run_warm():
+        for issue in corpus:
+            description_parsers.parse_issue_description(issue)
+
+    run_cold()  # prime the memo for the warm run
+    results = {}
+    for name, fn in (('legacy (inline regex)', run_legacy), ('precompiled, cold memo', run_cold), ('precompiled, warm memo', run_warm)):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"{name:<26} {best * 1000:9.2f} ms total  {best / len(corpus) * 1e6:9.1f} us/issue")
+
+    baseline = results['legacy (inline regex)']
+    for name, value in results.items():
+        print(f"{name:<26} speedup x{baseline / value:,.1f}")
+
+
+if __name__ == '__main__':
+    main()
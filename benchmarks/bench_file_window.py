@@ -0,0 +1,80 @@
+"""Micro-benchmark for windowed get_file_content reads.
+
+Compares the previous /browse approach (per-line dicts for every page, then
+a join) with streaming the raw bytes through read_window, for the whole file
+and for a slice near the top. Reports time and peak Python memory for a
+synthetic SQL file; the network is not involved.
+
+Usage:
+    python benchmarks/bench_file_window.py [--lines 50000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common.file_window import CHUNK_BYTES, read_window  # noqa: E402
+
+BROWSE_PAGE_LINES = 10000
+
+
+def make_file(lines: int) -> bytes:
+    return b''.join(f"INSERT INTO orders (id, customer, total) VALUES ({n}, 'customer-{n % 977}', {n * 3.5});\n".encode()
+                    for n in range(1, lines + 1))
+
+
+def browse_pages(data: bytes):
+    # What /browse returned: JSON pages of {'text': line} dicts
+    lines = data.decode().split('\n')
+    for start in range(0, len(lines), BROWSE_PAGE_LINES):
+        yield [{'text': text} for text in lines[start:start + BROWSE_PAGE_LINES]]
+
+
+def previous(data: bytes) -> str:
+    all_lines = []
+    for page in browse_pages(data):
+        all_lines.extend(page)
+    return '\n'.join([line.get('text', '') for line in all_lines])
+
+
+def chunks(data: bytes):
+    for i in range(0, len(data), CHUNK_BYTES):
+        yield data[i:i + CHUNK_BYTES]
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=50000, help='lines in the synthetic file')
+    args = parser.parse_args()
+
+    data = make_file(args.lines)
+    print(f"{args.lines} lines, {len(data) / 1024 / 1024:.1f} MiB\n")
+    print(f"{'read':<36} {'time':>10} {'peak memory':>12}")
+    cases = [
+        ('previous /browse pages + join', lambda: previous(data)),
+        ('raw stream, whole file', lambda: read_window(chunks(data), max_bytes=len(data))),
+        ('raw stream, lines 100-200', lambda: read_window(chunks(data), start_line=100, end_line=200)),
+        ('raw stream, 64 KiB at the middle', lambda: read_window(chunks(data), byte_offset=len(data) // 2,
+                                                                 max_bytes=64 * 1024)),
+    ]
+    for name, fn in cases:
+        elapsed, peak = measure(fn)
+        print(f"{name:<36} {elapsed * 1e3:>8.1f} ms {peak / 1024 / 1024:>9.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
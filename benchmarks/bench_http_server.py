@@ -0,0 +1,123 @@
+"""Load test for the Streamable HTTP server against a stub upstream.
+
+Starts a local HTTP server that mimics the Jira Cloud issue endpoint (with a
+fixed delay per request), runs mcp_server.http_server on uvicorn in the same
+process, and drives it with concurrent MCP clients. Each client repeatedly
+opens a session (initialize, notifications/initialized, tools/list), makes
+--calls get_issue calls and deletes the session. Reports completed sessions
+per second and tools/call latency percentiles.
+
+Usage:
+    python benchmarks/bench_http_server.py [--clients 50] [--sessions 200] [--calls 5] [--delay-ms 20]
+"""
+
+import argparse
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_lambda_cold_warm import make_stub_handler  # noqa: E402
+from http.server import ThreadingHTTPServer  # noqa: E402
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under this many clients
+    request_queue_size = 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, provider_threads: int):
+    import uvicorn
+    os.environ['PROVIDER_THREADS'] = str(provider_threads)
+    from mcp_server.http_server import McpHttpApp
+    server = uvicorn.Server(uvicorn.Config(McpHttpApp(config_path=None), host='127.0.0.1', port=port,
+                                           log_level='warning', backlog=2048))
+    threading.Thread(target=server.run, daemon=True).start()
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            requests.get(f'{url}/health', timeout=1)
+            return server, url
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    raise RuntimeError('HTTP server did not start')
+
+
+def run_session(url: str, calls: int, latencies: list) -> None:
+    http = requests.Session()
+    endpoint = f'{url}/mcp'
+    response = http.post(endpoint, json={'jsonrpc': '2.0', 'id': 0, 'method': 'initialize', 'params': {
+        'protocolVersion': '2025-06-18', 'capabilities': {}, 'clientInfo': {'name': 'bench', 'version': '1'}}})
+    response.raise_for_status()
+    headers = {'Mcp-Session-Id': response.headers['Mcp-Session-Id']}
+    http.post(endpoint, json={'jsonrpc': '2.0', 'method': 'notifications/initialized'}, headers=headers)
+    http.post(endpoint, json={'jsonrpc': '2.0', 'id': 1, 'method': 'tools/list'}, headers=headers).raise_for_status()
+    for i in range(calls):
+        start = time.perf_counter()
+        result = http.post(endpoint, headers=headers, json={
+            'jsonrpc': '2.0', 'id': i + 2, 'method': 'tools/call',
+            'params': {'name': 'get_issue', 'arguments': {'issue_key': f'SUP-{i + 1}'}}}).json()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert not result['result']['isError'], result
+    http.delete(endpoint, headers=headers)
+    http.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50, help='concurrent MCP clients')
+    parser.add_argument('--sessions', type=int, default=200, help='sessions to run in total')
+    parser.add_argument('--calls', type=int, default=5, help='tools/call requests per session')
+    parser.add_argument('--delay-ms', type=float, default=20, help='stub latency per upstream request')
+    parser.add_argument('--provider-threads', type=int, default=32, help='shared provider worker threads')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    stub = StubServer(('127.0.0.1', 0), make_stub_handler(args.calls, args.delay_ms / 1000))
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    os.environ.update({
+        'ATLASSIAN_BASE_URL': f'http://127.0.0.1:{stub.server_port}',
+        'ATLASSIAN_USERNAME': 'bench',
+        'ATLASSIAN_API_TOKEN': 'bench',
+    })
+    server, url = start_server(free_port(), args.provider_threads)
+
+    latencies: list = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        for future in [pool.submit(run_session, url, args.calls, latencies) for _ in range(args.sessions)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    server.should_exit = True
+    stub.shutdown()
+    print(f"{args.clients} clients, {args.sessions} sessions x {args.calls} calls, "
+          f"{args.delay_ms:.0f} ms stub latency, {args.provider_threads} provider threads\n")
+    print(f"sessions/sec       {args.sessions / elapsed:8.1f}")
+    print(f"tools/call per sec {len(latencies) / elapsed:8.1f}")
+    print(f"tools/call latency p50 {statistics.median(latencies):6.1f} ms   "
+          f"p95 {percentile(latencies, 95):6.1f} ms   p99 {percentile(latencies, 99):6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Multi-worker scaling benchmark for the Streamable HTTP server.
+
+For each worker count, starts `python -m mcp_server.http_server --workers N`
+against a stub Jira that returns large issues (so the server is CPU-bound on
+JSON decoding and response shaping rather than waiting on the network), then
+drives it with client processes. Each client opens one MCP session and calls
+get_issue in a loop for --seconds. Reports tools/call throughput, p95
+latency and the speedup over the first worker count.
+
+The tool result cache is off by default so every call does the full work;
+pass --cache-ttl 30 --keys 50 to measure the cache shared by the workers.
+Scaling is bounded by the free cores: the stub and the clients need CPU too.
+
+Usage:
+    python benchmarks/bench_http_workers.py [--workers 1,2,4] [--clients 8] [--payload-kb 200] [--seconds 10]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).parent.parent
+
+
+def make_issue(payload_kb: int) -> bytes:
+    comments = [{'id': str(i), 'author': {'displayName': f'User {i % 7}', 'accountId': f'u{i % 7}'},
+                 'body': 'Investigated the alert and attached logs. ' * 4, 'created': '2024-01-01T00:00:00.000+0000'}
+                for i in range(payload_kb * 4)]
+    issue = {'key': 'SUP-1', 'fields': {'summary': 'Large issue', 'description': 'x' * 1024,
+                                        'comment': {'comments': comments, 'total': len(comments)}}}
+    return json.dumps(issue).encode()
+
+
+def serve_stub(port: int, payload_kb: int) -> None:
+    body = make_issue(payload_kb)
+
+    class StubJira(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class StubServer(ThreadingHTTPServer):
+        request_queue_size = 1024
+        allow_reuse_port = True
+
+    StubServer(('127.0.0.1', port), StubJira).serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_client(url: str, seconds: float, keys: int, results) -> None:
+    http = requests.Session()
+    endpoint = f'{url}/mcp'
+    response = http.post(endpoint, json={'jsonrpc': '2.0', 'id': 0, 'method': 'initialize', 'params': {
+        'protocolVersion': '2025-06-18', 'capabilities': {}, 'clientInfo': {'name': 'bench', 'version': '1'}}})
+    headers = {'Mcp-Session-Id': response.headers['Mcp-Session-Id']}
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        result = http.post(endpoint, headers=headers, json={
+            'jsonrpc': '2.0', 'id': i, 'method': 'tools/call',
+            'params': {'name': 'get_issue', 'arguments': {'issue_key': f'SUP-{i % keys + 1}'}}}).json()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert not result['result']['isError'], result['result']['content'][0]['text'][:200]
+        i += 1
+    http.delete(endpoint, headers=headers)
+    results.put(latencies)
+
+
+def wait_healthy(url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f'{url}/health', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError('HTTP server did not start')
+
+
+def measure(workers: int, args, stub_port: int):
+    port = free_port()
+    env = {**os.environ, 'ATLASSIAN_BASE_URL': f'http://127.0.0.1:{stub_port}', 'ATLASSIAN_USERNAME': 'bench',
+           'ATLASSIAN_API_TOKEN': 'bench', 'MCP_CACHE_TTL': str(args.cache_ttl), 'MCP_CONFIG_RELOAD_INTERVAL': '0'}
+    server = subprocess.Popen([sys.executable, '-m', 'mcp_server.http_server', '--port', str(port),
+                               '--workers', str(workers)], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f'http://127.0.0.1:{port}'
+        wait_healthy(url)
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=run_client, args=(url, args.seconds, args.keys, results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        latencies = [ms for _ in clients for ms in results.get()]
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait(30)
+    latencies.sort()
+    return len(latencies) / args.seconds, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated worker counts to compare')
+    parser.add_argument('--clients', type=int, default=8, help='client processes (one session each)')
+    parser.add_argument('--payload-kb', type=int, default=200, help='approximate size of the stub issue')
+    parser.add_argument('--seconds', type=float, default=10, help='measurement time per worker count')
+    parser.add_argument('--stub-processes', type=int, default=2, help='stub Jira processes sharing its port')
+    parser.add_argument('--cache-ttl', type=float, default=0, help='MCP_CACHE_TTL for the server (0 = off)')
+    parser.add_argument('--keys', type=int, default=1000, help='distinct issue keys the clients cycle through')
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stubs = [multiprocessing.Process(target=serve_stub, args=(stub_port, args.payload_kb), daemon=True)
+             for _ in range(args.stub_processes)]
+    for stub in stubs:
+        stub.start()
+    time.sleep(0.5)
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, ~{len(make_issue(args.payload_kb)) // 1024} KB issues, "
+          f"cache ttl {args.cache_ttl:g}s, {args.seconds:g}s per run\n")
+    print(f"{'workers':>7} {'calls/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}")
+    baseline = None
+    for workers in [int(n) for n in args.workers.split(',')]:
+        rate, p50, p95 = measure(workers, args, stub_port)
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>10.1f} {p50:>8.1f} {p95:>8.1f} {rate / baseline:>7.2f}x")
+
+    for stub in stubs:
+        stub.terminate()
+
+
+if __name__ == '__main__':
+    main()
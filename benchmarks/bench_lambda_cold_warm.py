@@ -0,0 +1,120 @@
+"""Cold/warm latency benchmark for the Lambda handler against a stub upstream.
+
+Starts a local HTTP server that mimics the Jira Cloud endpoints used by
+get_open_support_tickets (search + per-issue fetch, with a fixed delay per
+request), points the Cloud providers at it, and times:
+
+  cold  - importing lambda_handler plus the first tools/call
+  warm  - subsequent tools/call invocations on the persistent event loop
+  fresh - the same invocations with a new event loop per call (previous behaviour)
+
+Usage:
+    python benchmarks/bench_lambda_cold_warm.py [--issues 20] [--delay-ms 20] [--warm 20]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def make_stub_handler(issue_count: int, delay: float):
+    keys = [f"SUP-{i}" for i in range(1, issue_count + 1)]
+
+    class StubJira(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            path = urlparse(self.path).path
+            if path.endswith('/search/jql'):
+                body = {'total': len(keys), 'issues': [{'key': k, 'fields': {'summary': k}} for k in keys]}
+            elif '/issue/' in path:
+                key = path.rsplit('/', 1)[-1]
+                body = {'key': key, 'fields': {'summary': f'Ticket {key}', 'updated': '2024-01-01T00:00:00.000+0000',
+                                               'customfield_10001': 'Alert' if key.endswith('1') else 'Request'}}
+            else:
+                body = {}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return StubJira
+
+
+class Context:
+    aws_request_id = 'bench'
+
+
+def invoke(handler, event):
+    start = time.perf_counter()
+    response = handler.lambda_handler(event, Context())
+    elapsed = (time.perf_counter() - start) * 1000
+    assert response['statusCode'] == 200, response
+    return elapsed
+
+
+def summarize(label, samples):
+    print(f"{label:<28} median {statistics.median(samples):8.1f} ms   "
+          f"min {min(samples):8.1f} ms   max {max(samples):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--issues', type=int, default=20, help='tickets in the stub support queue')
+    parser.add_argument('--delay-ms', type=float, default=20, help='stub latency per upstream request')
+    parser.add_argument('--warm', type=int, default=20, help='warm invocations to time')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(args.issues, args.delay_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        'ATLASSIAN_BASE_URL': f'http://127.0.0.1:{server.server_port}',
+        'ATLASSIAN_USERNAME': 'bench',
+        'ATLASSIAN_API_TOKEN': 'bench',
+        'AGENT_PRIMARY_TEAM': json.dumps([{'account_id': 'u1', 'name': 'Bench'}]),
+        'AGENT_TEMPLATE_MAPPING': json.dumps({'Support Request': {'custom_field': 'customfield_10001'}}),
+    })
+
+    event = {'httpMethod': 'POST',
+             'body': json.dumps({'method': 'tools/call', 'params': {'name': 'get_open_support_tickets', 'arguments': {}}})}
+
+    start = time.perf_counter()
+    import lambda_handler as handler
+    import_ms = (time.perf_counter() - start) * 1000
+    handler.metrics.stream = io.StringIO()  # keep EMF lines out of the report
+    first_ms = invoke(handler, event)
+
+    warm = [invoke(handler, event) for _ in range(args.warm)]
+
+    fresh = []
+    for _ in range(args.warm):
+        # Emulate the previous handler: a brand new loop (and thread pool) per invocation
+        handler.get_event_loop().close()
+        fresh.append(invoke(handler, event))
+
+    server.shutdown()
+    print(f"{args.issues} queue tickets, {args.delay_ms:.0f} ms stub latency, {args.warm} warm invocations\n")
+    print(f"{'cold (import + first call)':<28} {import_ms + first_ms:8.1f} ms   (import {import_ms:.1f} ms)")
+    summarize('warm, persistent loop', warm)
+    summarize('warm, loop per call', fresh)
+
+
+if __name__ == '__main__':
+    main()
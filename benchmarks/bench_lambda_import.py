@@ -0,0 +1,98 @@
+"""Cold start benchmark for the Lambda handler.
+
+Each sample runs in a fresh interpreter, like a new Lambda execution
+environment. It reports:
+
+  import  - cumulative `python -X importtime` cost of `import lambda_handler`
+  health  - import + GET health check
+  list    - import + tools/list
+  call    - import + first tools/call (providers are unconfigured, so no network)
+
+plus the slowest modules pulled in by the import.
+
+Usage:
+    python benchmarks/bench_lambda_import.py [--samples 5] [--top 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SCENARIO = """
+import io, json, sys, time
+start = time.perf_counter()
+import lambda_handler
+class Context:
+    aws_request_id = 'bench'
+events = {
+    'health': {'httpMethod': 'GET'},
+    'list': {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/list'})},
+    'call': {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/call', 'params': {'name': 'get_issue', 'arguments': {'issue_key': 'BENCH-1'}}})},
+}
+lambda_handler.metrics.stream = io.StringIO()
+lambda_handler.lambda_handler(events[sys.argv[1]], Context())
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def clean_env():
+    # Unconfigured providers: nothing leaves the machine
+    return {k: v for k, v in os.environ.items()
+            if not k.startswith(('ATLASSIAN_', 'JIRA_', 'CONFLUENCE_', 'BITBUCKET_', 'AGENT_'))}
+
+
+def parse_importtime(stderr, target='lambda_handler'):
+    """Return (cumulative_us, {module: cumulative_us}) for target and the modules it pulled in"""
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):
+            # Nested imports are listed before the module that triggered them
+            children[name.strip()] = int(cumulative)
+        elif name.strip() == target:
+            return int(cumulative), children
+        else:
+            children = {}
+    raise RuntimeError(f'{target} not found in importtime output')
+
+
+def measure_import():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import lambda_handler'],
+                            cwd=ROOT, env=clean_env(), capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def measure_scenario(name):
+    result = subprocess.run([sys.executable, '-c', SCENARIO, name],
+                            cwd=ROOT, env=clean_env(), capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=5, help='fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest imported modules to list')
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.samples)]
+    import_ms = [total / 1000 for total, _ in imports]
+    print(f"{'import lambda_handler':<24} median {statistics.median(import_ms):7.1f} ms")
+    for scenario in ('health', 'list', 'call'):
+        samples = [measure_scenario(scenario) for _ in range(args.samples)]
+        print(f"{'import + ' + scenario:<24} median {statistics.median(samples):7.1f} ms")
+
+    print("\nSlowest modules imported by lambda_handler (cumulative, last sample):")
+    slowest = sorted(imports[-1][1].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[:args.top]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
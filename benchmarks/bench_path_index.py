@@ -0,0 +1,64 @@
+"""Micro-benchmark for the commit-keyed path index behind search_files.
+
+Builds a synthetic repository tree and times index construction, the first
+search in each match mode, a repeated (memoized) search, and the previous
+per-call list comprehension over every path.
+
+Usage:
+    python benchmarks/bench_path_index.py [--paths 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common.path_index import PathIndex  # noqa: E402
+
+WORDS = ['api', 'core', 'service', 'user', 'profile', 'billing', 'auth', 'util', 'model', 'handler', 'client', 'config']
+EXTENSIONS = ['.py', '.java', '.ts', '.md', '.json', '.yaml']
+
+
+def make_paths(count: int):
+    rng = random.Random(42)
+    return [
+        '/'.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))) + f'/{rng.choice(WORDS)}_{i}{rng.choice(EXTENSIONS)}'
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat=1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def fmt(seconds):
+    return f"{seconds * 1e6:10.1f} us" if seconds < 1e-3 else f"{seconds * 1e3:10.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', type=int, default=100000, help='files in the synthetic repository')
+    args = parser.parse_args()
+
+    paths = make_paths(args.paths)
+    build, index = timed(lambda: PathIndex(paths))
+    print(f"{len(index)} paths, index built in {fmt(build).strip()}\n")
+
+    baseline, _ = timed(lambda: [p for p in paths if 'profile_1' in p.lower()], repeat=3)
+    print(f"{'previous list filter':<34} {fmt(baseline)}")
+    for mode, query in (('substring', 'profile_1'), ('glob', 'auth/*/user_*.ts'), ('fuzzy', 'billhand')):
+        first, result = timed(lambda: index.search(query, mode))
+        repeat, _ = timed(lambda: index.search(query, mode), repeat=100)
+        print(f"{mode + ' ' + repr(query):<34} {fmt(first)} first   {fmt(repeat)} repeat   {len(result):6d} matches")
+
+
+if __name__ == '__main__':
+    main()
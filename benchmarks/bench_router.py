@@ -0,0 +1,62 @@
+"""Dispatch overhead of route_tool_call.
+
+Times routing (lookup, argument mapping and the await of a no-op handler) for
+the first, middle and last tool in the registry. Registry lookup is a dict
+access, so all three should cost the same; the previous if/elif chain grew
+linearly with the tool's position.
+
+Usage:
+    python benchmarks/bench_router.py [--calls 100000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common.registry import TOOL_SPECS  # noqa: E402
+from mcp_server.common.router import route_tool_call  # noqa: E402
+
+
+class NoopProvider:
+    def __getattr__(self, name):
+        async def method(*args):
+            return {}
+        return method
+
+
+def sample_arguments(spec):
+    return {arg: 'x' for arg in spec.args if isinstance(arg, str)}
+
+
+async def time_tool(spec, calls, providers, repeats=5):
+    """Best of several runs, in microseconds per call"""
+    arguments = sample_arguments(spec)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await route_tool_call(spec.name, arguments, *providers)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20_000)
+    args = parser.parse_args()
+
+    provider = NoopProvider()
+    providers = (provider, provider, provider)
+    # Bitbucket tools only; ticket support handlers are real functions
+    specs = [spec for spec in TOOL_SPECS if spec.target == 'bitbucket']
+    for label, spec in (('first', TOOL_SPECS[0]), ('middle', specs[len(specs) // 2]), ('last', specs[-1])):
+        per_call = asyncio.run(time_tool(spec, args.calls, providers))
+        print(f"{label:<7} {spec.name:<28} {per_call:6.2f} us/call")
+
+
+if __name__ == '__main__':
+    main()
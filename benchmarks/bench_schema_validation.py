@@ -0,0 +1,63 @@
+"""Argument validation overhead in the dispatch path.
+
+Times the compiled validators alone (valid and invalid calls), the one-off
+compile of every schema in tool_schemas.py, and the precompiled regex checks
+in validation.py against re.match with a pattern literal.
+
+Usage:
+    python benchmarks/bench_schema_validation.py [--calls 200000]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common.schema_validation import compile_schema  # noqa: E402
+from mcp_server.common.tool_schemas import TOOL_SCHEMAS  # noqa: E402
+from mcp_server.common import validation  # noqa: E402
+
+CASES = [
+    ('get_issue (valid)', 'get_issue', {'issue_key': 'PROJ-123'}),
+    ('create_issue (valid)', 'create_issue', {'project_key': 'PROJ', 'summary': 's', 'description': 'd', 'custom_fields': {}}),
+    ('create_webhook (valid)', 'create_webhook', {'repo_slug': 'r', 'url': 'https://x', 'events': ['a', 'b', 'c']}),
+    ('get_pull_request (bad type)', 'get_pull_request', {'repo_slug': 'r', 'pr_id': '7'}),
+    ('get_issue (missing)', 'get_issue', {}),
+]
+
+
+def best_of(fn, calls, repeats=5):
+    """Best of several runs, in microseconds per call"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    validators = {name: compile_schema(schema) for name, schema in TOOL_SCHEMAS.items()}
+    print(f"compile {len(validators)} schemas: {(time.perf_counter() - start) * 1000:.2f} ms\n")
+
+    for label, name, arguments in CASES:
+        validator = validators[name]
+        print(f"{label:<30} {best_of(lambda: validator(arguments), args.calls):6.3f} us/call")
+
+    print()
+    literal = r'^[A-Z][A-Z0-9]+-\d+$'
+    print(f"{'re.match(literal)':<30} {best_of(lambda: re.match(literal, 'PROJ-123'), args.calls):6.3f} us/call")
+    print(f"{'validate_issue_key':<30} {best_of(lambda: validation.validate_issue_key('PROJ-123'), args.calls):6.3f} us/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -82,6 +82,10 @@ def build_parameter_overrides(config):
     params.append(f'AgentWorkloadStatuses="{json.dumps(agent.get("workload_statuses", []))}"')
     params.append(f'AgentSupportJql="{agent.get("support_jql", "")}"')
     
+    # Tool profiles
+    params.append(f'ToolProfile="{config.get("tool_profile", "all")}"')
+    params.append(f'ToolProfiles="{json.dumps(config.get("tool_profiles", {}))}"')
+    
     return ' '.join(params)
 
 def main():
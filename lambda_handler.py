@@ -1,76 +1,162 @@
 import json
-import asyncio
 import os
 import time
 import logging
-import boto3
 from datetime import datetime
 from mcp_server.common.tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS, TICKET_SUPPORT_TOOLS
-from mcp_server.common.tool_schemas import TOOL_SCHEMAS
 from mcp_server.common.router import route_tool_call
+from mcp_server.common.metrics import MetricsLogger
+from mcp_server.common.config import load_config
+
+# Heavy dependencies (requests via the providers, asyncio, tool schemas, numpy via the
+# ticket support agent) are imported on first use so health checks and tools/list
+# do not pay for them on a cold start.
 
 # Setup structured logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# CloudWatch client for custom metrics
-cloudwatch = boto3.client('cloudwatch')
-from mcp_server.cloud.jira_provider import JiraProvider
-from mcp_server.cloud.confluence_provider import ConfluenceProvider
-from mcp_server.cloud.bitbucket_provider import BitbucketProvider
-from mcp_server.datacenter.jira_dc_provider import JiraDCProvider
-from mcp_server.datacenter.confluence_dc_provider import ConfluenceDCProvider
-from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
-
-# Detect platform: Data Center uses service-specific PAT tokens, Cloud uses shared credentials
-PLATFORM = 'datacenter' if (os.getenv('JIRA_PAT_TOKEN') or os.getenv('CONFLUENCE_PAT_TOKEN') or os.getenv('BITBUCKET_PAT_TOKEN')) else 'cloud'
-
-# Initialize providers based on platform (providers handle their own availability)
-if PLATFORM == 'datacenter':
-    jira = JiraDCProvider()
-    confluence = ConfluenceDCProvider()
-    bitbucket = BitbucketDCProvider()
-else:
-    jira = JiraProvider()
-    confluence = ConfluenceProvider()
-    bitbucket = BitbucketProvider()
-
-# Initialize ticket support agent if configured
-try:
-    agent_primary = os.getenv('AGENT_PRIMARY_TEAM', '')
-    agent_secondary = os.getenv('AGENT_SECONDARY_TEAM', '')
-    if agent_primary or agent_secondary:
-        from mcp_server.common.ticket_support_tools import initialize_agent
-        primary_team = json.loads(agent_primary) if agent_primary else []
-        secondary_team = json.loads(agent_secondary) if agent_secondary else []
-        template_mapping = json.loads(os.getenv('AGENT_TEMPLATE_MAPPING', '{}'))
-        excluded_types = json.loads(os.getenv('AGENT_EXCLUDED_TYPES', '[]'))
-        workload_statuses = json.loads(os.getenv('AGENT_WORKLOAD_STATUSES', '[]'))
-        support_jql = os.getenv('AGENT_SUPPORT_JQL', '')
-        initialize_agent(
-            primary_team,
-            secondary_team,
-            template_mapping,
-            confluence if confluence.available else None,
-            excluded_types,
-            workload_statuses,
-            support_jql
-        )
-        logger.info(f"Ticket support agent initialized with {len(primary_team)} primary and {len(secondary_team)} secondary team members")
-except Exception as e:
-    logger.warning(f"Failed to initialize ticket support agent: {e}")
-
-# Merge tools with their schemas
-ALL_TOOLS = []
-for tool in (JIRA_TOOLS + CONFLUENCE_TOOLS + BITBUCKET_TOOLS + TICKET_SUPPORT_TOOLS):
-    tool_with_schema = tool.copy()
-    if tool['name'] in TOOL_SCHEMAS:
-        tool_with_schema['inputSchema'] = TOOL_SCHEMAS[tool['name']]
-    else:
-        tool_with_schema['inputSchema'] = {"type": "object", "properties": {}}
-    ALL_TOOLS.append(tool_with_schema)
-
-async def call_tool(name: str, arguments: dict):
+# Custom metrics are buffered per invocation and written as Embedded Metric Format log lines
+metrics = MetricsLogger(namespace='AtlassianMCP')
+
+def load_server_config():
+    """Lambda is configured through environment variables only (parsed once, including the JSON ones)"""
+    try:
+        return load_config(None)
+    except ValueError as e:
+        logger.warning(f"Invalid configuration, ignoring agent and tool profile settings: {e}")
+        return load_config(None, {k: v for k, v in os.environ.items() if not k.startswith(('AGENT_', 'TOOL_PROFILE'))})
+
+config = load_server_config()
+
+# Data Center uses service-specific PAT tokens, Cloud uses shared credentials
+PLATFORM = config.platform
+
+TOOL_COUNT = len(JIRA_TOOLS) + len(CONFLUENCE_TOOLS) + len(BITBUCKET_TOOLS) + len(TICKET_SUPPORT_TOOLS)
+
+# Clients may pick a tool profile other than the configured default with this header
+PROFILE_HEADER = 'X-MCP-Tool-Profile'
+
+_runtime = None
+_profiles = None
+
+def get_providers():
+    """Construct the detected platform's providers on first use (providers handle their own availability)"""
+    global _runtime
+    if _runtime is None:
+        from mcp_server.common.runtime import ProviderRuntime
+        _runtime = ProviderRuntime(config, init_agent=initialize_ticket_support_agent)
+    current = _runtime.current
+    return current.jira, current.confluence, current.bitbucket
+
+def initialize_ticket_support_agent(config, confluence):
+    """Initialize ticket support agent if configured"""
+    try:
+        from mcp_server.common.runtime import initialize_ticket_support
+        if initialize_ticket_support(config, confluence):
+            agent = config.ticket_support
+            logger.info(f"Ticket support agent initialized with {len(agent.primary_team_members)} primary and {len(agent.secondary_team_members)} secondary team members")
+            return True
+    except Exception as e:
+        logger.warning(f"Failed to initialize ticket support agent: {e}")
+    return False
+
+def get_profiles():
+    """Built-in plus configured (TOOL_PROFILES) tool profiles, resolved once"""
+    global _profiles
+    if _profiles is None:
+        from mcp_server.common.profiles import ToolProfiles
+        try:
+            _profiles = ToolProfiles(config.tool_profiles, default=config.tool_profile)
+        except Exception as e:
+            logger.warning(f"Invalid tool profile configuration, serving all tools: {e}")
+            _profiles = ToolProfiles()
+    return _profiles
+
+def get_header(event, name):
+    """Case-insensitive request header lookup (API Gateway passes headers as sent)"""
+    headers = event.get('headers') or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def tools_list_response(event, profile):
+    """Serve the profile's precomputed catalog: 304 when the client's ETag matches, gzip when accepted"""
+    catalog = get_profiles().catalog(profile)
+    headers = {
+        'ETag': catalog.etag,
+        'Cache-Control': 'no-cache',
+        'Vary': f'Accept-Encoding, {PROFILE_HEADER}',
+        PROFILE_HEADER: profile,
+        'X-MCP-Catalog-Tools': str(len(catalog.tools)),
+        'X-MCP-Catalog-Bytes': str(len(catalog.body_bytes))
+    }
+    if catalog.not_modified(get_header(event, 'If-None-Match')):
+        return {'statusCode': 304, 'headers': headers, 'body': ''}
+    headers['Content-Type'] = 'application/json'
+    if catalog.wants_gzip(get_header(event, 'Accept-Encoding')):
+        import base64
+        headers['Content-Encoding'] = 'gzip'
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': base64.b64encode(catalog.gzip_body).decode('ascii'),
+            'isBase64Encoded': True
+        }
+    return {'statusCode': 200, 'headers': headers, 'body': catalog.body}
+
+# Worker threads for concurrent provider calls (see mcp_server.common.concurrency)
+PROVIDER_THREADS = int(os.getenv('PROVIDER_THREADS', '16'))
+
+# tools/call_many and batch requests: calls per request, and how many run at once
+MAX_CALLS_PER_REQUEST = int(os.getenv('MAX_CALLS_PER_REQUEST', '25'))
+CALL_MANY_CONCURRENCY = int(os.getenv('CALL_MANY_CONCURRENCY', '8'))
+
+# One event loop for the lifetime of the execution environment. Reusing it across warm
+# invocations keeps its thread pool, and anything else bound to the loop, alive between calls.
+_loop = None
+
+def get_event_loop():
+    """Return the long-lived event loop, creating it on first use or if it was closed"""
+    global _loop
+    import asyncio
+    if _loop is None or _loop.is_closed():
+        from concurrent.futures import ThreadPoolExecutor
+        _loop = asyncio.new_event_loop()
+        _loop.set_default_executor(ThreadPoolExecutor(max_workers=PROVIDER_THREADS, thread_name_prefix='provider'))
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+def run_async(coro):
+    """Run a coroutine to completion on the persistent event loop.
+    
+    Lambda freezes the process between invocations, so nothing may be left running
+    on the loop afterwards: tasks the call spawned but did not await are cancelled.
+    """
+    import asyncio
+    loop = get_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+def profile_error(profile, name):
+    """Return an error message if the tool profile does not allow the tool"""
+    if profile and not get_profiles().allows(profile, name):
+        return f"Tool '{name}' is not available in tool profile '{profile}'"
+    return None
+
+async def call_tool(name: str, arguments: dict, profile: str = None):
+    error = profile_error(profile, name)
+    if error:
+        raise ValueError(error)
+    jira, confluence, bitbucket = get_providers()
     return await route_tool_call(name, arguments, jira, confluence, bitbucket)
 
 def log_structured(level, message, **kwargs):
@@ -84,20 +170,158 @@ def log_structured(level, message, **kwargs):
     logger.log(getattr(logging, level), json.dumps(log_entry))
 
 def put_metric(metric_name, value, unit='Count', **dimensions):
-    """Send custom metric to CloudWatch"""
+    """Buffer a custom metric; it is written to CloudWatch Logs when the invocation completes"""
     try:
-        cloudwatch.put_metric_data(
-            Namespace='AtlassianMCP',
-            MetricData=[{
-                'MetricName': metric_name,
-                'Value': value,
-                'Unit': unit,
-                'Timestamp': datetime.utcnow(),
-                'Dimensions': [{'Name': k, 'Value': v} for k, v in dimensions.items()]
-            }]
-        )
+        metrics.put_metric(metric_name, value, unit, **dimensions)
     except Exception as e:
-        logger.error(f"Failed to send metric: {e}")
+        logger.error(f"Failed to record metric: {e}")
+
+def response(status_code, payload):
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': 'application/json'},
+        'body': payload if isinstance(payload, str) else json.dumps(payload)
+    }
+
+async def invoke_tool(tool_name, arguments, request_id, profile=None, in_thread=False):
+    """Run one tool call with logging and metrics, returning its status, result or error and timing"""
+    rejected = profile_error(profile, tool_name)
+    if rejected:
+        # A client error, not a tool failure, so it is not counted in the Failure metric
+        log_structured('WARNING', 'Tool invocation rejected',
+                      request_id=request_id,
+                      tool_name=tool_name,
+                      tool_profile=profile,
+                      platform=PLATFORM)
+        return {'name': tool_name, 'status': 'error', 'error': rejected, 'rejected': True, 'duration_ms': 0.0}
+    tool_start = time.time()
+    log_structured('INFO', 'Tool invocation started',
+                  request_id=request_id,
+                  tool_name=tool_name,
+                  platform=PLATFORM)
+    try:
+        if in_thread:
+            # Providers block, so concurrent calls each get a worker thread
+            from mcp_server.common.concurrency import run_in_thread
+            result = await run_in_thread(call_tool(tool_name, arguments, profile))
+        else:
+            result = await call_tool(tool_name, arguments, profile)
+    except Exception as tool_error:
+        tool_duration = (time.time() - tool_start) * 1000
+        
+        # Log failure
+        log_structured('ERROR', 'Tool invocation failed',
+                      request_id=request_id,
+                      tool_name=tool_name,
+                      duration_ms=tool_duration,
+                      error=str(tool_error),
+                      platform=PLATFORM)
+        
+        # Send failure metric
+        put_metric('ToolInvocation', 1, ToolName=tool_name, Platform=PLATFORM, Status='Failure')
+        return {'name': tool_name, 'status': 'error', 'error': str(tool_error), 'duration_ms': round(tool_duration, 1)}
+    
+    tool_duration = (time.time() - tool_start) * 1000  # ms
+    
+    # Log success
+    log_structured('INFO', 'Tool invocation succeeded',
+                  request_id=request_id,
+                  tool_name=tool_name,
+                  duration_ms=tool_duration,
+                  platform=PLATFORM)
+    
+    # Send custom metrics
+    put_metric('ToolInvocation', 1, ToolName=tool_name, Platform=PLATFORM, Status='Success')
+    put_metric('ToolDuration', tool_duration, unit='Milliseconds', ToolName=tool_name, Platform=PLATFORM)
+    return {'name': tool_name, 'status': 'success', 'result': result, 'duration_ms': round(tool_duration, 1)}
+
+async def invoke_tools(calls, request_id, profile=None):
+    """Run several tool calls concurrently, returning their outcomes in request order"""
+    import asyncio
+    get_providers()  # construct providers once, before the calls fan out across threads
+    semaphore = asyncio.Semaphore(CALL_MANY_CONCURRENCY)
+    
+    async def bounded(call):
+        async with semaphore:
+            return await invoke_tool(call.get('name'), call.get('arguments', {}), request_id, profile, in_thread=True)
+    
+    return await asyncio.gather(*(bounded(call) for call in calls))
+
+def validate_calls(calls):
+    """Return an error message if a tools/call_many or batch call list is unusable"""
+    if not isinstance(calls, list) or not calls:
+        return 'calls must be a non-empty list'
+    if len(calls) > MAX_CALLS_PER_REQUEST:
+        return f'At most {MAX_CALLS_PER_REQUEST} calls per request'
+    for call in calls:
+        if not isinstance(call, dict) or not call.get('name'):
+            return 'Each call needs a tool name'
+    return None
+
+def handle_rpc(body, request_id, profile=None):
+    """Handle a single JSON-RPC request object, returning (status_code, payload)"""
+    method = body.get('method')
+    params = body.get('params', {})
+    
+    # List tools
+    if method == 'tools/list':
+        return 200, get_profiles().catalog(profile).body
+    
+    # Call tool
+    if method == 'tools/call':
+        # Run async tool call on the persistent loop
+        outcome = run_async(invoke_tool(params.get('name'), params.get('arguments', {}), request_id, profile))
+        if outcome['status'] == 'error':
+            return (403 if outcome.get('rejected') else 500), {'error': outcome['error']}
+        return 200, {'result': outcome['result']}
+    
+    # Call several tools concurrently in one request
+    if method == 'tools/call_many':
+        calls = params.get('calls')
+        error = validate_calls(calls)
+        if error:
+            return 400, {'error': error}
+        start = time.time()
+        results = run_async(invoke_tools(calls, request_id, profile))
+        return 200, {'results': results, 'duration_ms': round((time.time() - start) * 1000, 1)}
+    
+    return 400, {'error': 'Invalid method'}
+
+def handle_batch(batch, request_id, profile=None):
+    """Handle a JSON-RPC batch array. tools/call entries run concurrently; responses keep request order."""
+    if not batch:
+        return 400, {'error': 'Empty batch'}
+    if len(batch) > MAX_CALLS_PER_REQUEST:
+        return 400, {'error': f'At most {MAX_CALLS_PER_REQUEST} requests per batch'}
+    
+    responses = [None] * len(batch)
+    tool_calls = []
+    for index, item in enumerate(batch):
+        if not isinstance(item, dict):
+            responses[index] = {'id': None, 'error': 'Invalid request'}
+        elif item.get('method') == 'tools/call_many':
+            # Each batch entry is one call, so MAX_CALLS_PER_REQUEST bounds the whole request
+            responses[index] = {'id': item.get('id'), 'error': 'tools/call_many is not allowed inside a batch'}
+        elif item.get('method') == 'tools/call':
+            tool_calls.append((index, item.get('params', {})))
+        else:
+            status_code, payload = handle_rpc(item, request_id, profile)
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            responses[index] = {'id': item.get('id'), **payload}
+    
+    if tool_calls:
+        outcomes = run_async(invoke_tools([params for _, params in tool_calls], request_id, profile))
+        for (index, _), outcome in zip(tool_calls, outcomes):
+            entry = {'id': batch[index].get('id'), 'status': outcome['status'], 'duration_ms': outcome['duration_ms']}
+            if outcome['status'] == 'error':
+                entry['error'] = outcome['error']
+                if outcome.get('rejected'):
+                    entry['rejected'] = True
+            else:
+                entry['result'] = outcome['result']
+            responses[index] = entry
+    return 200, responses
 
 def lambda_handler(event, context):
     """AWS Lambda handler for MCP server"""
@@ -112,86 +336,36 @@ def lambda_handler(event, context):
     # Health check
     if event.get('httpMethod') == 'GET':
         log_structured('INFO', 'Health check', request_id=request_id)
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'status': 'healthy', 'tools': len(ALL_TOOLS), 'platform': PLATFORM})
-        }
+        profiles = get_profiles()
+        return response(200, {
+            'status': 'healthy',
+            'tools': len(profiles.names()),
+            'platform': PLATFORM,
+            'tool_profile': profiles.default,
+            'profiles': profiles.counts()
+        })
     
     # Parse request
     try:
-        body = event.get('body', '{}')
-        if isinstance(body, str):
+        body = event.get('body') or '{}'
+        if event.get('isBase64Encoded') and isinstance(body, str):
+            # API Gateway base64-encodes request bodies when binary media types are enabled
+            import base64
+            body = base64.b64decode(body)
+        if isinstance(body, (str, bytes)):
             body = json.loads(body)
         
-        method = body.get('method')
-        params = body.get('params', {})
-        
-        # List tools
-        if method == 'tools/list':
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'tools': ALL_TOOLS})
-            }
+        profile = get_header(event, PROFILE_HEADER) or get_profiles().default
+        if not get_profiles().exists(profile):
+            return response(400, {'error': f"Unknown tool profile: {profile}",
+                                  'profiles': get_profiles().profile_names()})
         
-        # Call tool
-        if method == 'tools/call':
-            tool_name = params.get('name')
-            arguments = params.get('arguments', {})
-            tool_start = time.time()
-            
-            log_structured('INFO', 'Tool invocation started',
-                          request_id=request_id,
-                          tool_name=tool_name,
-                          platform=PLATFORM)
-            
-            # Run async tool call
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(call_tool(tool_name, arguments))
-                tool_duration = (time.time() - tool_start) * 1000  # ms
-                
-                # Log success
-                log_structured('INFO', 'Tool invocation succeeded',
-                              request_id=request_id,
-                              tool_name=tool_name,
-                              duration_ms=tool_duration,
-                              platform=PLATFORM)
-                
-                # Send custom metrics
-                put_metric('ToolInvocation', 1, ToolName=tool_name, Platform=PLATFORM, Status='Success')
-                put_metric('ToolDuration', tool_duration, unit='Milliseconds', ToolName=tool_name, Platform=PLATFORM)
-                
-                return {
-                    'statusCode': 200,
-                    'headers': {'Content-Type': 'application/json'},
-                    'body': json.dumps({'result': result})
-                }
-            except Exception as tool_error:
-                tool_duration = (time.time() - tool_start) * 1000
-                
-                # Log failure
-                log_structured('ERROR', 'Tool invocation failed',
-                              request_id=request_id,
-                              tool_name=tool_name,
-                              duration_ms=tool_duration,
-                              error=str(tool_error),
-                              platform=PLATFORM)
-                
-                # Send failure metric
-                put_metric('ToolInvocation', 1, ToolName=tool_name, Platform=PLATFORM, Status='Failure')
-                
-                raise
-            finally:
-                loop.close()
-        
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': 'Invalid method'})
-        }
+        if isinstance(body, list):
+            return response(*handle_batch(body, request_id, profile))
+        # List tools (served with ETag and optional gzip)
+        if body.get('method') == 'tools/list':
+            return tools_list_response(event, profile)
+        return response(*handle_rpc(body, request_id, profile))
         
     except Exception as e:
         duration = (time.time() - start_time) * 1000
@@ -202,12 +376,12 @@ def lambda_handler(event, context):
                       error=str(e),
                       platform=PLATFORM)
         
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': str(e)})
-        }
+        return response(500, {'error': str(e)})
     finally:
+        try:
+            metrics.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush metrics: {e}")
         total_duration = (time.time() - start_time) * 1000
         log_structured('INFO', 'Request completed',
                       request_id=request_id,
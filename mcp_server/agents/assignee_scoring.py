@@ -0,0 +1,75 @@
+"""Local assignee scoring - ranks team members without round-tripping raw data to the AI"""
+
+import importlib.util
+from typing import Dict, List, Optional
+
+
+# Feature columns of the member x feature matrix, in order
+FEATURES = ['current_load', 'category_resolutions', 'prefix_matches', 'primary_team']
+
+# Default weight per feature. Load is penalised, related history and primary team membership rewarded.
+DEFAULT_WEIGHTS = {
+    'current_load': -1.0,
+    'category_resolutions': 1.0,
+    'prefix_matches': 1.5,
+    'primary_team': 2.0
+}
+
+# Resolution counts grow without bound, so they are log-damped before weighting
+_LOG_DAMPED = ('category_resolutions', 'prefix_matches')
+
+
+def is_available() -> bool:
+    """Return True if numpy is installed and local scoring can run"""
+    return importlib.util.find_spec('numpy') is not None
+
+
+class AssigneeScorer:
+    """Ranks candidates in a single vectorized pass over a member x feature matrix"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            unknown = set(weights) - set(FEATURES)
+            if unknown:
+                raise ValueError(f"Unknown scoring features: {', '.join(sorted(unknown))}")
+            self.weights.update({k: float(v) for k, v in weights.items()})
+
+    def rank(self, candidates: List[Dict], top_k: int = 3) -> List[Dict]:
+        """Score candidates and return the top_k with per-feature breakdowns.
+
+        Each candidate is a dict with a 'member' entry and one numeric value per FEATURES column.
+        Ties are broken by lower current load, then by original order.
+        """
+        if not candidates:
+            return []
+        try:
+            # numpy is optional and slow to import, so it is only loaded when ranking runs
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("numpy is required for local assignee scoring. Install with: pip install numpy")
+
+        raw = np.array([[float(c.get(f, 0) or 0) for f in FEATURES] for c in candidates], dtype=np.float64)
+        features = raw.copy()
+        damped = [FEATURES.index(f) for f in _LOG_DAMPED]
+        features[:, damped] = np.log1p(features[:, damped])
+
+        weights = np.array([self.weights[f] for f in FEATURES], dtype=np.float64)
+        contributions = features * weights
+        scores = contributions.sum(axis=1)
+
+        # lexsort uses the last key as primary: highest score first, then lowest load, then input order
+        order = np.lexsort((np.arange(len(candidates)), raw[:, 0], -scores))[:max(top_k, 0)]
+
+        ranking = []
+        for position, idx in enumerate(order, start=1):
+            ranking.append({
+                'rank': position,
+                'member': candidates[idx]['member'],
+                'score': round(float(scores[idx]), 4),
+                'breakdown': {
+                    f: {'value': candidates[idx].get(f, 0), 'contribution': round(float(contributions[idx, i]), 4)}
+                    for i, f in enumerate(FEATURES)
+                }
+            })
+        return ranking
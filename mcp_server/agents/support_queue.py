@@ -0,0 +1,181 @@
+"""Support queue snapshot - tracks open support tickets between polls so callers only receive deltas"""
+
+import math
+import re
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+# Tickets leave the queue by being assigned or transitioned, both of which bump updated,
+# so a periodic full reload is only a safety net for anything the delta queries miss
+DEFAULT_RESYNC_INTERVAL = 3600
+DEFAULT_MAX_TOMBSTONES = 1000
+# Jira's relative dates have minute granularity; widen each delta window by this much
+DELTA_MARGIN_MINUTES = 1
+
+_ORDER_BY = re.compile(r'\s+ORDER\s+BY\s+.*$', re.IGNORECASE | re.DOTALL)
+
+
+def strip_order_by(jql: str) -> str:
+    """Remove a trailing ORDER BY clause so the query can be combined with other clauses"""
+    return _ORDER_BY.sub('', jql.strip())
+
+
+def build_delta_jql(jql: str, minutes: int) -> str:
+    """Restrict a queue query to issues updated within the last N minutes"""
+    return f'({strip_order_by(jql)}) AND updated >= "-{minutes}m"'
+
+
+def build_touched_jql(keys: List[str], minutes: int) -> str:
+    """Find which of the given issues were updated within the last N minutes"""
+    return f'key in ({", ".join(keys)}) AND updated >= "-{minutes}m"'
+
+
+class SupportQueueSnapshot:
+    """In-memory view of the support queue keyed by issue key and updated timestamp.
+
+    Every poll that changes the queue bumps the version. Entries remember the
+    version they were added and last changed at, and removals leave a bounded
+    tombstone, so the changes since any recent version token can be rebuilt
+    without keeping a copy of each old queue state.
+
+    Tokens also carry the wall-clock start of the poll they describe. Another
+    process (an HTTP server worker) keeps its own snapshot, so it diffs from its
+    latest version polled no later than that time: the result may repeat changes
+    the caller already has, but never misses one.
+    """
+
+    def __init__(self, resync_interval: float = DEFAULT_RESYNC_INTERVAL,
+                 max_tombstones: int = DEFAULT_MAX_TOMBSTONES):
+        self.resync_interval = resync_interval
+        self.max_tombstones = max_tombstones
+        # Tokens from another process or an earlier snapshot never match this generation
+        self.generation = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tombstones: "OrderedDict[str, int]" = OrderedDict()
+        self._pruned_through = 0
+        self.last_poll: Optional[float] = None
+        self.last_full_poll: Optional[float] = None
+        # (wall-clock poll start in ms, version after the poll), oldest first
+        self._polls: deque = deque(maxlen=max_tombstones)
+
+    @property
+    def token(self) -> str:
+        if not self._polls:
+            return f"{self.generation}:{self.version}"
+        return f"{self.generation}:{self.version}:{self._polls[-1][0]}"
+
+    def parse_token(self, token: Optional[str]) -> Optional[int]:
+        """Return the version a token refers to, or None if it cannot be diffed against"""
+        parts = token.split(':') if token else []
+        if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts[1:]):
+            return None
+        if parts[0] == self.generation:
+            version = int(parts[1])
+        elif len(parts) == 3:
+            # Issued by another process: use this snapshot's state as of that poll
+            version = self._version_at(int(parts[2]))
+            if version is None:
+                return None
+        else:
+            return None
+        if version > self.version or version < self._pruned_through:
+            return None
+        return version
+
+    def _version_at(self, polled_at: int) -> Optional[int]:
+        """The version after the latest poll that started no later than polled_at"""
+        for started, version in reversed(self._polls):
+            if started <= polled_at:
+                return version
+        return None
+
+    def needs_full_reload(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return self.last_full_poll is None or now - self.last_full_poll >= self.resync_interval
+
+    def delta_window_minutes(self, now: Optional[float] = None) -> int:
+        """Minutes to look back so the delta query overlaps the previous poll"""
+        now = time.monotonic() if now is None else now
+        return math.ceil((now - self.last_poll) / 60) + DELTA_MARGIN_MINUTES
+
+    def mark_polled(self, started: float, full: bool) -> None:
+        """Record when a successful poll started (the next delta window is measured from here)"""
+        self.last_poll = started
+        if full:
+            self.last_full_poll = started
+        self._polls.append((int((time.time() - (time.monotonic() - started)) * 1000), self.version))
+
+    def apply(self, upserts: List[Dict], removals: List[str]) -> bool:
+        """Apply one poll's results. Tickets are dicts with key, summary, type and updated.
+
+        Unchanged tickets (same updated, summary and type) are ignored. Returns True
+        if the queue changed, in which case the version was bumped.
+        """
+        version = self.version + 1
+        changed = False
+        for ticket in upserts:
+            key = ticket['key']
+            current = self.entries.get(key)
+            if current is None:
+                self.entries[key] = {**ticket, 'added_version': version, 'version': version}
+                self._tombstones.pop(key, None)
+                changed = True
+            elif any(current.get(f) != ticket.get(f) for f in ('updated', 'summary', 'type')):
+                current.update(ticket)
+                current['version'] = version
+                changed = True
+        for key in removals:
+            if self.entries.pop(key, None) is not None:
+                self._tombstones[key] = version
+                self._tombstones.move_to_end(key)
+                changed = True
+        if not changed:
+            return False
+        self.version = version
+        while len(self._tombstones) > self.max_tombstones:
+            _, pruned = self._tombstones.popitem(last=False)
+            self._pruned_through = max(self._pruned_through, pruned)
+        return True
+
+    def replace(self, tickets: List[Dict]) -> bool:
+        """Apply a full reload - anything not in tickets has left the queue"""
+        keys = {t['key'] for t in tickets}
+        return self.apply(tickets, [k for k in self.entries if k not in keys])
+
+    def view(self) -> Dict:
+        """Full queue, separated by type"""
+        alerts = [_public(t) for t in self.entries.values() if t['type'] == 'alert']
+        others = [_public(t) for t in self.entries.values() if t['type'] != 'alert']
+        return {
+            'alert_tickets': alerts,
+            'other_tickets': others,
+            'total_alerts': len(alerts),
+            'total_other': len(others),
+            'total': len(alerts) + len(others)
+        }
+
+    def delta_since(self, version: int) -> Dict:
+        """Tickets added, changed and removed after the given version"""
+        added, changed = [], []
+        for ticket in self.entries.values():
+            if ticket['added_version'] > version:
+                added.append({**_public(ticket), 'type': ticket['type']})
+            elif ticket['version'] > version:
+                changed.append({**_public(ticket), 'type': ticket['type']})
+        removed = [key for key, removed_at in self._tombstones.items() if removed_at > version]
+        total_alerts = sum(1 for t in self.entries.values() if t['type'] == 'alert')
+        return {
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'total_alerts': total_alerts,
+            'total_other': len(self.entries) - total_alerts,
+            'total': len(self.entries)
+        }
+
+
+def _public(ticket: Dict) -> Dict:
+    return {'key': ticket['key'], 'summary': ticket['summary']}
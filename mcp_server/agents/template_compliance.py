@@ -0,0 +1,235 @@
+"""Template compliance - parses Confluence templates and ticket descriptions into sections and diffs them"""
+
+import re
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+
+# Wiki markup heading (h1. Title), markdown heading (## Title) or a bold-only line (*Title*)
+_WIKI_HEADING = re.compile(r'^\s*h[1-6]\.\s+(.+?)\s*$')
+_MARKDOWN_HEADING = re.compile(r'^\s*#{1,6}\s+(.+?)\s*#*\s*$')
+_BOLD_LINE = re.compile(r'^\s*\*([^*]+?)\*\s*:?\s*$')
+_HTML_TAG = re.compile(r'<(?:h[1-6]|p|div|strong|br|ul|table)\b', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_NAME_STRIP = re.compile(r'[\s:*#._-]+$|^[\s:*#._-]+')
+
+_HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_BLOCK_TAGS = {'p', 'div', 'li', 'tr', 'br', 'td', 'th'}
+
+
+def normalize_section_name(name: str) -> str:
+    """Normalize a section heading for comparison (case, whitespace, trailing punctuation)"""
+    return _NAME_STRIP.sub('', _WHITESPACE.sub(' ', name)).lower()
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class _SectionParser(HTMLParser):
+    """Splits HTML into (heading, text) sections.
+
+    Headings are h1-h6. Pages without headings fall back to paragraphs whose
+    only content is bold text (<p><strong>Section</strong></p>).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headings: List[Tuple[str, List[str]]] = []
+        self.bold_blocks: List[Tuple[str, List[str]]] = []
+        self._in_heading = False
+        self._heading_text: List[str] = []
+        self._paragraph: Optional[List[Tuple[bool, str]]] = None
+        self._bold_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HEADING_TAGS:
+            self._in_heading = True
+            self._heading_text = []
+        elif tag == 'p':
+            self._paragraph = []
+        elif tag in ('strong', 'b'):
+            self._bold_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._append_text('\n')
+
+    def handle_endtag(self, tag):
+        if tag in _HEADING_TAGS and self._in_heading:
+            self._in_heading = False
+            self.headings.append((''.join(self._heading_text), []))
+        elif tag == 'p' and self._paragraph is not None:
+            chunks = [(bold, text) for bold, text in self._paragraph if text.strip()]
+            if chunks and all(bold for bold, _ in chunks):
+                self.bold_blocks.append((''.join(t for _, t in chunks), []))
+            else:
+                text = ''.join(t for _, t in self._paragraph)
+                if self.bold_blocks:
+                    self.bold_blocks[-1][1].append(text)
+            self._paragraph = None
+        elif tag in ('strong', 'b') and self._bold_depth:
+            self._bold_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_heading:
+            self._heading_text.append(data)
+            return
+        if self._paragraph is not None:
+            self._paragraph.append((self._bold_depth > 0, data))
+        elif self.bold_blocks:
+            self.bold_blocks[-1][1].append(data)
+        self._append_text(data)
+
+    def _append_text(self, data):
+        if self._in_heading:
+            return
+        if self.headings:
+            self.headings[-1][1].append(data)
+
+
+def parse_html_sections(html_text: str) -> List[Dict[str, str]]:
+    """Parse HTML (Confluence storage format or rendered HTML) into ordered sections"""
+    parser = _SectionParser()
+    parser.feed(html_text or '')
+    parser.close()
+    blocks = parser.headings or parser.bold_blocks
+    return [{'name': _normalize_text(name), 'text': _normalize_text(''.join(text))}
+            for name, text in blocks if name.strip()]
+
+
+def parse_wiki_sections(text: str) -> List[Dict[str, str]]:
+    """Parse Jira wiki markup or markdown into ordered sections"""
+    sections = []
+    for line in (text or '').splitlines():
+        match = _WIKI_HEADING.match(line) or _MARKDOWN_HEADING.match(line) or _BOLD_LINE.match(line)
+        if match:
+            sections.append({'name': _normalize_text(match.group(1)), 'lines': []})
+        elif sections:
+            sections[-1]['lines'].append(line)
+    return [{'name': s['name'], 'text': _normalize_text(' '.join(s['lines']))} for s in sections]
+
+
+def parse_description_sections(description) -> List[Dict[str, str]]:
+    """Parse a ticket description, detecting HTML vs wiki markup"""
+    if not description or not isinstance(description, str):
+        return []
+    if _HTML_TAG.search(description):
+        return parse_html_sections(description)
+    return parse_wiki_sections(description)
+
+
+def build_template_schema(page: Dict) -> Dict:
+    """Turn a Confluence page (expanded with body.storage) into a section schema"""
+    body = page.get('body', {}).get('storage', {}).get('value', '')
+    sections = parse_html_sections(body)
+    return {
+        'id': page.get('id'),
+        'title': page.get('title'),
+        'version': page.get('version', {}).get('number'),
+        'sections': [{'name': s['name'], 'key': normalize_section_name(s['name']), 'placeholder': s['text']}
+                     for s in sections]
+    }
+
+
+def compare_sections(schema: Dict, ticket_sections: List[Dict[str, str]]) -> Dict:
+    """Diff ticket sections against a template schema.
+
+    A section counts as empty when it has no text or still contains the
+    template's placeholder text unchanged.
+    """
+    ticket_by_key = OrderedDict()
+    for section in ticket_sections:
+        ticket_by_key.setdefault(normalize_section_name(section['name']), section)
+
+    template_keys = set()
+    missing, empty, present = [], [], []
+    for section in schema['sections']:
+        key = section['key']
+        template_keys.add(key)
+        found = ticket_by_key.get(key)
+        if found is None:
+            missing.append(section['name'])
+        elif not found['text'] or (section['placeholder'] and found['text'] == section['placeholder']):
+            empty.append(section['name'])
+        else:
+            present.append(section['name'])
+
+    extra = [s['name'] for key, s in ticket_by_key.items() if key not in template_keys]
+    return {
+        'compliant': not missing and not empty,
+        'missing_sections': missing,
+        'empty_sections': empty,
+        'extra_sections': extra,
+        'present_sections': present,
+        'template_section_count': len(schema['sections'])
+    }
+
+
+def match_template(templates: List[Dict], labels: List[str]) -> Optional[Dict]:
+    """Pick the template whose title matches most of the ticket type labels.
+
+    Deeper labels (later in a cascading select) win ties, then shorter titles.
+    A single template is used as-is when nothing matches.
+    """
+    best, best_score = None, (0, 0, 0)
+    lowered = [label.lower() for label in labels if label]
+    for template in templates:
+        title = (template.get('title') or '').lower()
+        hits = [i for i, label in enumerate(lowered) if label in title]
+        if not hits:
+            continue
+        score = (len(hits), max(hits) + 1, -len(title))
+        if best is None or score > best_score:
+            best, best_score = template, score
+    if best is None and len(templates) == 1:
+        return templates[0]
+    return best
+
+
+class TemplateSchemaCache:
+    """Caches parsed template schemas per (page_id, version) and template listings per parent page"""
+
+    def __init__(self, max_schemas: int = 256, listing_ttl: float = 300.0):
+        self.max_schemas = max_schemas
+        self.listing_ttl = listing_ttl
+        self._schemas: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+        self._listings: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._parents: Dict[str, Tuple[float, Dict]] = {}
+
+    def get_schema(self, page_id: str, version) -> Optional[Dict]:
+        key = (str(page_id), version)
+        schema = self._schemas.get(key)
+        if schema is not None:
+            self._schemas.move_to_end(key)
+        return schema
+
+    def put_schema(self, schema: Dict) -> None:
+        key = (str(schema['id']), schema['version'])
+        self._schemas[key] = schema
+        self._schemas.move_to_end(key)
+        while len(self._schemas) > self.max_schemas:
+            self._schemas.popitem(last=False)
+
+    def get_listing(self, parent_id: str) -> Optional[List[Dict]]:
+        entry = self._listings.get(str(parent_id))
+        if entry and time.monotonic() - entry[0] < self.listing_ttl:
+            return entry[1]
+        return None
+
+    def put_listing(self, parent_id: str, templates: List[Dict]) -> None:
+        self._listings[str(parent_id)] = (time.monotonic(), templates)
+
+    def get_parent(self, identifier: str) -> Optional[Dict]:
+        entry = self._parents.get(str(identifier))
+        if entry and time.monotonic() - entry[0] < self.listing_ttl:
+            return entry[1]
+        return None
+
+    def put_parent(self, identifier: str, parent: Dict) -> None:
+        self._parents[str(identifier)] = (time.monotonic(), parent)
+
+    def clear(self) -> None:
+        self._schemas.clear()
+        self._listings.clear()
+        self._parents.clear()
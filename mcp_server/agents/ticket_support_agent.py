@@ -2,6 +2,15 @@
 
 from typing import Dict, List, Optional
 
+from mcp_server.agents.support_queue import SupportQueueSnapshot
+from mcp_server.agents.template_compliance import (
+    TemplateSchemaCache, build_template_schema, compare_sections, match_template, parse_description_sections
+)
+from mcp_server.common.description_parsers import option_labels, parse_field_value
+
+# Template bodies are parsed whole, so fetch them in a single chunk
+TEMPLATE_BODY_CHUNK = 5_000_000
+
 
 def _escape_jql(value: str) -> str:
     """Escape single quotes in JQL values by doubling them"""
@@ -22,11 +31,11 @@ class TicketSupportAgent:
         self.confluence_provider = confluence_provider
         self.excluded_issue_types = excluded_issue_types or []
         self.workload_statuses = workload_statuses
+        self.template_cache = TemplateSchemaCache()
+        self.support_queue = SupportQueueSnapshot()
     
     async def get_template_context(self, issue_data: Dict) -> Dict:
         """Expose raw ticket and template data for AI to analyze"""
-        import json
-        
         fields = issue_data.get('fields', {})
         issue_type = fields.get('issuetype', {}).get('name', '')
         
@@ -48,35 +57,25 @@ class TicketSupportAgent:
             # Parse custom field if specified
             custom_field = template_config.get('custom_field')
             if custom_field:
-                field_value = fields.get(custom_field)
-                if isinstance(field_value, str) and field_value.startswith('['):
-                    try:
-                        field_value = json.loads(field_value)
-                    except:
-                        pass
-                context['custom_field_value'] = field_value
+                context['custom_field_value'] = parse_field_value(fields.get(custom_field))
             
             # Get Confluence template pages if provider available
             if self.confluence_provider:
                 parent_page_id = template_config.get('parent_page')
                 if parent_page_id:
                     try:
-                        parent = await self.confluence_provider.get_page_by_title_or_id(parent_page_id)
+                        parent = self.template_cache.get_parent(parent_page_id)
+                        if parent is None:
+                            page = await self.confluence_provider.get_page_by_title_or_id(parent_page_id)
+                            if page:
+                                # Keep lightweight parent info (no body) - AI can fetch full content if needed
+                                parent = {'id': page.get('id'), 'title': page.get('title')}
+                                self.template_cache.put_parent(parent_page_id, parent)
                         if parent:
-                            # Return lightweight parent info (no body) - AI can fetch full content if needed
-                            context['template_parent'] = {
-                                'id': parent.get('id'),
-                                'title': parent.get('title')
-                            }
+                            context['template_parent'] = parent
                             
-                            children = await self.confluence_provider.get_child_pages(parent['id'])
-                            # Return lightweight list (id, title only) - AI can fetch full content on-demand
-                            template_pages = []
-                            for child in children.get('results', []):
-                                template_pages.append({
-                                    'id': child.get('id'),
-                                    'title': child.get('title')
-                                })
+                            # Lightweight list (id, title, version) of all templates, including nested ones
+                            template_pages = await self._get_template_listing(parent['id'])
                             context['template_pages'] = template_pages
                             context['template_page_count'] = len(template_pages)
                     except Exception as e:
@@ -84,111 +83,145 @@ class TicketSupportAgent:
         
         return context
 
-    async def get_troubleshooting_context(self, issue_data: Dict, troubleshooting_parent: str) -> Dict:
-        """Expose troubleshooting docs for AI to provide guidance"""
-        import re
-        import html
-        from urllib.parse import unquote
+    async def get_template_compliance(self, issue_data: Dict, context: Dict) -> Dict:
+        """Diff the ticket description against its matching template's sections.
         
-        fields = issue_data.get('fields', {})
-        description = fields.get('description', '')
+        Uses the template parent resolved by get_template_context. Template listings are
+        cached briefly; the matched template's current version is looked up on every check
+        (page history, no body) and parsed templates are cached per page version, so an
+        edit is seen at once and a template is only re-downloaded after it changes.
+        """
+        parent = context.get('template_parent')
+        if not self.confluence_provider or not parent:
+            return {'error': 'Template parent page not available'}
         
-        # Extract Bitbucket URL from description and parse it
-        bitbucket_url = None
-        repo_slug = None
-        file_path = None
+        templates = await self._get_template_listing(parent['id'])
+        labels = option_labels(context.get('custom_field_value'))
+        template = match_template(templates, labels)
+        if not template:
+            return {
+                'error': 'No template matches ticket type',
+                'ticket_type': labels,
+                'candidates': [t['title'] for t in templates]
+            }
         
-        if description:
-            # Decode HTML entities first
-            description = html.unescape(description)
-            
-            # Match Bitbucket/Git URLs (handle both plain text and HTML, Cloud and Data Center)
-            bitbucket_patterns = [
-                r'https?://(?:[^\s<>"]*(?:bitbucket|git)[^\s<>"]+)',  # Domain contains bitbucket/git
-                r'href=["\']([^"\'>]+(?:bitbucket|git)[^"\'>]+)["\']',  # HTML href
-            ]
-            
-            for pattern in bitbucket_patterns:
-                matches = re.findall(pattern, description, re.IGNORECASE)
-                if matches:
-                    bitbucket_url = matches[0]
-                    break
-            
-            if bitbucket_url:
-                # Decode URL encoding
-                bitbucket_url = unquote(bitbucket_url)
-                # Parse URL to extract repo_slug and file_path (handles both Cloud and Data Center formats)
-                # Data Center: /projects/PROJECT/repos/REPO/browse/path
-                # Cloud: /repos/REPO/browse/path
-                browse_match = re.search(r'/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)', bitbucket_url)
-                if browse_match:
-                    repo_slug = browse_match.group(1)
-                    file_path = browse_match.group(2).rstrip()
-                else:
-                    # Try Data Center format with project
-                    dc_match = re.search(r'/projects/[^/]+/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)', bitbucket_url)
-                    if dc_match:
-                        repo_slug = dc_match.group(1)
-                        file_path = dc_match.group(2).rstrip()
+        version = await self._get_template_version(template)
+        schema = None
+        if version is not None:
+            schema = self.template_cache.get_schema(template['id'], version)
+        cached = schema is not None
+        if not cached:
+            page = await self.confluence_provider.get_page(template['id'], 0, TEMPLATE_BODY_CHUNK)
+            if 'error' in page:
+                return {'error': page['error'], 'template': template}
+            schema = build_template_schema(page)
+            self.template_cache.put_schema(schema)
         
-        context = {
-            'ticket': {
-                'key': issue_data.get('key'),
-                'summary': fields.get('summary', ''),
-                'description': description
-            },
-            'bitbucket_url': bitbucket_url,
-            'repo_slug': repo_slug,
-            'file_path': file_path,
-            'branch': None,  # Will be populated by wrapper if bitbucket provider available
-            'troubleshooting_docs': []
+        fields = issue_data.get('fields', {})
+        diff = compare_sections(schema, parse_description_sections(fields.get('description')))
+        return {
+            'template': {'id': schema['id'], 'title': schema['title'], 'version': schema['version']},
+            'schema_cached': cached,
+            **diff
         }
+    
+    async def _get_template_version(self, template: Dict) -> Optional[int]:
+        """Current version of a template page, or the listed version if the lookup fails"""
+        history = await self.confluence_provider.get_page_history(template['id'])
+        if isinstance(history, dict) and 'error' not in history:
+            number = history.get('lastUpdated', {}).get('number')
+            if number is not None:
+                return number
+        return template['version']
+    
+    @staticmethod
+    async def _get_all_pages(list_pages, page_id: str) -> Dict:
+        """Every result of a child or descendant listing, requesting pages until _links.next runs out"""
+        pages = []
+        while True:
+            listing = await list_pages(page_id, expand='version', start=len(pages))
+            if 'error' in listing:
+                return listing
+            results = listing.get('results', [])
+            pages.extend(results)
+            if not results or not listing.get('_links', {}).get('next'):
+                return {'results': pages}
+    
+    async def _get_template_listing(self, parent_id: str) -> List[Dict]:
+        """List all template pages (with versions) under a parent, cached per parent"""
+        templates = self.template_cache.get_listing(parent_id)
+        if templates is not None:
+            return templates
         
-        # Get troubleshooting docs from configured parent page
-        if self.confluence_provider and troubleshooting_parent:
-            try:
-                # Try as page ID first
-                if troubleshooting_parent.isdigit():
-                    parent = await self.confluence_provider.get_page(troubleshooting_parent)
-                else:
-                    # Search by title using CQL
-                    search_result = await self.confluence_provider.cql_search(f'title = "{troubleshooting_parent}" AND type = page', limit=1)
-                    results = search_result.get('results', [])
-                    parent = results[0].get('content') if results else None
+        pages = []
+        descendants = await self._get_all_pages(self.confluence_provider.get_descendants, parent_id)
+        if 'error' not in descendants and descendants.get('results'):
+            pages = descendants['results']
+        else:
+            # Recursive approach for Data Center
+            async def get_all_children(page_id):
+                children = await self._get_all_pages(self.confluence_provider.get_child_pages, page_id)
+                for child in children.get('results', []):
+                    pages.append(child)
+                    await get_all_children(child.get('id'))
+            await get_all_children(parent_id)
+        
+        templates = [{
+            'id': p.get('id'),
+            'title': p.get('title'),
+            'version': p.get('version', {}).get('number')
+        } for p in pages]
+        self.template_cache.put_listing(parent_id, templates)
+        return templates
+
+    async def get_troubleshooting_docs(self, troubleshooting_parent: str) -> Dict:
+        """List the troubleshooting docs under the configured parent page (ID or title)"""
+        result = {'troubleshooting_docs': []}
+        if not (self.confluence_provider and troubleshooting_parent):
+            return result
+        try:
+            # Try as page ID first
+            if troubleshooting_parent.isdigit():
+                parent = await self.confluence_provider.get_page(troubleshooting_parent)
+            else:
+                # Search by title using CQL
+                search_result = await self.confluence_provider.cql_search(f'title = "{troubleshooting_parent}" AND type = page', limit=1)
+                results = search_result.get('results', [])
+                parent = results[0].get('content') if results else None
+            
+            if parent and 'error' not in parent:
+                parent_id = parent.get('id')
+                result['troubleshooting_parent'] = {
+                    'id': parent_id,
+                    'title': parent.get('title')
+                }
                 
-                if parent and 'error' not in parent:
-                    parent_id = parent.get('id')
-                    context['troubleshooting_parent'] = {
-                        'id': parent_id,
-                        'title': parent.get('title')
-                    }
-                    
-                    # Try get_descendants first (works in Cloud), fall back to recursive (Data Center)
-                    descendants = await self.confluence_provider.get_descendants(parent_id)
-                    if 'error' not in descendants and descendants.get('results'):
-                        for child in descendants['results']:
-                            context['troubleshooting_docs'].append({
+                # Try get_descendants first (works in Cloud), fall back to recursive (Data Center)
+                descendants = await self.confluence_provider.get_descendants(parent_id)
+                if 'error' not in descendants and descendants.get('results'):
+                    for child in descendants['results']:
+                        result['troubleshooting_docs'].append({
+                            'id': child.get('id'),
+                            'title': child.get('title')
+                        })
+                else:
+                    # Recursive approach for Data Center
+                    async def get_all_children(page_id, docs_list):
+                        children = await self.confluence_provider.get_child_pages(page_id)
+                        for child in children.get('results', []):
+                            docs_list.append({
                                 'id': child.get('id'),
                                 'title': child.get('title')
                             })
-                    else:
-                        # Recursive approach for Data Center
-                        async def get_all_children(page_id, docs_list):
-                            children = await self.confluence_provider.get_child_pages(page_id)
-                            for child in children.get('results', []):
-                                docs_list.append({
-                                    'id': child.get('id'),
-                                    'title': child.get('title')
-                                })
-                                await get_all_children(child.get('id'), docs_list)
-                        
-                        await get_all_children(parent_id, context['troubleshooting_docs'])
+                            await get_all_children(child.get('id'), docs_list)
                     
-                    context['doc_count'] = len(context['troubleshooting_docs'])
-            except Exception as e:
-                context['error'] = str(e)
+                    await get_all_children(parent_id, result['troubleshooting_docs'])
+                
+                result['doc_count'] = len(result['troubleshooting_docs'])
+        except Exception as e:
+            result['error'] = str(e)
         
-        return context
+        return result
     
     async def get_team_context(self, search_by_assignee_func, jira_search_func=None) -> Dict:
         """Expose raw team workload data for AI to analyze"""
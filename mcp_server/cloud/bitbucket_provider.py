@@ -1,17 +1,51 @@
 import requests
+import base64
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from ..common.auth import CloudAuth
-from ..common.validation import validate_repo_slug, validate_pr_id, validate_non_empty, validate_path, validate_branch_name, validate_commit_hash, sanitize_url_path
+from ..common.concurrency import gather_in_threads
+from ..common.diff_parser import paginate_diff, parse_unified_diff, summarize_files
+from ..common.file_window import CHUNK_BYTES, read_window
+from ..common.git_mirror import GitMirror, MirrorError, MirrorSet
+from ..common.object_cache import credential_namespace, get_object_cache
+from ..common.path_index import MATCH_MODES, get_path_index_cache, is_full_commit_hash
+from ..common.repo_catalog import MATCH_MODES as REPO_MATCH_MODES, get_repo_catalog_cache
+from ..common.review_bundle import ReviewBundle
+from ..common.validation import validate_repo_slug, validate_pr_id, validate_non_empty, validate_path, validate_branch_name, validate_commit_hash, validate_file_window, validate_diff_options, validate_pr_role, validate_pr_state, sanitize_url_path
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PAGE_SIZE = 25
 LIST_PAGE_SIZE = 50
+DIFFSTAT_PAGE_SIZE = 500
+# Repositories scanned at once by list_my_pull_requests, and how long its result is reused
+DASHBOARD_CONCURRENCY = 8
+DASHBOARD_TTL = float(os.getenv('BITBUCKET_DASHBOARD_TTL', '60'))
+# Participant entries wrap the user ({'user': ..., 'role': ...}), unlike author and reviewers
+_DASHBOARD_FIELDS = {'AUTHOR': 'author', 'REVIEWER': 'reviewers', 'PARTICIPANT': 'participants.user'}
+_PR_STATES = ('OPEN', 'MERGED', 'DECLINED', 'SUPERSEDED')
+
+
+def _diffstat_file(value: Dict[str, Any]) -> Dict[str, Any]:
+    """A diffstat entry as a diff_parser file summary"""
+    new, old = value.get('new') or {}, value.get('old') or {}
+    status = 'deleted' if value.get('status') == 'removed' else value.get('status', 'modified')
+    return {'path': new.get('path') or old.get('path'), 'old_path': old.get('path') if status == 'renamed' else None,
+            'status': status, 'additions': value.get('lines_added'), 'deletions': value.get('lines_removed')}
+
+
+def _is_fork_pull_request(pr: Dict[str, Any]) -> bool:
+    """True when the pull request's source branch lives in another repository"""
+    source = (pr['source'].get('repository') or {}).get('full_name')
+    destination = (pr['destination'].get('repository') or {}).get('full_name')
+    return bool(source and destination) and source != destination
+
 
 class BitbucketProvider:
     def __init__(self) -> None:
@@ -21,6 +55,12 @@ class BitbucketProvider:
         self.available = bool(self.bitbucket_token and self.workspace and self.auth.username)
         self.session = self._create_session() if self.available else None
         self.timeout = 25
+        self.path_indexes = get_path_index_cache()
+        self.objects = get_object_cache()
+        self._dashboards: Dict[tuple, tuple] = {}
+        self.repo_catalogs = get_repo_catalog_cache()
+        self.mirrors = MirrorSet.from_env(f"https://bitbucket.org/{self.workspace}/{{repo_slug}}.git",
+                                          auth_header=self._basic_auth_header()) if self.available else None
         
         if self.available:
             logger.info(f"BitbucketProvider initialized for workspace: {self.workspace}")
@@ -145,8 +185,9 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_file_content(self, repo_slug: str, file_path: str, branch: str = "main") -> Dict[str, Any]:
-        """Get raw content of a file."""
+    async def get_file_content(self, repo_slug: str, file_path: str, branch: str = "main", start_line: Optional[int] = None,
+                               end_line: Optional[int] = None, byte_offset: Optional[int] = None, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """Get raw content of a file, or a window of its lines or bytes."""
         check = self._check_available()
         if check:
             return check
@@ -156,11 +197,21 @@ class BitbucketProvider:
         valid, error = validate_branch_name(branch)
         if not valid:
             return {'error': error}
+        valid, error = validate_file_window(start_line, end_line, byte_offset, max_bytes)
+        if not valid:
+            return {'error': error}
+        window = {'start_line': start_line, 'end_line': end_line, 'byte_offset': byte_offset, 'max_bytes': max_bytes}
         try:
+            data = self._from_mirror(repo_slug, lambda mirror: mirror.file_content(branch, file_path))
+            if data is not None:
+                return {**read_window([data], **window), 'path': file_path}
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/src/{sanitize_url_path(branch)}/{sanitize_url_path(file_path)}"
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
-            response.raise_for_status()
-            return {'content': response.text, 'path': file_path}
+            if is_full_commit_hash(branch):
+                # Content at a commit never changes
+                content = self.objects.fetch_text(self._object_key(repo_slug, 'file', branch, file_path), lambda: self._get_text(url))
+            else:
+                content = self._get_text(url)
+            return {**read_window([content.encode('utf-8')], **window), 'path': file_path}
         except Exception as e:
             return {'error': str(e)}
     
@@ -177,6 +228,9 @@ class BitbucketProvider:
             if not valid:
                 return {'error': error}
         try:
+            commits = self._from_mirror(repo_slug, lambda mirror: mirror.log(branch, LIST_PAGE_SIZE, path=path))
+            if commits is not None:
+                return self._mirror_commits(commits)
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/commits/{sanitize_url_path(branch)}"
             params = {'pagelen': LIST_PAGE_SIZE}
             if path:
@@ -197,9 +251,7 @@ class BitbucketProvider:
             return {'error': error}
         try:
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/commit/{commit_hash}"
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return self.objects.fetch_json(self._object_key(repo_slug, 'commit', commit_hash), lambda: self._get_json(url))
         except Exception as e:
             return {'error': str(e)}
     
@@ -216,12 +268,30 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_pull_request_diff(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
-        """Get the full diff for a pull request."""
+    async def get_pull_request_diff(self, repo_slug: str, pr_id: int, structured: bool = False, paths: Optional[List[str]] = None,
+                                   context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                                   limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Get the full diff for a pull request, or one page of it per file with structured=True."""
         check = self._check_available()
         if check:
             return check
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}"
+                pr_url = f"{repo_url}/pullrequests/{pr_id}"
+                pr = self._get_json(pr_url)
+                if _is_fork_pull_request(pr):
+                    # The source commit is not in this repository; the pull request endpoints resolve it
+                    return await self._structured_diff(f"{pr_url}/diffstat", f"{pr_url}/diff", **options)
+                # The pull request diff is the source's changes since it left the destination
+                spec = f"{pr['source']['commit']['hash']}..{pr['destination']['commit']['hash']}"
+                return await self._structured_diff(f"{repo_url}/diffstat/{spec}", f"{repo_url}/diff/{spec}", **options)
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{repo_slug}/pullrequests/{pr_id}/diff"
             response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
             response.raise_for_status()
@@ -229,6 +299,107 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
+    async def get_pull_request_summary(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
+        """Per-file line counts and status of a pull request from the diffstat, without patch bodies."""
+        check = self._check_available()
+        if check:
+            return check
+        valid, error = validate_repo_slug(repo_slug)
+        if not valid:
+            return {'error': error}
+        valid, error = validate_pr_id(pr_id)
+        if not valid:
+            return {'error': error}
+        try:
+            pr_url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{repo_slug}/pullrequests/{pr_id}"
+            pr = self._get_json(pr_url)
+            source, destination = pr['source']['commit']['hash'], pr['destination']['commit']['hash']
+            # The pull request's own diffstat also works for forks. New commits on either
+            # side change the pair, so the diffstat for a pair never changes
+            files = self.objects.fetch_json(
+                self._object_key(repo_slug, 'pr-diffstat', source, destination),
+                lambda: [_diffstat_file(value) for value in self._get_all_values(
+                    f"{pr_url}/diffstat", {'pagelen': DIFFSTAT_PAGE_SIZE})])
+            return {
+                'pull_request': {
+                    'id': pr.get('id', pr_id),
+                    'title': pr.get('title'),
+                    'state': pr.get('state'),
+                    'author': (pr.get('author') or {}).get('display_name'),
+                    'source_branch': pr['source'].get('branch', {}).get('name'),
+                    'destination_branch': pr['destination'].get('branch', {}).get('name'),
+                    'source_commit': source,
+                    'destination_commit': destination,
+                },
+                **summarize_files(files),
+            }
+        except Exception as e:
+            logger.error(f"Error summarizing pull request {pr_id} in {repo_slug}: {e}")
+            return {'error': str(e)}
+
+    async def get_pr_review_bundle(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
+        """Pull request, comments, activity, build status and default reviewers, fetched concurrently."""
+        check = self._check_available()
+        if check:
+            return check
+        valid, error = validate_repo_slug(repo_slug)
+        if not valid:
+            return {'error': error}
+        valid, error = validate_pr_id(pr_id)
+        if not valid:
+            return {'error': error}
+        bundle = ReviewBundle()
+
+        async def pull_request_and_builds():
+            pr = await bundle.part('pull_request', self.get_pull_request(repo_slug, pr_id))
+            commit = (((pr or {}).get('source') or {}).get('commit') or {}).get('hash')
+            builds = await bundle.part('builds', self.get_build_status(repo_slug, commit)) if commit else None
+            return pr, builds
+
+        (pr, builds), comments, activity, reviewers = await gather_in_threads(
+            pull_request_and_builds(),
+            bundle.part('comments', self.get_pull_request_comments(repo_slug, pr_id)),
+            bundle.part('activity', self.get_pr_activity(repo_slug, pr_id)),
+            bundle.part('default_reviewers', self.get_default_reviewers(repo_slug)),
+        )
+        if pr is None:
+            return {'error': bundle.errors['pull_request'], 'errors': bundle.errors}
+
+        def user(value):
+            return bundle.user(*self._bundle_user(value))
+
+        return bundle.result(
+            pull_request={
+                'id': pr.get('id', pr_id),
+                'title': pr.get('title'),
+                'description': pr.get('description'),
+                'state': pr.get('state'),
+                'author': user(pr.get('author')),
+                'source_branch': ((pr.get('source') or {}).get('branch') or {}).get('name'),
+                'destination_branch': ((pr.get('destination') or {}).get('branch') or {}).get('name'),
+                'source_commit': ((pr.get('source') or {}).get('commit') or {}).get('hash'),
+                'created_on': pr.get('created_on'),
+                'updated_on': pr.get('updated_on'),
+                'comment_count': pr.get('comment_count'),
+                'task_count': pr.get('task_count'),
+                'participants': [{'user': user(p.get('user')), 'role': p.get('role'), 'approved': p.get('approved'),
+                                  'state': p.get('state')} for p in pr.get('participants', [])],
+            },
+            comments=[{
+                'id': c.get('id'),
+                'user': user(c.get('user')),
+                'created_on': c.get('created_on'),
+                'text': (c.get('content') or {}).get('raw'),
+                'path': (c.get('inline') or {}).get('path'),
+                'line': (c.get('inline') or {}).get('to') or (c.get('inline') or {}).get('from'),
+                'parent_id': (c.get('parent') or {}).get('id'),
+            } for c in (comments or {}).get('values', []) if not c.get('deleted')],
+            activity=[self._bundle_activity(a, user) for a in (activity or {}).get('values', [])],
+            builds=[{'key': b.get('key'), 'name': b.get('name'), 'state': b.get('state'), 'url': b.get('url')}
+                    for b in (builds or {}).get('values', [])],
+            default_reviewers=[user(r) for r in (reviewers or {}).get('values', [])],
+        )
+
     async def get_pull_request_comments(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
         """Retrieve all comments on a pull request."""
         check = self._check_available()
@@ -282,19 +453,31 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_commit_diff(self, repo_slug: str, commit_hash: str) -> Dict[str, Any]:
-        """Get the diff/changes for a commit."""
+    async def get_commit_diff(self, repo_slug: str, commit_hash: str, structured: bool = False, paths: Optional[List[str]] = None,
+                             context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                             limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Get the diff/changes for a commit, or one page of them per file with structured=True."""
         check = self._check_available()
         if check:
             return check
         valid, error = validate_commit_hash(commit_hash)
         if not valid:
             return {'error': error}
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}"
+                return await self._structured_diff(f"{repo_url}/diffstat/{commit_hash}", f"{repo_url}/diff/{commit_hash}", **options)
+            diff = self._from_mirror(repo_slug, lambda mirror: mirror.commit_diff(commit_hash))
+            if diff is not None:
+                return {'diff': diff}
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/diff/{commit_hash}"
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
-            response.raise_for_status()
-            return {'diff': response.text}
+            return {'diff': self.objects.fetch_text(self._object_key(repo_slug, 'diff', commit_hash), lambda: self._get_text(url))}
         except Exception as e:
             return {'error': str(e)}
     
@@ -323,6 +506,11 @@ class BitbucketProvider:
         if not valid:
             return {'error': error}
         try:
+            entries = self._from_mirror(repo_slug, lambda mirror: mirror.list_directory(branch, path))
+            if entries is not None:
+                values = [{'type': 'commit_directory' if e['type'] == 'directory' else 'commit_file', 'path': e['path'], 'size': e['size']}
+                          for e in entries]
+                return {'values': values, 'pagelen': len(values)}
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/src/{sanitize_url_path(branch)}/{sanitize_url_path(path)}"
             response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
             response.raise_for_status()
@@ -348,8 +536,10 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def compare_commits(self, repo_slug: str, from_commit: str, to_commit: str) -> Dict[str, Any]:
-        """Compare differences between two commits."""
+    async def compare_commits(self, repo_slug: str, from_commit: str, to_commit: str, structured: bool = False, paths: Optional[List[str]] = None,
+                             context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                             limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Compare differences between two commits, or one page of them per file with structured=True."""
         check = self._check_available()
         if check:
             return check
@@ -359,11 +549,23 @@ class BitbucketProvider:
         valid, error = validate_commit_hash(to_commit)
         if not valid:
             return {'error': error.replace('commit_hash', 'to_commit')}
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}"
+                spec = f"{from_commit}..{to_commit}"
+                return await self._structured_diff(f"{repo_url}/diffstat/{spec}", f"{repo_url}/diff/{spec}", **options)
+            diff = self._from_mirror(repo_slug, lambda mirror: mirror.compare(from_commit, to_commit))
+            if diff is not None:
+                return {'diff': diff}
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/diff/{from_commit}..{to_commit}"
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
-            response.raise_for_status()
-            return {'diff': response.text}
+            key = self._object_key(repo_slug, 'compare', from_commit, to_commit)
+            return {'diff': self.objects.fetch_text(key, lambda: self._get_text(url))}
         except Exception as e:
             return {'error': str(e)}
     
@@ -513,6 +715,59 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
+    async def list_my_pull_requests(self, role: str = "REVIEWER", state: str = "OPEN") -> Dict[str, Any]:
+        """Pull requests across the workspace where the current user is author, reviewer or participant."""
+        check = self._check_available()
+        if check:
+            return check
+        for validate, value in ((validate_pr_role, role), (validate_pr_state, state)):
+            valid, error = validate(value)
+            if not valid:
+                return {'error': error}
+        role, state = role.upper(), state.upper()
+        cached = self._dashboards.get((role, state))
+        if cached and time.monotonic() - cached[0] < DASHBOARD_TTL:
+            return {**cached[1], 'cached': True}
+        try:
+            api = "https://api.bitbucket.org/2.0"
+            account_id = self._get_json(f"{api}/user")['account_id']
+            slugs = [r['slug'] for r in self._get_all_values(f"{api}/repositories/{self.workspace}",
+                                                             {'pagelen': 100, 'fields': 'next,values.slug'})]
+            # Cloud has no workspace-wide pull request search, so each repository is queried
+            params = [('q', f'{_DASHBOARD_FIELDS[role]}.account_id="{account_id}"'), ('pagelen', LIST_PAGE_SIZE)]
+            params += [('state', s) for s in (_PR_STATES if state == 'ALL' else (state,))]
+
+            async def repo_pull_requests(slug: str) -> list:
+                return self._get_all_values(f"{api}/repositories/{self.workspace}/{slug}/pullrequests", params)
+
+            results = await gather_in_threads(*(repo_pull_requests(slug) for slug in slugs),
+                                              limit=DASHBOARD_CONCURRENCY, return_exceptions=True)
+            pull_requests, errors = [], {}
+            for slug, result in zip(slugs, results):
+                if isinstance(result, Exception):
+                    errors[slug] = str(result)
+                    continue
+                pull_requests.extend({
+                    'repo_slug': slug,
+                    'id': pr.get('id'),
+                    'title': pr.get('title'),
+                    'state': pr.get('state'),
+                    'author': (pr.get('author') or {}).get('display_name'),
+                    'source_branch': ((pr.get('source') or {}).get('branch') or {}).get('name'),
+                    'destination_branch': ((pr.get('destination') or {}).get('branch') or {}).get('name'),
+                    'updated_on': pr.get('updated_on'),
+                    'url': ((pr.get('links') or {}).get('html') or {}).get('href'),
+                } for pr in result)
+            pull_requests.sort(key=lambda pr: pr['updated_on'] or '', reverse=True)
+            dashboard = {'pull_requests': pull_requests, 'count': len(pull_requests), 'role': role, 'state': state,
+                         'repositories_scanned': len(slugs), 'errors': errors}
+            if not errors:
+                self._dashboards[(role, state)] = (time.monotonic(), dashboard)
+            return dashboard
+        except Exception as e:
+            logger.error(f"Error listing pull requests for the current user: {e}")
+            return {'error': str(e)}
+
     async def list_commits_by_author(self, repo_slug: str, author: str, branch: str = "main") -> Dict[str, Any]:
         """Get commits by specific user."""
         check = self._check_available()
@@ -522,6 +777,9 @@ class BitbucketProvider:
         if not valid:
             return {'error': error}
         try:
+            commits = self._from_mirror(repo_slug, lambda mirror: mirror.log(branch, LIST_PAGE_SIZE, author=author))
+            if commits is not None:
+                return self._mirror_commits(commits)
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{repo_slug}/commits/{branch}"
             params = {'author': author, 'pagelen': LIST_PAGE_SIZE}
             response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout, params=params)
@@ -600,8 +858,8 @@ class BitbucketProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def search_files(self, repo_slug: str, query: str, branch: str = "master") -> Dict[str, Any]:
-        """Search for files in a repository by filename."""
+    async def search_files(self, repo_slug: str, query: str, branch: str = "master", match: str = "substring", limit: Optional[int] = None) -> Dict[str, Any]:
+        """Search file paths in a repository (substring, glob or fuzzy match) using a per-commit path index."""
         check = self._check_available()
         if check:
             return check
@@ -611,62 +869,193 @@ class BitbucketProvider:
         valid, error = validate_non_empty(query, "query")
         if not valid:
             return {'error': error}
+        valid, error = validate_branch_name(branch)
+        if not valid:
+            return {'error': error}
+        if match not in MATCH_MODES:
+            return {'error': f"Invalid match mode: {match}. Use one of: {', '.join(MATCH_MODES)}"}
         try:
-            logger.info(f"Searching files in {repo_slug}: {query}")
-            url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}/src/{sanitize_url_path(branch)}"
-            params = {'pagelen': 100, 'max_depth': 100}
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout, params=params)
-            response.raise_for_status()
-            all_files = []
-            data = response.json()
-            # Recursively collect all files
-            def collect_files(items):
-                for item in items:
-                    if item.get('type') == 'commit_file':
-                        all_files.append(item.get('path'))
-            collect_files(data.get('values', []))
-            # Filter files matching query
-            matching_files = [f for f in all_files if query.lower() in f.lower()]
-            return {'files': matching_files, 'count': len(matching_files)}
+            logger.info(f"Searching files in {repo_slug}: {query} ({match})")
+            repo_url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}/{sanitize_url_path(repo_slug)}"
+            commit = branch if is_full_commit_hash(branch) else self._resolve_commit(repo_url, branch)
+            index, cached = self.path_indexes.get_or_build(
+                ('cloud', self.workspace, repo_slug, commit), lambda: self._list_all_files(repo_url, commit))
+            if not cached:
+                logger.info(f"Indexed {len(index)} paths in {repo_slug} at {commit[:12]}")
+            files = index.search(query, match, limit)
+            return {'files': files, 'count': len(files), 'match': match, 'commit': commit, 'total_files': len(index)}
         except Exception as e:
             logger.error(f"Error searching files in {repo_slug}: {e}")
             return {'error': str(e)}
+
+    async def _structured_diff(self, diffstat_url: str, diff_url: str, paths: Optional[List[str]] = None, context_lines: Optional[int] = None,
+                               ignore_whitespace: bool = False, start: int = 0, limit: Optional[int] = None,
+                               include_generated: bool = False) -> Dict[str, Any]:
+        """The diffstat first, then one streamed diff request for the files on the requested page"""
+        params = {'ignore_whitespace': 'true'} if ignore_whitespace else {}
+        files = [_diffstat_file(value) for value in self._get_all_values(diffstat_url, {**params, 'pagelen': DIFFSTAT_PAGE_SIZE})]
+
+        async def fetch(wanted: List[str]) -> List[Dict[str, Any]]:
+            diff_params = [*params.items(), *(('path', path) for path in wanted)]
+            if context_lines is not None:
+                diff_params.append(('context', context_lines))
+            return self._stream_diff(diff_url, diff_params)
+
+        return await paginate_diff(files, fetch, paths, start, limit, include_generated)
+
+    def _stream_diff(self, url: str, params: list) -> List[Dict[str, Any]]:
+        """Parse a unified diff as it downloads, keeping only each file's hunk budget"""
+        response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            lines = (line.decode('utf-8', 'replace') for line in response.iter_lines(chunk_size=CHUNK_BYTES))
+            return list(parse_unified_diff(lines))
+        finally:
+            response.close()
+
+    def _get_all_values(self, url: str, params: Any, limit: Optional[int] = None) -> list:
+        """Every value of a paged collection, following next links; stops after limit values if given"""
+        values = []
+        while url and (limit is None or len(values) < limit):
+            data = self._get_json(url, params)
+            values.extend(data.get('values', []))
+            # The next link already carries the query parameters
+            url, params = data.get('next'), None
+        return values[:limit]
+
+    @staticmethod
+    def _bundle_user(user: Optional[Dict[str, Any]]) -> tuple:
+        """(key, compact fields) of a Cloud user object"""
+        user = user or {}
+        key = user.get('account_id') or user.get('uuid')
+        return key, {'display_name': user.get('display_name'), 'account_id': user.get('account_id'),
+                     'nickname': user.get('nickname')}
+
+    @staticmethod
+    def _bundle_activity(entry: Dict[str, Any], user: Callable[[Any], Optional[str]]) -> Dict[str, Any]:
+        """An activity entry as {'type', 'user', 'date', ...}; comment bodies are in the comments part"""
+        for kind in ('approval', 'changes_requested', 'update', 'comment'):
+            event = entry.get(kind)
+            if event is None:
+                continue
+            compact = {'type': kind, 'user': user(event.get('user') or event.get('author')),
+                       'date': event.get('date') or event.get('created_on')}
+            if kind == 'update':
+                compact['state'] = event.get('state')
+            elif kind == 'comment':
+                compact['comment_id'] = event.get('id')
+            return compact
+        return {'type': 'other'}
+
+    def _basic_auth_header(self) -> str:
+        credentials = f"{self.auth.username}:{self.bitbucket_token}"
+        return f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+    def _from_mirror(self, repo_slug: str, read: Callable[[GitMirror], Any]) -> Any:
+        """read(mirror) when the repository has a local mirror, or None to use the REST API"""
+        mirror = self.mirrors.get(repo_slug) if self.mirrors else None
+        if mirror is None:
+            return None
+        try:
+            return read(mirror)
+        except MirrorError as e:
+            logger.info(f"Mirror of {repo_slug} could not answer, using the REST API: {e}")
+            return None
+
+    @staticmethod
+    def _mirror_commits(commits: list) -> Dict[str, Any]:
+        """Mirror log entries in the shape of the commits endpoint"""
+        values = [{
+            'hash': c['hash'],
+            'message': c['message'],
+            'date': datetime.fromtimestamp(c['timestamp'], timezone.utc).isoformat(),
+            'author': {'raw': f"{c['author_name']} <{c['author_email']}>"},
+        } for c in commits]
+        return {'values': values, 'pagelen': len(values)}
+
+    @property
+    def cache_namespace(self) -> str:
+        """Digest of the credentials, so cached objects are never shared between accounts"""
+        return credential_namespace(self.auth.username, self.bitbucket_token)
+
+    def _object_key(self, repo_slug: str, kind: str, *parts: str) -> tuple:
+        """Object cache key for an immutable object in this workspace"""
+        return ('cloud', self.workspace, self.cache_namespace, repo_slug, kind, *parts)
+
+    def _get_text(self, url: str) -> str:
+        response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _resolve_commit(self, repo_url: str, branch: str) -> str:
+        """Resolve a branch or tag to the commit hash at its head"""
+        response = self.session.get(f"{repo_url}/commits/{sanitize_url_path(branch)}", auth=(self.auth.username, self.bitbucket_token),
+                                    timeout=self.timeout, params={'pagelen': 1, 'fields': 'values.hash'})
+        response.raise_for_status()
+        values = response.json().get('values', [])
+        if not values:
+            raise ValueError(f"No commits found for {branch}")
+        return values[0]['hash']
+
+    def _list_all_files(self, repo_url: str, commit: str) -> list:
+        """Every file path at a commit, following all pages of the recursive source listing"""
+        url = f"{repo_url}/src/{commit}/"
+        params = {'pagelen': 100, 'max_depth': 100, 'fields': 'next,values.path,values.type'}
+        paths = []
+        while url:
+            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout, params=params)
+            response.raise_for_status()
+            data = response.json()
+            paths.extend(item['path'] for item in data.get('values', []) if item.get('type') == 'commit_file')
+            # The next link already carries the query parameters
+            url, params = data.get('next'), None
+        return paths
     
-    async def search(self, query: str) -> Dict[str, Any]:
-        """Search using query."""
+    async def search(self, query: str, match: str = "substring", limit: Optional[int] = None) -> Dict[str, Any]:
+        """Search repositories by name, filtered server-side (substring) or in the cached catalog (fuzzy)."""
         check = self._check_available()
         if check:
             return check
+        valid, error = validate_non_empty(query, "query")
+        if not valid:
+            return {'error': error}
+        if match not in REPO_MATCH_MODES:
+            return {'error': f"Invalid match mode: {match}. Use one of: {', '.join(REPO_MATCH_MODES)}"}
+        if limit is not None and limit < 1:
+            return {'error': "limit must be at least 1"}
         try:
-            logger.info(f"Searching Bitbucket: {query}")
+            logger.info(f"Searching Bitbucket: {query} ({match})")
             url = f"https://api.bitbucket.org/2.0/repositories/{self.workspace}"
-            
-            response = self.session.get(url, auth=(self.auth.username, self.bitbucket_token), timeout=self.timeout)
-            
-            if response.status_code == 401:
+            fields = 'next,values.slug,values.name,values.full_name,values.description'
+            if match == 'fuzzy':
+                catalog, _ = self.repo_catalogs.get_or_build(('cloud', self.workspace, self.cache_namespace), lambda: [
+                    self._search_result(r) for r in self._get_all_values(url, {'pagelen': 100, 'fields': fields})])
+                results = catalog.search(query, match, limit)
+                return {'results': results, 'count': len(results), 'match': match, 'total_repositories': len(catalog)}
+            escaped = query.replace('\\', '\\\\').replace('"', '\\"')
+            values = self._get_all_values(url, {'q': f'name ~ "{escaped}"', 'pagelen': 100, 'fields': fields}, limit)
+            results = [self._search_result(r) for r in values]
+            return {'results': results, 'count': len(results), 'match': match}
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 401:
                 return {
                     'error': 'Bitbucket authentication failed',
                     'note': 'Create token at https://bitbucket.org/account/settings/api-tokens/ and set BITBUCKET_API_TOKEN',
                     'results': []
                 }
-            
-            response.raise_for_status()
-            
-            repos = response.json().get('values', [])
-            results = []
-            
-            for repo in repos:
-                if query.lower() in repo.get('name', '').lower():
-                    results.append({
-                        'type': 'repository',
-                        'name': repo.get('name'),
-                        'full_name': repo.get('full_name'),
-                        'description': repo.get('description')
-                    })
-            
-            return {'results': results}
+            return {'error': str(e)}
         except Exception as e:
             return {'error': str(e)}
+
+    @staticmethod
+    def _search_result(repo: Dict[str, Any]) -> Dict[str, Any]:
+        return {'type': 'repository', 'name': repo.get('name'), 'slug': repo.get('slug'),
+                'full_name': repo.get('full_name'), 'description': repo.get('description')}
     
     async def _get_repositories(self) -> str:
         try:
@@ -599,8 +599,8 @@ class ConfluenceProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_child_pages(self, page_id: str) -> Dict[str, Any]:
-        """Get direct child pages of a page."""
+    async def get_child_pages(self, page_id: str, expand: Optional[str] = None, start: int = 0) -> Dict[str, Any]:
+        """Get direct child pages of a page, optionally expanding fields (e.g. 'version') and from result start."""
         check = self._check_available()
         if check:
             return check
@@ -610,14 +610,17 @@ class ConfluenceProvider:
         try:
             headers = self.auth.get_auth_headers()
             url = f"{self.auth.get_base_url()}/wiki/rest/api/content/{sanitize_url_path(page_id)}/child/page"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            params = {'expand': expand} if expand else {}
+            if start:
+                params['start'] = start
+            response = self.session.get(url, headers=headers, params=params or None, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_descendants(self, page_id: str) -> Dict[str, Any]:
-        """Get all descendant pages of a page."""
+    async def get_descendants(self, page_id: str, expand: Optional[str] = None, start: int = 0) -> Dict[str, Any]:
+        """Get descendant pages of a page, optionally expanding fields (e.g. 'version') and from result start."""
         check = self._check_available()
         if check:
             return check
@@ -627,7 +630,10 @@ class ConfluenceProvider:
         try:
             headers = self.auth.get_auth_headers()
             url = f"{self.auth.get_base_url()}/wiki/rest/api/content/{sanitize_url_path(page_id)}/descendant/page"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            params = {'expand': expand} if expand else {}
+            if start:
+                params['start'] = start
+            response = self.session.get(url, headers=headers, params=params or None, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
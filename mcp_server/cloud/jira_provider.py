@@ -1,7 +1,7 @@
 import requests
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from ..common.auth import CloudAuth
@@ -585,8 +585,8 @@ class JiraProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def search(self, jql: str) -> Dict[str, Any]:
-        """Search using JQL query via Jira API v3."""
+    async def search(self, jql: str, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """Search using JQL query via Jira API v3; pass next_page_token back as page_token for the next page."""
         check = self._check_available()
         if check:
             return check
@@ -600,6 +600,8 @@ class JiraProvider:
                 'maxResults': 50,
                 'fields': 'summary'
             }
+            if page_token:
+                params['nextPageToken'] = page_token
             
             response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
             response.raise_for_status()
@@ -610,6 +612,8 @@ class JiraProvider:
             results = [{'key': i.get('key'), 'summary': i.get('fields', {}).get('summary', '')} for i in issues]
             
             result = {'total': total, 'results': results}
+            if data.get('nextPageToken') and not data.get('isLast', False):
+                result['next_page_token'] = data['nextPageToken']
             if total > len(results):
                 result['message'] = f'Showing {len(results)} of {total} results. Results limited to prevent response size exceeding 100K character limit.'
             return result
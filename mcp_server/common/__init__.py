@@ -1,5 +1,19 @@
 # Common utilities for Atlassian MCP Server
-from .auth import CloudAuth, DataCenterAuth
-from .tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS
+# Re-exports are resolved lazily so importing a light submodule (tools, router, metrics)
+# does not pull in requests via auth.
+_EXPORTS = {
+    'CloudAuth': 'auth',
+    'DataCenterAuth': 'auth',
+    'JIRA_TOOLS': 'tools',
+    'CONFLUENCE_TOOLS': 'tools',
+    'BITBUCKET_TOOLS': 'tools',
+}
 
 __all__ = ['CloudAuth', 'DataCenterAuth', 'JIRA_TOOLS', 'CONFLUENCE_TOOLS', 'BITBUCKET_TOOLS']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,79 @@
+"""Tool catalog - merges tool metadata with schemas and serializes tools/list once, with an ETag"""
+
+import gzip
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from mcp_server.common.tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS, TICKET_SUPPORT_TOOLS
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+EMPTY_SCHEMA = {"type": "object", "properties": {}}
+
+
+class ToolCatalog:
+    """An immutable tool list with its serialized tools/list body and content hash.
+
+    The ETag is derived from the body, so it changes exactly when a tool,
+    description or schema changes and is stable across processes and deploys.
+    """
+
+    def __init__(self, tools: List[Dict]):
+        self.tools = tools
+        self.names = frozenset(t['name'] for t in tools)
+        self.body = json.dumps({'tools': tools}, separators=(',', ':'))
+        self.body_bytes = self.body.encode('utf-8')
+        self.etag = '"' + hashlib.sha256(self.body_bytes).hexdigest()[:32] + '"'
+        self._gzip_body: Optional[bytes] = None
+
+    @property
+    def gzip_body(self) -> bytes:
+        """Gzip-compressed body, built on first request (mtime pinned so output is deterministic)"""
+        if self._gzip_body is None:
+            self._gzip_body = gzip.compress(self.body_bytes, compresslevel=9, mtime=0)
+        return self._gzip_body
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """Return True if an If-None-Match header already names this catalog version"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            # Weak comparison (RFC 7232): W/"x" matches "x"
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == self.etag:
+                return True
+        return False
+
+    def wants_gzip(self, accept_encoding: Optional[str]) -> bool:
+        """Return True if the client accepts gzip and the body is large enough to benefit"""
+        if not accept_encoding or len(self.body_bytes) < GZIP_MIN_BYTES:
+            return False
+        for coding in accept_encoding.split(','):
+            name, _, params = coding.strip().partition(';')
+            if name.strip().lower() in ('gzip', '*'):
+                return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+        return False
+
+
+def merge_tool_schemas(tools: List[Dict], schemas: Dict[str, Dict]) -> List[Dict]:
+    """Attach an inputSchema to each tool (an empty object schema when none is defined)"""
+    return [{**tool, 'inputSchema': schemas.get(tool['name'], EMPTY_SCHEMA)} for tool in tools]
+
+
+_catalog: Optional[ToolCatalog] = None
+
+
+def get_catalog() -> ToolCatalog:
+    """The full tool catalog, built on first use and reused for the life of the process"""
+    global _catalog
+    if _catalog is None:
+        from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+        all_tools = JIRA_TOOLS + CONFLUENCE_TOOLS + BITBUCKET_TOOLS + TICKET_SUPPORT_TOOLS
+        _catalog = ToolCatalog(merge_tool_schemas(all_tools, TOOL_SCHEMAS))
+    return _catalog
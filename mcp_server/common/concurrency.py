@@ -0,0 +1,32 @@
+"""Helpers for running provider calls concurrently"""
+
+import asyncio
+from typing import Any, Awaitable, List, Optional
+
+
+async def run_in_thread(coro: Awaitable[Any]) -> Any:
+    """Drive a provider coroutine to completion on a worker thread.
+
+    Provider methods are declared async but issue blocking requests calls, so
+    gathering them on one event loop still runs them back to back. Running each
+    one on its own worker thread lets the HTTP round-trips overlap.
+    """
+    return await asyncio.to_thread(asyncio.run, coro)
+
+
+async def gather_in_threads(*coros: Awaitable[Any], limit: Optional[int] = None,
+                            return_exceptions: bool = False) -> List[Any]:
+    """Run provider coroutines concurrently on worker threads, preserving order.
+
+    limit bounds how many run at once (e.g. when fanning out across many repositories).
+    """
+    if not limit:
+        return await asyncio.gather(*(run_in_thread(c) for c in coros), return_exceptions=return_exceptions)
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await run_in_thread(coro)
+
+    return await asyncio.gather(*(bounded(c) for c in coros), return_exceptions=return_exceptions)
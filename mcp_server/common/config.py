@@ -0,0 +1,234 @@
+"""Server configuration - config.yaml and environment variables parsed once into a typed object.
+
+Environment variables always win over config.yaml, so credentials passed by
+an MCP client or Lambda keep working unchanged. Providers still read their
+credentials from the environment; apply_env() exports the config.yaml values
+they need. Long-running servers can watch config.yaml with ConfigWatcher and
+use changed_components() to rebuild only what a change affects.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Mapping, MutableMapping, Optional, Tuple
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / 'config.yaml'
+
+DEFAULT_SUPPORT_JQL = 'assignee is EMPTY AND status = Open ORDER BY created DESC'
+
+# config.yaml (section, key) -> environment variable read by the providers
+CREDENTIAL_ENV = {
+    ('cloud', 'atlassian_base_url'): 'ATLASSIAN_BASE_URL',
+    ('cloud', 'atlassian_username'): 'ATLASSIAN_USERNAME',
+    ('cloud', 'atlassian_api_token'): 'ATLASSIAN_API_TOKEN',
+    ('cloud', 'bitbucket_workspace'): 'BITBUCKET_WORKSPACE',
+    ('cloud', 'bitbucket_api_token'): 'BITBUCKET_API_TOKEN',
+    ('datacenter', 'jira_base_url'): 'JIRA_BASE_URL',
+    ('datacenter', 'jira_pat_token'): 'JIRA_PAT_TOKEN',
+    ('datacenter', 'confluence_base_url'): 'CONFLUENCE_BASE_URL',
+    ('datacenter', 'confluence_pat_token'): 'CONFLUENCE_PAT_TOKEN',
+    ('datacenter', 'bitbucket_base_url'): 'BITBUCKET_BASE_URL',
+    ('datacenter', 'bitbucket_pat_token'): 'BITBUCKET_PAT_TOKEN',
+    ('datacenter', 'bitbucket_project'): 'BITBUCKET_PROJECT',
+}
+
+# Environment variables each provider reads, per platform
+PROVIDER_ENV = {
+    'cloud': {
+        'jira': ('ATLASSIAN_BASE_URL', 'ATLASSIAN_USERNAME', 'ATLASSIAN_API_TOKEN'),
+        'confluence': ('ATLASSIAN_BASE_URL', 'ATLASSIAN_USERNAME', 'ATLASSIAN_API_TOKEN'),
+        'bitbucket': ('ATLASSIAN_BASE_URL', 'ATLASSIAN_USERNAME', 'ATLASSIAN_API_TOKEN',
+                      'BITBUCKET_WORKSPACE', 'BITBUCKET_API_TOKEN'),
+    },
+    'datacenter': {
+        'jira': ('JIRA_BASE_URL', 'JIRA_PAT_TOKEN'),
+        'confluence': ('CONFLUENCE_BASE_URL', 'CONFLUENCE_PAT_TOKEN'),
+        'bitbucket': ('BITBUCKET_BASE_URL', 'BITBUCKET_PAT_TOKEN', 'BITBUCKET_PROJECT'),
+    },
+}
+
+PROVIDERS = ('jira', 'confluence', 'bitbucket')
+
+# Environment variables (JSON where noted) that override the ticket_support_agent section
+AGENT_ENV = {
+    'primary_team_members': ('AGENT_PRIMARY_TEAM', True),
+    'secondary_team_members': ('AGENT_SECONDARY_TEAM', True),
+    'template_mapping': ('AGENT_TEMPLATE_MAPPING', True),
+    'excluded_issue_types': ('AGENT_EXCLUDED_TYPES', True),
+    'workload_statuses': ('AGENT_WORKLOAD_STATUSES', True),
+    'support_jql': ('AGENT_SUPPORT_JQL', False),
+}
+
+
+@dataclass(frozen=True)
+class TicketSupportConfig:
+    """The ticket_support_agent section"""
+    primary_team_members: List[Dict] = field(default_factory=list)
+    secondary_team_members: List[Dict] = field(default_factory=list)
+    template_mapping: Dict[str, Dict] = field(default_factory=dict)
+    excluded_issue_types: List[str] = field(default_factory=list)
+    workload_statuses: Optional[List[str]] = None
+    support_jql: str = DEFAULT_SUPPORT_JQL
+    troubleshooting_parent: Optional[str] = None
+    alert_expertise_jql: Optional[str] = None
+    other_expertise_jql: Optional[str] = None
+    scoring_weights: Optional[Dict[str, float]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.primary_team_members or self.secondary_team_members)
+
+    def agent_args(self, confluence) -> Tuple:
+        """Positional arguments for ticket_support_tools.initialize_agent"""
+        return (self.primary_team_members, self.secondary_team_members, self.template_mapping, confluence,
+                self.excluded_issue_types, self.workload_statuses, self.support_jql, self.troubleshooting_parent,
+                self.alert_expertise_jql, self.other_expertise_jql, self.scoring_weights)
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Everything the servers read from config.yaml and the environment"""
+    platform: str = 'cloud'
+    stack_name: str = 'atlassian-mcp-stack'
+    credentials: Dict[str, str] = field(default_factory=dict)
+    ticket_support: TicketSupportConfig = field(default_factory=TicketSupportConfig)
+    tool_profile: str = 'all'
+    tool_profiles: Dict[str, Dict] = field(default_factory=dict)
+    source: Optional[str] = None
+
+    def provider_env(self, provider: str) -> Tuple:
+        """The credential values a provider is built from (to tell whether it needs rebuilding)"""
+        return tuple(self.credentials.get(name) for name in PROVIDER_ENV[self.platform][provider])
+
+
+def load_config(path: Optional[Path] = DEFAULT_CONFIG_PATH, environ: Optional[Mapping[str, str]] = None) -> ServerConfig:
+    """Parse config.yaml (if present) once and overlay the environment.
+
+    Raises ValueError for a config.yaml or agent JSON variable that cannot be parsed.
+    """
+    environ = os.environ if environ is None else environ
+    raw = _read_yaml(path) if path else {}
+
+    # Credentials: environment first, then config.yaml
+    credentials = {}
+    for (section, key), name in CREDENTIAL_ENV.items():
+        value = environ.get(name) or (raw.get(section) or {}).get(key)
+        if value:
+            credentials[name] = str(value)
+
+    # Platform: DEPLOYMENT_TYPE, then deployment_type, then which tokens are configured
+    platform = (environ.get('DEPLOYMENT_TYPE') or raw.get('deployment_type') or '').lower()
+    if platform not in PROVIDER_ENV:
+        pat_tokens = ('JIRA_PAT_TOKEN', 'CONFLUENCE_PAT_TOKEN', 'BITBUCKET_PAT_TOKEN')
+        platform = 'datacenter' if any(credentials.get(name) for name in pat_tokens) else 'cloud'
+
+    tool_profiles = raw.get('tool_profiles') or {}
+    if environ.get('TOOL_PROFILES'):
+        tool_profiles = _parse_json('TOOL_PROFILES', environ['TOOL_PROFILES'])
+
+    return ServerConfig(
+        platform=platform,
+        stack_name=raw.get('stack_name', 'atlassian-mcp-stack'),
+        credentials=credentials,
+        ticket_support=_ticket_support(raw.get('ticket_support_agent') or {}, environ),
+        tool_profile=environ.get('TOOL_PROFILE') or raw.get('tool_profile') or 'all',
+        tool_profiles=tool_profiles,
+        source=str(path) if raw else None
+    )
+
+
+def _read_yaml(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            text = f.read()
+    except FileNotFoundError:
+        return {}
+    import yaml
+    try:
+        raw = yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"Could not parse {path}: {e}") from e
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path} must contain a mapping")
+    return raw
+
+
+def _parse_json(name: str, value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name} is not valid JSON: {e}") from e
+
+
+def _ticket_support(section: Dict[str, Any], environ: Mapping[str, str]) -> TicketSupportConfig:
+    values = {key: section[key] for key in TicketSupportConfig.__dataclass_fields__ if section.get(key) is not None}
+    for key, (name, is_json) in AGENT_ENV.items():
+        if environ.get(name):
+            values[key] = _parse_json(name, environ[name]) if is_json else environ[name]
+    if 'assignee_scoring_weights' in section:
+        values['scoring_weights'] = section['assignee_scoring_weights']
+    # Empty lists mean "not configured" for the status filter
+    if not values.get('workload_statuses'):
+        values.pop('workload_statuses', None)
+    return TicketSupportConfig(**values)
+
+
+# Environment variables set by apply_env (rather than by whoever started the process)
+_managed_env: set = set()
+
+
+def apply_env(config: ServerConfig, environ: Optional[MutableMapping[str, str]] = None) -> None:
+    """Export config.yaml credentials for the providers.
+
+    Variables that were already set outside this module are left alone; ones
+    this module set earlier are updated or removed, so a reload takes effect.
+    """
+    environ = os.environ if environ is None else environ
+    for name in CREDENTIAL_ENV.values():
+        if name in environ and name not in _managed_env:
+            continue
+        value = config.credentials.get(name)
+        if value:
+            environ[name] = value
+            _managed_env.add(name)
+        elif name in _managed_env:
+            environ.pop(name, None)
+            _managed_env.discard(name)
+
+
+def changed_components(old: ServerConfig, new: ServerConfig) -> FrozenSet[str]:
+    """Which of jira/confluence/bitbucket/ticket_support/tool_profiles a reload must rebuild"""
+    if old.platform != new.platform:
+        changed = set(PROVIDERS)
+    else:
+        changed = {p for p in PROVIDERS if old.provider_env(p) != new.provider_env(p)}
+    # The agent holds the Confluence provider as well as its own settings
+    if old.ticket_support != new.ticket_support or 'confluence' in changed:
+        changed.add('ticket_support')
+    if (old.tool_profile, old.tool_profiles) != (new.tool_profile, new.tool_profiles):
+        changed.add('tool_profiles')
+    return frozenset(changed)
+
+
+class ConfigWatcher:
+    """Detects config.yaml changes by polling its modification time and size"""
+
+    def __init__(self, path: Path = DEFAULT_CONFIG_PATH):
+        self.path = Path(path)
+        self._stamp = self._current()
+
+    def _current(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self) -> bool:
+        """True once per change (including the file appearing or disappearing)"""
+        stamp = self._current()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
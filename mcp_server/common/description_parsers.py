@@ -0,0 +1,183 @@
+"""Precompiled parsers for Jira ticket descriptions and custom field values"""
+
+import html
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+# Match Bitbucket/Git URLs (handle both plain text and HTML, Cloud and Data Center)
+_BITBUCKET_URL_PATTERNS = (
+    re.compile(r'https?://(?:[^\s<>"]*(?:bitbucket|git)[^\s<>"]+)', re.IGNORECASE),  # Domain contains bitbucket/git
+    re.compile(r'href=["\']([^"\'>]+(?:bitbucket|git)[^"\'>]+)["\']', re.IGNORECASE),  # HTML href
+)
+# Data Center: /projects/PROJECT/repos/REPO/browse/path  (also matches /repos/REPO/browse/path)
+_BROWSE_PATH = re.compile(r'/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)')
+# Cloud: bitbucket.org/WORKSPACE/REPO/src/BRANCH/path
+_CLOUD_SRC_PATH = re.compile(r'bitbucket\.org/[^/]+/([^/]+)/src/([^/?#<]+)/(.+?)(?:\?|#|$|<)')
+# Data Center branch selector: ?at=refs/heads/branch or ?at=branch
+_AT_PARAM = re.compile(r'[?&]at=([^&#<\s]+)')
+
+DEFAULT_MEMO_SIZE = 512
+
+
+def option_labels(field_value: Any) -> List[str]:
+    """Flatten a custom field value (string, JSON string, option dict or cascading list) into labels"""
+    value = parse_field_value(field_value)
+    if isinstance(value, list):
+        return [item.get('selectedOptionLabel', '') if isinstance(item, dict) else str(item) for item in value]
+    if isinstance(value, dict):
+        return [value.get('selectedOptionLabel') or value.get('value', '')]
+    if isinstance(value, str) and value:
+        return [value]
+    return []
+
+
+def parse_field_value(field_value: Any) -> Any:
+    """Decode custom field values that Jira returns as JSON-encoded lists"""
+    if isinstance(field_value, str) and field_value.startswith('['):
+        try:
+            return json.loads(field_value)
+        except ValueError:
+            pass
+    return field_value
+
+
+def custom_field_text(field_value: Any) -> str:
+    """Render a custom field value as text, joining cascading labels with ' - '"""
+    value = parse_field_value(field_value)
+    if isinstance(value, list):
+        return ' - '.join(item.get('selectedOptionLabel', '') for item in value if isinstance(item, dict))
+    if isinstance(value, dict):
+        return value.get('selectedOptionLabel', '')
+    return value if isinstance(value, str) else ''
+
+
+def is_alert(field_value: Any) -> bool:
+    """Return True if a custom field value marks the ticket as an Alert"""
+    if isinstance(field_value, str):
+        return 'Alert' in field_value
+    if isinstance(field_value, list):
+        return any(isinstance(item, dict) and 'Alert' in item.get('selectedOptionLabel', '') for item in field_value)
+    if isinstance(field_value, dict):
+        return 'Alert' in field_value.get('selectedOptionLabel', '')
+    return False
+
+
+def extract_bitbucket_reference(description: Optional[str]) -> Dict[str, Optional[str]]:
+    """Find the first Bitbucket/Git URL in a description and split it into repo, path and branch.
+
+    Returns the HTML-unescaped description alongside the parsed fields.
+    """
+    reference = {
+        'description': description,
+        'bitbucket_url': None,
+        'repo_slug': None,
+        'file_path': None,
+        'branch': None
+    }
+    if not description:
+        return reference
+
+    # Decode HTML entities first (skipped when there are none to decode)
+    if '&' in description:
+        description = html.unescape(description)
+    reference['description'] = description
+
+    bitbucket_url = None
+    for pattern in _BITBUCKET_URL_PATTERNS:
+        match = pattern.search(description)
+        if match:
+            bitbucket_url = match.group(1) if pattern.groups else match.group(0)
+            break
+    if not bitbucket_url:
+        return reference
+
+    # Decode URL encoding
+    bitbucket_url = unquote(bitbucket_url)
+    reference['bitbucket_url'] = bitbucket_url
+
+    browse_match = _BROWSE_PATH.search(bitbucket_url)
+    if browse_match:
+        reference['repo_slug'] = browse_match.group(1)
+        reference['file_path'] = browse_match.group(2).rstrip()
+        at_match = _AT_PARAM.search(bitbucket_url)
+        if at_match:
+            ref = at_match.group(1)
+            reference['branch'] = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref
+        return reference
+
+    src_match = _CLOUD_SRC_PATH.search(bitbucket_url)
+    if src_match:
+        reference['repo_slug'] = src_match.group(1)
+        reference['branch'] = src_match.group(2)
+        reference['file_path'] = src_match.group(3).rstrip()
+    return reference
+
+
+class _DescriptionMemo:
+    """Bounded LRU of parsed descriptions keyed on (issue key, updated timestamp)"""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, value: Dict) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_memo = _DescriptionMemo()
+
+
+def parse_issue_description(issue: Dict) -> Dict[str, Optional[str]]:
+    """Extract the Bitbucket reference from a Jira issue, memoized on (key, updated).
+
+    Issues without a key or updated timestamp are parsed without caching. The
+    returned dict is shared with the memo, so callers must copy before mutating.
+    """
+    fields = issue.get('fields', {})
+    memo_key = (issue.get('key'), fields.get('updated'))
+    cacheable = all(memo_key)
+    if cacheable:
+        cached = _memo.get(memo_key)
+        if cached is not None:
+            return cached
+    reference = extract_bitbucket_reference(fields.get('description', ''))
+    if cacheable:
+        _memo.put(memo_key, reference)
+    return reference
+
+
+def clear_memo() -> None:
+    """Drop all memoized descriptions"""
+    _memo.clear()
+
+
+def memo_stats() -> Dict[str, int]:
+    """Report memo hit/miss counters and current size"""
+    return {'hits': _memo.hits, 'misses': _memo.misses, 'size': len(_memo._entries), 'maxsize': _memo.maxsize}
@@ -0,0 +1,278 @@
+"""Structured, paginated diffs for get_pull_request_diff, get_commit_diff and compare_commits.
+
+With structured=true the providers first fetch the diffstat (the list of
+changed files), filter it by path and page it, and only then fetch the
+hunks for the files on the requested page. Generated files such as
+lockfiles and minified bundles are listed with their line counts but not
+fetched unless include_generated is set. Each file's hunks are capped at
+BITBUCKET_DIFF_MAX_FILE_BYTES so one huge file cannot use up the response.
+
+Unified diff text (Cloud) is parsed line by line as it streams in; Data
+Center's JSON diffs are converted to the same shape:
+
+    {'path', 'old_path', 'status', 'additions', 'deletions', 'binary',
+     'truncated', 'hunks': [{'header', 'old_start', 'old_lines', 'new_start',
+                             'new_lines', 'lines': ['+added', '-removed', ' context']}]}
+"""
+
+import fnmatch
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_PAGE_FILES = 20
+# Hunk text kept per file; the rest of the file is counted but not returned
+MAX_FILE_BYTES = int(os.getenv('BITBUCKET_DIFF_MAX_FILE_BYTES', str(20 * 1024)))
+
+# File names and patterns treated as generated
+GENERATED_NAMES = frozenset({
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock', 'Pipfile.lock',
+    'Cargo.lock', 'Gemfile.lock', 'composer.lock', 'go.sum', 'gradle.lockfile', 'packages.lock.json', 'uv.lock',
+})
+GENERATED_PATTERNS = ('*.min.js', '*.min.css', '*.map', '*.pb.go', '*_pb2.py', '*.generated.*', '*.snap')
+GENERATED_DIRECTORIES = ('dist/', 'build/', 'vendor/', 'node_modules/', 'target/', 'generated/')
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def is_generated(path: str) -> bool:
+    name = path.rsplit('/', 1)[-1]
+    if name in GENERATED_NAMES or any(fnmatch.fnmatchcase(name, p) for p in GENERATED_PATTERNS):
+        return True
+    return any(path.startswith(d) or f'/{d}' in path for d in GENERATED_DIRECTORIES)
+
+
+def matches_paths(file: Dict[str, Any], paths: Optional[Sequence[str]]) -> bool:
+    """True if the file (or its old path) matches a glob, an exact path or a directory prefix"""
+    if not paths:
+        return True
+    for path in (file.get('path'), file.get('old_path')):
+        if not path:
+            continue
+        for pattern in paths:
+            if path == pattern or path.startswith(pattern.rstrip('/') + '/') or fnmatch.fnmatchcase(path, pattern):
+                return True
+    return False
+
+
+def _new_file(path: Optional[str] = None, old_path: Optional[str] = None, status: str = 'modified') -> Dict[str, Any]:
+    return {'path': path, 'old_path': old_path, 'status': status, 'additions': 0, 'deletions': 0,
+            'binary': False, 'truncated': False, 'hunks': []}
+
+
+# C-style escapes git uses in quoted paths, besides \NNN octal bytes
+_GIT_ESCAPES = {'a': b'\a', 'b': b'\b', 't': b'\t', 'n': b'\n', 'v': b'\v', 'f': b'\f', 'r': b'\r',
+                '"': b'"', '\\': b'\\'}
+
+
+def _unquote_git_path(text: str) -> str:
+    """A path as git prints it, without its quotes and escapes ("t\\303\\251st" -> test with an accent)"""
+    if len(text) < 2 or not (text.startswith('"') and text.endswith('"')):
+        return text
+    out = bytearray()
+    i, end = 1, len(text) - 1
+    while i < end:
+        char = text[i]
+        if char != '\\' or i + 1 >= end:
+            out += char.encode('utf-8')
+            i += 1
+            continue
+        escape = text[i + 1]
+        if escape in '01234567':
+            digits = escape
+            while len(digits) < 3 and i + 1 + len(digits) < end and text[i + 1 + len(digits)] in '01234567':
+                digits += text[i + 1 + len(digits)]
+            out.append(int(digits, 8) & 0xFF)
+            i += 1 + len(digits)
+        else:
+            out += _GIT_ESCAPES.get(escape, escape.encode('utf-8'))
+            i += 2
+    return out.decode('utf-8', 'replace')
+
+
+def _split_quoted(text: str):
+    """The leading quoted path of text and the rest after it"""
+    i = 1
+    while i < len(text) and text[i] != '"':
+        i += 2 if text[i] == '\\' else 1
+    return text[:i + 1], text[i + 1:].lstrip(' ')
+
+
+def _strip_prefix(path: str, prefix: str) -> str:
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def _git_header_paths(rest: str):
+    # Paths with special characters are quoted: "a/x\ty" "b/x\ty"
+    if rest.startswith('"'):
+        old, new = _split_quoted(rest)
+        return _strip_prefix(_unquote_git_path(old), 'a/'), _strip_prefix(_unquote_git_path(new), 'b/')
+    if rest.endswith('"') and ' "b/' in rest:
+        split = rest.rindex(' "b/')
+        return _strip_prefix(rest[:split], 'a/'), _strip_prefix(_unquote_git_path(rest[split + 1:]), 'b/')
+    # "a/x b/x": without a rename both halves are the same length
+    half = (len(rest) - 1) // 2
+    old, new = rest[:half], rest[half + 1:]
+    if old[2:] == new[2:] and old.startswith('a/') and new.startswith('b/'):
+        return old[2:], new[2:]
+    old, _, new = rest.partition(' b/')
+    return old[2:], new
+
+
+class _FileBuilder:
+    """Appends diff lines to a file's hunks until its byte budget runs out"""
+
+    def __init__(self, file: Dict[str, Any], max_bytes: int):
+        self.file = file
+        self.remaining = max_bytes
+        self.hunk = None
+
+    def start_hunk(self, header: str, old_start: int, old_lines: int, new_start: int, new_lines: int):
+        self.hunk = None
+        if self.remaining <= 0:
+            self.file['truncated'] = True
+            return
+        self.hunk = {'header': header, 'old_start': old_start, 'old_lines': old_lines,
+                     'new_start': new_start, 'new_lines': new_lines, 'lines': []}
+        self.file['hunks'].append(self.hunk)
+        self.remaining -= len(header)
+
+    def add_line(self, line: str):
+        if line.startswith('+'):
+            self.file['additions'] += 1
+        elif line.startswith('-'):
+            self.file['deletions'] += 1
+        if self.hunk is None:
+            return
+        if self.remaining - len(line) - 1 < 0:
+            self.file['truncated'] = True
+            self.hunk = None
+            self.remaining = 0
+            return
+        self.hunk['lines'].append(line)
+        self.remaining -= len(line) + 1
+
+
+def parse_unified_diff(lines: Iterable[str], max_file_bytes: int = MAX_FILE_BYTES) -> Iterator[Dict[str, Any]]:
+    """Files of a git unified diff, yielded one at a time as the lines arrive"""
+    builder = None
+    in_header = False
+    for line in lines:
+        if line.startswith('diff --git '):
+            if builder:
+                yield builder.file
+            old, new = _git_header_paths(line[len('diff --git '):])
+            builder = _FileBuilder(_new_file(new, old if old != new else None), max_file_bytes)
+            in_header = True
+            continue
+        if builder is None:
+            continue
+        file = builder.file
+        if in_header:
+            if line.startswith('new file mode'):
+                file['status'] = 'added'
+            elif line.startswith('deleted file mode'):
+                file['status'] = 'deleted'
+            elif line.startswith('rename from '):
+                file['status'] = 'renamed'
+                file['old_path'] = _unquote_git_path(line[len('rename from '):])
+            elif line.startswith('rename to '):
+                file['path'] = _unquote_git_path(line[len('rename to '):])
+            elif line.startswith('Binary files') or line.startswith('GIT binary patch'):
+                file['binary'] = True
+            elif line.startswith('+++ '):
+                path = _unquote_git_path(line[len('+++ '):])
+                if path.startswith('b/'):
+                    file['path'] = path[2:]
+            elif line.startswith('@@'):
+                in_header = False
+        if not in_header:
+            match = _HUNK_HEADER.match(line)
+            if match:
+                old_start, old_lines, new_start, new_lines = match.groups()
+                builder.start_hunk(line, int(old_start), int(old_lines or 1), int(new_start), int(new_lines or 1))
+            elif line[:1] in ('+', '-', ' ', '\\'):
+                builder.add_line(line)
+    if builder:
+        yield builder.file
+
+
+def convert_dc_diff(diff: Dict[str, Any], max_file_bytes: int = MAX_FILE_BYTES) -> Dict[str, Any]:
+    """A Bitbucket Data Center JSON diff entry in the parse_unified_diff shape"""
+    source = (diff.get('source') or {}).get('toString')
+    destination = (diff.get('destination') or {}).get('toString')
+    if source and destination:
+        status = 'renamed' if source != destination else 'modified'
+    else:
+        status = 'added' if destination else 'deleted'
+    file = _new_file(destination or source, source if status == 'renamed' else None, status)
+    file['binary'] = bool(diff.get('binary'))
+    builder = _FileBuilder(file, max_file_bytes)
+    prefixes = {'ADDED': '+', 'REMOVED': '-', 'CONTEXT': ' '}
+    for hunk in diff.get('hunks', []):
+        old_start, old_lines = hunk.get('sourceLine', 0), hunk.get('sourceSpan', 0)
+        new_start, new_lines = hunk.get('destinationLine', 0), hunk.get('destinationSpan', 0)
+        header = f"@@ -{old_start},{old_lines} +{new_start},{new_lines} @@"
+        if hunk.get('context'):
+            header += f" {hunk['context']}"
+        builder.start_hunk(header, old_start, old_lines, new_start, new_lines)
+        for segment in hunk.get('segments', []):
+            prefix = prefixes.get(segment.get('type'), ' ')
+            for line in segment.get('lines', []):
+                builder.add_line(prefix + line.get('line', ''))
+        if hunk.get('truncated'):
+            file['truncated'] = True
+    if diff.get('truncated'):
+        file['truncated'] = True
+    return file
+
+
+def summarize_files(files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A diffstat with generated files flagged and totals, for get_pull_request_summary"""
+    summary = [{**f, 'generated': is_generated(f['path'] or f.get('old_path') or '')} for f in files]
+    result = {'files': summary, 'total_files': len(summary),
+              'generated_files': sum(1 for f in summary if f['generated'])}
+    if all(f.get('additions') is not None for f in summary):
+        result['additions'] = sum(f['additions'] for f in summary)
+        result['deletions'] = sum(f['deletions'] for f in summary)
+    return result
+
+
+async def paginate_diff(files: List[Dict[str, Any]], fetch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+                        paths: Optional[Sequence[str]] = None, start: int = 0, limit: Optional[int] = None,
+                        include_generated: bool = False) -> Dict[str, Any]:
+    """One page of a structured diff.
+
+    files is the diffstat: {'path', 'old_path', 'status', 'additions', 'deletions'}
+    per changed file. await fetch(paths) returns the parsed diffs of the given
+    paths; it is called once, for the files on the page that are not skipped.
+    """
+    limit = limit or DEFAULT_PAGE_FILES
+    selected = [f for f in files if matches_paths(f, paths)]
+    page = [dict(f) for f in selected[start:start + limit]]
+    wanted = []
+    for file in page:
+        if not include_generated and is_generated(file['path'] or file.get('old_path') or ''):
+            file['skipped'] = 'generated'
+        else:
+            wanted.append(file['path'])
+    parsed = {f['path']: f for f in await fetch(wanted)} if wanted else {}
+    for file in page:
+        if 'skipped' in file:
+            continue
+        diff = parsed.get(file['path'])
+        if diff is None:
+            file['hunks'] = []
+            continue
+        for key in ('additions', 'deletions'):
+            if file.get(key) is None:
+                file[key] = diff[key]
+        file.update(binary=diff['binary'], truncated=diff['truncated'], hunks=diff['hunks'])
+    end = start + len(page)
+    result = {'files': page, 'total_files': len(selected), 'start': start,
+              'next_start': end if end < len(selected) else None}
+    if all(f.get('additions') is not None for f in selected):
+        # Data Center's change list has no line counts
+        result['additions'] = sum(f['additions'] for f in selected)
+        result['deletions'] = sum(f['deletions'] for f in selected)
+    return result
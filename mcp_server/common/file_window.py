@@ -0,0 +1,107 @@
+"""Bounded reads of a window of a file from a stream of raw chunks, for get_file_content.
+
+The file is consumed chunk by chunk and only the requested window is kept:
+lines start_line..end_line (1-based, inclusive), or max_bytes starting at
+byte_offset. Reading stops as soon as the window is complete, so a slice
+near the top of a large file costs only the bytes before it. Files with a
+NUL byte near the start are reported as binary without decoding them.
+"""
+
+import os
+from typing import Any, Dict, Iterable, Optional
+
+# Content returned by one read when max_bytes is not given
+MAX_CONTENT_BYTES = int(os.getenv('BITBUCKET_MAX_FILE_BYTES', str(1024 * 1024)))
+# Chunk size for streamed downloads
+CHUNK_BYTES = 64 * 1024
+# A NUL byte in this many leading bytes marks the file as binary (as git does)
+BINARY_SNIFF_BYTES = 8000
+
+
+def read_window(chunks: Iterable[bytes], start_line: Optional[int] = None, end_line: Optional[int] = None,
+                byte_offset: Optional[int] = None, max_bytes: Optional[int] = None,
+                total_size: Optional[int] = None, stream_offset: int = 0) -> Dict[str, Any]:
+    """The window of the file as {'content', 'size', 'truncated', ...}, or {'binary': True, 'size'}.
+
+    size is total_size when known, otherwise the number of bytes read when the
+    stream was read to its end, otherwise None. Line windows also report the
+    line range returned, and total_lines when the end of the file was reached.
+    stream_offset is the file offset the chunks start at, when a server has
+    already skipped ahead for a byte range request.
+    """
+    limit = max_bytes or MAX_CONTENT_BYTES
+    by_line = start_line is not None or end_line is not None
+    first = start_line or 1
+    skip = (byte_offset or 0) - stream_offset
+    out = bytearray()
+    seen = 0
+    line = 1  # line number at the current stream position
+    truncated = False
+    at_end = True
+    sniffed = False
+    last_byte = b''
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not sniffed:
+            if b'\0' in chunk[:BINARY_SNIFF_BYTES]:
+                return {'binary': True, 'size': total_size}
+            sniffed = True
+        start = seen
+        seen += len(chunk)
+        last_byte = chunk[-1:]
+
+        if not by_line:
+            if seen <= skip:
+                continue
+            piece = chunk[max(0, skip - start):]
+            room = limit - len(out)
+            out += piece[:room]
+            if len(piece) > room:
+                truncated, at_end = True, False
+                break
+            continue
+
+        newlines = chunk.count(b'\n')
+        if line + newlines < first:
+            # The whole chunk is before the window
+            line += newlines
+            continue
+        done = False
+        position = 0
+        while position < len(chunk):
+            newline = chunk.find(b'\n', position)
+            stop = len(chunk) if newline == -1 else newline + 1
+            if line >= first:
+                piece = chunk[position:stop]
+                room = limit - len(out)
+                out += piece[:room]
+                if len(piece) > room:
+                    truncated = done = True
+                    break
+            if newline == -1:
+                break
+            line += 1
+            position = stop
+            if end_line is not None and line > end_line:
+                done = True
+                break
+        if done:
+            at_end = False
+            break
+
+    if total_size is None and at_end:
+        total_size = stream_offset + seen
+    result: Dict[str, Any] = {'content': out.decode('utf-8', 'replace'), 'size': total_size, 'truncated': truncated}
+    if by_line:
+        returned = out.count(b'\n') + (0 if not out or out.endswith(b'\n') else 1)
+        result['start_line'] = first
+        result['end_line'] = first + returned - 1 if returned else None
+        if at_end:
+            result['total_lines'] = line - 1 if not seen or last_byte == b'\n' else line
+    elif byte_offset is not None:
+        result['byte_offset'] = byte_offset
+        if truncated:
+            result['next_byte_offset'] = byte_offset + len(out)
+    return result
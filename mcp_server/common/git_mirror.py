@@ -0,0 +1,226 @@
+"""Local bare git mirrors that serve Bitbucket read tools without REST calls.
+
+Enabled by setting BITBUCKET_MIRROR_DIR and BITBUCKET_MIRROR_REPOS (comma
+separated repository slugs, or * for every repository the tools touch).
+The first read of a repository clones it in the background with
+`git clone --mirror`. Later reads are served from the local object store,
+and a background `git fetch` runs once the mirror is older than
+BITBUCKET_MIRROR_REFRESH_SECONDS or when a Bitbucket webhook arrives
+(http_server.py, POST /hooks/bitbucket).
+
+Reads by branch may lag the server by up to the refresh interval. Reads
+that name a commit the mirror does not have yet, and any git failure, raise
+MirrorError so the provider falls back to its REST implementation.
+
+Credentials are passed as an http.extraHeader through git's environment
+configuration (GIT_CONFIG_COUNT), so they never appear in the command line
+or in the mirror's config file.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from mcp_server.common.validation import validate_repo_slug
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = float(os.getenv('BITBUCKET_MIRROR_GIT_TIMEOUT', '30'))
+# Clones and fetches of large repositories may take much longer than a read
+SYNC_TIMEOUT = float(os.getenv('BITBUCKET_MIRROR_SYNC_TIMEOUT', '1800'))
+REFRESH_SECONDS = float(os.getenv('BITBUCKET_MIRROR_REFRESH_SECONDS', '60'))
+# Marker touched after every successful clone or fetch
+FETCH_MARKER = 'mcp-last-fetch'
+
+# git log fields, separated by unit separators; records end with a record separator
+_LOG_FORMAT = '%H%x1f%an%x1f%ae%x1f%at%x1f%B%x1e'
+
+
+class MirrorError(Exception):
+    """A mirror could not answer; the caller should use the REST API instead"""
+
+
+class GitMirror:
+    """One bare mirror and the read operations the Bitbucket tools need"""
+
+    def __init__(self, path: Path, url: str, auth_header: Optional[str] = None):
+        self.path = Path(path)
+        self.url = url
+        self._env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        if auth_header:
+            self._env.update(GIT_CONFIG_COUNT='1', GIT_CONFIG_KEY_0='http.extraHeader',
+                             GIT_CONFIG_VALUE_0=f'Authorization: {auth_header}')
+        self._sync_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return (self.path / FETCH_MARKER).exists()
+
+    def age(self) -> float:
+        """Seconds since the last successful clone or fetch"""
+        try:
+            return time.time() - (self.path / FETCH_MARKER).stat().st_mtime
+        except OSError:
+            return float('inf')
+
+    def _git(self, *args: str, timeout: float = GIT_TIMEOUT, cwd: Optional[Path] = None) -> bytes:
+        try:
+            result = subprocess.run(['git', *args], cwd=cwd or self.path, env=self._env, capture_output=True,
+                                    timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise MirrorError(f"git {args[0]} failed: {e}") from e
+        if result.returncode != 0:
+            raise MirrorError(f"git {args[0]} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return result.stdout
+
+    def sync(self) -> None:
+        """Clone the mirror if it does not exist yet, otherwise fetch; one sync at a time"""
+        with self._sync_lock:
+            start = time.monotonic()
+            if (self.path / 'HEAD').exists():
+                self._git('fetch', '--prune', '--quiet', 'origin', timeout=SYNC_TIMEOUT)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._git('clone', '--mirror', '--quiet', self.url, str(self.path), timeout=SYNC_TIMEOUT,
+                          cwd=self.path.parent)
+            (self.path / FETCH_MARKER).touch()
+            logger.info(f"Synced mirror {self.path.name} in {time.monotonic() - start:.1f}s")
+
+    def resolve(self, ref: str) -> str:
+        """The commit hash a branch, tag or (partial) hash names"""
+        if not ref or ref.startswith('-'):
+            raise MirrorError(f"Invalid ref: {ref}")
+        return self._git('rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}').decode().strip()
+
+    def file_content(self, ref: str, path: str) -> bytes:
+        return self._git('cat-file', 'blob', f'{self.resolve(ref)}:{path.strip("/")}')
+
+    def list_directory(self, ref: str, path: str = '') -> List[Dict]:
+        """Entries of a directory: {'path', 'name', 'type': 'file' | 'directory', 'size'}"""
+        path = path.strip('/')
+        args = ['ls-tree', '-l', '-z', self.resolve(ref)]
+        if path:
+            args += ['--', f'{path}/']
+        entries = []
+        for record in self._git(*args).decode('utf-8', 'replace').split('\0'):
+            if not record:
+                continue
+            meta, entry_path = record.split('\t', 1)
+            _mode, kind, _object, size = meta.split()
+            entries.append({'path': entry_path, 'name': entry_path.rsplit('/', 1)[-1],
+                            'type': 'directory' if kind == 'tree' else 'file',
+                            'size': int(size) if size.isdigit() else None})
+        if path and not entries:
+            raise MirrorError(f"No directory {path} at {ref}")
+        return entries
+
+    def log(self, ref: str, limit: int, path: Optional[str] = None, author: Optional[str] = None) -> List[Dict]:
+        """Newest first: {'hash', 'author_name', 'author_email', 'timestamp', 'message'}"""
+        args = ['log', f'--max-count={limit}', f'--format={_LOG_FORMAT}']
+        if author:
+            args += ['--regexp-ignore-case', '--fixed-strings', f'--author={author}']
+        args.append(self.resolve(ref))
+        if path:
+            args += ['--', path.strip('/')]
+        commits = []
+        for record in self._git(*args).decode('utf-8', 'replace').split('\x1e'):
+            record = record.strip('\n')
+            if not record:
+                continue
+            commit_hash, name, email, timestamp, message = record.split('\x1f', 4)
+            commits.append({'hash': commit_hash, 'author_name': name, 'author_email': email,
+                            'timestamp': int(timestamp), 'message': message.strip()})
+        return commits
+
+    def commit_diff(self, commit: str) -> str:
+        """Patch of a commit against its first parent (the whole tree for a root commit)"""
+        return self._git('show', '--format=', '--patch', '--diff-merges=first-parent',
+                         self.resolve(commit)).decode('utf-8', 'replace')
+
+    def compare(self, from_commit: str, to_commit: str) -> str:
+        """Changes on from_commit since it diverged from to_commit, as the Bitbucket compare APIs report them"""
+        spec = f'{self.resolve(to_commit)}...{self.resolve(from_commit)}'
+        return self._git('diff', spec).decode('utf-8', 'replace')
+
+
+class MirrorSet:
+    """The configured mirrors of one Bitbucket provider, synced in background threads"""
+
+    def __init__(self, root: Path, url_template: str, repos: Optional[List[str]] = None,
+                 refresh_seconds: float = REFRESH_SECONDS, auth_header: Optional[str] = None, background: bool = True):
+        self.root = Path(root)
+        self.url_template = url_template
+        self.repos = None if repos is None or '*' in repos else frozenset(repos)
+        self.refresh_seconds = refresh_seconds
+        self.auth_header = auth_header
+        self.background = background
+        self._mirrors: Dict[str, GitMirror] = {}
+        self._syncing: set = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, default_url_template: str, auth_header: Optional[str] = None) -> Optional['MirrorSet']:
+        """The MirrorSet configured by BITBUCKET_MIRROR_* variables, or None when mirroring is off"""
+        root = os.getenv('BITBUCKET_MIRROR_DIR')
+        repos = [r.strip() for r in os.getenv('BITBUCKET_MIRROR_REPOS', '').split(',') if r.strip()]
+        if not root or not repos:
+            return None
+        return cls(root, os.getenv('BITBUCKET_MIRROR_URL_TEMPLATE') or default_url_template, repos,
+                   auth_header=auth_header)
+
+    def mirrors(self, repo_slug: str) -> bool:
+        return self.repos is None or repo_slug in self.repos
+
+    def _mirror(self, repo_slug: str) -> GitMirror:
+        with self._lock:
+            mirror = self._mirrors.get(repo_slug)
+            if mirror is None:
+                url = self.url_template.format(repo_slug=repo_slug)
+                mirror = self._mirrors[repo_slug] = GitMirror(self.root / f'{repo_slug}.git', url, self.auth_header)
+            return mirror
+
+    def get(self, repo_slug: str) -> Optional[GitMirror]:
+        """The repository's mirror if it can serve reads; starts a clone or refresh when one is due"""
+        if not self.mirrors(repo_slug) or not validate_repo_slug(repo_slug)[0]:
+            return None
+        mirror = self._mirror(repo_slug)
+        if not mirror.ready:
+            self.refresh(repo_slug)
+            return mirror if mirror.ready else None
+        if mirror.age() > self.refresh_seconds:
+            self.refresh(repo_slug)
+        return mirror
+
+    def refresh(self, repo_slug: str, clone: bool = True) -> bool:
+        """Clone or fetch the repository's mirror now (in the background by default).
+
+        With clone=False only an existing mirror is fetched; nothing is cloned.
+        """
+        if not self.mirrors(repo_slug) or not validate_repo_slug(repo_slug)[0]:
+            return False
+        mirror = self._mirror(repo_slug)
+        if not clone and not mirror.ready:
+            return False
+        with self._lock:
+            if repo_slug in self._syncing:
+                return True
+            self._syncing.add(repo_slug)
+        if self.background:
+            threading.Thread(target=self._sync, args=(repo_slug, mirror), name=f'mirror-{repo_slug}',
+                             daemon=True).start()
+        else:
+            self._sync(repo_slug, mirror)
+        return True
+
+    def _sync(self, repo_slug: str, mirror: GitMirror) -> None:
+        try:
+            mirror.sync()
+        except MirrorError as e:
+            logger.warning(f"Could not sync mirror of {repo_slug}: {e}")
+        finally:
+            with self._lock:
+                self._syncing.discard(repo_slug)
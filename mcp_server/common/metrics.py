@@ -0,0 +1,100 @@
+"""CloudWatch Embedded Metric Format (EMF) logging.
+
+Metrics are buffered for the duration of a request and written to stdout as
+EMF JSON lines on flush. CloudWatch Logs extracts them into custom metrics
+asynchronously, so emitting a metric never makes a network call.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, TextIO
+
+DEFAULT_NAMESPACE = 'AtlassianMCP'
+# EMF limits: 100 values per metric per document, 30 dimensions per dimension set
+MAX_VALUES_PER_METRIC = 100
+MAX_DIMENSIONS = 30
+
+
+class MetricsLogger:
+    """Buffers metrics and flushes them as as few EMF documents as possible.
+
+    Metrics whose dimension values agree share a document (one directive per
+    dimension set), and repeats of the same metric are batched into a value
+    array, so a typical request produces a single log line.
+    """
+
+    def __init__(self, namespace: str = DEFAULT_NAMESPACE, stream: Optional[TextIO] = None):
+        self.namespace = namespace
+        self.stream = stream
+        self._documents: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def put_metric(self, name: str, value: float, unit: str = 'Count', **dimensions: str) -> None:
+        """Buffer a metric value with its dimensions"""
+        if len(dimensions) > MAX_DIMENSIONS:
+            raise ValueError(f"EMF supports at most {MAX_DIMENSIONS} dimensions per metric")
+        dimensions = {k: str(v) for k, v in dimensions.items()}
+        with self._lock:
+            for document in self._documents:
+                if self._add_to_document(document, name, value, unit, dimensions):
+                    return
+            document = {'timestamp': int(time.time() * 1000), 'dimensions': {}, 'metrics': {}}
+            self._add_to_document(document, name, value, unit, dimensions)
+            self._documents.append(document)
+
+    def _add_to_document(self, document: Dict, name: str, value: float, unit: str, dimensions: Dict[str, str]) -> bool:
+        # Root keys hold one value per dimension, so dimension values must agree
+        root = document['dimensions']
+        if any(root.get(k, v) != v for k, v in dimensions.items()):
+            return False
+        if name in root:
+            return False
+        dimension_keys = tuple(dimensions)
+        metric = document['metrics'].get(name)
+        if metric is not None:
+            if metric['unit'] != unit or metric['dimension_keys'] != dimension_keys \
+                    or len(metric['values']) >= MAX_VALUES_PER_METRIC:
+                return False
+            metric['values'].append(value)
+        else:
+            if any(k in document['metrics'] for k in dimensions):
+                return False
+            document['metrics'][name] = {'unit': unit, 'dimension_keys': dimension_keys, 'values': [value]}
+        root.update(dimensions)
+        return True
+
+    def serialize(self) -> List[str]:
+        """Render buffered metrics as EMF JSON lines and clear the buffer"""
+        with self._lock:
+            documents, self._documents = self._documents, []
+        lines = []
+        for document in documents:
+            # One directive per distinct dimension set
+            directives: Dict[tuple, Dict] = {}
+            body = dict(document['dimensions'])
+            for name, metric in document['metrics'].items():
+                directive = directives.setdefault(metric['dimension_keys'], {
+                    'Namespace': self.namespace,
+                    'Dimensions': [list(metric['dimension_keys'])],
+                    'Metrics': []
+                })
+                directive['Metrics'].append({'Name': name, 'Unit': metric['unit']})
+                values = metric['values']
+                body[name] = values[0] if len(values) == 1 else values
+            body['_aws'] = {
+                'Timestamp': document['timestamp'],
+                'CloudWatchMetrics': list(directives.values())
+            }
+            lines.append(json.dumps(body, separators=(',', ':')))
+        return lines
+
+    def flush(self) -> int:
+        """Write buffered metrics to the stream (stdout by default), returning the line count"""
+        lines = self.serialize()
+        if lines:
+            stream = self.stream or sys.stdout
+            stream.write(''.join(line + '\n' for line in lines))
+            stream.flush()
+        return len(lines)
@@ -0,0 +1,164 @@
+"""Content-addressed on-disk cache for immutable Bitbucket objects.
+
+Commits, commit diffs, commit-to-commit comparisons and file contents at a
+commit hash never change, so they can be kept indefinitely. Each object is
+stored in its own file named by the SHA-256 of its key (platform, credential
+namespace, repository, kind, commit hashes, path) under
+BITBUCKET_OBJECT_CACHE_DIR (default: the system temp directory, which is /tmp
+on Lambda). The directory is private to the user running the server (0700),
+and the credential namespace keeps objects fetched with one account from
+being served to another. The total size is capped at BITBUCKET_OBJECT_CACHE_MB
+and the least recently used objects are evicted first.
+
+Several processes may share the directory. Files are written to a temporary
+name and renamed, so readers never see partial objects. Each process tracks
+the size of the files it knows about and evicts by modification time, which
+a read refreshes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIRECTORY = os.getenv('BITBUCKET_OBJECT_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'atlassian-mcp-objects')
+DEFAULT_MAX_BYTES = int(float(os.getenv('BITBUCKET_OBJECT_CACHE_MB', '256')) * 1024 * 1024)
+# A single object may use at most this fraction of the cache
+MAX_OBJECT_FRACTION = 4
+
+
+class ObjectCache:
+    """Immutable objects on disk by key, with least-recently-used eviction by total bytes"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: Optional['OrderedDict[str, int]'] = None  # file name -> size, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(parts: Sequence[Any]) -> str:
+        return hashlib.sha256('\0'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name[:2] / name
+
+    def _scan(self) -> None:
+        # Adopt objects written by earlier processes, oldest first
+        found = []
+        if self.directory.is_dir():
+            for path in self.directory.glob('??/*'):
+                if path.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path.name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in found)
+        self._total = sum(size for _, _, size in found)
+
+    def get(self, parts: Sequence[Any]) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        name = self.key(parts)
+        path = self._path(name)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            if self._entries is None:
+                self._scan()
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            else:
+                self._entries[name] = len(data)
+                self._total += len(data)
+        return data
+
+    def put(self, parts: Sequence[Any], data: bytes) -> None:
+        if not self.enabled or len(data) > self.max_bytes // MAX_OBJECT_FRACTION:
+            return
+        name = self.key(parts)
+        path = self._path(name)
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            path.parent.mkdir(mode=0o700, exist_ok=True)
+            temporary = path.with_name(f'{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"Could not cache object {name[:12]}: {e}")
+            return
+        with self._lock:
+            if self._entries is None:
+                self._scan()
+            self._total += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            evicted = []
+            while self._total > self.max_bytes and self._entries:
+                old, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                self._path(old).unlink()
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            if self._entries is None:
+                self._scan()
+            return self._total
+
+    def fetch_text(self, parts: Sequence[Any], fetch: Callable[[], str]) -> str:
+        """The cached text for parts, or fetch() stored under parts"""
+        data = self.get(parts)
+        if data is not None:
+            return data.decode('utf-8')
+        text = fetch()
+        self.put(parts, text.encode('utf-8'))
+        return text
+
+    def fetch_json(self, parts: Sequence[Any], fetch: Callable[[], Any]) -> Any:
+        """The cached JSON value for parts, or fetch() stored under parts"""
+        data = self.get(parts)
+        if data is not None:
+            return json.loads(data)
+        value = fetch()
+        self.put(parts, json.dumps(value).encode('utf-8'))
+        return value
+
+
+def credential_namespace(*credentials: Optional[str]) -> str:
+    """A short digest of the credentials, for cache keys that must not cross accounts"""
+    return hashlib.sha256('\0'.join(str(c) for c in credentials).encode('utf-8')).hexdigest()[:16]
+
+
+_default_cache: Optional[ObjectCache] = None
+
+
+def get_object_cache() -> ObjectCache:
+    """The process-wide cache shared by the Cloud and Data Center providers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ObjectCache()
+    return _default_cache
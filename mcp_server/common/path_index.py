@@ -0,0 +1,213 @@
+"""Repository file-path index keyed by commit, for search_files.
+
+A commit's file tree never changes, so the index for (repository, commit)
+is built once from a fully paged listing and then reused. Only the branch
+to commit resolution (one small request) is repeated. Indexes live in an
+in-memory LRU and, when BITBUCKET_PATH_INDEX_DIR is set, also as gzipped
+path lists on disk that survive restarts.
+
+Matching modes:
+  substring - case-insensitive substring of the path (the previous behaviour)
+  glob      - fnmatch pattern; without '/' it matches the file name, with '/' the full path
+  fuzzy     - query characters in order, ranked like an editor's file finder
+"""
+
+import fnmatch
+import gzip
+import hashlib
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+MATCH_MODES = ('substring', 'glob', 'fuzzy')
+# Fuzzy matches are ranked, so they are capped unless a limit is given
+DEFAULT_FUZZY_LIMIT = 50
+# Memoized query results per index
+MAX_MEMO_ENTRIES = 256
+MAX_INDEXES = int(os.getenv('BITBUCKET_PATH_INDEX_MAX', '32'))
+
+_BOUNDARY = frozenset('/_-. ')
+_FULL_COMMIT_HASH = re.compile(r'^[0-9a-f]{40}$')
+
+
+def is_full_commit_hash(ref: str) -> bool:
+    """True if ref already names a commit, so it needs no resolution"""
+    return bool(_FULL_COMMIT_HASH.match(ref))
+
+
+class PathIndex:
+    """An immutable, searchable set of file paths"""
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths: Tuple[str, ...] = tuple(sorted(set(paths)))
+        self._lower = [p.lower() for p in self.paths]
+        # One newline-joined string lets substring search run in str.find
+        self._blob = '\n'.join(self._lower)
+        self._starts = []
+        offset = 0
+        for path in self._lower:
+            self._starts.append(offset)
+            offset += len(path) + 1
+        self._memo: 'OrderedDict[tuple, Tuple[str, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def search(self, query: str, mode: str = 'substring', limit: Optional[int] = None) -> List[str]:
+        """Paths matching query; substring and glob results are in path order, fuzzy results best first"""
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode}. Use one of: {', '.join(MATCH_MODES)}")
+        if limit is None and mode == 'fuzzy':
+            limit = DEFAULT_FUZZY_LIMIT
+        key = (mode, query, limit)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return list(self._memo[key])
+        if mode == 'substring':
+            result = self._substring(query.lower(), limit)
+        elif mode == 'glob':
+            result = self._glob(query, limit)
+        else:
+            result = self._fuzzy(query.lower(), limit)
+        with self._lock:
+            self._memo[key] = tuple(result)
+            if len(self._memo) > MAX_MEMO_ENTRIES:
+                self._memo.popitem(last=False)
+        return result
+
+    def _substring(self, query: str, limit: Optional[int]) -> List[str]:
+        if not query or '\n' in query:
+            return []
+        found = []
+        position = self._blob.find(query)
+        while position != -1 and (limit is None or len(found) < limit):
+            index = bisect_right(self._starts, position) - 1
+            found.append(self.paths[index])
+            if index + 1 >= len(self._starts):
+                break
+            # Continue from the next path so each path is reported once
+            position = self._blob.find(query, self._starts[index + 1])
+        return found
+
+    def _glob(self, pattern: str, limit: Optional[int]) -> List[str]:
+        match = re.compile(fnmatch.translate(pattern.lower())).match
+        whole_path = '/' in pattern
+        found = []
+        for path, lower in zip(self.paths, self._lower):
+            if match(lower if whole_path else lower.rsplit('/', 1)[-1]):
+                found.append(path)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def _fuzzy(self, query: str, limit: Optional[int]) -> List[str]:
+        query = query.replace(' ', '')
+        if not query:
+            return []
+        # Regex prefilter: the query characters in order, anywhere in the path
+        candidate = re.compile('.*?'.join(map(re.escape, query))).search
+        scored = []
+        for index, lower in enumerate(self._lower):
+            if candidate(lower):
+                scored.append((-_fuzzy_score(query, lower), len(lower), self.paths[index]))
+        scored.sort()
+        return [path for _, _, path in scored[:limit]]
+
+
+def _fuzzy_score(query: str, path: str) -> int:
+    """Higher is better: matches in the file name, at word boundaries and in runs score more"""
+    name_start = path.rfind('/') + 1
+    # Prefer matching the whole query inside the file name
+    best = _score_from(query, path, name_start, name_start)
+    if best is None:
+        best = _score_from(query, path, 0, name_start) or 0
+    return best
+
+
+def _score_from(query: str, path: str, start: int, name_start: int) -> Optional[int]:
+    score = 0
+    previous = start - 2
+    position = start
+    for char in query:
+        position = path.find(char, position)
+        if position == -1:
+            return None
+        if position == previous + 1:
+            score += 5
+        if position == 0 or path[position - 1] in _BOUNDARY:
+            score += 3
+        if position >= name_start:
+            score += 2
+        previous = position
+        position += 1
+    return score
+
+
+class PathIndexCache:
+    """PathIndex objects by (repository, commit) in an LRU, optionally backed by a directory"""
+
+    def __init__(self, max_indexes: int = MAX_INDEXES, directory: Optional[str] = None):
+        self.max_indexes = max_indexes
+        self.directory = Path(directory) if directory else None
+        self._indexes: 'OrderedDict[tuple, PathIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Sequence[str], build: Callable[[], List[str]]) -> Tuple[PathIndex, bool]:
+        """The index for key, building it with build() on a miss; returns (index, was_cached)"""
+        key = tuple(key)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index, True
+        paths = self._load(key)
+        cached = paths is not None
+        if paths is None:
+            paths = build()
+            self._store(key, paths)
+        index = PathIndex(paths)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index, cached
+
+    def _file(self, key: tuple) -> Path:
+        return self.directory / (hashlib.sha256('\0'.join(key).encode('utf-8')).hexdigest() + '.paths.gz')
+
+    def _load(self, key: tuple) -> Optional[List[str]]:
+        if not self.directory:
+            return None
+        try:
+            with gzip.open(self._file(key), 'rt', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, EOFError):
+            return None
+        return text.split('\n') if text else []
+
+    def _store(self, key: tuple, paths: List[str]) -> None:
+        if not self.directory:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self._file(key)
+        temporary = target.with_name(f'{target.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with gzip.open(temporary, 'wt', encoding='utf-8') as f:
+            f.write('\n'.join(paths))
+        os.replace(temporary, target)
+
+
+_default_cache: Optional[PathIndexCache] = None
+
+
+def get_path_index_cache() -> PathIndexCache:
+    """The process-wide cache shared by the Cloud and Data Center providers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PathIndexCache(directory=os.getenv('BITBUCKET_PATH_INDEX_DIR') or None)
+    return _default_cache
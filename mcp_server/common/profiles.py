@@ -0,0 +1,137 @@
+"""Tool profiles - named subsets of the tool catalog, advertised and routable per deployment or request"""
+
+from fnmatch import fnmatchcase
+from typing import Dict, FrozenSet, List, Optional
+
+from mcp_server.common.registry import REGISTRY
+from mcp_server.common.tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS, TICKET_SUPPORT_TOOLS
+
+# The unfiltered catalog
+ALL_PROFILE = 'all'
+
+ALL_TOOL_NAMES = tuple(t['name'] for t in JIRA_TOOLS + CONFLUENCE_TOOLS + BITBUCKET_TOOLS + TICKET_SUPPORT_TOOLS)
+
+BUILTIN_PROFILES = {
+    'jira-readonly': {
+        'tools': [
+            'search_jira', 'get_issue', 'get_issue_comments', 'get_issue_transitions', 'list_projects',
+            'get_project', 'get_issue_attachments', 'get_issue_watchers', 'get_user', 'search_users',
+            'get_current_user', 'get_worklogs', 'search_by_assignee', 'search_by_reporter',
+            'get_recent_issues', 'list_boards', 'get_board_issues', 'list_sprints', 'get_sprint_issues',
+            'get_user_permissions'
+        ]
+    },
+    'support-triage': {
+        'tools': [
+            'get_open_support_tickets', 'check_ticket_template', 'suggest_assignee', 'get_team_workload',
+            'get_expertise_jql', 'check_troubleshooting',
+            'search_jira', 'get_issue', 'get_issue_comments', 'add_comment', 'assign_issue',
+            'get_issue_transitions', 'transition_issue', 'search_by_assignee',
+            'get_page', 'search_confluence', 'cql_search', 'get_child_pages',
+            'get_file_content', 'list_commits'
+        ]
+    },
+    'code-review': {
+        'tools': [
+            'list_pull_requests', 'get_pull_request', 'get_pull_request_diff', 'get_pull_request_summary',
+            'get_pull_request_comments', 'add_pr_comment', 'approve_pull_request', 'request_changes', 'get_pr_activity',
+            'get_default_reviewers', 'get_pr_review_bundle', 'add_pr_reviewer', 'list_pull_requests_by_author',
+            'list_my_pull_requests', 'get_commit', 'get_commit_diff', 'compare_commits', 'list_commits', 'list_branches',
+            'get_file_content', 'list_directory', 'search_files', 'get_build_status',
+            'get_repository', 'list_repositories', 'get_issue'
+        ]
+    }
+}
+
+
+class ToolProfiles:
+    """Resolves profile definitions (built-in plus configured) into tool name sets.
+
+    A profile lists tool names or glob patterns under 'tools', may start from
+    another profile with 'extends', and may drop tools with 'exclude' (or all
+    tools with side effects with 'read_only: true'). Config profiles override
+    built-ins of the same name. Definitions are validated up front so a typo
+    fails at startup rather than silently hiding a tool.
+    """
+
+    def __init__(self, custom: Optional[Dict[str, Dict]] = None, default: str = ALL_PROFILE):
+        self.definitions = {**BUILTIN_PROFILES, **(custom or {})}
+        self._names: Dict[str, FrozenSet[str]] = {ALL_PROFILE: frozenset(ALL_TOOL_NAMES)}
+        for name in self.definitions:
+            self._resolve(name, ())
+        if default not in self._names:
+            raise ValueError(f"Unknown tool profile: {default}")
+        self.default = default
+        self._catalogs = {}
+
+    def _resolve(self, name: str, chain: tuple) -> FrozenSet[str]:
+        if name in self._names:
+            return self._names[name]
+        if name in chain:
+            raise ValueError(f"Tool profile inheritance cycle: {' -> '.join(chain + (name,))}")
+        definition = self.definitions.get(name)
+        if definition is None:
+            raise ValueError(f"Unknown tool profile: {name}")
+        names = set()
+        if definition.get('extends'):
+            names |= self._resolve(definition['extends'], chain + (name,))
+        names |= _expand(definition.get('tools', []), name)
+        names -= _expand(definition.get('exclude', []), name)
+        if definition.get('read_only'):
+            names = {n for n in names if REGISTRY[n].read_only}
+        self._names[name] = frozenset(names)
+        return self._names[name]
+
+    def profile_names(self) -> List[str]:
+        return [ALL_PROFILE] + sorted(self.definitions)
+
+    def exists(self, profile: str) -> bool:
+        return profile in self._names
+
+    def names(self, profile: Optional[str] = None) -> FrozenSet[str]:
+        return self._names[profile or self.default]
+
+    def allows(self, profile: Optional[str], tool_name: str) -> bool:
+        # The unfiltered profile leaves unknown names for the router to reject
+        profile = profile or self.default
+        return profile == ALL_PROFILE or tool_name in self._names[profile]
+
+    def catalog(self, profile: Optional[str] = None):
+        """The profile's ToolCatalog (its own body and ETag), built once per profile"""
+        from mcp_server.common.catalog import ToolCatalog, get_catalog
+        profile = profile or self.default
+        if profile == ALL_PROFILE:
+            return get_catalog()
+        if profile not in self._catalogs:
+            allowed = self.names(profile)
+            self._catalogs[profile] = ToolCatalog([t for t in get_catalog().tools if t['name'] in allowed])
+        return self._catalogs[profile]
+
+    def counts(self) -> Dict[str, int]:
+        """Tool count per profile (cheap - does not load schemas)"""
+        return {name: len(self._names[name]) for name in self.profile_names()}
+
+    def sizes(self) -> Dict[str, Dict[str, int]]:
+        """Tool count and serialized tools/list size per profile"""
+        sizes = {}
+        for name in self.profile_names():
+            catalog = self.catalog(name)
+            sizes[name] = {'tools': len(catalog.tools), 'bytes': len(catalog.body_bytes),
+                           'gzip_bytes': len(catalog.gzip_body)}
+        return sizes
+
+
+def _expand(patterns: List[str], profile: str) -> set:
+    names = set()
+    for pattern in patterns:
+        matched = [n for n in ALL_TOOL_NAMES if fnmatchcase(n, pattern)]
+        if not matched:
+            raise ValueError(f"Tool profile '{profile}': '{pattern}' matches no tools")
+        names.update(matched)
+    return names
+
+
+if __name__ == '__main__':
+    # Report catalog size per built-in profile: python -m mcp_server.common.profiles
+    for profile, size in ToolProfiles().sizes().items():
+        print(f"{profile:<16} {size['tools']:4d} tools  {size['bytes']:7,d} bytes  {size['gzip_bytes']:6,d} gzipped")
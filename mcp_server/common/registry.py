@@ -0,0 +1,245 @@
+"""Tool registry - one declarative entry per tool, dispatched by name in O(1).
+
+Each ToolSpec names the handler (a provider method or a ticket support
+function), how tool arguments map onto its positional parameters, and its
+side-effect policy. Descriptions come from tools.py and input schemas from
+tool_schemas.py; both are looked up by name so the registry stays cheap to
+import on the Lambda cold path.
+"""
+
+import sys
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_server.common.schema_validation import get_validators
+from mcp_server.common.tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS, TICKET_SUPPORT_TOOLS
+
+# Handler targets
+JIRA = 'jira'
+CONFLUENCE = 'confluence'
+BITBUCKET = 'bitbucket'
+TICKET_SUPPORT = 'mcp_server.common.ticket_support_tools'
+
+# Provider instances passed positionally to ticket support functions (in dispatch order)
+PROVIDERS = (JIRA, CONFLUENCE, BITBUCKET)
+_PROVIDER_INDEX = {provider: index for index, provider in enumerate(PROVIDERS)}
+
+_REQUIRED = object()
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A tool's handler, argument mapping and side-effect policy.
+
+    args lists the handler's positional parameters in order: a tool argument
+    name (required), a (name, default) pair (optional), or a provider name
+    (JIRA/CONFLUENCE/BITBUCKET) to pass that provider instance itself.
+    read_only tools have no side effects, so their results may be cached and
+    the calls retried; idempotent writes may be retried but not cached.
+    cache=False marks reads whose result depends on state kept in the process
+    (such as a queue snapshot), which a cached reply would serve stale.
+    """
+    name: str
+    target: str
+    method: str
+    args: Tuple = ()
+    read_only: bool = True
+    idempotent: bool = True
+    cache: bool = True
+
+    def __post_init__(self):
+        # Precompute the argument mapping: (tool argument, default) or (None, provider index)
+        plan = []
+        for arg in self.args:
+            if isinstance(arg, tuple):
+                plan.append(arg)
+            elif arg in _PROVIDER_INDEX:
+                plan.append((None, _PROVIDER_INDEX[arg]))
+            else:
+                plan.append((arg, _REQUIRED))
+        object.__setattr__(self, '_plan', tuple(plan))
+        object.__setattr__(self, '_provider_index', _PROVIDER_INDEX.get(self.target))
+
+    @property
+    def cacheable(self) -> bool:
+        return self.read_only and self.cache
+
+    @property
+    def description(self) -> str:
+        return _DESCRIPTIONS[self.name]
+
+    @property
+    def schema(self) -> Dict:
+        from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+        return TOOL_SCHEMAS.get(self.name, {"type": "object", "properties": {}})
+
+    def bind(self, arguments: Dict[str, Any], providers: Tuple) -> list:
+        """Map tool arguments to the handler's positional parameters (KeyError on a missing required one)"""
+        values = []
+        for key, default in self._plan:
+            if key is None:
+                values.append(providers[default])
+            elif default is _REQUIRED:
+                values.append(arguments[key])
+            else:
+                values.append(arguments.get(key, default))
+        return values
+
+    def handler(self, providers: Tuple):
+        if self._provider_index is not None:
+            return getattr(providers[self._provider_index], self.method)
+        # Resolved per call so the module loads on first use (and tests can patch it)
+        module = sys.modules.get(self.target) or import_module(self.target)
+        return getattr(module, self.method)
+
+
+def _write(name, target, method, *args, idempotent=False):
+    return ToolSpec(name, target, method, args, read_only=False, idempotent=idempotent)
+
+
+def _read(name, target, method, *args, cache=True):
+    return ToolSpec(name, target, method, args, cache=cache)
+
+
+# Optional arguments of the diff tools (structured mode)
+_DIFF_OPTIONS = (("structured", False), ("paths", None), ("context_lines", None), ("ignore_whitespace", False),
+                 ("start", 0), ("limit", None), ("include_generated", False))
+
+TOOL_SPECS = (
+    # Jira tools
+    _read("search_jira", JIRA, "search", "jql"),
+    _read("get_issue", JIRA, "get_issue", "issue_key"),
+    _write("create_issue", JIRA, "create_issue", "project_key", "summary", "description", ("issue_type", "Task"), ("custom_fields", None)),
+    _write("update_issue", JIRA, "update_issue", "issue_key", "fields", idempotent=True),
+    _write("add_comment", JIRA, "add_comment", "issue_key", "comment"),
+    _read("get_issue_comments", JIRA, "get_issue_comments", "issue_key"),
+    _write("transition_issue", JIRA, "transition_issue", "issue_key", "transition_id"),
+    _read("get_issue_transitions", JIRA, "get_issue_transitions", "issue_key"),
+    _write("assign_issue", JIRA, "assign_issue", "issue_key", "account_id", idempotent=True),
+    _write("delete_issue", JIRA, "delete_issue", "issue_key", idempotent=True),
+    _read("list_projects", JIRA, "list_projects"),
+    _read("get_project", JIRA, "get_project", "project_key"),
+    _read("get_issue_attachments", JIRA, "get_issue_attachments", "issue_key"),
+    _read("get_issue_watchers", JIRA, "get_issue_watchers", "issue_key"),
+    _read("get_user", JIRA, "get_user", "account_id"),
+    _read("search_users", JIRA, "search_users", "query"),
+    _read("get_current_user", JIRA, "get_current_user"),
+    _write("link_issues", JIRA, "link_issues", "inward_issue", "outward_issue", ("link_type", "Relates")),
+    _write("add_worklog", JIRA, "add_worklog", "issue_key", "time_spent", ("comment", "")),
+    _read("get_worklogs", JIRA, "get_worklogs", "issue_key"),
+    _write("add_label", JIRA, "add_label", "issue_key", "label", idempotent=True),
+    _read("search_by_assignee", JIRA, "search_by_assignee", "assignee", ("project_key", "")),
+    _read("search_by_reporter", JIRA, "search_by_reporter", "reporter", ("project_key", "")),
+    _read("get_recent_issues", JIRA, "get_recent_issues", ("days", 7), ("project_key", "")),
+    _write("set_priority", JIRA, "set_priority", "issue_key", "priority", idempotent=True),
+    _read("list_boards", JIRA, "list_boards"),
+    _read("get_board_issues", JIRA, "get_board_issues", "board_id"),
+    _read("list_sprints", JIRA, "list_sprints", "board_id"),
+    _read("get_sprint_issues", JIRA, "get_sprint_issues", "sprint_id"),
+    _read("get_user_permissions", JIRA, "get_user_permissions", ("project_key", "")),
+    _write("add_attachment", JIRA, "add_attachment", "issue_key", "filename", "content"),
+
+    # Confluence tools
+    _read("search_confluence", CONFLUENCE, "search", "query"),
+    _read("get_page", CONFLUENCE, "get_page", "page_id", ("offset", 0), ("chunk_size", 80000)),
+    _read("get_page_by_title", CONFLUENCE, "get_page_by_title", "space_key", "title", ("offset", 0), ("chunk_size", 80000)),
+    _write("create_page", CONFLUENCE, "create_page", "space_key", "title", "content", ("parent_id", None)),
+    _write("update_page", CONFLUENCE, "update_page", "page_id", "title", "content", "version", idempotent=True),
+    _write("delete_page", CONFLUENCE, "delete_page", "page_id", idempotent=True),
+    _read("list_pages", CONFLUENCE, "list_pages", "space_key"),
+    _read("get_space", CONFLUENCE, "get_space", "space_key"),
+    _read("list_spaces", CONFLUENCE, "list_spaces"),
+    _read("get_page_comments", CONFLUENCE, "get_page_comments", "page_id"),
+    _write("add_page_comment", CONFLUENCE, "add_page_comment", "page_id", "comment"),
+    _read("get_page_attachments", CONFLUENCE, "get_page_attachments", "page_id"),
+    _read("get_confluence_user", CONFLUENCE, "get_user", "account_id"),
+    _read("get_confluence_user_by_key", CONFLUENCE, "get_user_by_key", "userkey"),
+    _read("search_confluence_users", CONFLUENCE, "search_users", "query"),
+    _write("add_page_label", CONFLUENCE, "add_label", "page_id", "label", idempotent=True),
+    _read("get_page_labels", CONFLUENCE, "get_labels", "page_id"),
+    _read("get_page_history", CONFLUENCE, "get_page_history", "page_id"),
+    _read("get_page_restrictions", CONFLUENCE, "get_page_restrictions", "page_id"),
+    _write("set_page_restrictions", CONFLUENCE, "set_page_restrictions", "page_id", "restrictions", idempotent=True),
+    _write("copy_page", CONFLUENCE, "copy_page", "page_id", "new_title", ("space_key", "")),
+    _read("get_user_content", CONFLUENCE, "get_user_content", "account_id"),
+    _read("get_recent_content", CONFLUENCE, "get_recent_content", ("days", 7), ("space_key", "")),
+    _write("restore_page_version", CONFLUENCE, "restore_page_version", "page_id", "version"),
+    _read("search_by_author", CONFLUENCE, "search_by_author", "account_id", ("space_key", "")),
+    _read("search_by_label", CONFLUENCE, "search_by_label", "label", ("space_key", "")),
+    _write("move_page", CONFLUENCE, "move_page", "page_id", "target_space_key", ("target_parent_id", None), idempotent=True),
+    _read("get_child_pages", CONFLUENCE, "get_child_pages", "page_id"),
+    _read("get_descendants", CONFLUENCE, "get_descendants", "page_id"),
+    _read("get_ancestors", CONFLUENCE, "get_ancestors", "page_id"),
+    _read("cql_search", CONFLUENCE, "cql_search", "cql", ("limit", 25)),
+
+    # Bitbucket tools
+    _read("search_bitbucket", BITBUCKET, "search", "query", ("match", "substring"), ("limit", None)),
+    _read("search_files", BITBUCKET, "search_files", "repo_slug", "query", ("branch", "master"), ("match", "substring"), ("limit", None)),
+    _read("get_repository", BITBUCKET, "get_repository", "repo_slug"),
+    _read("list_repositories", BITBUCKET, "list_repositories"),
+    _read("list_pull_requests", BITBUCKET, "list_pull_requests", "repo_slug", ("state", "OPEN")),
+    _read("get_pull_request", BITBUCKET, "get_pull_request", "repo_slug", "pr_id"),
+    _write("create_pull_request", BITBUCKET, "create_pull_request", "repo_slug", "title", "source_branch", "dest_branch", ("description", "")),
+    _read("get_file_content", BITBUCKET, "get_file_content", "repo_slug", "file_path", ("branch", "main"),
+          ("start_line", None), ("end_line", None), ("byte_offset", None), ("max_bytes", None)),
+    _read("list_commits", BITBUCKET, "list_commits", "repo_slug", ("branch", "main"), ("path", None)),
+    _read("get_commit", BITBUCKET, "get_commit", "repo_slug", "commit_hash"),
+    _read("list_branches", BITBUCKET, "list_branches", "repo_slug"),
+    _read("get_pull_request_diff", BITBUCKET, "get_pull_request_diff", "repo_slug", "pr_id", *_DIFF_OPTIONS),
+    _read("get_pull_request_summary", BITBUCKET, "get_pull_request_summary", "repo_slug", "pr_id"),
+    _read("get_pull_request_comments", BITBUCKET, "get_pull_request_comments", "repo_slug", "pr_id"),
+    _write("add_pr_comment", BITBUCKET, "add_pr_comment", "repo_slug", "pr_id", "comment"),
+    _write("approve_pull_request", BITBUCKET, "approve_pull_request", "repo_slug", "pr_id", idempotent=True),
+    _write("merge_pull_request", BITBUCKET, "merge_pull_request", "repo_slug", "pr_id"),
+    _read("get_commit_diff", BITBUCKET, "get_commit_diff", "repo_slug", "commit_hash", *_DIFF_OPTIONS),
+    _read("list_tags", BITBUCKET, "list_tags", "repo_slug"),
+    _read("list_directory", BITBUCKET, "list_directory", "repo_slug", ("path", ""), ("branch", "main")),
+    _write("update_pull_request", BITBUCKET, "update_pull_request", "repo_slug", "pr_id", ("title", None), ("description", None), idempotent=True),
+    _read("compare_commits", BITBUCKET, "compare_commits", "repo_slug", "from_commit", "to_commit", *_DIFF_OPTIONS),
+    _write("add_pr_reviewer", BITBUCKET, "add_pr_reviewer", "repo_slug", "pr_id", "account_id", idempotent=True),
+    _write("decline_pull_request", BITBUCKET, "decline_pull_request", "repo_slug", "pr_id"),
+    _write("create_branch", BITBUCKET, "create_branch", "repo_slug", "branch_name", ("from_branch", "main")),
+    _write("delete_branch", BITBUCKET, "delete_branch", "repo_slug", "branch_name", idempotent=True),
+    _read("get_bitbucket_user", BITBUCKET, "get_user", "username"),
+    _read("get_pr_activity", BITBUCKET, "get_pr_activity", "repo_slug", "pr_id"),
+    _read("get_default_reviewers", BITBUCKET, "get_default_reviewers", "repo_slug"),
+    _read("get_pr_review_bundle", BITBUCKET, "get_pr_review_bundle", "repo_slug", "pr_id"),
+    _read("list_pull_requests_by_author", BITBUCKET, "list_pull_requests_by_author", "repo_slug", ("author", None)),
+    _read("list_my_pull_requests", BITBUCKET, "list_my_pull_requests", ("role", "REVIEWER"), ("state", "OPEN")),
+    _read("list_commits_by_author", BITBUCKET, "list_commits_by_author", "repo_slug", "author", ("branch", "main")),
+    _write("request_changes", BITBUCKET, "request_changes", "repo_slug", "pr_id", ("comment", "")),
+    _read("get_branch_restrictions", BITBUCKET, "get_branch_restrictions", "repo_slug"),
+    _read("get_build_status", BITBUCKET, "get_build_status", "repo_slug", "commit_hash"),
+    _write("create_webhook", BITBUCKET, "create_webhook", "repo_slug", "url", ("events", [])),
+
+    # Ticket support tools
+    _read("get_open_support_tickets", TICKET_SUPPORT, "get_open_support_tickets", JIRA, ("since", None), cache=False),
+    _read("check_ticket_template", TICKET_SUPPORT, "check_ticket_template", "issue_key", JIRA),
+    _read("suggest_assignee", TICKET_SUPPORT, "suggest_assignee", "issue_key", JIRA, ("rank_locally", False), ("top_k", 3), cache=False),
+    _read("get_team_workload", TICKET_SUPPORT, "get_team_workload", JIRA),
+    _read("get_expertise_jql", TICKET_SUPPORT, "get_expertise_jql", "issue_key", "member_account_id", "is_alert", JIRA),
+    _read("check_troubleshooting", TICKET_SUPPORT, "check_troubleshooting", "issue_key", JIRA, BITBUCKET, cache=False),
+)
+
+REGISTRY: Dict[str, ToolSpec] = {spec.name: spec for spec in TOOL_SPECS}
+
+_DESCRIPTIONS = {t['name']: t['description'] for t in JIRA_TOOLS + CONFLUENCE_TOOLS + BITBUCKET_TOOLS + TICKET_SUPPORT_TOOLS}
+
+
+def get_spec(name: str) -> Optional[ToolSpec]:
+    return REGISTRY.get(name)
+
+
+async def dispatch(name: str, arguments: Dict[str, Any], jira, confluence, bitbucket) -> Dict[str, Any]:
+    """Look up the tool by name, validate the arguments against its schema and await its handler"""
+    spec = REGISTRY.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown tool: {name}")
+    if arguments is None:
+        arguments = {}
+    error = get_validators()[name](arguments)
+    if error:
+        return {'error': f"Invalid arguments for {name}: {error}"}
+    providers = (jira, confluence, bitbucket)
+    return await spec.handler(providers)(*spec.bind(arguments, providers))
@@ -0,0 +1,150 @@
+"""Repository catalog with a prefix and trigram index, for search_bitbucket.
+
+search_bitbucket filters repositories by name on the server and reads pages
+only until limit results are found. With match='fuzzy' it searches a local
+catalog of every repository instead, built from one fully paged listing and
+reused for BITBUCKET_REPO_CATALOG_TTL seconds. Catalogs are keyed by the
+workspace or server and the credentials, so users never share one.
+
+Repository names and slugs are indexed lower-cased in two ways:
+  prefix  - a sorted list of (term, repository) searched with bisect
+  trigram - the repositories containing each three-character sequence, so a
+            fuzzy query is only scored against repositories sharing one
+"""
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+MATCH_MODES = ('substring', 'fuzzy')
+# Fuzzy matches are ranked, so they are capped unless a limit is given
+DEFAULT_FUZZY_LIMIT = 20
+CATALOG_TTL = float(os.getenv('BITBUCKET_REPO_CATALOG_TTL', '300'))
+# Trigram similarity below this is not reported as a fuzzy match
+MIN_SIMILARITY = 0.3
+
+_WORD_BREAK = re.compile(r'[\s_.-]+')
+
+
+def _trigrams(text: str) -> Set[str]:
+    # Padding makes the start and end of a term count, as in pg_trgm
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class RepoCatalog:
+    """An immutable, searchable list of repositories ({'slug', 'name', ...} dicts)"""
+
+    def __init__(self, repos: Iterable[Dict[str, Any]]):
+        self.repos: Tuple[Dict[str, Any], ...] = tuple(repos)
+        self._terms: List[Tuple[str, ...]] = []
+        # Trigram sets of each term and of each word in it, for fuzzy scoring
+        self._shapes: List[List[Set[str]]] = []
+        prefixes = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        for index, repo in enumerate(self.repos):
+            terms = tuple(sorted({t.lower() for t in (repo.get('name'), repo.get('slug')) if t}))
+            self._terms.append(terms)
+            words = {w for t in terms for w in _WORD_BREAK.split(t) if w} - set(terms)
+            self._shapes.append([_trigrams(w) for w in (*terms, *words)])
+            for term in terms:
+                prefixes.append((term, index))
+                for trigram in _trigrams(term):
+                    self._trigrams.setdefault(trigram, set()).add(index)
+        prefixes.sort()
+        self._prefix_terms = [term for term, _ in prefixes]
+        self._prefix_repos = [index for _, index in prefixes]
+
+    def __len__(self):
+        return len(self.repos)
+
+    def search(self, query: str, mode: str = 'substring', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Repositories matching query; substring results are in name order, fuzzy results best first"""
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode}. Use one of: {', '.join(MATCH_MODES)}")
+        query = query.strip().lower()
+        if not query:
+            return []
+        if mode == 'substring':
+            found = [r for r, terms in zip(self.repos, self._terms) if any(query in t for t in terms)]
+            found.sort(key=lambda r: (r.get('name') or '').lower())
+            return found[:limit] if limit is not None else found
+        return self._fuzzy(query, DEFAULT_FUZZY_LIMIT if limit is None else limit)
+
+    def _prefixed(self, query: str) -> Set[int]:
+        found = set()
+        position = bisect_left(self._prefix_terms, query)
+        while position < len(self._prefix_terms) and self._prefix_terms[position].startswith(query):
+            found.add(self._prefix_repos[position])
+            position += 1
+        return found
+
+    def _fuzzy(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        query_trigrams = _trigrams(query)
+        candidates = self._prefixed(query)
+        for trigram in query_trigrams:
+            candidates |= self._trigrams.get(trigram, set())
+        if len(query) < 3:
+            # Too short for an interior trigram, so substring matches need a scan
+            candidates |= {i for i, terms in enumerate(self._terms) if any(query in t for t in terms)}
+        scored = []
+        for index in candidates:
+            score = _similarity(query, query_trigrams, self._terms[index], self._shapes[index])
+            if score >= MIN_SIMILARITY:
+                name = self.repos[index].get('name') or ''
+                scored.append((-score, len(name), name.lower(), index))
+        scored.sort()
+        return [self.repos[index] for *_, index in scored[:limit]]
+
+
+def _similarity(query: str, query_trigrams: Set[str], terms: Sequence[str], shapes: Sequence[Set[str]]) -> float:
+    """Exact, prefix and substring matches outrank any trigram similarity (0..1)"""
+    if query in terms:
+        return 4.0
+    if any(t.startswith(query) for t in terms):
+        return 3.0
+    if any(query in t for t in terms):
+        return 2.0
+    # The best of the whole name or slug and each word in it, so one misspelt word still matches
+    return max(len(query_trigrams & shape) / len(query_trigrams | shape) for shape in shapes)
+
+
+class RepoCatalogCache:
+    """RepoCatalog objects by workspace or server, each reused for ttl seconds"""
+
+    def __init__(self, ttl: float = CATALOG_TTL):
+        self.ttl = ttl
+        self._catalogs: Dict[tuple, Tuple[float, RepoCatalog]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Sequence[str]) -> Optional[RepoCatalog]:
+        """The catalog for key if it is fresh, otherwise None"""
+        with self._lock:
+            entry = self._catalogs.get(tuple(key))
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def get_or_build(self, key: Sequence[str], build: Callable[[], List[Dict[str, Any]]]) -> Tuple[RepoCatalog, bool]:
+        """The fresh catalog for key, building it with build() otherwise; returns (catalog, was_cached)"""
+        catalog = self.get(key)
+        if catalog is not None:
+            return catalog, True
+        catalog = RepoCatalog(build())
+        with self._lock:
+            self._catalogs[tuple(key)] = (time.monotonic(), catalog)
+        return catalog, False
+
+
+_default_cache: Optional[RepoCatalogCache] = None
+
+
+def get_repo_catalog_cache() -> RepoCatalogCache:
+    """The process-wide cache shared by the Cloud and Data Center providers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RepoCatalogCache()
+    return _default_cache
@@ -0,0 +1,51 @@
+"""One-call pull request review bundle for get_pr_review_bundle.
+
+A review needs the pull request, its comments and activity, the build status
+of its head commit and the repository's default reviewers. The providers
+fetch these concurrently on worker threads; only the build status waits, for
+the pull request that names the head commit. Each part is compacted, and
+every user it mentions is stored once in 'users' and referred to by key.
+Each part's time is reported in 'timings_ms', and a part that fails is
+reported in 'errors' while the rest of the bundle is still returned.
+"""
+
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+
+class ReviewBundle:
+    """Per-part timings and errors, and the shared user table, of one bundle"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings_ms: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+
+    async def part(self, name: str, coro: Awaitable[Any]) -> Optional[Any]:
+        """The part's result, or None (recorded in errors) if it failed"""
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except Exception as e:
+            result = {'error': str(e)}
+        self.timings_ms[name] = _elapsed_ms(start)
+        if isinstance(result, dict) and 'error' in result:
+            self.errors[name] = result['error']
+            return None
+        return result
+
+    def user(self, key: Optional[str], fields: Dict[str, Any]) -> Optional[str]:
+        """Store a user once and return the key that refers to it"""
+        if not key:
+            return None
+        self.users.setdefault(key, fields)
+        return key
+
+    def result(self, **parts: Any) -> Dict[str, Any]:
+        self.timings_ms['total'] = _elapsed_ms(self.started)
+        return {**parts, 'users': self.users, 'timings_ms': self.timings_ms, 'errors': self.errors}
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
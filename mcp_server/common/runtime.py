@@ -0,0 +1,128 @@
+"""Provider lifecycle for long-running servers (stdio and HTTP).
+
+ProviderRuntime owns the current set of providers. A call acquires the set
+for its whole duration; reload() builds a new set that reuses every provider
+whose configuration did not change, swaps it in for new calls, and closes
+the replaced providers' HTTP sessions once the calls still using them finish.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+from mcp_server.common.config import PROVIDERS, ServerConfig, apply_env, changed_components
+
+logger = logging.getLogger(__name__)
+
+
+def build_provider(platform: str, name: str):
+    """Construct one provider from the current environment"""
+    if platform == 'datacenter':
+        from mcp_server.datacenter.jira_dc_provider import JiraDCProvider
+        from mcp_server.datacenter.confluence_dc_provider import ConfluenceDCProvider
+        from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
+        classes = {'jira': JiraDCProvider, 'confluence': ConfluenceDCProvider, 'bitbucket': BitbucketDCProvider}
+    else:
+        from mcp_server.cloud.jira_provider import JiraProvider
+        from mcp_server.cloud.confluence_provider import ConfluenceProvider
+        from mcp_server.cloud.bitbucket_provider import BitbucketProvider
+        classes = {'jira': JiraProvider, 'confluence': ConfluenceProvider, 'bitbucket': BitbucketProvider}
+    return classes[name]()
+
+
+def initialize_ticket_support(config: ServerConfig, confluence) -> bool:
+    """(Re)initialize the ticket support agent from config, returning whether it is enabled"""
+    if not config.ticket_support.enabled:
+        return False
+    from mcp_server.common.ticket_support_tools import initialize_agent
+    available = confluence if getattr(confluence, 'available', False) else None
+    initialize_agent(*config.ticket_support.agent_args(available))
+    return True
+
+
+class ProviderSet:
+    """One generation of providers, with a count of the calls using it"""
+
+    def __init__(self, providers: Dict[str, object]):
+        self.providers = providers
+        self.in_flight = 0
+
+    @property
+    def jira(self):
+        return self.providers['jira']
+
+    @property
+    def confluence(self):
+        return self.providers['confluence']
+
+    @property
+    def bitbucket(self):
+        return self.providers['bitbucket']
+
+
+class ProviderRuntime:
+    """Holds the current ProviderSet and swaps it when the configuration changes"""
+
+    def __init__(self, config: ServerConfig, factory: Callable[[str, str], object] = build_provider,
+                 init_agent: Callable[[ServerConfig, object], bool] = initialize_ticket_support):
+        self.config = config
+        self._factory = factory
+        self._init_agent = init_agent
+        self._lock = threading.Lock()
+        self._pinned: List[ProviderSet] = []  # earlier generations with calls still running
+        self._retired: List[Tuple[str, object]] = []  # replaced providers not yet closed
+        apply_env(config)
+        self.current = ProviderSet({name: factory(config.platform, name) for name in PROVIDERS})
+        self.agent_enabled = init_agent(config, self.current.confluence)
+
+    @contextmanager
+    def acquire(self):
+        """Pin the current providers for the duration of a call"""
+        with self._lock:
+            generation = self.current
+            generation.in_flight += 1
+        try:
+            yield generation
+        finally:
+            with self._lock:
+                generation.in_flight -= 1
+                if generation.in_flight == 0 and generation in self._pinned:
+                    self._pinned.remove(generation)
+                closable = self._take_closable()
+            _close(closable)
+
+    def reload(self, config: ServerConfig) -> FrozenSet[str]:
+        """Apply a new configuration, rebuilding only the affected components; returns what changed"""
+        changed = changed_components(self.config, config)
+        apply_env(config)
+        rebuilt = {name: self._factory(config.platform, name) for name in PROVIDERS if name in changed}
+        with self._lock:
+            old = self.current
+            self.current = ProviderSet({**old.providers, **rebuilt})
+            self.config = config
+            if old.in_flight:
+                self._pinned.append(old)
+            self._retired.extend((name, old.providers[name]) for name in rebuilt)
+            closable = self._take_closable()
+        _close(closable)
+        if 'ticket_support' in changed:
+            self.agent_enabled = self._init_agent(config, self.current.confluence)
+        if changed:
+            logger.info(f"Configuration reloaded; rebuilt: {', '.join(sorted(changed))}")
+        return changed
+
+    def _take_closable(self) -> List[Tuple[str, object]]:
+        # A replaced provider can close once no generation with running calls still holds it
+        in_use = {id(p) for generation in self._pinned for p in generation.providers.values()}
+        closable = [(name, p) for name, p in self._retired if id(p) not in in_use]
+        self._retired = [(name, p) for name, p in self._retired if id(p) in in_use]
+        return closable
+
+
+def _close(providers: List[Tuple[str, object]]) -> None:
+    for name, provider in providers:
+        session = getattr(provider, 'session', None)
+        if session is not None:
+            session.close()
+        logger.info(f"Closed replaced {name} provider")
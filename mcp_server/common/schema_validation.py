@@ -0,0 +1,104 @@
+"""Compiled tool argument validation.
+
+Each tool's JSON schema in tool_schemas.py is compiled once into a plain
+function that checks required arguments, JSON types, enums, numeric minimums,
+array item types and string patterns. Dispatch runs it before the handler, so a
+malformed call is rejected without any network I/O. Only the schema subset tool_schemas.py uses is
+supported; unknown keywords are ignored and extra arguments are allowed.
+"""
+
+import re
+from typing import Any, Callable, Dict, Optional
+
+# Returns None when the arguments are valid, otherwise an error message
+Validator = Callable[[Any], Optional[str]]
+
+JSON_TYPES = {
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'object': dict,
+    'array': list,
+}
+
+
+def _type_check(json_type: Optional[str]) -> Callable[[Any], bool]:
+    if json_type is None:
+        return lambda value: True
+    if json_type not in JSON_TYPES:
+        raise ValueError(f"Unsupported schema type: {json_type}")
+    python_type = JSON_TYPES[json_type]
+    if json_type in ('integer', 'number'):
+        # bool is an int subclass but not a JSON number
+        return lambda value: isinstance(value, python_type) and not isinstance(value, bool)
+    return lambda value: isinstance(value, python_type)
+
+
+def _compile_property(key: str, schema: Dict) -> Callable[[Any], Optional[str]]:
+    json_type = schema.get('type')
+    is_type = _type_check(json_type)
+    enum = frozenset(schema['enum']) if 'enum' in schema else None
+    # Compiled once per tool here, not on every call
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+    minimum = schema.get('minimum')
+    item_type = schema.get('items', {}).get('type') if json_type == 'array' else None
+    is_item = _type_check(item_type) if item_type else None
+
+    def check(value):
+        if not is_type(value):
+            return f"Argument '{key}' must be of type {json_type}"
+        if enum is not None and value not in enum:
+            return f"Argument '{key}' must be one of: {', '.join(map(str, schema['enum']))}"
+        if minimum is not None and value < minimum:
+            return f"Argument '{key}' must be at least {minimum}"
+        if pattern is not None and not pattern.search(value):
+            return f"Argument '{key}' has an invalid format (expected pattern {schema['pattern']})"
+        if is_item is not None:
+            for item in value:
+                if not is_item(item):
+                    return f"Items of argument '{key}' must be of type {item_type}"
+        return None
+
+    return check
+
+
+def compile_schema(schema: Dict) -> Validator:
+    """Compile an object schema into a validator function"""
+    required = tuple(schema.get('required', ()))
+    checks = tuple((key, _compile_property(key, prop)) for key, prop in schema.get('properties', {}).items())
+
+    def validate(arguments):
+        if not isinstance(arguments, dict):
+            return "Arguments must be an object"
+        for key in required:
+            if arguments.get(key) is None:
+                return f"Missing required argument: {key}"
+        for key, check in checks:
+            value = arguments.get(key)
+            # Optional arguments may be omitted, null or empty (the router's default for some)
+            if value is not None and not (value == '' and key not in required):
+                error = check(value)
+                if error:
+                    return error
+        return None
+
+    return validate
+
+
+_validators: Optional[Dict[str, Validator]] = None
+
+
+def get_validators() -> Dict[str, Validator]:
+    """Validators for every tool, compiled from TOOL_SCHEMAS on first use"""
+    global _validators
+    if _validators is None:
+        from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+        _validators = {name: compile_schema(schema) for name, schema in TOOL_SCHEMAS.items()}
+    return _validators
+
+
+def validate_arguments(name: str, arguments: Any) -> Optional[str]:
+    """Return an error message if the arguments do not match the tool's schema"""
+    validator = get_validators().get(name)
+    return validator(arguments) if validator else None
@@ -0,0 +1,151 @@
+"""Cross-process state for the multi-worker HTTP server, kept in one local SQLite file.
+
+SharedCache stores serialized results of read-only tools for a short TTL, so
+the same call made through different workers reaches Atlassian and is
+decoded and serialized once. Any write tool clears it. SessionTable holds
+the MCP sessions, so a worker can serve a session another one opened.
+SQLite in WAL mode lets every worker read concurrently while writes
+serialize on the file lock. Connections are opened per process and thread,
+so the stores are safe after fork.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Seconds a read-only tool result is served from the cache (0 disables caching)
+DEFAULT_CACHE_TTL = float(os.getenv('MCP_CACHE_TTL', '30'))
+DEFAULT_MAX_ENTRIES = int(os.getenv('MCP_CACHE_MAX_ENTRIES', '10000'))
+# Expired and surplus rows are pruned every this many writes
+PRUNE_EVERY = 256
+
+
+def default_state_path() -> Path:
+    return Path(tempfile.gettempdir()) / f'atlassian-mcp-{os.getpid()}.sqlite'
+
+
+class SqliteStore:
+    """A SQLite file with one connection per process and thread"""
+
+    SCHEMA = ''
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            # isolation_level=None: every statement commits on its own
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+
+class SharedCache(SqliteStore):
+    """Read-only tool results by (namespace, tool, arguments), shared by all workers"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS tool_results (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tool_results_expiry ON tool_results (expires_at);
+    '''
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(namespace: str, name: str, arguments: Dict[str, Any]) -> str:
+        canonical = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(f'{namespace}\0{name}\0{canonical}'.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            'SELECT value FROM tool_results WHERE key = ? AND expires_at > ?', (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        db = self._connect()
+        db.execute('INSERT OR REPLACE INTO tool_results (key, value, expires_at) VALUES (?, ?, ?)',
+                   (key, value, time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired rows, then the soonest-to-expire ones beyond max_entries"""
+        db = self._connect()
+        db.execute('DELETE FROM tool_results WHERE expires_at <= ?', (time.time(),))
+        db.execute('DELETE FROM tool_results WHERE key IN (SELECT key FROM tool_results '
+                   'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def clear(self) -> None:
+        self._connect().execute('DELETE FROM tool_results')
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM tool_results').fetchone()[0]
+
+
+def config_namespace(config) -> str:
+    """Cache namespace for a configuration, so a reload to other credentials never sees old results"""
+    identity = json.dumps([config.platform, sorted(config.credentials.items())])
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+
+
+class SessionTable(SqliteStore):
+    """MCP session records shared by all workers, so any worker can serve any session"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            protocol_version TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            last_seen REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+    '''
+
+    def add(self, session_id: str, protocol_version: str, profile: str, max_sessions: int) -> None:
+        db = self._connect()
+        # Make room by dropping the least recently seen sessions
+        db.execute('DELETE FROM sessions WHERE id IN (SELECT id FROM sessions '
+                   'ORDER BY last_seen DESC LIMIT -1 OFFSET ?)', (max(max_sessions - 1, 0),))
+        db.execute('INSERT INTO sessions (id, protocol_version, profile, last_seen) VALUES (?, ?, ?, ?)',
+                   (session_id, protocol_version, profile, time.time()))
+
+    def get(self, session_id: str) -> Optional[tuple]:
+        """(protocol_version, profile, last_seen) or None"""
+        return self._connect().execute(
+            'SELECT protocol_version, profile, last_seen FROM sessions WHERE id = ?', (session_id,)).fetchone()
+
+    def touch(self, session_id: str) -> None:
+        self._connect().execute('UPDATE sessions SET last_seen = ? WHERE id = ?', (time.time(), session_id))
+
+    def remove(self, session_id: str) -> bool:
+        return self._connect().execute('DELETE FROM sessions WHERE id = ?', (session_id,)).rowcount > 0
+
+    def expire(self, ttl: float) -> int:
+        return self._connect().execute('DELETE FROM sessions WHERE last_seen < ?', (time.time() - ttl,)).rowcount
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
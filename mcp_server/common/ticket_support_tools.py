@@ -1,18 +1,40 @@
 """MCP tool interface for ticket support agent"""
 
-from typing import Dict, Any, List
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from mcp_server.agents import assignee_scoring, support_queue
+from mcp_server.common import description_parsers
+from mcp_server.common.concurrency import gather_in_threads, run_in_thread
 from mcp_server.agents.ticket_support_agent import TicketSupportAgent
 
 
 _agent: TicketSupportAgent = None
 _config: Dict[str, Any] = {}
 
+# Referenced file content is read as a bounded window of this many bytes
+MAX_FILE_BYTES = 100_000
+FILE_CACHE_SIZE = 128
+# (repo_slug, file_path, commit) -> file info; a commit pins the content, so entries never go stale
+_file_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+# Queue polling: issues fetched in parallel, and snapshot keys checked per JQL key-in query
+QUEUE_FETCH_CONCURRENCY = 8
+QUEUE_KEY_CHUNK = 50
+# Jira search returns at most this many results, and Cloud reports no total, so a
+# full page of delta results may have more behind it
+SEARCH_PAGE_SIZE = 50
+# Per-member expertise history searches run in parallel when ranking assignees
+EXPERTISE_SEARCH_CONCURRENCY = 8
+
 
 def initialize_agent(primary_team_members, secondary_team_members, 
                      template_mapping=None, confluence_provider=None, 
                      excluded_issue_types=None, workload_statuses=None, 
                      support_jql=None, troubleshooting_parent=None,
-                     alert_expertise_jql=None, other_expertise_jql=None):
+                     alert_expertise_jql=None, other_expertise_jql=None,
+                     scoring_weights=None):
     """Initialize the ticket support agent"""
     global _agent, _config
     _agent = TicketSupportAgent(
@@ -24,6 +46,7 @@ def initialize_agent(primary_team_members, secondary_team_members,
     _config['troubleshooting_parent'] = troubleshooting_parent
     _config['alert_expertise_jql'] = alert_expertise_jql
     _config['other_expertise_jql'] = other_expertise_jql
+    _config['scoring_weights'] = scoring_weights
     # Get custom field from template_mapping
     if template_mapping:
         first_issue_type = next(iter(template_mapping.keys()))
@@ -31,8 +54,42 @@ def initialize_agent(primary_team_members, secondary_team_members,
     else:
         _config['custom_field'] = None
 
-async def get_open_support_tickets(jira) -> Dict[str, Any]:
-    """Get list of open support tickets, separated by type."""
+def _extract_expertise_values(fields: Dict[str, Any], custom_field: str) -> Dict[str, str]:
+    """Extract issue type, custom field text and summary prefix used by expertise JQL templates"""
+    # Extract issue type
+    issue_type = fields.get('issuetype', {}).get('name', '')
+    
+    # Extract custom field value (handles string, JSON string, list, or dict)
+    custom_field_text = description_parsers.custom_field_text(fields.get(custom_field))
+    
+    # Extract summary prefix (before first colon)
+    summary = fields.get('summary', '')
+    summary_prefix = summary.split(':')[0].strip() if ':' in summary else summary
+    
+    return {
+        'issue_type': issue_type,
+        'custom_field_value': custom_field_text,
+        'summary_prefix': summary_prefix
+    }
+
+def _build_expertise_jql(jql_template: str, account_id: str, values: Dict[str, str]) -> str:
+    """Replace expertise JQL template placeholders with extracted values"""
+    jql = jql_template.replace('{account_id}', account_id)
+    jql = jql.replace('{issue_type}', values['issue_type'])
+    jql = jql.replace('{custom_field_value}', values['custom_field_value'])
+    jql = jql.replace('{summary_prefix}', values['summary_prefix'])
+    
+    # Legacy placeholder support (for backward compatibility)
+    jql = jql.replace('{requested_work}', values['custom_field_value'])
+    return jql
+
+async def get_open_support_tickets(jira, since: str = None) -> Dict[str, Any]:
+    """Get list of open support tickets, separated by type.
+    
+    The agent keeps a snapshot of the queue. The first poll loads it in full, later polls
+    only query tickets updated since the previous poll. Pass the returned version as since
+    to receive just the added, changed and removed tickets instead of the whole queue.
+    """
     if not _agent:
         return {"error": "Ticket support agent not configured"}
     
@@ -43,45 +100,95 @@ async def get_open_support_tickets(jira) -> Dict[str, Any]:
     
     # Use configured JQL query
     jql = _config.get('support_jql', 'assignee is EMPTY AND status = Open ORDER BY created DESC')
-    result = await jira.search(jql)
-    
-    alert_tickets = []
-    other_tickets = []
-    
-    for t in result.get('results', []):
-        key = t.get('key')
-        
-        # Fetch full issue to get custom field
-        full_issue = await jira.get_issue(key)
+    snapshot = _agent.support_queue
+    error = await _refresh_support_queue(snapshot, jira, jql, custom_field)
+    if error:
+        return {'error': error}
+    
+    since_version = snapshot.parse_token(since)
+    if since_version is None:
+        result = {**snapshot.view(), 'mode': 'full', 'version': snapshot.token}
+        if since:
+            result['note'] = 'since token is unknown or expired - returning the full queue'
+        return result
+    return {**snapshot.delta_since(since_version), 'mode': 'delta', 'since': since, 'version': snapshot.token}
+
+async def _refresh_support_queue(snapshot, jira, jql: str, custom_field: str) -> Optional[str]:
+    """Bring the queue snapshot up to date, returning an error message on failure"""
+    started = time.monotonic()
+    if not snapshot.needs_full_reload(started):
+        minutes = snapshot.delta_window_minutes(started)
+        changes = await _poll_queue_changes(jira, jql, snapshot, minutes)
+        if changes is not None:
+            keys, removals = changes
+            tickets = await _fetch_queue_tickets(jira, keys, custom_field)
+            if isinstance(tickets, str):
+                return tickets
+            snapshot.apply(tickets, removals)
+            snapshot.mark_polled(started, full=False)
+            return None
+        # Delta query failed or overflowed a page - fall back to a full reload
+    
+    result = await _search_all(jira, jql)
+    if 'error' in result:
+        return result['error']
+    tickets = await _fetch_queue_tickets(jira, [t.get('key') for t in result['results']], custom_field)
+    if isinstance(tickets, str):
+        return tickets
+    snapshot.replace(tickets)
+    snapshot.mark_polled(started, full=True)
+    return None
+
+async def _search_all(jira, jql: str) -> Dict[str, Any]:
+    """Every result of a JQL search, requesting pages until no next_page_token is returned"""
+    results = []
+    page_token = None
+    while True:
+        page = await jira.search(jql, page_token=page_token) if page_token else await jira.search(jql)
+        if 'error' in page:
+            return page
+        results.extend(page.get('results', []))
+        page_token = page.get('next_page_token')
+        if not page_token or not page.get('results'):
+            return {'results': results}
+
+async def _poll_queue_changes(jira, jql: str, snapshot, minutes: int):
+    """Find queue tickets updated in the window and snapshot tickets that left the queue.
+    
+    A ticket leaves the queue by being assigned or transitioned, which bumps updated, so
+    snapshot tickets updated in the window but missing from the delta results were removed.
+    Returns (keys to fetch, removed keys), or None if a full reload is needed.
+    """
+    delta = await jira.search(support_queue.build_delta_jql(jql, minutes))
+    results = delta.get('results', [])
+    if 'error' in delta or len(results) >= SEARCH_PAGE_SIZE or delta.get('total', 0) > len(results):
+        return None
+    keys = [t.get('key') for t in results]
+    in_queue = set(keys)
+    candidates = [k for k in snapshot.entries if k not in in_queue]
+    removals = []
+    for i in range(0, len(candidates), QUEUE_KEY_CHUNK):
+        touched = await jira.search(support_queue.build_touched_jql(candidates[i:i + QUEUE_KEY_CHUNK], minutes))
+        if 'error' in touched:
+            return None
+        removals.extend(t.get('key') for t in touched.get('results', []))
+    return keys, removals
+
+async def _fetch_queue_tickets(jira, keys: List[str], custom_field: str):
+    """Fetch and classify queue tickets concurrently, returning an error message on failure"""
+    issues = await gather_in_threads(*(jira.get_issue(key) for key in keys), limit=QUEUE_FETCH_CONCURRENCY)
+    tickets = []
+    for key, full_issue in zip(keys, issues):
+        if 'error' in full_issue:
+            return full_issue['error']
         fields = full_issue.get('fields', {})
-        summary = fields.get('summary', '')
-        field_value = fields.get(custom_field)
-        
-        # Parse field value
-        is_alert = False
-        if isinstance(field_value, str) and 'Alert' in field_value:
-            is_alert = True
-        elif isinstance(field_value, list):
-            for item in field_value:
-                if isinstance(item, dict) and 'Alert' in item.get('selectedOptionLabel', ''):
-                    is_alert = True
-                    break
-        elif isinstance(field_value, dict) and 'Alert' in field_value.get('selectedOptionLabel', ''):
-            is_alert = True
-        
-        ticket_info = {'key': key, 'summary': summary}
-        if is_alert:
-            alert_tickets.append(ticket_info)
-        else:
-            other_tickets.append(ticket_info)
-    
-    return {
-        'alert_tickets': alert_tickets,
-        'other_tickets': other_tickets,
-        'total_alerts': len(alert_tickets),
-        'total_other': len(other_tickets),
-        'total': len(alert_tickets) + len(other_tickets)
-    }
+        tickets.append({
+            'key': key,
+            'summary': fields.get('summary', ''),
+            'type': 'alert' if description_parsers.is_alert(fields.get(custom_field)) else 'other',
+            'updated': fields.get('updated')
+        })
+    return tickets
 
 async def check_ticket_template(issue_key: str, jira) -> Dict[str, Any]:
     """Validate single ticket against template. Skips validation for Alert tickets."""
@@ -95,26 +202,25 @@ async def check_ticket_template(issue_key: str, jira) -> Dict[str, Any]:
     # Check if Alert type - skip validation
     template_config = _agent.template_mapping.get(issue_type, {})
     custom_field = template_config.get('custom_field')
-    if custom_field:
-        field_value = fields.get(custom_field)
-        
-        # Check for Alert
-        is_alert = False
-        if isinstance(field_value, str) and 'Alert' in field_value:
-            is_alert = True
-        elif isinstance(field_value, list):
-            for item in field_value:
-                if isinstance(item, dict) and 'Alert' in item.get('selectedOptionLabel', ''):
-                    is_alert = True
-                    break
-        elif isinstance(field_value, dict) and 'Alert' in field_value.get('selectedOptionLabel', ''):
-            is_alert = True
-        
-        if is_alert:
-            return {'skipped': True, 'reason': 'Alert tickets do not require template validation'}
+    if custom_field and description_parsers.is_alert(fields.get(custom_field)):
+        return {'skipped': True, 'reason': 'Alert tickets do not require template validation'}
     
     context = await _agent.get_template_context(issue)
     
+    if context.get('template_parent'):
+        context['compliance'] = await _agent.get_template_compliance(issue, context)
+    
+    if context.get('compliance') and 'error' not in context['compliance']:
+        context['_ai_hints'] = {
+            'next_steps': [
+                'Template comparison is already done server-side - see compliance',
+                'Report missing_sections and empty_sections to the user',
+                'extra_sections are informational (ticket sections not in the template)',
+                'Call get_page(compliance.template.id) only if the full template text is needed'
+            ]
+        }
+        return context
+    
     # Add hints for AI
     context['_ai_hints'] = {
         'next_steps': [
@@ -134,10 +240,16 @@ async def check_ticket_template(issue_key: str, jira) -> Dict[str, Any]:
     
     return context
 
-async def suggest_assignee(issue_key: str, jira) -> Dict[str, Any]:
-    """Suggest assignee for single ticket based on workload."""
+async def suggest_assignee(issue_key: str, jira, rank_locally: bool = False, top_k: int = 3) -> Dict[str, Any]:
+    """Suggest assignee for single ticket based on workload.
+    
+    With rank_locally=True the candidates are scored server-side and only the top_k
+    members with their score breakdowns are returned instead of the raw team data.
+    """
     if not _agent:
         return {"error": "Ticket support agent not configured"}
+    if rank_locally and not assignee_scoring.is_available():
+        return {"error": "Local ranking requires numpy. Install with: pip install numpy"}
     
     # Get team workload
     issue = await jira.get_issue(issue_key)
@@ -150,6 +262,9 @@ async def suggest_assignee(issue_key: str, jira) -> Dict[str, Any]:
     
     team_context = await _agent.get_team_context(search_func, jira_search_func)
     
+    if rank_locally:
+        return await _rank_assignees(issue, team_context, jira, top_k)
+    
     # Get comments
     comments_result = await jira.get_issue_comments(issue_key)
     comments = comments_result.get('comments', [])
@@ -184,6 +299,74 @@ async def suggest_assignee(issue_key: str, jira) -> Dict[str, Any]:
     
     return result
 
+async def _rank_assignees(issue: Dict[str, Any], team_context: Dict[str, Any], jira, top_k: int) -> Dict[str, Any]:
+    """Build the member x feature inputs for the scorer and return the top_k candidates"""
+    fields = issue.get('fields', {})
+    custom_field = _config.get('custom_field')
+    values = _extract_expertise_values(fields, custom_field) if custom_field else {
+        'issue_type': fields.get('issuetype', {}).get('name', ''),
+        'custom_field_value': '',
+        'summary_prefix': ''
+    }
+    
+    # Category history comes from the category-only template when available; prefix matches
+    # are counted locally from the same results so each member costs one search
+    jql_template = _config.get('other_expertise_jql') or _config.get('alert_expertise_jql')
+    if not custom_field:
+        jql_template = None
+    prefix = values['summary_prefix'].lower()
+    
+    entries = [(entry, is_primary) for team_key, is_primary in (('primary_team', 1), ('secondary_team', 0))
+               for entry in team_context.get(team_key, [])]
+
+    async def member_history(entry):
+        if 'error' in entry or not jql_template:
+            return None
+        return await jira.search(_build_expertise_jql(jql_template, entry['member']['account_id'], values))
+
+    histories = await gather_in_threads(*(member_history(entry) for entry, _ in entries), limit=EXPERTISE_SEARCH_CONCURRENCY)
+
+    candidates = []
+    excluded = []
+    for (entry, is_primary), history in zip(entries, histories):
+        member = entry['member']
+        if 'error' in entry:
+            excluded.append({'member': member, 'error': entry['error']})
+            continue
+        category_resolutions = 0
+        prefix_matches = 0
+        if history is not None:
+            if 'error' in history:
+                excluded.append({'member': member, 'error': history['error']})
+                continue
+            # Both features count the same returned page: Cloud's search reports no total,
+            # and a server-side total would not match a prefix count taken from one page
+            resolved = history.get('results', [])
+            category_resolutions = len(resolved)
+            if prefix:
+                prefix_matches = sum(1 for i in resolved if i.get('summary', '').lower().startswith(prefix))
+        candidates.append({
+            'member': member,
+            'current_load': entry.get('issue_count', 0),
+            'category_resolutions': category_resolutions,
+            'prefix_matches': prefix_matches,
+            'primary_team': is_primary
+        })
+    
+    scorer = assignee_scoring.AssigneeScorer(_config.get('scoring_weights'))
+    return {
+        'ticket': {
+            'key': issue.get('key'),
+            'summary': fields.get('summary', ''),
+            **values
+        },
+        'ranking': scorer.rank(candidates, top_k),
+        'candidate_count': len(candidates),
+        'excluded': excluded,
+        'weights': scorer.weights,
+        'history_jql_configured': bool(jql_template)
+    }
+
 async def get_team_workload(jira) -> Dict[str, Any]:
     """Expose raw team workload data for AI to analyze"""
     if not _agent:
@@ -216,148 +399,145 @@ async def get_expertise_jql(issue_key: str, member_account_id: str, is_alert: bo
     issue = await jira.get_issue(issue_key)
     fields = issue.get('fields', {})
     
-    # Extract issue type
-    issue_type = fields.get('issuetype', {}).get('name', '')
-    
-    # Extract custom field value (handles string, list, or dict)
-    import json
-    field_value = fields.get(custom_field)
-    custom_field_text = ''
-    if isinstance(field_value, str):
-        try:
-            parsed = json.loads(field_value)
-            if isinstance(parsed, list):
-                labels = [item.get('selectedOptionLabel', '') for item in parsed if isinstance(item, dict)]
-                custom_field_text = ' - '.join(labels)
-            else:
-                custom_field_text = field_value
-        except:
-            custom_field_text = field_value
-    elif isinstance(field_value, list):
-        labels = [item.get('selectedOptionLabel', '') for item in field_value if isinstance(item, dict)]
-        custom_field_text = ' - '.join(labels)
-    elif isinstance(field_value, dict):
-        custom_field_text = field_value.get('selectedOptionLabel', '')
-    
-    # Extract summary prefix (before first colon)
-    summary = fields.get('summary', '')
-    summary_prefix = summary.split(':')[0].strip() if ':' in summary else summary
-    
-    # Replace placeholders
-    jql = jql_template.replace('{account_id}', member_account_id)
-    jql = jql.replace('{issue_type}', issue_type)
-    jql = jql.replace('{custom_field_value}', custom_field_text)
-    jql = jql.replace('{summary_prefix}', summary_prefix)
-    
-    # Legacy placeholder support (for backward compatibility)
-    jql = jql.replace('{requested_work}', custom_field_text)
+    values = _extract_expertise_values(fields, custom_field)
+    jql = _build_expertise_jql(jql_template, member_account_id, values)
     
     return {
         'jql': jql,
         'extracted_values': {
             'account_id': member_account_id,
-            'issue_type': issue_type,
-            'custom_field_value': custom_field_text,
-            'summary_prefix': summary_prefix
+            **values
         }
     }
 
 async def check_troubleshooting(issue_key: str, jira, bitbucket=None) -> Dict[str, Any]:
-    """Get troubleshooting documentation for alert ticket from configured Confluence parent page."""
+    """Get troubleshooting documentation for alert ticket from configured Confluence parent page.
+    
+    Once the ticket is parsed, the docs walk and the referenced file lookup (default branch,
+    latest commit touching the file, file content) run concurrently so the AI gets ticket,
+    docs and code in a single response.
+    """
     if not _agent:
         return {"error": "Ticket support agent not configured"}
     
     troubleshooting_parent = _config.get('troubleshooting_parent')
-    if not troubleshooting_parent:
-        # Still return ticket info and bitbucket URL even if no docs configured
-        issue = await jira.get_issue(issue_key)
-        fields = issue.get('fields', {})
-        description = fields.get('description', '')
-        
-        import re
-        import html
-        from urllib.parse import unquote
-        
-        bitbucket_url = None
-        repo_slug = None
-        file_path = None
-        branch = None
-        
-        if description:
-            # Decode HTML entities first
-            description = html.unescape(description)
-            
-            bitbucket_patterns = [
-                r'https?://(?:[^\s<>"]*(?:bitbucket|git)[^\s<>"]+)',  # Domain contains bitbucket/git
-                r'href=["\']([^"\'>]+(?:bitbucket|git)[^"\'>]+)["\']',  # HTML href
-            ]
-            
-            for pattern in bitbucket_patterns:
-                matches = re.findall(pattern, description, re.IGNORECASE)
-                if matches:
-                    bitbucket_url = matches[0]
-                    break
-            
-            if bitbucket_url:
-                # Decode URL encoding
-                bitbucket_url = unquote(bitbucket_url)
-                # Parse URL to extract repo_slug and file_path (handles both Cloud and Data Center formats)
-                browse_match = re.search(r'/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)', bitbucket_url)
-                if browse_match:
-                    repo_slug = browse_match.group(1)
-                    file_path = browse_match.group(2).rstrip()
-                else:
-                    # Try Data Center format with project
-                    dc_match = re.search(r'/projects/[^/]+/repos/([^/]+)/browse/(.+?)(?:\?|#|$|<)', bitbucket_url)
-                    if dc_match:
-                        repo_slug = dc_match.group(1)
-                        file_path = dc_match.group(2).rstrip()
-                    
-                    # Get default branch from repository
-                    if bitbucket and repo_slug:
-                        try:
-                            repo_info = await bitbucket.get_repository(repo_slug)
-                            branch = repo_info.get('defaultBranch', {}).get('displayId', 'master')
-                        except:
-                            branch = 'master'  # fallback
-        
-        return {
-            'ticket': {
-                'key': issue_key,
-                'summary': fields.get('summary', ''),
-                'description': description
-            },
-            'bitbucket_url': bitbucket_url,
-            'repo_slug': repo_slug,
-            'file_path': file_path,
-            'branch': branch,
-            'troubleshooting_docs': [],
-            'note': 'Troubleshooting parent page not configured, but ticket details and Bitbucket URL (if present) are provided'
-        }
-    
     issue = await jira.get_issue(issue_key)
-    context = await _agent.get_troubleshooting_context(issue, troubleshooting_parent)
+    fields = issue.get('fields', {})
+    reference = description_parsers.parse_issue_description(issue)
+    
+    context = {
+        'ticket': {
+            'key': issue.get('key', issue_key),
+            'summary': fields.get('summary', ''),
+            'description': reference['description']
+        },
+        'bitbucket_url': reference['bitbucket_url'],
+        'repo_slug': reference['repo_slug'],
+        'file_path': reference['file_path'],
+        'branch': reference['branch'],
+        'troubleshooting_docs': []
+    }
     
-    # Get default branch if repo_slug is present
-    if bitbucket and context.get('repo_slug'):
-        try:
-            repo_info = await bitbucket.get_repository(context['repo_slug'])
-            context['branch'] = repo_info.get('defaultBranch', {}).get('displayId', 'master')
-        except:
-            context['branch'] = 'master'  # fallback
+    async def no_docs():
+        return {}
+    
+    docs_task = run_in_thread(_agent.get_troubleshooting_docs(troubleshooting_parent)) if troubleshooting_parent else no_docs()
+    if bitbucket and reference['repo_slug']:
+        docs, code = await asyncio.gather(docs_task, _get_referenced_code(bitbucket, reference))
+        context.update(code)
+    else:
+        docs = await docs_task
+    context.update(docs)
+    
+    if not troubleshooting_parent:
+        context['note'] = 'Troubleshooting parent page not configured, but ticket details and Bitbucket URL (if present) are provided'
+        return context
     
     # Add hints for AI
     doc_count = len(context.get('troubleshooting_docs', []))
+    file_info = context.get('file') or {}
+    if 'content' in file_info:
+        code_step = '3. THEN: Read the alert code already provided in file.content (check file.truncated before relying on it)'
+    else:
+        code_step = '3. THEN: Use repo_slug, file_path, and branch to call get_file_content() to read the alert code'
     context['_ai_hints'] = {
         'workflow': [
             f"1. FIRST: Review the {doc_count} troubleshooting docs already provided in troubleshooting_docs list",
             '2. Call get_page(page_id) on relevant docs to get full troubleshooting steps',
-            '3. THEN: Use repo_slug, file_path, and branch to call get_file_content() to read the alert code',
+            code_step,
             '4. Analyze code/SQL to understand alert logic and supplement documentation',
             '5. If SQL queries present, optionally use @gpprod to get schemas and run diagnostics',
             '6. Provide comprehensive guidance combining docs + code analysis'
         ],
-        'note': 'Troubleshooting docs are pre-fetched from configured parent page - no need to search Confluence'
+        'note': 'Troubleshooting docs and referenced file are pre-fetched - no need to search Confluence or Bitbucket'
     }
     
     return context
+
+async def _get_referenced_code(bitbucket, reference: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve branch and latest commit for the referenced file, then fetch its content.
+    
+    Content is cached per (repo, path, commit), so repeat checks of the same alert
+    only cost the commit lookup. Every step degrades gracefully - a failure leaves
+    'file' with an error and the AI can fall back to get_file_content().
+    """
+    repo_slug = reference['repo_slug']
+    branch = reference['branch'] or await _get_default_branch(bitbucket, repo_slug)
+    result = {'branch': branch}
+    file_path = reference['file_path']
+    if not file_path:
+        return result
+    
+    commit = await _get_latest_commit(bitbucket, repo_slug, branch, file_path)
+    result['commit'] = commit
+    cache_key = (repo_slug, file_path, commit)
+    if commit:
+        cached = _file_cache.get(cache_key)
+        if cached is not None:
+            _file_cache.move_to_end(cache_key)
+            result['file'] = {**cached, 'cached': True}
+            return result
+    
+    try:
+        response = await run_in_thread(bitbucket.get_file_content(repo_slug, file_path, commit or branch,
+                                                                  max_bytes=MAX_FILE_BYTES))
+    except Exception as e:
+        response = {'error': str(e)}
+    if 'error' in response:
+        result['file'] = {'path': file_path, 'error': response['error']}
+        return result
+    
+    # The provider stops reading at max_bytes; size is None when the end was not reached
+    file_info = {'path': file_path, 'size': response.get('size')}
+    if response.get('binary'):
+        file_info['binary'] = True
+    else:
+        file_info['content'] = response.get('content', '')
+        file_info['truncated'] = bool(response.get('truncated'))
+    if commit:
+        _file_cache[cache_key] = file_info
+        while len(_file_cache) > FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    result['file'] = {**file_info, 'cached': False}
+    return result
+
+async def _get_latest_commit(bitbucket, repo_slug: str, branch: str, file_path: str) -> Optional[str]:
+    """Return the hash of the latest commit touching file_path on branch, or None"""
+    try:
+        commits = await run_in_thread(bitbucket.list_commits(repo_slug, branch, path=file_path))
+        latest = commits.get('values', [])[0]
+        # Cloud returns 'hash', Data Center returns 'id'
+        return latest.get('hash') or latest.get('id')
+    except Exception:
+        return None
+
+async def _get_default_branch(bitbucket, repo_slug: str) -> str:
+    """Resolve a repository's default branch, falling back to master"""
+    try:
+        repo_info = await run_in_thread(bitbucket.get_repository(repo_slug))
+        # Data Center exposes defaultBranch, Cloud exposes mainbranch
+        return (repo_info.get('defaultBranch', {}).get('displayId')
+                or repo_info.get('mainbranch', {}).get('name')
+                or 'master')
+    except:
+        return 'master'  # fallback
@@ -1,5 +1,20 @@
 """JSON schemas for MCP tool inputs"""
 
+from mcp_server.common.validation import (
+    _BRANCH_NAME, _COMMIT_HASH, _ISSUE_KEY, _PROJECT_KEY, _REPO_SLUG, _SPACE_KEY
+)
+
+# Shared by get_pull_request_diff, get_commit_diff and compare_commits
+_STRUCTURED_DIFF_PROPERTIES = {
+    "structured": {"type": "boolean", "description": "Return per-file hunks in pages (diffstat first, generated files skipped) instead of one raw diff"},
+    "paths": {"type": "array", "items": {"type": "string"}, "description": "Structured only: files, directories or glob patterns to include"},
+    "context_lines": {"type": "integer", "description": "Structured only: context lines around each change"},
+    "ignore_whitespace": {"type": "boolean", "description": "Structured only: ignore whitespace-only changes"},
+    "start": {"type": "integer", "description": "Structured only: index of the first file; continue from next_start"},
+    "limit": {"type": "integer", "description": "Structured only: files per page (default 20)"},
+    "include_generated": {"type": "boolean", "description": "Structured only: include hunks of lockfiles, minified and vendored files"}
+}
+
 TOOL_SCHEMAS = {
     # Jira tools
     "search_jira": {
@@ -25,7 +40,7 @@ TOOL_SCHEMAS = {
             "issue_type": {"type": "string"},
             "custom_fields": {"type": "object", "description": "Optional custom fields as key-value pairs (e.g., {'customfield_10001': 'value'})"}
         },
-        "required": ["project_key", "summary", "issue_type"]
+        "required": ["project_key", "summary", "description"]
     },
     "update_issue": {
         "type": "object",
@@ -108,7 +123,8 @@ TOOL_SCHEMAS = {
     "search_by_assignee": {
         "type": "object",
         "properties": {
-            "assignee": {"type": "string", "description": "Jira account ID or email address of the assignee. For current user, use 'currentUser()'."}
+            "assignee": {"type": "string", "description": "Jira account ID or email address of the assignee. For current user, use 'currentUser()'."},
+            "project_key": {"type": "string", "description": "Optional project key to limit the search"}
         },
         "required": ["assignee"]
     },
@@ -153,7 +169,8 @@ TOOL_SCHEMAS = {
         "properties": {
             "space_key": {"type": "string"},
             "title": {"type": "string"},
-            "content": {"type": "string"}
+            "content": {"type": "string"},
+            "parent_id": {"type": "string", "description": "Optional parent page ID"}
         },
         "required": ["space_key", "title", "content"]
     },
@@ -257,7 +274,9 @@ TOOL_SCHEMAS = {
     "search_bitbucket": {
         "type": "object",
         "properties": {
-            "query": {"type": "string"}
+            "query": {"type": "string"},
+            "match": {"type": "string", "enum": ["substring", "fuzzy"], "description": "How query is matched against repository names and slugs (default: substring). Fuzzy results are ranked best first and tolerate typos"},
+            "limit": {"type": "integer", "minimum": 1, "description": "Maximum number of repositories to return (default: all; 20 for fuzzy)"}
         },
         "required": ["query"]
     },
@@ -265,8 +284,10 @@ TOOL_SCHEMAS = {
         "type": "object",
         "properties": {
             "repo_slug": {"type": "string"},
-            "query": {"type": "string", "description": "Filename or partial filename to search for"},
-            "branch": {"type": "string", "description": "Branch to search in (default: master)"}
+            "query": {"type": "string", "description": "Text, glob pattern (e.g. '*.py', 'src/*/test_*') or fuzzy query, depending on match"},
+            "branch": {"type": "string", "description": "Branch, tag or commit hash to search in (default: master)"},
+            "match": {"type": "string", "enum": ["substring", "glob", "fuzzy"], "description": "How query is matched against file paths (default: substring). Fuzzy results are ranked best first"},
+            "limit": {"type": "integer", "description": "Maximum number of paths to return (default: all; 50 for fuzzy)"}
         },
         "required": ["repo_slug", "query"]
     },
@@ -313,7 +334,11 @@ TOOL_SCHEMAS = {
         "properties": {
             "repo_slug": {"type": "string"},
             "file_path": {"type": "string"},
-            "branch": {"type": "string"}
+            "branch": {"type": "string"},
+            "start_line": {"type": "integer", "description": "First line to return (1-based); reads only up to end_line"},
+            "end_line": {"type": "integer", "description": "Last line to return (inclusive)"},
+            "byte_offset": {"type": "integer", "description": "Return bytes from this offset instead of lines; continue from next_byte_offset"},
+            "max_bytes": {"type": "integer", "description": "Maximum bytes of content to return (default 1 MiB); truncated is true when more remain"}
         },
         "required": ["repo_slug", "file_path"]
     },
@@ -342,6 +367,15 @@ TOOL_SCHEMAS = {
         "required": ["repo_slug"]
     },
     "get_pull_request_diff": {
+        "type": "object",
+        "properties": {
+            "repo_slug": {"type": "string"},
+            "pr_id": {"type": "integer"},
+            **_STRUCTURED_DIFF_PROPERTIES
+        },
+        "required": ["repo_slug", "pr_id"]
+    },
+    "get_pull_request_summary": {
         "type": "object",
         "properties": {
             "repo_slug": {"type": "string"},
@@ -386,7 +420,8 @@ TOOL_SCHEMAS = {
         "type": "object",
         "properties": {
             "repo_slug": {"type": "string"},
-            "commit_hash": {"type": "string"}
+            "commit_hash": {"type": "string"},
+            **_STRUCTURED_DIFF_PROPERTIES
         },
         "required": ["repo_slug", "commit_hash"]
     },
@@ -421,7 +456,8 @@ TOOL_SCHEMAS = {
         "properties": {
             "repo_slug": {"type": "string"},
             "from_commit": {"type": "string"},
-            "to_commit": {"type": "string"}
+            "to_commit": {"type": "string"},
+            **_STRUCTURED_DIFF_PROPERTIES
         },
         "required": ["repo_slug", "from_commit", "to_commit"]
     },
@@ -636,7 +672,8 @@ TOOL_SCHEMAS = {
     "search_by_label": {
         "type": "object",
         "properties": {
-            "label": {"type": "string"}
+            "label": {"type": "string"},
+            "space_key": {"type": "string", "description": "Optional space key to limit the search"}
         },
         "required": ["label"]
     },
@@ -698,6 +735,14 @@ TOOL_SCHEMAS = {
         },
         "required": ["repo_slug"]
     },
+    "get_pr_review_bundle": {
+        "type": "object",
+        "properties": {
+            "repo_slug": {"type": "string"},
+            "pr_id": {"type": "integer"}
+        },
+        "required": ["repo_slug", "pr_id"]
+    },
     "list_pull_requests_by_author": {
         "type": "object",
         "properties": {
@@ -706,6 +751,13 @@ TOOL_SCHEMAS = {
         },
         "required": ["repo_slug"]
     },
+    "list_my_pull_requests": {
+        "type": "object",
+        "properties": {
+            "role": {"type": "string", "enum": ["AUTHOR", "REVIEWER", "PARTICIPANT"], "description": "Your role on the pull requests (default: REVIEWER)"},
+            "state": {"type": "string", "enum": ["OPEN", "MERGED", "DECLINED", "ALL"]}
+        }
+    },
     "list_commits_by_author": {
         "type": "object",
         "properties": {
@@ -744,16 +796,18 @@ TOOL_SCHEMAS = {
         "properties": {
             "repo_slug": {"type": "string"},
             "url": {"type": "string"},
-            "events": {"type": "array", "items": {"type": "string"}}
+            "events": {"type": "array", "items": {"type": "string"}, "description": "Optional events (defaults to push and pull request created)"}
         },
-        "required": ["repo_slug", "url", "events"]
+        "required": ["repo_slug", "url"]
     },
     
     # Ticket support tools - (expose raw data for AI reasoning)
     "get_open_support_tickets": {
         "type": "object",
-        "properties": {},
-        "description": "Get list of open support tickets, separated by type. Returns: alert_tickets (list of tickets with Alert in custom field), other_tickets (list of non-alert tickets), total counts."
+        "properties": {
+            "since": {"type": "string", "description": "Version token from a previous call. When valid, only added, changed and removed tickets since that version are returned"}
+        },
+        "description": "Get list of open support tickets, separated by type. Returns: alert_tickets (list of tickets with Alert in custom field), other_tickets (list of non-alert tickets), total counts and a version token. When polling, pass the version back as since to get only added/changed/removed tickets (mode: delta)."
     },
     "check_ticket_template": {
         "type": "object",
@@ -761,15 +815,17 @@ TOOL_SCHEMAS = {
             "issue_key": {"type": "string", "description": "Jira issue key (e.g., PROJ-123)"}
         },
         "required": ["issue_key"],
-        "description": "Validate single ticket against template. Automatically skips validation for Alert tickets. Returns: ticket.fields (all Jira fields), template_config, template_pages (list of available templates), or {skipped: true, reason: ...} if Alert ticket."
+        "description": "Validate single ticket against template. Automatically skips validation for Alert tickets. Returns: ticket.fields (all Jira fields), template_config, template_pages (list of available templates), compliance (matched template plus missing_sections, empty_sections, extra_sections, present_sections computed server-side), or {skipped: true, reason: ...} if Alert ticket."
     },
     "suggest_assignee": {
         "type": "object",
         "properties": {
-            "issue_key": {"type": "string", "description": "Jira issue key (e.g., PROJ-123)"}
+            "issue_key": {"type": "string", "description": "Jira issue key (e.g., PROJ-123)"},
+            "rank_locally": {"type": "boolean", "description": "Score candidates server-side and return only the top_k ranking with score breakdowns (default: false)"},
+            "top_k": {"type": "integer", "description": "Number of ranked candidates to return when rank_locally is true (default: 3)"}
         },
         "required": ["issue_key"],
-        "description": "Suggest assignee for single ticket based on workload. Returns: ticket (full Jira issue with comments), team.primary_team/secondary_team (members with their current ticket counts and issues)."
+        "description": "Suggest assignee for single ticket based on workload. Returns: ticket (full Jira issue with comments), team.primary_team/secondary_team (members with their current ticket counts and issues). With rank_locally=true returns: ticket (key, summary, extracted values), ranking (top_k members with score and per-feature breakdown: current_load, category_resolutions, prefix_matches, primary_team)."
     },
     "get_team_workload": {
         "type": "object",
@@ -792,6 +848,62 @@ TOOL_SCHEMAS = {
             "issue_key": {"type": "string", "description": "Jira issue key for alert ticket (e.g., PROJ-123)"}
         },
         "required": ["issue_key"],
-        "description": "Get troubleshooting info for alert. Returns: ticket (summary, description), bitbucket_url, repo_slug, file_path, branch (auto-detected default branch), troubleshooting_docs list. Use repo_slug/file_path/branch with get_file_content() to read code/SQL, use get_page(page_id) for docs."
+        "description": "Get troubleshooting info for alert. Returns: ticket (summary, description), bitbucket_url, repo_slug, file_path, branch (auto-detected default branch), commit, file (content of the referenced file, size-capped), troubleshooting_docs list. Docs and code are fetched concurrently in one call; use get_page(page_id) for docs and get_file_content() only if file has an error."
     }
 }
+
+# Identifier arguments get the pattern their provider validates them with, so a
+# malformed identifier is rejected before any request is made
+_IDENTIFIER_PATTERNS = {
+    'issue_key': _ISSUE_KEY,
+    'inward_issue': _ISSUE_KEY,
+    'outward_issue': _ISSUE_KEY,
+    'project_key': _PROJECT_KEY,
+    'space_key': _SPACE_KEY,
+    'target_space_key': _SPACE_KEY,
+    'repo_slug': _REPO_SLUG,
+    'branch': _BRANCH_NAME,
+    'branch_name': _BRANCH_NAME,
+    'from_branch': _BRANCH_NAME,
+    'commit_hash': _COMMIT_HASH,
+    'from_commit': _COMMIT_HASH,
+    'to_commit': _COMMIT_HASH,
+}
+
+# Only arguments both providers already check with the matching validate_* function;
+# a pattern on any other argument would reject calls the provider accepts
+_VALIDATED_IDENTIFIERS = {
+    'get_issue': ('issue_key',),
+    'create_issue': ('project_key',),
+    'update_issue': ('issue_key',),
+    'get_project': ('project_key',),
+    'link_issues': ('inward_issue', 'outward_issue'),
+    'add_worklog': ('issue_key',),
+    'get_worklogs': ('issue_key',),
+    'add_label': ('issue_key',),
+    'set_priority': ('issue_key',),
+    'add_attachment': ('issue_key',),
+    'create_page': ('space_key',),
+    'get_space': ('space_key',),
+    'move_page': ('target_space_key',),
+    'search_files': ('repo_slug', 'branch'),
+    'get_repository': ('repo_slug',),
+    'get_pull_request': ('repo_slug',),
+    'create_pull_request': ('repo_slug',),
+    'get_file_content': ('branch',),
+    'list_commits': ('branch',),
+    'get_commit': ('commit_hash',),
+    'get_pull_request_summary': ('repo_slug',),
+    'get_commit_diff': ('commit_hash',),
+    'list_directory': ('branch',),
+    'compare_commits': ('from_commit', 'to_commit'),
+    'create_branch': ('branch_name', 'from_branch'),
+    'delete_branch': ('branch_name',),
+    'get_default_reviewers': ('repo_slug',),
+    'get_pr_review_bundle': ('repo_slug',),
+    'get_build_status': ('commit_hash',),
+}
+
+for _tool, _names in _VALIDATED_IDENTIFIERS.items():
+    for _name in _names:
+        TOOL_SCHEMAS[_tool]['properties'][_name].setdefault('pattern', _IDENTIFIER_PATTERNS[_name].pattern)
@@ -67,27 +67,28 @@ CONFLUENCE_TOOLS = [
 ]
 
 BITBUCKET_TOOLS = [
-    {"name": "search_bitbucket", "description": "Search Bitbucket repositories"},
-    {"name": "search_files", "description": "Search for files in a repository by filename"},
+    {"name": "search_bitbucket", "description": "Search Bitbucket repositories by name (substring, or fuzzy in a cached catalog)"},
+    {"name": "search_files", "description": "Search for files in a repository by path (substring, glob or fuzzy match)"},
     {"name": "get_repository", "description": "Get Bitbucket repository details"},
     {"name": "list_repositories", "description": "List all Bitbucket repositories"},
     {"name": "list_pull_requests", "description": "List pull requests in repository"},
     {"name": "get_pull_request", "description": "Get pull request details"},
     {"name": "create_pull_request", "description": "Create new pull request"},
-    {"name": "get_file_content", "description": "Get file content from repository"},
+    {"name": "get_file_content", "description": "Get file content from repository, optionally a window of lines or bytes of a large file"},
     {"name": "list_commits", "description": "List commits in repository"},
     {"name": "get_commit", "description": "Get commit details"},
     {"name": "list_branches", "description": "List branches in repository"},
-    {"name": "get_pull_request_diff", "description": "Get pull request diff"},
+    {"name": "get_pull_request_diff", "description": "Get pull request diff (raw, or structured per-file pages with path filters)"},
+    {"name": "get_pull_request_summary", "description": "Get per-file additions, deletions and status of a pull request without patch bodies"},
     {"name": "get_pull_request_comments", "description": "Get pull request comments"},
     {"name": "add_pr_comment", "description": "Add comment to pull request"},
     {"name": "approve_pull_request", "description": "Approve pull request"},
     {"name": "merge_pull_request", "description": "Merge pull request"},
-    {"name": "get_commit_diff", "description": "Get commit diff"},
+    {"name": "get_commit_diff", "description": "Get commit diff (raw, or structured per-file pages with path filters)"},
     {"name": "list_tags", "description": "List tags in repository"},
     {"name": "list_directory", "description": "List files in directory"},
     {"name": "update_pull_request", "description": "Update pull request"},
-    {"name": "compare_commits", "description": "Compare two commits"},
+    {"name": "compare_commits", "description": "Compare two commits (raw diff, or structured per-file pages with path filters)"},
     {"name": "add_pr_reviewer", "description": "Add a reviewer to a pull request"},
     {"name": "decline_pull_request", "description": "Decline a pull request"},
     {"name": "create_branch", "description": "Create a new branch"},
@@ -95,7 +96,9 @@ BITBUCKET_TOOLS = [
     {"name": "get_bitbucket_user", "description": "Get Bitbucket user details"},
     {"name": "get_pr_activity", "description": "Get pull request activity/timeline"},
     {"name": "get_default_reviewers", "description": "Get default reviewers for repository"},
+    {"name": "get_pr_review_bundle", "description": "Get a pull request with its comments, activity, build status and default reviewers in one call"},
     {"name": "list_pull_requests_by_author", "description": "List pull requests by author"},
+    {"name": "list_my_pull_requests", "description": "List pull requests across all repositories where you are the author, a reviewer or a participant"},
     {"name": "list_commits_by_author", "description": "List commits by author"},
     {"name": "request_changes", "description": "Request changes on pull request"},
     {"name": "get_branch_restrictions", "description": "Get branch permissions/restrictions"},
@@ -104,10 +107,10 @@ BITBUCKET_TOOLS = [
 ]
 
 TICKET_SUPPORT_TOOLS = [
-    {"name": "get_open_support_tickets", "description": "Get list of open support tickets needing assignment, separated by type. Returns: alert_tickets (list of tickets with Alert in custom field), other_tickets (list of non-alert tickets), total counts."},
+    {"name": "get_open_support_tickets", "description": "Get list of open support tickets needing assignment, separated by type. Returns: alert_tickets (list of tickets with Alert in custom field), other_tickets (list of non-alert tickets), total counts, version token. Pass since=version when polling to get only added/changed/removed tickets."},
     {"name": "check_ticket_template", "description": "Check if Jira ticket follows defined template"},
     {"name": "suggest_assignee", "description": "Suggest who should be assigned to ticket based on team workload"},
     {"name": "get_team_workload", "description": "Get current workload for all team members"},
     {"name": "get_expertise_jql", "description": "Construct expertise JQL query for a member. Automatically extracts ticket fields and builds proper JQL. Returns: jql (ready to use with search_jira), extracted_values (shows what was extracted)."},
-    {"name": "check_troubleshooting", "description": "Get troubleshooting documentation for alert ticket. Returns: ticket details (summary, description), Bitbucket URL extracted from description, list of Confluence troubleshooting docs. AI can then read code and supplement docs with code/SQL analysis."}
+    {"name": "check_troubleshooting", "description": "Get troubleshooting documentation for alert ticket. Returns: ticket details (summary, description), Bitbucket URL extracted from description, content of the referenced file, list of Confluence troubleshooting docs. AI can then read code and supplement docs with code/SQL analysis."}
 ]
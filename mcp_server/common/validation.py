@@ -3,11 +3,22 @@ import re
 from typing import Tuple, Any
 from urllib.parse import quote
 
+# Patterns are compiled once at import
+_ISSUE_KEY = re.compile(r'^[A-Z][A-Z0-9]+-\d+$')
+_PROJECT_KEY = re.compile(r'^[A-Z][A-Z0-9]+$')
+_SPACE_KEY = re.compile(r'^([A-Z0-9]+|~[a-zA-Z0-9:_-]+)$')
+_REPO_SLUG = re.compile(r'^[a-z0-9_-]+$')
+_BRANCH_NAME = re.compile(r'^[a-zA-Z0-9/_.-]+$')
+_COMMIT_HASH = re.compile(r'^[a-f0-9]{7,40}$')
+_TIME_SPENT = re.compile(r'^(\d+[wdhm]\s*)+$')
+_LABEL = re.compile(r'^[a-zA-Z0-9_-]+$')
+_URL_SCHEME = re.compile(r'^https?://')
+
 def validate_issue_key(issue_key: str) -> Tuple[bool, str]:
     """Validate Jira issue key format (e.g., PROJ-123)"""
     if not issue_key or not issue_key.strip():
         return False, "issue_key is required"
-    if not re.match(r'^[A-Z][A-Z0-9]+-\d+$', issue_key):
+    if not _ISSUE_KEY.match(issue_key):
         return False, "Invalid issue_key format. Expected: PROJECT-123"
     return True, ""
 
@@ -15,7 +26,7 @@ def validate_project_key(project_key: str) -> Tuple[bool, str]:
     """Validate Jira project key format"""
     if not project_key or not project_key.strip():
         return False, "project_key is required"
-    if not re.match(r'^[A-Z][A-Z0-9]+$', project_key):
+    if not _PROJECT_KEY.match(project_key):
         return False, "Invalid project_key format. Expected: PROJ"
     return True, ""
 
@@ -32,7 +43,7 @@ def validate_space_key(space_key: str) -> Tuple[bool, str]:
     if not space_key or not space_key.strip():
         return False, "space_key is required"
     # Allow team spaces (TEAM, PROJ) or personal spaces (~accountId)
-    if not re.match(r'^([A-Z0-9]+|~[a-zA-Z0-9:_-]+)$', space_key):
+    if not _SPACE_KEY.match(space_key):
         return False, "Invalid space_key format. Expected: SPACE, TEAM123, or ~accountId"
     return True, ""
 
@@ -40,7 +51,7 @@ def validate_repo_slug(repo_slug: str) -> Tuple[bool, str]:
     """Validate repository slug"""
     if not repo_slug or not repo_slug.strip():
         return False, "repo_slug is required"
-    if not re.match(r'^[a-z0-9_-]+$', repo_slug):
+    if not _REPO_SLUG.match(repo_slug):
         return False, "Invalid repo_slug format. Expected lowercase with hyphens/underscores: my-repo or my_repo"
     return True, ""
 
@@ -70,7 +81,7 @@ def validate_branch_name(branch: str, field_name: str = "branch") -> Tuple[bool,
     """Validate branch/tag name"""
     if not branch or not branch.strip():
         return False, f"{field_name} is required"
-    if not re.match(r'^[a-zA-Z0-9/_.-]+$', branch):
+    if not _BRANCH_NAME.match(branch):
         return False, f"{field_name} contains invalid characters. Use alphanumeric, /, _, ., -"
     return True, ""
 
@@ -78,7 +89,7 @@ def validate_commit_hash(commit_hash: str) -> Tuple[bool, str]:
     """Validate commit hash"""
     if not commit_hash or not commit_hash.strip():
         return False, "commit_hash is required"
-    if not re.match(r'^[a-f0-9]{7,40}$', commit_hash):
+    if not _COMMIT_HASH.match(commit_hash):
         return False, "commit_hash must be 7-40 hexadecimal characters"
     return True, ""
 
@@ -124,7 +135,7 @@ def validate_time_spent(time_spent: str) -> Tuple[bool, str]:
     """Validate Jira worklog time format (e.g., 2h, 1d 4h, 30m)"""
     if not time_spent or not time_spent.strip():
         return False, "time_spent is required"
-    if not re.match(r'^(\d+[wdhm]\s*)+$', time_spent.strip()):
+    if not _TIME_SPENT.match(time_spent.strip()):
         return False, "Invalid time_spent format. Expected: 2h, 1d 4h, 30m, 1w 2d"
     return True, ""
 
@@ -138,7 +149,7 @@ def validate_label(label: str) -> Tuple[bool, str]:
     """Validate label format"""
     if not label or not label.strip():
         return False, "label is required"
-    if not re.match(r'^[a-zA-Z0-9_-]+$', label):
+    if not _LABEL.match(label):
         return False, "label can only contain alphanumeric characters, hyphens, and underscores"
     return True, ""
 
@@ -164,7 +175,7 @@ def validate_url(url: str) -> Tuple[bool, str]:
     """Validate URL format"""
     if not url or not url.strip():
         return False, "url is required"
-    if not re.match(r'^https?://', url):
+    if not _URL_SCHEME.match(url):
         return False, "url must start with http:// or https://"
     return True, ""
 
@@ -175,12 +186,40 @@ def validate_pr_state(state: str) -> Tuple[bool, str]:
         return False, f"state must be one of: {', '.join(valid_states)}"
     return True, ""
 
+def validate_pr_role(role: str) -> Tuple[bool, str]:
+    """Validate the current user's role on a pull request"""
+    valid_roles = ["AUTHOR", "REVIEWER", "PARTICIPANT"]
+    if not isinstance(role, str) or role.upper() not in valid_roles:
+        return False, f"role must be one of: {', '.join(valid_roles)}"
+    return True, ""
+
 def validate_events_list(events: Any) -> Tuple[bool, str]:
     """Validate webhook events list"""
     if not events or not isinstance(events, list) or len(events) == 0:
         return False, "events must be a non-empty list"
     return True, ""
 
+def validate_file_window(start_line: Any = None, end_line: Any = None, byte_offset: Any = None, max_bytes: Any = None) -> Tuple[bool, str]:
+    """Validate a get_file_content line or byte window"""
+    for name, value, minimum in (("start_line", start_line, 1), ("end_line", end_line, 1),
+                                 ("byte_offset", byte_offset, 0), ("max_bytes", max_bytes, 1)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < minimum):
+            return False, f"{name} must be an integer >= {minimum}"
+    if start_line is not None and end_line is not None and end_line < start_line:
+        return False, "end_line must be >= start_line"
+    if byte_offset is not None and (start_line is not None or end_line is not None):
+        return False, "Use either start_line/end_line or byte_offset, not both"
+    return True, ""
+
+def validate_diff_options(paths: Any = None, context_lines: Any = None, start: Any = 0, limit: Any = None) -> Tuple[bool, str]:
+    """Validate structured diff filters and paging"""
+    if paths is not None and (not isinstance(paths, list) or not all(isinstance(p, str) and p for p in paths)):
+        return False, "paths must be a list of file paths or glob patterns"
+    for name, value, minimum in (("context_lines", context_lines, 0), ("start", start, 0), ("limit", limit, 1)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < minimum):
+            return False, f"{name} must be an integer >= {minimum}"
+    return True, ""
+
 def sanitize_url_path(value: str) -> str:
     """URL encode path component"""
     return quote(value, safe='')
@@ -1,16 +1,44 @@
 import requests
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from ..common.auth import DataCenterAuth
-from ..common.validation import validate_repo_slug, validate_pr_id, validate_non_empty, validate_path, validate_branch_name, validate_commit_hash, sanitize_url_path
+from ..common.concurrency import gather_in_threads
+from ..common.diff_parser import convert_dc_diff, paginate_diff, summarize_files
+from ..common.file_window import CHUNK_BYTES, MAX_CONTENT_BYTES, read_window
+from ..common.git_mirror import GitMirror, MirrorError, MirrorSet
+from ..common.object_cache import credential_namespace, get_object_cache
+from ..common.path_index import MATCH_MODES, get_path_index_cache, is_full_commit_hash
+from ..common.repo_catalog import MATCH_MODES as REPO_MATCH_MODES, get_repo_catalog_cache
+from ..common.review_bundle import ReviewBundle
+from ..common.validation import validate_repo_slug, validate_pr_id, validate_non_empty, validate_path, validate_branch_name, validate_commit_hash, validate_file_window, validate_diff_options, validate_pr_role, validate_pr_state, sanitize_url_path
 
 logger = logging.getLogger(__name__)
 
 # Pagination constants
 LIST_PAGE_SIZE = 50
+FILES_PAGE_SIZE = 1000
+# Per-file diff requests in flight for one structured diff page
+DIFF_FETCH_CONCURRENCY = 8
+
+def _range_total(headers) -> Optional[int]:
+    """The file size from a Content-Range header (bytes 0-99/1234 or bytes */1234)"""
+    total = headers.get('Content-Range', '').rpartition('/')[2]
+    return int(total) if total.isdigit() else None
+
+
+_CHANGE_STATUS = {'ADD': 'added', 'DELETE': 'deleted', 'MOVE': 'renamed', 'COPY': 'copied'}
+
+
+def _change_file(value: Dict[str, Any]) -> Dict[str, Any]:
+    """A change list entry as a diff_parser file summary (line counts come with the diff)"""
+    path = (value.get('path') or {}).get('toString')
+    source = (value.get('srcPath') or {}).get('toString')
+    return {'path': path, 'old_path': source if source and source != path else None,
+            'status': _CHANGE_STATUS.get(value.get('type'), 'modified'), 'additions': None, 'deletions': None}
+
 
 class BitbucketDCProvider:
     def __init__(self) -> None:
@@ -20,6 +48,11 @@ class BitbucketDCProvider:
         self.project = os.getenv('BITBUCKET_PROJECT', 'PROJECT')
         self.session = self._create_session() if self.available else None
         self.timeout = 25
+        self.path_indexes = get_path_index_cache()
+        self.objects = get_object_cache()
+        self.repo_catalogs = get_repo_catalog_cache()
+        self.mirrors = MirrorSet.from_env(f"{self.base_url}/scm/{self.project}/{{repo_slug}}.git",
+                                          auth_header=self.auth.get_auth_headers()['Authorization']) if self.available else None
         if self.available:
             logger.info(f"BitbucketDCProvider initialized with base_url: {self.base_url}, project: {self.project}")
         else:
@@ -139,8 +172,9 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_file_content(self, repo_slug: str, file_path: str, branch: str = "main") -> Dict[str, Any]:
-        """Get raw content of a file."""
+    async def get_file_content(self, repo_slug: str, file_path: str, branch: str = "main", start_line: Optional[int] = None,
+                               end_line: Optional[int] = None, byte_offset: Optional[int] = None, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """Get raw content of a file, or a window of its lines or bytes."""
         from urllib.parse import quote
         check = self._check_available()
         if check:
@@ -151,22 +185,24 @@ class BitbucketDCProvider:
         valid, error = validate_branch_name(branch)
         if not valid:
             return {'error': error}
+        valid, error = validate_file_window(start_line, end_line, byte_offset, max_bytes)
+        if not valid:
+            return {'error': error}
+        window = {'start_line': start_line, 'end_line': end_line, 'byte_offset': byte_offset, 'max_bytes': max_bytes}
         try:
+            data = self._from_mirror(repo_slug, lambda mirror: mirror.file_content(branch, file_path))
+            if data is not None:
+                return {**read_window([data], **window), 'path': file_path}
             headers = self.auth.get_auth_headers()
             encoded_path = quote(file_path, safe='/')
-            url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/browse/{encoded_path}"
-            params = {'at': branch, 'limit': 10000}
-            all_lines = []
-            while True:
-                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                data = response.json()
-                all_lines.extend(data.get('lines', []))
-                if data.get('isLastPage', True):
-                    break
-                params['start'] = data.get('nextPageStart')
-            content = '\n'.join([line.get('text', '') for line in all_lines])
-            return {'content': content, 'path': file_path}
+            url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/raw/{encoded_path}"
+            if is_full_commit_hash(branch):
+                # Content at a commit never changes
+                key = self._object_key(repo_slug, 'file', branch, file_path, start_line, end_line, byte_offset, max_bytes)
+                result = self.objects.fetch_json(key, lambda: self._read_raw(url, headers, branch, window))
+            else:
+                result = self._read_raw(url, headers, branch, window)
+            return {**result, 'path': file_path}
         except Exception as e:
             return {'error': str(e)}
     
@@ -183,6 +219,9 @@ class BitbucketDCProvider:
             if not valid:
                 return {'error': error}
         try:
+            commits = self._from_mirror(repo_slug, lambda mirror: mirror.log(branch, LIST_PAGE_SIZE, path=path))
+            if commits is not None:
+                return self._mirror_commits(commits)
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/commits"
             params = {'until': branch, 'limit': LIST_PAGE_SIZE}
@@ -205,9 +244,7 @@ class BitbucketDCProvider:
         try:
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/commits/{commit_hash}"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return self.objects.fetch_json(self._object_key(repo_slug, 'commit', commit_hash), lambda: self._get(url, headers).json())
         except Exception as e:
             return {'error': str(e)}
     
@@ -225,12 +262,23 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_pull_request_diff(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
-        """Get the full diff for a pull request."""
+    async def get_pull_request_diff(self, repo_slug: str, pr_id: int, structured: bool = False, paths: Optional[List[str]] = None,
+                                   context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                                   limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Get the full diff for a pull request, or one page of it per file with structured=True."""
         check = self._check_available()
         if check:
             return check
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}"
+                return await self._structured_diff(f"{repo_url}/pull-requests/{pr_id}", {}, **options)
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{repo_slug}/pull-requests/{pr_id}/diff"
             response = self.session.get(url, headers=headers, timeout=self.timeout)
@@ -239,6 +287,107 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
+    async def get_pull_request_summary(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
+        """Per-file status of a pull request from its change list, without patch bodies."""
+        check = self._check_available()
+        if check:
+            return check
+        valid, error = validate_repo_slug(repo_slug)
+        if not valid:
+            return {'error': error}
+        valid, error = validate_pr_id(pr_id)
+        if not valid:
+            return {'error': error}
+        try:
+            headers = self.auth.get_auth_headers()
+            pr_url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{repo_slug}/pull-requests/{pr_id}"
+            pr = self._get(pr_url, headers).json()
+            source, destination = pr['fromRef']['latestCommit'], pr['toRef']['latestCommit']
+            # New commits on either side change the pair, so the change list for a pair never changes
+            files = self.objects.fetch_json(
+                self._object_key(repo_slug, 'pr-changes', source, destination),
+                lambda: [_change_file(value) for value in self._get_all_values(f"{pr_url}/changes", headers, {})])
+            return {
+                'pull_request': {
+                    'id': pr.get('id', pr_id),
+                    'title': pr.get('title'),
+                    'state': pr.get('state'),
+                    'author': ((pr.get('author') or {}).get('user') or {}).get('displayName'),
+                    'source_branch': pr['fromRef'].get('displayId'),
+                    'destination_branch': pr['toRef'].get('displayId'),
+                    'source_commit': source,
+                    'destination_commit': destination,
+                },
+                **summarize_files(files),
+            }
+        except Exception as e:
+            logger.error(f"Error summarizing pull request {pr_id} in {repo_slug}: {e}")
+            return {'error': str(e)}
+
+    async def get_pr_review_bundle(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
+        """Pull request, comments, activity, build status and default reviewers, fetched concurrently."""
+        check = self._check_available()
+        if check:
+            return check
+        valid, error = validate_repo_slug(repo_slug)
+        if not valid:
+            return {'error': error}
+        valid, error = validate_pr_id(pr_id)
+        if not valid:
+            return {'error': error}
+        bundle = ReviewBundle()
+
+        async def pull_request_and_builds():
+            pr = await bundle.part('pull_request', self.get_pull_request(repo_slug, pr_id))
+            commit = ((pr or {}).get('fromRef') or {}).get('latestCommit')
+            builds = await bundle.part('builds', self.get_build_status(repo_slug, commit)) if commit else None
+            return pr, builds
+
+        # Comments are activities here, so one /activities request serves both parts
+        (pr, builds), activity, reviewers = await gather_in_threads(
+            pull_request_and_builds(),
+            bundle.part('activity', self.get_pr_activity(repo_slug, pr_id)),
+            bundle.part('default_reviewers', self.get_default_reviewers(repo_slug)),
+        )
+        if pr is None:
+            return {'error': bundle.errors['pull_request'], 'errors': bundle.errors}
+
+        def user(value):
+            return bundle.user(*self._bundle_user(value))
+
+        activities = (activity or {}).get('values', [])
+        comments = []
+        for entry in activities:
+            if entry.get('action') == 'COMMENTED' and entry.get('comment'):
+                self._bundle_comments(entry['comment'], entry.get('commentAnchor') or {}, None, user, comments)
+        return bundle.result(
+            pull_request={
+                'id': pr.get('id', pr_id),
+                'title': pr.get('title'),
+                'description': pr.get('description'),
+                'state': pr.get('state'),
+                'author': user((pr.get('author') or {}).get('user')),
+                'source_branch': (pr.get('fromRef') or {}).get('displayId'),
+                'destination_branch': (pr.get('toRef') or {}).get('displayId'),
+                'source_commit': (pr.get('fromRef') or {}).get('latestCommit'),
+                'created_date': pr.get('createdDate'),
+                'updated_date': pr.get('updatedDate'),
+                'reviewers': [{'user': user(r.get('user')), 'approved': r.get('approved'), 'status': r.get('status')}
+                              for r in pr.get('reviewers', [])],
+            },
+            comments=comments,
+            activity=[{
+                'type': a.get('action'),
+                'user': user(a.get('user')),
+                'date': a.get('createdDate'),
+                **({'comment_id': a['comment'].get('id')} if a.get('comment') else {}),
+            } for a in activities],
+            builds=[{'key': b.get('key'), 'name': b.get('name'), 'state': b.get('state'), 'url': b.get('url')}
+                    for b in (builds or {}).get('values', [])],
+            # The default reviewers endpoint returns a bare list of users
+            default_reviewers=[user(r) for r in (reviewers if isinstance(reviewers, list) else [])],
+        )
+
     async def get_pull_request_comments(self, repo_slug: str, pr_id: int) -> Dict[str, Any]:
         """Retrieve all comments on a pull request."""
         check = self._check_available()
@@ -301,20 +450,32 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_commit_diff(self, repo_slug: str, commit_hash: str) -> Dict[str, Any]:
-        """Get the diff/changes for a commit."""
+    async def get_commit_diff(self, repo_slug: str, commit_hash: str, structured: bool = False, paths: Optional[List[str]] = None,
+                             context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                             limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Get the diff/changes for a commit, or one page of them per file with structured=True."""
         check = self._check_available()
         if check:
             return check
         valid, error = validate_commit_hash(commit_hash)
         if not valid:
             return {'error': error}
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}"
+                return await self._structured_diff(f"{repo_url}/commits/{commit_hash}", {}, **options)
+            diff = self._from_mirror(repo_slug, lambda mirror: mirror.commit_diff(commit_hash))
+            if diff is not None:
+                return {'diff': diff}
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/commits/{commit_hash}/diff"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            return {'diff': response.text}
+            return {'diff': self.objects.fetch_text(self._object_key(repo_slug, 'diff', commit_hash), lambda: self._get(url, headers).text)}
         except Exception as e:
             return {'error': str(e)}
     
@@ -344,6 +505,12 @@ class BitbucketDCProvider:
         if not valid:
             return {'error': error}
         try:
+            entries = self._from_mirror(repo_slug, lambda mirror: mirror.list_directory(branch, path))
+            if entries is not None:
+                children = [{'path': {'name': e['name'], 'toString': e['name']}, 'type': e['type'].upper(), 'size': e['size']}
+                            for e in entries]
+                return {'path': {'toString': path}, 'revision': branch,
+                        'children': {'values': children, 'size': len(children), 'isLastPage': True, 'start': 0}}
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/browse/{sanitize_url_path(path)}"
             params = {'at': branch}
@@ -375,8 +542,10 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def compare_commits(self, repo_slug: str, from_commit: str, to_commit: str) -> Dict[str, Any]:
-        """Compare differences between two commits."""
+    async def compare_commits(self, repo_slug: str, from_commit: str, to_commit: str, structured: bool = False, paths: Optional[List[str]] = None,
+                             context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                             limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """Compare differences between two commits, or one page of them per file with structured=True."""
         check = self._check_available()
         if check:
             return check
@@ -386,13 +555,24 @@ class BitbucketDCProvider:
         valid, error = validate_commit_hash(to_commit)
         if not valid:
             return {'error': error.replace('commit_hash', 'to_commit')}
+        if structured:
+            valid, error = validate_diff_options(paths, context_lines, start, limit)
+            if not valid:
+                return {'error': error}
+        options = {'paths': paths, 'context_lines': context_lines, 'ignore_whitespace': ignore_whitespace,
+                   'start': start, 'limit': limit, 'include_generated': include_generated}
         try:
+            if structured:
+                repo_url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}"
+                return await self._structured_diff(f"{repo_url}/compare", {'from': from_commit, 'to': to_commit}, **options)
+            diff = self._from_mirror(repo_slug, lambda mirror: mirror.compare(from_commit, to_commit))
+            if diff is not None:
+                return {'diff': diff}
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/compare/diff"
             params = {'from': from_commit, 'to': to_commit}
-            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return {'diff': response.text}
+            key = self._object_key(repo_slug, 'compare', from_commit, to_commit)
+            return {'diff': self.objects.fetch_text(key, lambda: self._get(url, headers, params).text)}
         except Exception as e:
             return {'error': str(e)}
     
@@ -556,6 +736,41 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
+    async def list_my_pull_requests(self, role: str = "REVIEWER", state: str = "OPEN") -> Dict[str, Any]:
+        """Pull requests across all projects where the current user is author, reviewer or participant."""
+        check = self._check_available()
+        if check:
+            return check
+        for validate, value in ((validate_pr_role, role), (validate_pr_state, state)):
+            valid, error = validate(value)
+            if not valid:
+                return {'error': error}
+        role, state = role.upper(), state.upper()
+        try:
+            headers = self.auth.get_auth_headers()
+            # The dashboard endpoint filters by the authenticated user server-side, in one paged query
+            params = {'role': role} if state == 'ALL' else {'role': role, 'state': state}
+            values = self._get_all_values(f"{self.base_url}/rest/api/1.0/dashboard/pull-requests", headers, params)
+            pull_requests = []
+            for pr in values:
+                repository = (pr.get('toRef') or {}).get('repository') or {}
+                pull_requests.append({
+                    'project_key': (repository.get('project') or {}).get('key'),
+                    'repo_slug': repository.get('slug'),
+                    'id': pr.get('id'),
+                    'title': pr.get('title'),
+                    'state': pr.get('state'),
+                    'author': ((pr.get('author') or {}).get('user') or {}).get('displayName'),
+                    'source_branch': (pr.get('fromRef') or {}).get('displayId'),
+                    'destination_branch': (pr.get('toRef') or {}).get('displayId'),
+                    'updated_date': pr.get('updatedDate'),
+                    'url': (((pr.get('links') or {}).get('self') or [{}])[0]).get('href'),
+                })
+            return {'pull_requests': pull_requests, 'count': len(pull_requests), 'role': role, 'state': state}
+        except Exception as e:
+            logger.error(f"Error listing pull requests for the current user: {e}")
+            return {'error': str(e)}
+
     async def list_commits_by_author(self, repo_slug: str, author: str, branch: str = "main") -> Dict[str, Any]:
         """Get commits by specific user."""
         check = self._check_available()
@@ -565,6 +780,9 @@ class BitbucketDCProvider:
         if not valid:
             return {'error': error}
         try:
+            commits = self._from_mirror(repo_slug, lambda mirror: mirror.log(branch, LIST_PAGE_SIZE, author=author))
+            if commits is not None:
+                return self._mirror_commits(commits)
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{repo_slug}/commits"
             params = {'until': branch, 'author': author, 'limit': LIST_PAGE_SIZE}
@@ -649,8 +867,8 @@ class BitbucketDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def search_files(self, repo_slug: str, query: str, branch: str = "master") -> Dict[str, Any]:
-        """Search for files in a repository by filename."""
+    async def search_files(self, repo_slug: str, query: str, branch: str = "master", match: str = "substring", limit: Optional[int] = None) -> Dict[str, Any]:
+        """Search file paths in a repository (substring, glob or fuzzy match) using a per-commit path index."""
         check = self._check_available()
         if check:
             return check
@@ -660,35 +878,198 @@ class BitbucketDCProvider:
         valid, error = validate_non_empty(query, "query")
         if not valid:
             return {'error': error}
+        valid, error = validate_branch_name(branch)
+        if not valid:
+            return {'error': error}
+        if match not in MATCH_MODES:
+            return {'error': f"Invalid match mode: {match}. Use one of: {', '.join(MATCH_MODES)}"}
         try:
-            logger.info(f"Searching files in {repo_slug}: {query}")
+            logger.info(f"Searching files in {repo_slug}: {query} ({match})")
             headers = self.auth.get_auth_headers()
-            url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}/files"
-            params = {'at': branch, 'limit': 10000}
-            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            all_files = response.json().get('values', [])
-            # Filter files matching query
-            matching_files = [f for f in all_files if query.lower() in f.lower()]
-            return {'files': matching_files, 'count': len(matching_files)}
+            repo_url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos/{sanitize_url_path(repo_slug)}"
+            commit = branch if is_full_commit_hash(branch) else self._resolve_commit(repo_url, headers, branch)
+            index, cached = self.path_indexes.get_or_build(
+                ('datacenter', self.base_url, self.project, repo_slug, commit),
+                lambda: self._list_all_files(repo_url, headers, commit))
+            if not cached:
+                logger.info(f"Indexed {len(index)} paths in {repo_slug} at {commit[:12]}")
+            files = index.search(query, match, limit)
+            return {'files': files, 'count': len(files), 'match': match, 'commit': commit, 'total_files': len(index)}
         except Exception as e:
             logger.error(f"Error searching files in {repo_slug}: {e}")
             return {'error': str(e)}
+
+    def _from_mirror(self, repo_slug: str, read: Callable[[GitMirror], Any]) -> Any:
+        """read(mirror) when the repository has a local mirror, or None to use the REST API"""
+        mirror = self.mirrors.get(repo_slug) if self.mirrors else None
+        if mirror is None:
+            return None
+        try:
+            return read(mirror)
+        except MirrorError as e:
+            logger.info(f"Mirror of {repo_slug} could not answer, using the REST API: {e}")
+            return None
+
+    @staticmethod
+    def _mirror_commits(commits: list) -> Dict[str, Any]:
+        """Mirror log entries in the shape of the commits endpoint"""
+        values = [{
+            'id': c['hash'],
+            'displayId': c['hash'][:11],
+            'message': c['message'],
+            'author': {'name': c['author_name'], 'emailAddress': c['author_email']},
+            'authorTimestamp': c['timestamp'] * 1000,
+        } for c in commits]
+        return {'values': values, 'size': len(values), 'isLastPage': len(values) < LIST_PAGE_SIZE, 'start': 0, 'limit': LIST_PAGE_SIZE}
+
+    @staticmethod
+    def _bundle_user(user: Optional[Dict[str, Any]]) -> tuple:
+        """(key, compact fields) of a Data Center user object"""
+        user = user or {}
+        key = user.get('slug') or user.get('name')
+        return key, {'display_name': user.get('displayName'), 'name': user.get('name'), 'email': user.get('emailAddress')}
+
+    @classmethod
+    def _bundle_comments(cls, comment: Dict[str, Any], anchor: Dict[str, Any], parent_id: Optional[int],
+                         user: Callable[[Any], Optional[str]], out: List[Dict[str, Any]]) -> None:
+        """Flatten a comment thread (replies are nested in comments) into out"""
+        out.append({
+            'id': comment.get('id'),
+            'user': user(comment.get('author')),
+            'created_date': comment.get('createdDate'),
+            'text': comment.get('text'),
+            'path': anchor.get('path'),
+            'line': anchor.get('line'),
+            'parent_id': parent_id,
+        })
+        for reply in comment.get('comments', []):
+            cls._bundle_comments(reply, anchor, comment.get('id'), user, out)
+
+    @property
+    def cache_namespace(self) -> str:
+        """Digest of the access token, so cached objects are never shared between accounts"""
+        return credential_namespace(self.auth.pat_token)
+
+    def _object_key(self, repo_slug: str, kind: str, *parts: str) -> tuple:
+        """Object cache key for an immutable object in this project"""
+        return ('datacenter', self.base_url, self.cache_namespace, self.project, repo_slug, kind, *parts)
+
+    def _get(self, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    async def _structured_diff(self, base_url: str, base_params: Dict[str, Any], paths: Optional[List[str]] = None,
+                               context_lines: Optional[int] = None, ignore_whitespace: bool = False, start: int = 0,
+                               limit: Optional[int] = None, include_generated: bool = False) -> Dict[str, Any]:
+        """The change list first, then the JSON diffs of the files on the requested page, fetched concurrently"""
+        from urllib.parse import quote
+        headers = self.auth.get_auth_headers()
+        files = [_change_file(value) for value in self._get_all_values(f"{base_url}/changes", headers, base_params)]
+        old_paths = {f['path']: f['old_path'] for f in files}
+        diff_params = dict(base_params)
+        if context_lines is not None:
+            diff_params['contextLines'] = context_lines
+        if ignore_whitespace:
+            diff_params['whitespace'] = 'ignore-all'
+
+        async def file_diff(path: str) -> Dict[str, Any]:
+            params = {**diff_params, 'srcPath': old_paths[path]} if old_paths.get(path) else diff_params
+            diffs = self._get(f"{base_url}/diff/{quote(path, safe='/')}", headers, params).json().get('diffs') or [{}]
+            return {**convert_dc_diff(diffs[0]), 'path': path}
+
+        async def fetch(wanted: List[str]) -> List[Dict[str, Any]]:
+            return await gather_in_threads(*(file_diff(path) for path in wanted), limit=DIFF_FETCH_CONCURRENCY)
+
+        return await paginate_diff(files, fetch, paths, start, limit, include_generated)
+
+    def _get_all_values(self, url: str, headers: Dict[str, str], params: Dict[str, Any],
+                        limit: Optional[int] = None) -> list:
+        """Every value of a paged collection, following nextPageStart; stops after limit values if given"""
+        params = {**params, 'limit': LIST_PAGE_SIZE * 10}
+        values = []
+        while True:
+            data = self._get(url, headers, params).json()
+            values.extend(data.get('values', []))
+            if data.get('isLastPage', True) or (limit is not None and len(values) >= limit):
+                return values[:limit]
+            params['start'] = data.get('nextPageStart')
+
+    def _read_raw(self, url: str, headers: Dict[str, str], branch: str, window: Dict[str, Any]) -> Dict[str, Any]:
+        """Stream /raw through a bounded window instead of loading the whole file"""
+        byte_offset = window['byte_offset']
+        if byte_offset:
+            # One byte past the window tells whether the file continues
+            headers = {**headers, 'Range': f"bytes={byte_offset}-{byte_offset + (window['max_bytes'] or MAX_CONTENT_BYTES)}"}
+        response = self.session.get(url, headers=headers, params={'at': branch}, timeout=self.timeout, stream=True)
+        try:
+            if response.status_code == 416:
+                # The offset is past the end of the file
+                return {'content': '', 'size': _range_total(response.headers), 'truncated': False, 'byte_offset': byte_offset}
+            response.raise_for_status()
+            chunks = response.iter_content(CHUNK_BYTES)
+            if response.status_code == 206:
+                return read_window(chunks, **window, total_size=_range_total(response.headers), stream_offset=byte_offset)
+            # A compressed body's Content-Length is not the file size
+            length = response.headers.get('Content-Length')
+            total_size = int(length) if length and length.isdigit() and not response.headers.get('Content-Encoding') else None
+            return read_window(chunks, **window, total_size=total_size)
+        finally:
+            response.close()
+
+    def _resolve_commit(self, repo_url: str, headers: Dict[str, str], branch: str) -> str:
+        """Resolve a branch or tag to the commit hash at its head"""
+        response = self.session.get(f"{repo_url}/commits", headers=headers, params={'until': branch, 'limit': 1}, timeout=self.timeout)
+        response.raise_for_status()
+        values = response.json().get('values', [])
+        if not values:
+            raise ValueError(f"No commits found for {branch}")
+        return values[0]['id']
+
+    def _list_all_files(self, repo_url: str, headers: Dict[str, str], commit: str) -> list:
+        """Every file path at a commit, following all pages of /files"""
+        params = {'at': commit, 'limit': FILES_PAGE_SIZE}
+        paths = []
+        while True:
+            response = self.session.get(f"{repo_url}/files", headers=headers, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            paths.extend(data.get('values', []))
+            if data.get('isLastPage', True):
+                return paths
+            params['start'] = data.get('nextPageStart')
     
-    async def search(self, query: str) -> Dict[str, Any]:
-        """Search using query."""
+    async def search(self, query: str, match: str = "substring", limit: Optional[int] = None) -> Dict[str, Any]:
+        """Search repositories in BITBUCKET_PROJECT by name, filtered server-side (substring) or in the cached catalog (fuzzy)."""
         check = self._check_available()
         if check:
             return check
+        valid, error = validate_non_empty(query, "query")
+        if not valid:
+            return {'error': error}
+        if match not in REPO_MATCH_MODES:
+            return {'error': f"Invalid match mode: {match}. Use one of: {', '.join(REPO_MATCH_MODES)}"}
+        if limit is not None and limit < 1:
+            return {'error': "limit must be at least 1"}
         try:
-            logger.info(f"Searching Bitbucket: {query}")
+            logger.info(f"Searching Bitbucket: {query} ({match})")
             headers = self.auth.get_auth_headers()
-            url = f"{self.base_url}/rest/api/1.0/projects/{self.project}/repos"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            repos = response.json().get('values', [])
-            results = [{'type': 'repository', 'name': r.get('name'), 'slug': r.get('slug'), 'description': r.get('description')} 
-                      for r in repos if query.lower() in r.get('name', '').lower()]
-            return {'results': results}
+            # Scoped to BITBUCKET_PROJECT, like every other repository tool
+            url = f"{self.base_url}/rest/api/1.0/repos"
+            params = {'projectkey': self.project}
+            if match == 'fuzzy':
+                key = ('datacenter', self.base_url, self.cache_namespace, self.project)
+                catalog, _ = self.repo_catalogs.get_or_build(key, lambda: [
+                    self._search_result(r) for r in self._get_all_values(url, headers, params)])
+                results = catalog.search(query, match, limit)
+                return {'results': results, 'count': len(results), 'match': match, 'total_repositories': len(catalog)}
+            values = self._get_all_values(url, headers, {**params, 'name': query}, limit)
+            results = [self._search_result(r) for r in values]
+            return {'results': results, 'count': len(results), 'match': match}
         except Exception as e:
             return {'error': str(e)}
+
+    @staticmethod
+    def _search_result(repo: Dict[str, Any]) -> Dict[str, Any]:
+        return {'type': 'repository', 'name': repo.get('name'), 'slug': repo.get('slug'),
+                'project_key': (repo.get('project') or {}).get('key'), 'description': repo.get('description')}
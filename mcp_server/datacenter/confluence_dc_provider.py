@@ -594,8 +594,8 @@ class ConfluenceDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_child_pages(self, page_id: str) -> Dict[str, Any]:
-        """Get direct child pages of a page."""
+    async def get_child_pages(self, page_id: str, expand: Optional[str] = None, start: int = 0) -> Dict[str, Any]:
+        """Get direct child pages of a page, optionally expanding fields (e.g. 'version') and from result start."""
         check = self._check_available()
         if check:
             return check
@@ -605,14 +605,17 @@ class ConfluenceDCProvider:
         try:
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/content/{sanitize_url_path(page_id)}/child/page"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            params = {'expand': expand} if expand else {}
+            if start:
+                params['start'] = start
+            response = self.session.get(url, headers=headers, params=params or None, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             return {'error': str(e)}
     
-    async def get_descendants(self, page_id: str) -> Dict[str, Any]:
-        """Get all descendant pages of a page."""
+    async def get_descendants(self, page_id: str, expand: Optional[str] = None, start: int = 0) -> Dict[str, Any]:
+        """Get descendant pages of a page, optionally expanding fields (e.g. 'version') and from result start."""
         check = self._check_available()
         if check:
             return check
@@ -622,7 +625,10 @@ class ConfluenceDCProvider:
         try:
             headers = self.auth.get_auth_headers()
             url = f"{self.base_url}/rest/api/content/{sanitize_url_path(page_id)}/descendant/page"
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            params = {'expand': expand} if expand else {}
+            if start:
+                params['start'] = start
+            response = self.session.get(url, headers=headers, params=params or None, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -1,7 +1,7 @@
 import requests
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from ..common.auth import DataCenterAuth
@@ -202,8 +202,8 @@ class JiraDCProvider:
         except Exception as e:
             return {'error': str(e)}
     
-    async def search(self, jql: str) -> Dict[str, Any]:
-        """Search using query."""
+    async def search(self, jql: str, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """Search using query; pass next_page_token back as page_token for the next page."""
         check = self._check_available()
         if check:
             return check
@@ -213,7 +213,8 @@ class JiraDCProvider:
         try:
             logger.info(f"Searching Jira with JQL: {jql}")
             url = f"{self.base_url}/rest/api/2/search"
-            params = {'jql': jql, 'maxResults': 50}
+            start_at = int(page_token or 0)
+            params = {'jql': jql, 'maxResults': 50, 'startAt': start_at}
             response = self.session.get(url, headers=self.auth.get_auth_headers(), timeout=self.timeout, params=params)
             response.raise_for_status()
             data = response.json()
@@ -222,6 +223,9 @@ class JiraDCProvider:
             results = [{'key': i.get('key'), 'summary': i.get('fields', {}).get('summary', '')} for i in issues]
             
             result = {'total': total, 'results': results}
+            # The token is the next startAt
+            if issues and start_at + len(issues) < total:
+                result['next_page_token'] = str(start_at + len(issues))
             if total > len(results):
                 result['message'] = f'Showing {len(results)} of {total} results. Results limited to prevent response size exceeding 100K character limit.'
             return result
@@ -0,0 +1,543 @@
+"""Streamable HTTP MCP server - many concurrent MCP sessions in one long-running process.
+
+Implements the Streamable HTTP transport in JSON response mode: clients POST
+JSON-RPC messages to /mcp and get the response in the HTTP body. The server
+does not open server-initiated SSE streams (GET /mcp answers 405, which the
+transport allows). Providers, their connection pools, the tool catalog and
+the compiled validators are shared by every session; each session gets its
+own concurrency limit so one busy client cannot starve the rest.
+
+With --workers N, uvicorn pre-forks N worker processes on one listening
+socket. Sessions and read-only tool results then live in a shared SQLite
+file (shared_cache.py), so any worker can serve any session and a result
+fetched by one worker is reused by the others. A single worker uses the
+shared result cache only when MCP_HTTP_STATE_DB names a file for it.
+
+POST /hooks/bitbucket accepts Bitbucket push webhooks and refreshes the
+pushed repository's local git mirror (git_mirror.py) right away. Webhooks
+must be signed with BITBUCKET_WEBHOOK_SECRET or carry the MCP_HTTP_TOKEN.
+
+Usage:
+    python -m mcp_server.http_server [--host 127.0.0.1] [--port 8080] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.common.concurrency import run_in_thread
+from mcp_server.common.config import DEFAULT_CONFIG_PATH, ConfigWatcher, load_config
+from mcp_server.common.profiles import ToolProfiles
+from mcp_server.common.registry import REGISTRY
+from mcp_server.common.router import route_tool_call
+from mcp_server.common.shared_cache import SessionTable, SharedCache, config_namespace, default_state_path
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = 'atlassian-mcp'
+SERVER_VERSION = '1.0.0'
+# Newest first; an unknown client version is answered with the newest
+PROTOCOL_VERSIONS = ('2025-06-18', '2025-03-26')
+
+MCP_PATH = '/mcp'
+WEBHOOK_PATH = '/hooks/bitbucket'
+SESSION_HEADER = 'mcp-session-id'
+PROFILE_HEADER = 'x-mcp-tool-profile'
+
+# Concurrent tool calls per session (further calls wait their turn)
+SESSION_CONCURRENCY = int(os.getenv('MCP_HTTP_SESSION_CONCURRENCY', '4'))
+MAX_SESSIONS = int(os.getenv('MCP_HTTP_MAX_SESSIONS', '1000'))
+# Sessions idle for longer than this are closed
+SESSION_TTL = float(os.getenv('MCP_HTTP_SESSION_TTL', '1800'))
+# Worker threads shared by all sessions for blocking provider calls
+PROVIDER_THREADS = int(os.getenv('PROVIDER_THREADS', '32'))
+# Optional shared secret; when set, requests need "Authorization: Bearer <token>"
+AUTH_TOKEN = os.getenv('MCP_HTTP_TOKEN', '')
+# Webhook secret; when set, webhooks need a matching X-Hub-Signature (otherwise the auth token)
+WEBHOOK_SECRET = os.getenv('BITBUCKET_WEBHOOK_SECRET', '')
+# Extra browser origins allowed besides localhost (comma separated)
+ALLOWED_ORIGINS = frozenset(o.strip() for o in os.getenv('MCP_HTTP_ALLOWED_ORIGINS', '').split(',') if o.strip())
+CONFIG_RELOAD_INTERVAL = float(os.getenv('MCP_CONFIG_RELOAD_INTERVAL', '2'))
+# Shared state file for the worker processes (set by main() when --workers > 1)
+STATE_DB_ENV = 'MCP_HTTP_STATE_DB'
+WORKERS_ENV = 'MCP_HTTP_WORKERS'
+
+RESOURCES = [
+    {"uri": "atlassian://bitbucket/repositories", "name": "Bitbucket Repositories",
+     "description": "Access to Bitbucket repositories and pull requests"},
+    {"uri": "atlassian://confluence/spaces", "name": "Confluence Spaces",
+     "description": "Access to Confluence spaces and pages"},
+    {"uri": "atlassian://jira/projects", "name": "Jira Projects",
+     "description": "Access to Jira projects and issues"},
+]
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class Session:
+    """One MCP client session: its negotiated protocol, tool profile and concurrency limit"""
+
+    def __init__(self, protocol_version: str, profile: str, concurrency: int, session_id: Optional[str] = None):
+        self.id = session_id or uuid.uuid4().hex
+        self.protocol_version = protocol_version
+        self.profile = profile
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.last_seen = time.monotonic()
+        self.in_flight = 0
+
+
+class SessionStore:
+    """Sessions by id in least-recently-used order, with idle expiry and a size cap"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: 'OrderedDict[str, Session]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, session: Session) -> bool:
+        self.expire()
+        if len(self._sessions) >= self.max_sessions:
+            # Make room by dropping the least recently used idle session
+            for session_id, existing in self._sessions.items():
+                if existing.in_flight == 0:
+                    del self._sessions[session_id]
+                    break
+            else:
+                return False
+        self._sessions[session.id] = session
+        return True
+
+    def get(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.last_seen > self.ttl and session.in_flight == 0:
+            del self._sessions[session_id]
+            return None
+        session.last_seen = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def expire(self) -> int:
+        cutoff = time.monotonic() - self.ttl
+        expired = [sid for sid, s in self._sessions.items() if s.last_seen < cutoff and s.in_flight == 0]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+
+class SharedSessionStore(SessionStore):
+    """Sessions recorded in a SessionTable, so every worker process can serve them.
+
+    Each worker keeps its own Session objects (and so its own per-session
+    concurrency limit); the table decides which sessions exist.
+    """
+
+    def __init__(self, table: SessionTable, concurrency: int = SESSION_CONCURRENCY,
+                 max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL):
+        super().__init__(max_sessions, ttl)
+        self.table = table
+        self.concurrency = concurrency
+        # last_seen is written at most this often per session
+        self.touch_interval = min(60.0, ttl / 10)
+
+    def __len__(self):
+        return len(self.table)
+
+    def add(self, session: Session) -> bool:
+        self.table.add(session.id, session.protocol_version, session.profile, self.max_sessions)
+        self._sessions[session.id] = session
+        return True
+
+    def get(self, session_id: str) -> Optional[Session]:
+        row = self.table.get(session_id)
+        if row is None or time.time() - row[2] > self.ttl:
+            self._sessions.pop(session_id, None)
+            return None
+        protocol_version, profile, last_seen = row
+        if time.time() - last_seen > self.touch_interval:
+            self.table.touch(session_id)
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Session(protocol_version, profile, self.concurrency, session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        self._sessions.pop(session_id, None)
+        return self.table.remove(session_id)
+
+    def expire(self) -> int:
+        expired = self.table.expire(self.ttl)
+        # Forget local copies of sessions this worker has not seen for a while
+        super().expire()
+        return expired
+
+
+def _rpc_result(request_id, result) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _rpc_error(request_id, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RawJson:
+    """A pre-serialized JSON fragment spliced into a response without re-encoding"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _encode(message) -> str:
+    if isinstance(message, RawJson):
+        return message.text
+    return json.dumps(message, default=str)
+
+
+class McpHttpApp:
+    """ASGI application serving MCP over Streamable HTTP"""
+
+    def __init__(self, runtime=None, profiles: Optional[ToolProfiles] = None,
+                 session_concurrency: int = SESSION_CONCURRENCY, sessions: Optional[SessionStore] = None,
+                 auth_token: str = AUTH_TOKEN, config_path: Optional[Path] = DEFAULT_CONFIG_PATH,
+                 cache: Optional[SharedCache] = None, webhook_secret: str = WEBHOOK_SECRET):
+        self.config_path = config_path
+        if runtime is None:
+            from mcp_server.common.runtime import ProviderRuntime
+            runtime = ProviderRuntime(load_config(config_path))
+        self.runtime = runtime
+        self.profiles = profiles or self._build_profiles(runtime.config)
+        self.session_concurrency = session_concurrency
+        self.sessions = sessions if sessions is not None else SessionStore()
+        self.auth_token = auth_token
+        self.webhook_secret = webhook_secret
+        self.cache = cache if cache is not None and cache.enabled else None
+        self.cache_namespace = config_namespace(runtime.config)
+        self._background: List[asyncio.Task] = []
+
+    @staticmethod
+    def _build_profiles(config) -> ToolProfiles:
+        try:
+            return ToolProfiles(config.tool_profiles, default=config.tool_profile)
+        except ValueError as e:
+            logger.warning(f"Invalid tool profile configuration, serving all tools: {e}")
+            return ToolProfiles()
+
+    # ASGI entry point
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        status, response_headers, body = await self.handle(scope['method'], scope['path'], headers, receive)
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in response_headers.items()]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for task in self._background:
+                    task.cancel()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self) -> None:
+        """Size the shared provider thread pool and start background upkeep"""
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=PROVIDER_THREADS, thread_name_prefix='provider'))
+        self._background.append(loop.create_task(self._expire_sessions()))
+        if CONFIG_RELOAD_INTERVAL > 0 and self.config_path:
+            self._background.append(loop.create_task(self._watch_config()))
+
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.sessions.ttl))
+            self.sessions.expire()
+
+    async def _watch_config(self):
+        watcher = ConfigWatcher(self.config_path)
+        while True:
+            await asyncio.sleep(CONFIG_RELOAD_INTERVAL)
+            if watcher.changed():
+                self.reload_config()
+
+    def reload_config(self):
+        """Re-read config.yaml; in-flight calls finish on the providers they started with"""
+        try:
+            config = load_config(self.config_path)
+        except ValueError as e:
+            logger.warning(f"Keeping previous configuration: {e}")
+            return frozenset()
+        changed = self.runtime.reload(config)
+        self.cache_namespace = config_namespace(config)
+        if 'tool_profiles' in changed:
+            self.profiles = self._build_profiles(config)
+        return changed
+
+    # HTTP layer
+
+    async def handle(self, method: str, path: str, headers: Dict[str, str], receive) -> Tuple[int, Dict, bytes]:
+        if path == '/health' and method == 'GET':
+            return self._json(200, {'status': 'healthy', 'sessions': len(self.sessions),
+                                    'platform': self.runtime.config.platform})
+        if path == WEBHOOK_PATH and method == 'POST':
+            return self._bitbucket_webhook(headers, await self._read_body(receive))
+        if path != MCP_PATH:
+            return self._json(404, {'error': 'Not found'})
+        if not self._origin_allowed(headers.get('origin')):
+            return self._json(403, {'error': 'Origin not allowed'})
+        if self.auth_token and headers.get('authorization') != f'Bearer {self.auth_token}':
+            return self._json(401, {'error': 'Unauthorized'})
+
+        if method == 'DELETE':
+            removed = self.sessions.remove(headers.get(SESSION_HEADER, ''))
+            return 200 if removed else 404, {}, b''
+        if method != 'POST':
+            # No server-initiated SSE stream
+            return 405, {'allow': 'POST, DELETE'}, b''
+
+        body = await self._read_body(receive)
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return self._json(400, _rpc_error(None, PARSE_ERROR, 'Parse error'))
+        return await self.handle_payload(payload, headers)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def _bitbucket_webhook(self, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict, bytes]:
+        """Refresh the existing mirror of the repository a Bitbucket Cloud or Data Center webhook names.
+
+        Webhooks are signed with BITBUCKET_WEBHOOK_SECRET or, without one, carry the
+        MCP_HTTP_TOKEN bearer token; with neither configured they are refused. A webhook
+        only fetches into a mirror that is already cloned; first clones start on reads.
+        """
+        if self.webhook_secret:
+            expected = 'sha256=' + hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(headers.get('x-hub-signature', ''), expected):
+                return self._json(401, {'error': 'Invalid signature'})
+        elif self.auth_token:
+            if not hmac.compare_digest(headers.get('authorization', ''), f'Bearer {self.auth_token}'):
+                return self._json(401, {'error': 'Unauthorized'})
+        else:
+            return self._json(403, {'error': 'Webhooks need BITBUCKET_WEBHOOK_SECRET or MCP_HTTP_TOKEN'})
+        try:
+            repository = json.loads(body).get('repository')
+        except (ValueError, UnicodeDecodeError, AttributeError):
+            return self._json(400, {'error': 'Invalid payload'})
+        if not isinstance(repository, dict):
+            # Test pings and events without a repository
+            return self._json(202, {'refreshing': False})
+        # Data Center sends the slug, Cloud the workspace/slug full name
+        slug = repository.get('slug') or str(repository.get('full_name') or '').rsplit('/', 1)[-1]
+        mirrors = getattr(self.runtime.current.bitbucket, 'mirrors', None)
+        refreshing = bool(slug) and mirrors is not None and mirrors.refresh(slug, clone=False)
+        return self._json(202, {'repository': slug, 'refreshing': refreshing})
+
+    @staticmethod
+    def _origin_allowed(origin: Optional[str]) -> bool:
+        # Browsers send Origin; rejecting foreign ones prevents DNS rebinding attacks
+        if not origin or origin in ALLOWED_ORIGINS:
+            return True
+        return urlparse(origin).hostname in ('localhost', '127.0.0.1', '::1')
+
+    @staticmethod
+    def _json(status: int, payload, extra_headers: Optional[Dict] = None) -> Tuple[int, Dict, bytes]:
+        headers = {'content-type': 'application/json', **(extra_headers or {})}
+        if isinstance(payload, list):
+            text = '[' + ','.join(_encode(m) for m in payload) + ']'
+        else:
+            text = _encode(payload)
+        return status, headers, text.encode('utf-8')
+
+    # JSON-RPC layer
+
+    async def handle_payload(self, payload, headers: Dict[str, str]) -> Tuple[int, Dict, bytes]:
+        messages = payload if isinstance(payload, list) else [payload]
+        if not messages or not all(isinstance(m, dict) for m in messages):
+            return self._json(400, _rpc_error(None, INVALID_REQUEST, 'Invalid Request'))
+
+        if any(m.get('method') == 'initialize' for m in messages):
+            if len(messages) != 1:
+                return self._json(400, _rpc_error(None, INVALID_REQUEST, 'initialize must not be batched'))
+            return self._initialize(messages[0], headers)
+
+        session_id = headers.get(SESSION_HEADER)
+        if not session_id:
+            return self._json(400, _rpc_error(None, INVALID_REQUEST, 'Missing Mcp-Session-Id header'))
+        session = self.sessions.get(session_id)
+        if session is None:
+            # 404 tells the client to start a new session
+            return self._json(404, _rpc_error(None, INVALID_REQUEST, 'Session not found'))
+
+        requests = [m for m in messages if 'method' in m and 'id' in m]
+        if not requests:
+            # Notifications and client responses only
+            return 202, {}, b''
+        responses = await asyncio.gather(*(self._dispatch(session, m) for m in requests))
+        return self._json(200, responses if isinstance(payload, list) else responses[0])
+
+    def _initialize(self, message: Dict, headers: Dict[str, str]) -> Tuple[int, Dict, bytes]:
+        params = message.get('params') or {}
+        requested = params.get('protocolVersion')
+        version = requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0]
+        profile = headers.get(PROFILE_HEADER) or self.profiles.default
+        if not self.profiles.exists(profile):
+            return self._json(400, _rpc_error(message.get('id'), INVALID_PARAMS, f"Unknown tool profile: {profile}"))
+        session = Session(version, profile, self.session_concurrency)
+        if not self.sessions.add(session):
+            return self._json(503, _rpc_error(message.get('id'), INVALID_REQUEST, 'Too many sessions'))
+        result = {
+            'protocolVersion': version,
+            'capabilities': {'tools': {'listChanged': False}, 'resources': {}},
+            'serverInfo': {'name': SERVER_NAME, 'version': SERVER_VERSION},
+        }
+        return self._json(200, _rpc_result(message.get('id'), result), {SESSION_HEADER: session.id})
+
+    async def _dispatch(self, session: Session, message: Dict):
+        request_id = message.get('id')
+        method = message.get('method')
+        params = message.get('params') or {}
+        if method == 'ping':
+            return _rpc_result(request_id, {})
+        if method == 'tools/list':
+            # Splice the profile's precomputed catalog body ({"tools": [...]}) into the response
+            body = self.profiles.catalog(session.profile).body
+            return RawJson(f'{{"jsonrpc":"2.0","id":{json.dumps(request_id)},"result":{body}}}')
+        if method == 'tools/call':
+            if not isinstance(params.get('name'), str):
+                return _rpc_error(request_id, INVALID_PARAMS, 'params.name is required')
+            return _rpc_result(request_id, await self._call_tool(session, params['name'], params.get('arguments') or {}))
+        if method == 'resources/list':
+            return _rpc_result(request_id, {'resources': RESOURCES})
+        if method == 'resources/read':
+            return await self._read_resource(session, request_id, params.get('uri', ''))
+        return _rpc_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def _call_tool(self, session: Session, name: str, arguments: Dict[str, Any]) -> Dict:
+        if not self.profiles.allows(session.profile, name):
+            return _tool_result(f"Tool '{name}' is not available in tool profile '{session.profile}'", True)
+        spec = REGISTRY.get(name)
+        key = None
+        if self.cache is not None and spec and spec.cacheable:
+            key = self.cache.key(self.cache_namespace, name, arguments)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return _tool_result(cached, False)
+        session.in_flight += 1
+        try:
+            async with session.semaphore:
+                with self.runtime.acquire() as providers:
+                    # Providers block on HTTP, so each call runs on the shared worker pool
+                    result = await run_in_thread(route_tool_call(
+                        name, arguments, providers.jira, providers.confluence, providers.bitbucket))
+        except Exception as e:
+            logger.warning(f"Tool {name} failed: {e}")
+            return _tool_result(str(e), True)
+        finally:
+            session.in_flight -= 1
+        is_error = isinstance(result, dict) and 'error' in result
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        if self.cache is not None and spec and not spec.read_only:
+            # A write may change anything a cached read returned
+            await asyncio.to_thread(self.cache.clear)
+        elif key and not is_error:
+            await asyncio.to_thread(self.cache.set, key, text)
+        return _tool_result(text, is_error)
+
+    async def _read_resource(self, session: Session, request_id, uri: str):
+        service = uri[len('atlassian://'):].split('/', 1)[0] if uri.startswith('atlassian://') else None
+        if service not in ('jira', 'confluence', 'bitbucket'):
+            return _rpc_error(request_id, INVALID_PARAMS, f"Unknown resource: {uri}")
+        async with session.semaphore:
+            with self.runtime.acquire() as providers:
+                text = await run_in_thread(getattr(providers, service).get_resource(uri))
+        return _rpc_result(request_id, {'contents': [{'uri': uri, 'mimeType': 'application/json', 'text': str(text)}]})
+
+
+def _tool_result(text: str, is_error: bool) -> Dict:
+    return {'content': [{'type': 'text', 'text': text}], 'isError': is_error}
+
+
+def create_app() -> McpHttpApp:
+    """App factory for uvicorn; every worker process calls it once"""
+    state_path = os.getenv(STATE_DB_ENV)
+    if not state_path:
+        return McpHttpApp()
+    sessions = None
+    if int(os.getenv(WORKERS_ENV, '1')) > 1:
+        sessions = SharedSessionStore(SessionTable(state_path))
+    return McpHttpApp(sessions=sessions, cache=SharedCache(state_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Atlassian MCP server over Streamable HTTP')
+    parser.add_argument('--host', default=os.getenv('MCP_HTTP_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('MCP_HTTP_PORT', '8080')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv(WORKERS_ENV, '1')),
+                        help='worker processes sharing the listening socket')
+    args = parser.parse_args()
+
+    import uvicorn
+    logging.basicConfig(level=logging.INFO)
+    # Workers inherit the environment, which is how they find the shared state file
+    os.environ[WORKERS_ENV] = str(args.workers)
+    # Workers need the shared state file; a single process uses it only if asked to
+    owns_state = STATE_DB_ENV not in os.environ and args.workers > 1
+    if owns_state:
+        state_path = default_state_path()
+        os.environ[STATE_DB_ENV] = str(state_path)
+    # uvicorn re-raises SIGTERM after a graceful shutdown; exit normally so the state file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        uvicorn.run('mcp_server.http_server:create_app', factory=True, host=args.host, port=args.port,
+                    workers=args.workers, log_level='warning')
+    finally:
+        if owns_state:
+            for suffix in ('', '-wal', '-shm'):
+                Path(f'{state_path}{suffix}').unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,144 +1,99 @@
 import asyncio
+import logging
 import os
 import sys
-import yaml
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def load_config_to_env():
-    """Load config.yaml and set environment variables if they don't exist"""
-    config_path = Path(__file__).parent.parent / 'config.yaml'
-    if not config_path.exists():
-        return  # No config file, use existing environment variables
-    
-    try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        # Load Cloud credentials if present
-        cloud = config.get('cloud', {})
-        if not os.getenv('ATLASSIAN_BASE_URL') and cloud.get('atlassian_base_url'):
-            os.environ['ATLASSIAN_BASE_URL'] = cloud['atlassian_base_url']
-        if not os.getenv('ATLASSIAN_USERNAME') and cloud.get('atlassian_username'):
-            os.environ['ATLASSIAN_USERNAME'] = cloud['atlassian_username']
-        if not os.getenv('ATLASSIAN_API_TOKEN') and cloud.get('atlassian_api_token'):
-            os.environ['ATLASSIAN_API_TOKEN'] = cloud['atlassian_api_token']
-        if not os.getenv('BITBUCKET_WORKSPACE') and cloud.get('bitbucket_workspace'):
-            os.environ['BITBUCKET_WORKSPACE'] = cloud['bitbucket_workspace']
-        if not os.getenv('BITBUCKET_API_TOKEN') and cloud.get('bitbucket_api_token'):
-            os.environ['BITBUCKET_API_TOKEN'] = cloud['bitbucket_api_token']
-        
-        # Load Data Center credentials if present
-        dc = config.get('datacenter', {})
-        # Jira DC
-        if not os.getenv('JIRA_BASE_URL') and dc.get('jira_base_url'):
-            os.environ['JIRA_BASE_URL'] = dc['jira_base_url']
-        if not os.getenv('JIRA_PAT_TOKEN') and dc.get('jira_pat_token'):
-            os.environ['JIRA_PAT_TOKEN'] = dc['jira_pat_token']
-        # Confluence DC
-        if not os.getenv('CONFLUENCE_BASE_URL') and dc.get('confluence_base_url'):
-            os.environ['CONFLUENCE_BASE_URL'] = dc['confluence_base_url']
-        if not os.getenv('CONFLUENCE_PAT_TOKEN') and dc.get('confluence_pat_token'):
-            os.environ['CONFLUENCE_PAT_TOKEN'] = dc['confluence_pat_token']
-        # Bitbucket DC
-        if not os.getenv('BITBUCKET_BASE_URL') and dc.get('bitbucket_base_url'):
-            os.environ['BITBUCKET_BASE_URL'] = dc['bitbucket_base_url']
-        if not os.getenv('BITBUCKET_PAT_TOKEN') and dc.get('bitbucket_pat_token'):
-            os.environ['BITBUCKET_PAT_TOKEN'] = dc['bitbucket_pat_token']
-        if not os.getenv('BITBUCKET_PROJECT') and dc.get('bitbucket_project'):
-            os.environ['BITBUCKET_PROJECT'] = dc['bitbucket_project']
-    
-    except Exception as e:
-        print(f"Warning: Could not load config.yaml: {e}")
-
-# Load config before importing providers
-load_config_to_env()
-
-# Load ticket support agent config
-def load_ticket_support_config():
-    """Load ticket support agent configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent / 'config.yaml'
-    if not config_path.exists():
-        return None, None, None, None, None, None, None, None, None
-    
-    try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        agent_config = config.get('ticket_support_agent', {})
-        primary_team_members = agent_config.get('primary_team_members', [])
-        secondary_team_members = agent_config.get('secondary_team_members', [])
-        template_mapping = agent_config.get('template_mapping', {})
-        excluded_issue_types = agent_config.get('excluded_issue_types', [])
-        workload_statuses = agent_config.get('workload_statuses')
-        support_jql = agent_config.get('support_jql', 'assignee is EMPTY AND status = Open ORDER BY created DESC')
-        troubleshooting_parent = agent_config.get('troubleshooting_parent')
-        alert_expertise_jql = agent_config.get('alert_expertise_jql')
-        other_expertise_jql = agent_config.get('other_expertise_jql')
-        
-        return primary_team_members, secondary_team_members, template_mapping, excluded_issue_types, workload_statuses, support_jql, troubleshooting_parent, alert_expertise_jql, other_expertise_jql
-    except Exception as e:
-        print(f"Warning: Could not load ticket support agent config: {e}")
-        return None, None, None, None, None, None, None, None, None
-
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Resource, Tool, TextContent
-from mcp_server.cloud.bitbucket_provider import BitbucketProvider
-from mcp_server.cloud.confluence_provider import ConfluenceProvider
-from mcp_server.cloud.jira_provider import JiraProvider
-from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
-from mcp_server.datacenter.confluence_dc_provider import ConfluenceDCProvider
-from mcp_server.datacenter.jira_dc_provider import JiraDCProvider
-from mcp_server.common.tools import JIRA_TOOLS, CONFLUENCE_TOOLS, BITBUCKET_TOOLS, TICKET_SUPPORT_TOOLS
-from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+from mcp_server.common.config import DEFAULT_CONFIG_PATH, ConfigWatcher, load_config
+from mcp_server.common.profiles import ToolProfiles
 from mcp_server.common.router import route_tool_call
+from mcp_server.common.runtime import ProviderRuntime
+from mcp_server.common.schema_validation import get_validators
+
+# Seconds between config.yaml change checks (0 disables hot reload)
+CONFIG_RELOAD_INTERVAL = float(os.getenv('MCP_CONFIG_RELOAD_INTERVAL', '2'))
+
+# stdout carries the JSON-RPC stream, so all diagnostics go to stderr
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
 
 server = Server("atlassian-mcp")
 
-# Detect platform: Check DEPLOYMENT_TYPE env var first, then config.yaml, then fall back to token detection
-PLATFORM = os.getenv('DEPLOYMENT_TYPE', '').lower()
-if not PLATFORM:
-    # Check config.yaml for deployment_type
-    config_path = Path(__file__).parent.parent / 'config.yaml'
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                PLATFORM = config.get('deployment_type', '').lower()
-        except:
-            pass
-    
-    # Fall back to token-based detection if still not set
-    if not PLATFORM:
-        PLATFORM = 'datacenter' if (os.getenv('JIRA_PAT_TOKEN') or os.getenv('CONFLUENCE_PAT_TOKEN') or os.getenv('BITBUCKET_PAT_TOKEN')) else 'cloud'
-
-# Initialize providers based on platform (providers handle their own availability)
-if PLATFORM == 'datacenter':
-    jira = JiraDCProvider()
-    confluence = ConfluenceDCProvider()
-    bitbucket = BitbucketDCProvider()
-else:
-    jira = JiraProvider()
-    confluence = ConfluenceProvider()
-    bitbucket = BitbucketProvider()
-
-# Initialize ticket support agent if configured
-primary_team_members, secondary_team_members, template_mapping, excluded_issue_types, workload_statuses, support_jql, troubleshooting_parent, alert_expertise_jql, other_expertise_jql = load_ticket_support_config()
-if primary_team_members and secondary_team_members and 'pytest' not in sys.modules and 'test_' not in sys.argv[0]:
+# config.yaml and the environment are parsed once; the environment wins
+try:
+    config = load_config(DEFAULT_CONFIG_PATH)
+except ValueError as e:
+    logger.warning(f"Could not load config.yaml: {e}")
+    config = load_config(None)
+PLATFORM = config.platform
+
+def build_tool_list(config):
+    """Tool profiles and the advertised Tool objects for a configuration"""
+    try:
+        profiles = ToolProfiles(config.tool_profiles, default=config.tool_profile)
+    except ValueError as e:
+        logger.warning(f"Invalid tool profile configuration, serving all tools: {e}")
+        profiles = ToolProfiles()
+    tools = [Tool(name=t["name"], description=t["description"], inputSchema=t["inputSchema"]) for t in profiles.catalog().tools]
+    if profiles.default != 'all':
+        logger.info(f"Tool profile '{profiles.default}': {len(tools)} tools")
+    return profiles, tools
+
+def init_ticket_support(config, confluence):
+    """Initialize the ticket support agent if configured (skipped under test)"""
+    agent = config.ticket_support
+    if not agent.enabled or 'pytest' in sys.modules or 'test_' in sys.argv[0]:
+        return False
     from mcp_server.common.ticket_support_tools import initialize_agent
-    initialize_agent(primary_team_members, secondary_team_members, template_mapping, confluence, excluded_issue_types, workload_statuses, support_jql, troubleshooting_parent, alert_expertise_jql, other_expertise_jql)
-    print(f"Ticket support agent initialized with {len(primary_team_members)} primary + {len(secondary_team_members)} secondary team members")
-    if template_mapping:
-        print(f"Template mapping configured for {len(template_mapping)} issue types")
-    if troubleshooting_parent:
-        print(f"Troubleshooting docs parent page: {troubleshooting_parent}")
-    if alert_expertise_jql:
-        print(f"Alert expertise JQL configured")
-    if other_expertise_jql:
-        print(f"Other expertise JQL configured")
+    initialize_agent(*agent.agent_args(confluence))
+    logger.info(f"Ticket support agent initialized with {len(agent.primary_team_members)} primary + {len(agent.secondary_team_members)} secondary team members")
+    if agent.template_mapping:
+        logger.info(f"Template mapping configured for {len(agent.template_mapping)} issue types")
+    if agent.troubleshooting_parent:
+        logger.info(f"Troubleshooting docs parent page: {agent.troubleshooting_parent}")
+    if agent.alert_expertise_jql:
+        logger.info("Alert expertise JQL configured")
+    if agent.other_expertise_jql:
+        logger.info("Other expertise JQL configured")
+    return True
+
+# Providers for the detected platform (providers handle their own availability); rebuilt on reload
+runtime = ProviderRuntime(config, init_agent=init_ticket_support)
+
+# Tool objects are built once per configuration; the catalog never changes between reloads
+profiles, TOOLS = build_tool_list(config)
+# Compile argument validators up front rather than on the first call
+get_validators()
+
+def reload_config():
+    """Re-read config.yaml and rebuild only what changed; in-flight calls finish on the old providers"""
+    global config, profiles, TOOLS
+    try:
+        new_config = load_config(DEFAULT_CONFIG_PATH)
+    except ValueError as e:
+        logger.warning(f"Keeping previous configuration: {e}")
+        return frozenset()
+    changed = runtime.reload(new_config)
+    if 'tool_profiles' in changed:
+        profiles, TOOLS = build_tool_list(new_config)
+    config = new_config
+    if changed:
+        logger.info(f"Configuration reloaded: {', '.join(sorted(changed))}")
+    return changed
+
+async def watch_config(interval=CONFIG_RELOAD_INTERVAL):
+    """Poll config.yaml and hot-reload on change"""
+    watcher = ConfigWatcher(DEFAULT_CONFIG_PATH)
+    while True:
+        await asyncio.sleep(interval)
+        if watcher.changed():
+            reload_config()
 
 @server.list_resources()
 async def list_resources() -> list[Resource]:
@@ -162,28 +117,36 @@ async def list_resources() -> list[Resource]:
 
 @server.read_resource()
 async def read_resource(uri: str) -> str:
-    if uri.startswith("atlassian://bitbucket/"):
-        return await bitbucket.get_resource(uri)
-    elif uri.startswith("atlassian://confluence/"):
-        return await confluence.get_resource(uri)
-    elif uri.startswith("atlassian://jira/"):
-        return await jira.get_resource(uri)
-    else:
-        raise ValueError(f"Unknown resource: {uri}")
+    with runtime.acquire() as providers:
+        if uri.startswith("atlassian://bitbucket/"):
+            return await providers.bitbucket.get_resource(uri)
+        elif uri.startswith("atlassian://confluence/"):
+            return await providers.confluence.get_resource(uri)
+        elif uri.startswith("atlassian://jira/"):
+            return await providers.jira.get_resource(uri)
+        else:
+            raise ValueError(f"Unknown resource: {uri}")
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
-    all_tools = JIRA_TOOLS + CONFLUENCE_TOOLS + BITBUCKET_TOOLS + TICKET_SUPPORT_TOOLS
-    return [Tool(name=t["name"], description=t["description"], inputSchema=TOOL_SCHEMAS.get(t["name"], {"type": "object", "properties": {}})) for t in all_tools]
+    return TOOLS
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    result = await route_tool_call(name, arguments, jira, confluence, bitbucket)
+    if not profiles.allows(None, name):
+        raise ValueError(f"Tool '{name}' is not available in tool profile '{profiles.default}'")
+    with runtime.acquire() as providers:
+        result = await route_tool_call(name, arguments, providers.jira, providers.confluence, providers.bitbucket)
     return [TextContent(type="text", text=str(result))]
 
 async def main():
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    watcher = asyncio.create_task(watch_config()) if CONFIG_RELOAD_INTERVAL > 0 else None
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        if watcher:
+            watcher.cancel()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Unit tests for local assignee scoring"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mcp_server.agents.assignee_scoring import AssigneeScorer, FEATURES
+
+
+def _candidate(name, load, category=0, prefix=0, primary=1):
+    return {
+        'member': {'account_id': name, 'name': name},
+        'current_load': load,
+        'category_resolutions': category,
+        'prefix_matches': prefix,
+        'primary_team': primary
+    }
+
+
+def test_rank_prefers_lower_load():
+    scorer = AssigneeScorer()
+    ranking = scorer.rank([_candidate('busy', 8), _candidate('free', 1)], top_k=2)
+
+    assert [r['member']['account_id'] for r in ranking] == ['free', 'busy']
+    assert ranking[0]['rank'] == 1
+
+
+def test_rank_rewards_related_history():
+    scorer = AssigneeScorer()
+    ranking = scorer.rank([_candidate('new', 2), _candidate('expert', 3, category=10, prefix=4)], top_k=1)
+
+    assert len(ranking) == 1
+    assert ranking[0]['member']['account_id'] == 'expert'
+
+
+def test_rank_prefers_primary_team_on_equal_load():
+    scorer = AssigneeScorer()
+    ranking = scorer.rank([_candidate('secondary', 2, primary=0), _candidate('primary', 2)], top_k=2)
+
+    assert ranking[0]['member']['account_id'] == 'primary'
+
+
+def test_rank_breaks_ties_by_lower_load():
+    scorer = AssigneeScorer({'current_load': 0.0})
+    ranking = scorer.rank([_candidate('a', 5), _candidate('b', 1)], top_k=2)
+
+    assert ranking[0]['member']['account_id'] == 'b'
+
+
+def test_breakdown_contributions_sum_to_score():
+    scorer = AssigneeScorer()
+    ranking = scorer.rank([_candidate('a', 3, category=5, prefix=2)], top_k=1)
+
+    breakdown = ranking[0]['breakdown']
+    assert set(breakdown) == set(FEATURES)
+    assert breakdown['current_load'] == {'value': 3, 'contribution': -3.0}
+    assert sum(b['contribution'] for b in breakdown.values()) == pytest.approx(ranking[0]['score'], abs=1e-3)
+
+
+def test_rank_empty_candidates():
+    assert AssigneeScorer().rank([], top_k=3) == []
+
+
+def test_unknown_weight_rejected():
+    with pytest.raises(ValueError, match="Unknown scoring features"):
+        AssigneeScorer({'seniority': 1.0})
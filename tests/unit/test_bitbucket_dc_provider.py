@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import Mock, patch
 from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
+from mcp_server.common.object_cache import ObjectCache
+from mcp_server.common.repo_catalog import RepoCatalogCache
 
 
 @pytest.fixture
@@ -10,6 +12,8 @@ def bitbucket_dc_provider():
             provider = BitbucketDCProvider()
             provider.base_url = "https://bitbucket.company.com"
             provider.auth.get_auth_headers = Mock(return_value={"Authorization": "Bearer token"})
+            provider.objects = ObjectCache(max_bytes=0)
+            provider.repo_catalogs = RepoCatalogCache()
             return provider
 
 
@@ -222,3 +226,284 @@ async def test_create_webhook_success(bitbucket_dc_provider, mock_response):
     
     assert result["url"] == "https://example.com/hook"
     bitbucket_dc_provider.session.post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_search_files_pages_full_tree_and_reuses_commit_index(bitbucket_dc_provider):
+    from mcp_server.common.path_index import PathIndexCache
+    bitbucket_dc_provider.path_indexes = PathIndexCache()
+
+    def page(payload):
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.json = Mock(return_value=payload)
+        return response
+
+    def get(url, params=None, **kwargs):
+        if url.endswith("/commits"):
+            return page({"values": [{"id": "b" * 40}]})
+        if params.get("start"):
+            return page({"values": ["src/main/App.java"], "isLastPage": True})
+        return page({"values": ["README.md", "src/main/AppConfig.java"], "isLastPage": False, "nextPageStart": 2})
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.search_files("test-repo", "apcfg", match="fuzzy")
+    assert result["files"] == ["src/main/AppConfig.java"]
+    assert result["total_files"] == 3
+    assert bitbucket_dc_provider.session.get.call_count == 3
+
+    result = await bitbucket_dc_provider.search_files("test-repo", "APP")
+    assert result["files"] == ["src/main/App.java", "src/main/AppConfig.java"]
+    assert bitbucket_dc_provider.session.get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_immutable_objects_are_served_from_object_cache(bitbucket_dc_provider, tmp_path):
+    bitbucket_dc_provider.objects = ObjectCache(tmp_path)
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.text = "diff"
+    response.json = Mock(return_value={"id": "abc1234"})
+    response.status_code = 200
+    response.headers = {}
+    response.iter_content = Mock(side_effect=lambda size: iter([b"line"]))
+    bitbucket_dc_provider.session.get = Mock(return_value=response)
+
+    for _ in range(2):
+        assert (await bitbucket_dc_provider.get_commit_diff("test-repo", "abc1234"))["diff"] == "diff"
+        assert (await bitbucket_dc_provider.compare_commits("test-repo", "abc1234", "def5678"))["diff"] == "diff"
+        assert (await bitbucket_dc_provider.get_commit("test-repo", "abc1234"))["id"] == "abc1234"
+        assert (await bitbucket_dc_provider.get_file_content("test-repo", "README.md", "b" * 40))["content"] == "line"
+    assert bitbucket_dc_provider.session.get.call_count == 4
+
+    # Another account's token never reads these objects
+    bitbucket_dc_provider.auth.pat_token = "other-token"
+    await bitbucket_dc_provider.get_commit("test-repo", "abc1234")
+    assert bitbucket_dc_provider.session.get.call_count == 5
+
+
+def _json_response(payload):
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.json = Mock(return_value=payload)
+    return response
+
+
+def _raw_response(body, status_code=200, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.raise_for_status = Mock()
+    response.iter_content = Mock(side_effect=lambda size: (body[i:i + size] for i in range(0, len(body), size)))
+    return response
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_streams_raw_line_window(bitbucket_dc_provider):
+    body = b"".join(f"SELECT {n};\n".encode() for n in range(1, 50001))
+    response = _raw_response(body, headers={"Content-Length": str(len(body))})
+    bitbucket_dc_provider.session.get = Mock(return_value=response)
+
+    result = await bitbucket_dc_provider.get_file_content("test-repo", "db/schema.sql", "main", start_line=3, end_line=4)
+
+    assert result["content"] == "SELECT 3;\nSELECT 4;\n"
+    assert result["size"] == len(body)
+    assert result["path"] == "db/schema.sql"
+    url = bitbucket_dc_provider.session.get.call_args[0][0]
+    assert url.endswith("/repos/test-repo/raw/db/schema.sql")
+    assert bitbucket_dc_provider.session.get.call_args[1]["stream"] is True
+    response.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_byte_window_uses_range_request(bitbucket_dc_provider):
+    response = _raw_response(b"0123456789A", status_code=206, headers={"Content-Range": "bytes 100-110/5000"})
+    bitbucket_dc_provider.session.get = Mock(return_value=response)
+
+    result = await bitbucket_dc_provider.get_file_content("test-repo", "big.log", "main", byte_offset=100, max_bytes=10)
+
+    assert bitbucket_dc_provider.session.get.call_args[1]["headers"]["Range"] == "bytes=100-110"
+    assert result["content"] == "0123456789"
+    assert result["truncated"] is True
+    assert result["next_byte_offset"] == 110
+    assert result["size"] == 5000
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_reports_binary_files(bitbucket_dc_provider):
+    bitbucket_dc_provider.session.get = Mock(return_value=_raw_response(b"\x7fELF\x00\x00" + b"\x00" * 100,
+                                                                       headers={"Content-Length": "106"}))
+
+    result = await bitbucket_dc_provider.get_file_content("test-repo", "bin/tool", "main")
+
+    assert result == {"binary": True, "size": 106, "path": "bin/tool"}
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_rejects_invalid_windows(bitbucket_dc_provider):
+    result = await bitbucket_dc_provider.get_file_content("test-repo", "a.sql", "main", start_line=5, end_line=2)
+    assert "end_line" in result["error"]
+    result = await bitbucket_dc_provider.get_file_content("test-repo", "a.sql", "main", start_line=1, byte_offset=0)
+    assert "not both" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_structured_compare_fetches_changes_then_file_diffs(bitbucket_dc_provider):
+    changes = {"values": [
+        {"path": {"toString": "src/New.java"}, "srcPath": {"toString": "src/Old.java"}, "type": "MOVE"},
+        {"path": {"toString": "dist/app.min.js"}, "type": "MODIFY"},
+        {"path": {"toString": "README.md"}, "type": "MODIFY"},
+    ], "isLastPage": True}
+    file_diff = {"diffs": [{"source": {"toString": "src/Old.java"}, "destination": {"toString": "src/New.java"}, "hunks": [
+        {"sourceLine": 1, "sourceSpan": 1, "destinationLine": 1, "destinationSpan": 1, "segments": [
+            {"type": "REMOVED", "lines": [{"line": "int x;"}]}, {"type": "ADDED", "lines": [{"line": "long x;"}]}]}]}]}
+    requested = []
+
+    def get(url, headers=None, params=None, timeout=None):
+        requested.append((url.split("/compare/")[1], dict(params)))
+        return _json_response(changes if url.endswith("/compare/changes") else file_diff)
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.compare_commits("test-repo", "abc1234", "def5678", structured=True,
+                                                         ignore_whitespace=True, limit=2)
+
+    assert [f["path"] for f in result["files"]] == ["src/New.java", "dist/app.min.js"]
+    assert result["files"][0]["hunks"][0]["lines"] == ["-int x;", "+long x;"]
+    assert (result["files"][0]["additions"], result["files"][0]["deletions"]) == (1, 1)
+    assert result["files"][1]["skipped"] == "generated"
+    assert result["next_start"] == 2
+    assert "additions" not in result
+    assert requested[1] == ("diff/src/New.java", {"from": "abc1234", "to": "def5678", "whitespace": "ignore-all",
+                                                  "srcPath": "src/Old.java"})
+    assert len(requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_pull_request_summary_uses_cached_change_list(bitbucket_dc_provider, tmp_path):
+    bitbucket_dc_provider.objects = ObjectCache(tmp_path)
+    pr = {"id": 3, "title": "Rename", "state": "OPEN", "author": {"user": {"displayName": "Dev"}},
+          "fromRef": {"displayId": "feature", "latestCommit": "a" * 40},
+          "toRef": {"displayId": "main", "latestCommit": "b" * 40}}
+    changes = {"values": [
+        {"path": {"toString": "src/New.java"}, "srcPath": {"toString": "src/Old.java"}, "type": "MOVE"},
+        {"path": {"toString": "yarn.lock"}, "type": "MODIFY"},
+    ], "isLastPage": True}
+
+    def get(url, headers=None, params=None, timeout=None):
+        return _json_response(changes if url.endswith("/pull-requests/3/changes") else pr)
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.get_pull_request_summary("test-repo", 3)
+
+    assert result["pull_request"]["author"] == "Dev"
+    assert result["files"][0] == {"path": "src/New.java", "old_path": "src/Old.java", "status": "renamed",
+                                  "additions": None, "deletions": None, "generated": False}
+    assert result["generated_files"] == 1 and "additions" not in result
+    assert await bitbucket_dc_provider.get_pull_request_summary("test-repo", 3) == result
+    assert bitbucket_dc_provider.session.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_pr_review_bundle_reads_comments_from_one_activities_request(bitbucket_dc_provider):
+    dev = {"name": "dev", "slug": "dev", "displayName": "Dev", "emailAddress": "dev@example.com", "links": {}}
+    lead = {"name": "lead", "slug": "lead", "displayName": "Lead", "emailAddress": "lead@example.com"}
+    pr = {"id": 3, "title": "Fix", "state": "OPEN", "author": {"user": dev},
+          "fromRef": {"displayId": "fix", "latestCommit": "a" * 40}, "toRef": {"displayId": "main", "latestCommit": "b" * 40},
+          "reviewers": [{"user": lead, "approved": False, "status": "NEEDS_WORK"}]}
+    activities = {"values": [
+        {"action": "COMMENTED", "user": lead, "createdDate": 2, "commentAnchor": {"path": "A.java", "line": 9},
+         "comment": {"id": 10, "text": "why?", "author": lead, "comments": [{"id": 11, "text": "because", "author": dev}]}},
+        {"action": "OPENED", "user": dev, "createdDate": 1},
+    ]}
+    requested = []
+
+    def get(url, headers=None, params=None, timeout=None):
+        requested.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/pull-requests/3"):
+            return _json_response(pr)
+        if url.endswith("/activities"):
+            return _json_response(activities)
+        if url.endswith("/reviewers"):
+            return _json_response([lead])
+        assert url.endswith("/commits/" + "a" * 40)
+        return _json_response({"values": [{"key": "ci", "state": "FAILED"}]})
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.get_pr_review_bundle("test-repo", 3)
+
+    assert sorted(requested) == sorted(["3", "activities", "reviewers", "a" * 40])
+    assert set(result["users"]) == {"dev", "lead"}
+    assert result["users"]["lead"] == {"display_name": "Lead", "name": "lead", "email": "lead@example.com"}
+    assert result["pull_request"]["reviewers"] == [{"user": "lead", "approved": False, "status": "NEEDS_WORK"}]
+    assert [(c["id"], c["parent_id"], c["user"], c["path"]) for c in result["comments"]] == [
+        (10, None, "lead", "A.java"), (11, 10, "dev", "A.java")]
+    assert result["activity"][0] == {"type": "COMMENTED", "user": "lead", "date": 2, "comment_id": 10}
+    assert result["builds"] == [{"key": "ci", "name": None, "state": "FAILED", "url": None}]
+    assert result["default_reviewers"] == ["lead"]
+    assert result["errors"] == {}
+
+
+@pytest.mark.asyncio
+async def test_list_my_pull_requests_uses_dashboard_endpoint(bitbucket_dc_provider):
+    pr = {"id": 5, "title": "Fix", "state": "OPEN", "author": {"user": {"displayName": "Dev"}}, "updatedDate": 1700,
+          "fromRef": {"displayId": "fix"},
+          "toRef": {"displayId": "main", "repository": {"slug": "api", "project": {"key": "OTHER"}}},
+          "links": {"self": [{"href": "https://bitbucket.example.com/projects/OTHER/repos/api/pull-requests/5"}]}}
+    pages = [{"values": [pr], "isLastPage": False, "nextPageStart": 1}, {"values": [{**pr, "id": 6}], "isLastPage": True}]
+    requested = []
+
+    def get(url, headers=None, params=None, timeout=None):
+        requested.append((url, dict(params)))
+        return _json_response(pages[len(requested) - 1])
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.list_my_pull_requests()
+
+    assert requested[0][0].endswith("/rest/api/1.0/dashboard/pull-requests")
+    assert requested[0][1]["role"] == "REVIEWER" and requested[0][1]["state"] == "OPEN"
+    assert requested[1][1]["start"] == 1
+    assert result["count"] == 2
+    assert result["pull_requests"][0] == {
+        "project_key": "OTHER", "repo_slug": "api", "id": 5, "title": "Fix", "state": "OPEN", "author": "Dev",
+        "source_branch": "fix", "destination_branch": "main", "updated_date": 1700,
+        "url": "https://bitbucket.example.com/projects/OTHER/repos/api/pull-requests/5"}
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_name_in_project_and_stops_at_limit(bitbucket_dc_provider):
+    pages = [{"values": [{"slug": "api", "name": "api", "project": {"key": "PROJ"}}], "isLastPage": False, "nextPageStart": 1},
+             {"values": [{"slug": "api-docs", "name": "api-docs", "project": {"key": "PROJ"}}], "isLastPage": False, "nextPageStart": 2},
+             {"values": [{"slug": "api-gateway", "name": "api-gateway", "project": {"key": "PROJ"}}], "isLastPage": True}]
+    requested = []
+
+    def get(url, headers=None, params=None, timeout=None):
+        requested.append((url, dict(params)))
+        return _json_response(pages[len(requested) - 1])
+
+    bitbucket_dc_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_dc_provider.search("api", limit=2)
+
+    assert requested[0][0] == "https://bitbucket.company.com/rest/api/1.0/repos"
+    assert requested[0][1]["projectkey"] == "PROJ" and requested[0][1]["name"] == "api"
+    assert requested[1][1]["start"] == 1
+    # The third page is never requested
+    assert len(requested) == 2
+    assert [(r["project_key"], r["slug"]) for r in result["results"]] == [("PROJ", "api"), ("PROJ", "api-docs")]
+    assert "at least 1" in (await bitbucket_dc_provider.search("api", limit=0))["error"]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_catalog_is_per_project_and_credentials(bitbucket_dc_provider):
+    repos = {"values": [{"slug": "payments-service", "name": "payments-service", "project": {"key": "PROJ"}}], "isLastPage": True}
+    bitbucket_dc_provider.session.get = Mock(return_value=_json_response(repos))
+
+    result = await bitbucket_dc_provider.search("paymnts", match="fuzzy")
+    assert [r["slug"] for r in result["results"]] == ["payments-service"]
+    assert bitbucket_dc_provider.session.get.call_args.kwargs["params"]["projectkey"] == "PROJ"
+    await bitbucket_dc_provider.search("paymnts", match="fuzzy")
+    assert bitbucket_dc_provider.session.get.call_count == 1
+
+    # Another user's token gets its own catalog
+    bitbucket_dc_provider.auth.pat_token = "other-token"
+    await bitbucket_dc_provider.search("paymnts", match="fuzzy")
+    assert bitbucket_dc_provider.session.get.call_count == 2
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import Mock, patch
 from mcp_server.cloud.bitbucket_provider import BitbucketProvider
+from mcp_server.common.object_cache import ObjectCache
+from mcp_server.common.repo_catalog import RepoCatalogCache
 
 
 @pytest.fixture
@@ -9,6 +11,8 @@ def bitbucket_provider():
         with patch.dict('os.environ', {'BITBUCKET_API_TOKEN': 'token', 'BITBUCKET_WORKSPACE': 'workspace'}):
             provider = BitbucketProvider()
             provider.auth.username = "user@test.com"
+            provider.objects = ObjectCache(max_bytes=0)
+            provider.repo_catalogs = RepoCatalogCache()
             return provider
 
 
@@ -388,3 +392,371 @@ async def test_list_directory_success(bitbucket_provider, mock_response):
     
     assert "values" in result
     bitbucket_provider.session.get.assert_called_once()
+
+
+def _json_response(payload):
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.json = Mock(return_value=payload)
+    return response
+
+
+@pytest.mark.asyncio
+async def test_search_files_pages_full_tree_and_reuses_commit_index(bitbucket_provider):
+    from mcp_server.common.path_index import PathIndexCache
+    bitbucket_provider.path_indexes = PathIndexCache()
+    commit = "a" * 40
+    pages = {
+        "commits": _json_response({"values": [{"hash": commit}]}),
+        "page1": _json_response({"values": [{"path": "src", "type": "commit_directory"},
+                                            {"path": "src/app.py", "type": "commit_file"}],
+                                 "next": "https://api.bitbucket.org/page2"}),
+        "page2": _json_response({"values": [{"path": "docs/README.md", "type": "commit_file"}]}),
+    }
+
+    def get(url, **kwargs):
+        if "/commits/" in url:
+            return pages["commits"]
+        return pages["page2"] if url.endswith("page2") else pages["page1"]
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.search_files("test-repo", "*.md", "main", match="glob")
+    assert result["files"] == ["docs/README.md"]
+    assert result["commit"] == commit and result["total_files"] == 2
+    assert bitbucket_provider.session.get.call_count == 3
+
+    result = await bitbucket_provider.search_files("test-repo", "app", "main")
+    assert result["files"] == ["src/app.py"]
+    assert bitbucket_provider.session.get.call_count == 4  # only the branch was resolved again
+
+
+@pytest.mark.asyncio
+async def test_search_files_invalid_match(bitbucket_provider):
+    result = await bitbucket_provider.search_files("test-repo", "app", match="regex")
+    assert "Invalid match mode" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_immutable_objects_are_served_from_object_cache(bitbucket_provider, tmp_path):
+    bitbucket_provider.objects = ObjectCache(tmp_path)
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.text = "diff --git a/x b/x"
+    response.json = Mock(return_value={"hash": "abc1234"})
+    bitbucket_provider.session.get = Mock(return_value=response)
+
+    for _ in range(2):
+        assert (await bitbucket_provider.get_commit_diff("test-repo", "abc1234"))["diff"] == "diff --git a/x b/x"
+        assert (await bitbucket_provider.compare_commits("test-repo", "abc1234", "def5678"))["diff"] == "diff --git a/x b/x"
+        assert await bitbucket_provider.get_commit("test-repo", "abc1234") == {"hash": "abc1234"}
+        await bitbucket_provider.get_file_content("test-repo", "README.md", "a" * 40)
+    assert bitbucket_provider.session.get.call_count == 4
+
+    # A branch can move, so content by branch name is always fetched
+    await bitbucket_provider.get_file_content("test-repo", "README.md", "main")
+    await bitbucket_provider.get_file_content("test-repo", "README.md", "main")
+    assert bitbucket_provider.session.get.call_count == 6
+
+
+@pytest.mark.asyncio
+async def test_structured_pull_request_diff_fetches_diffstat_then_page(bitbucket_provider):
+    diffstat = {"values": [
+        {"status": "modified", "lines_added": 1, "lines_removed": 1, "old": {"path": "src/app.py"}, "new": {"path": "src/app.py"}},
+        {"status": "modified", "lines_added": 5000, "lines_removed": 4000, "old": {"path": "yarn.lock"}, "new": {"path": "yarn.lock"}},
+        {"status": "removed", "lines_added": 0, "lines_removed": 3, "old": {"path": "docs/old.md"}, "new": None},
+    ]}
+    diff = b"diff --git a/src/app.py b/src/app.py\n--- a/src/app.py\n+++ b/src/app.py\n@@ -1 +1 @@\n-a\n+b\n"
+
+    def get(url, **kwargs):
+        if url.endswith("/pullrequests/7"):
+            return _json_response({"source": {"commit": {"hash": "aaa111"}}, "destination": {"commit": {"hash": "bbb222"}}})
+        if "/diffstat/" in url:
+            assert url.endswith("/diffstat/aaa111..bbb222")
+            return _json_response(diffstat)
+        assert url.endswith("/diff/aaa111..bbb222")
+        assert ("path", "src/app.py") in kwargs["params"] and ("context", 1) in kwargs["params"]
+        response = Mock()
+        response.iter_lines = Mock(return_value=iter(diff.split(b"\n")))
+        return response
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.get_pull_request_diff("test-repo", 7, structured=True, paths=["src/", "*.lock"],
+                                                            context_lines=1)
+
+    assert [f["path"] for f in result["files"]] == ["src/app.py", "yarn.lock"]
+    assert result["files"][0]["hunks"][0]["lines"] == ["-a", "+b"]
+    assert result["files"][1]["skipped"] == "generated"
+    assert result["total_files"] == 2 and result["next_start"] is None
+    assert bitbucket_provider.session.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_structured_fork_pull_request_diff_uses_pull_request_endpoints(bitbucket_provider):
+    pr = {"source": {"commit": {"hash": "aaa111"}, "repository": {"full_name": "someone/fork"}},
+          "destination": {"commit": {"hash": "bbb222"}, "repository": {"full_name": "workspace/test-repo"}}}
+    diff = b"diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n-a\n+b\n"
+    urls = []
+
+    def get(url, **kwargs):
+        urls.append(url)
+        if url.endswith("/pullrequests/7"):
+            return _json_response(pr)
+        if url.endswith("/pullrequests/7/diffstat"):
+            return _json_response({"values": [{"status": "modified", "lines_added": 1, "lines_removed": 1,
+                                               "old": {"path": "app.py"}, "new": {"path": "app.py"}}]})
+        assert url.endswith("/pullrequests/7/diff")
+        response = Mock()
+        response.iter_lines = Mock(return_value=iter(diff.split(b"\n")))
+        return response
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.get_pull_request_diff("test-repo", 7, structured=True)
+
+    assert result["files"][0]["hunks"][0]["lines"] == ["-a", "+b"]
+    assert not any("aaa111" in url for url in urls)
+
+
+@pytest.mark.asyncio
+async def test_structured_diff_rejects_invalid_options(bitbucket_provider):
+    result = await bitbucket_provider.get_commit_diff("test-repo", "abc1234", structured=True, paths="src/")
+    assert "paths must be a list" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_pull_request_summary_is_cached_by_commit_pair(bitbucket_provider, tmp_path):
+    bitbucket_provider.objects = ObjectCache(tmp_path)
+    heads = {"source": "aaa111"}
+    diffstat = {"values": [
+        {"status": "modified", "lines_added": 4, "lines_removed": 1, "old": {"path": "src/app.py"}, "new": {"path": "src/app.py"}},
+        {"status": "added", "lines_added": 900, "lines_removed": 0, "old": None, "new": {"path": "package-lock.json"}},
+    ]}
+
+    def get(url, **kwargs):
+        if url.endswith("/pullrequests/7"):
+            return _json_response({"id": 7, "title": "Add app", "state": "OPEN", "author": {"display_name": "Dev"},
+                                   "source": {"branch": {"name": "feature"}, "commit": {"hash": heads["source"]}},
+                                   "destination": {"branch": {"name": "main"}, "commit": {"hash": "bbb222"}}})
+        assert url.endswith("/pullrequests/7/diffstat")
+        return _json_response(diffstat)
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.get_pull_request_summary("test-repo", 7)
+
+    assert result["pull_request"]["source_branch"] == "feature"
+    assert result["files"][0] == {"path": "src/app.py", "old_path": None, "status": "modified",
+                                  "additions": 4, "deletions": 1, "generated": False}
+    assert result["files"][1]["generated"] is True
+    assert (result["total_files"], result["generated_files"], result["additions"], result["deletions"]) == (2, 1, 904, 1)
+
+    assert await bitbucket_provider.get_pull_request_summary("test-repo", 7) == result
+    assert bitbucket_provider.session.get.call_count == 3  # the second diffstat came from the cache
+
+    heads["source"] = "ccc333"
+    await bitbucket_provider.get_pull_request_summary("test-repo", 7)
+    assert bitbucket_provider.session.get.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_pr_review_bundle_fetches_parts_concurrently_and_dedupes_users(bitbucket_provider):
+    import threading
+    dev = {"display_name": "Dev", "account_id": "acc-dev", "nickname": "dev", "links": {"avatar": {"href": "x"}}}
+    lead = {"display_name": "Lead", "account_id": "acc-lead", "nickname": "lead"}
+    # The four independent parts must all be in flight before any of them returns
+    first_wave = threading.Barrier(4, timeout=5)
+
+    def get(url, **kwargs):
+        if url.endswith("/statuses"):
+            assert "/commit/abc1234/" in url
+            return _json_response({"values": [{"key": "ci", "name": "CI", "state": "SUCCESSFUL", "url": "https://ci"}]})
+        first_wave.wait()
+        if url.endswith("/pullrequests/7"):
+            return _json_response({"id": 7, "title": "Fix", "state": "OPEN", "author": dev,
+                                   "source": {"branch": {"name": "fix"}, "commit": {"hash": "abc1234"}},
+                                   "destination": {"branch": {"name": "main"}, "commit": {"hash": "def5678"}},
+                                   "participants": [{"user": lead, "role": "REVIEWER", "approved": True}]})
+        if url.endswith("/comments"):
+            return _json_response({"values": [
+                {"id": 1, "user": lead, "content": {"raw": "nit"}, "inline": {"path": "a.py", "to": 3}},
+                {"id": 2, "user": dev, "content": {"raw": "done"}, "parent": {"id": 1}},
+                {"id": 3, "user": dev, "deleted": True, "content": {"raw": ""}},
+            ]})
+        if url.endswith("/activity"):
+            return _json_response({"values": [{"approval": {"user": lead, "date": "2024-01-02"}},
+                                              {"comment": {"id": 1, "user": lead, "created_on": "2024-01-01"}}]})
+        assert url.endswith("/default-reviewers")
+        return _json_response({"values": [lead]})
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.get_pr_review_bundle("test-repo", 7)
+
+    assert result["errors"] == {}
+    assert result["users"] == {"acc-dev": {"display_name": "Dev", "account_id": "acc-dev", "nickname": "dev"},
+                               "acc-lead": {"display_name": "Lead", "account_id": "acc-lead", "nickname": "lead"}}
+    assert result["pull_request"]["author"] == "acc-dev"
+    assert result["pull_request"]["participants"][0]["user"] == "acc-lead"
+    assert [(c["id"], c["parent_id"], c["path"], c["line"]) for c in result["comments"]] == [(1, None, "a.py", 3), (2, 1, None, None)]
+    assert result["activity"] == [{"type": "approval", "user": "acc-lead", "date": "2024-01-02"},
+                                  {"type": "comment", "user": "acc-lead", "date": "2024-01-01", "comment_id": 1}]
+    assert result["builds"][0]["state"] == "SUCCESSFUL"
+    assert result["default_reviewers"] == ["acc-lead"]
+    assert set(result["timings_ms"]) == {"pull_request", "comments", "activity", "builds", "default_reviewers", "total"}
+
+
+@pytest.mark.asyncio
+async def test_pr_review_bundle_reports_failed_parts(bitbucket_provider):
+    def get(url, **kwargs):
+        if url.endswith("/default-reviewers"):
+            raise Exception("403 Forbidden")
+        if url.endswith("/pullrequests/7"):
+            return _json_response({"id": 7, "source": {"commit": {"hash": "abc1234"}}})
+        return _json_response({"values": []})
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.get_pr_review_bundle("test-repo", 7)
+
+    assert result["errors"] == {"default_reviewers": "403 Forbidden"}
+    assert result["default_reviewers"] == [] and result["pull_request"]["id"] == 7
+
+    bitbucket_provider.session.get = Mock(side_effect=Exception("404 Not Found"))
+    result = await bitbucket_provider.get_pr_review_bundle("test-repo", 7)
+    assert result["error"] == "404 Not Found"
+
+
+@pytest.mark.asyncio
+async def test_list_my_pull_requests_fans_out_across_repositories(bitbucket_provider):
+    import threading
+    import time
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+    repos = [{"slug": f"repo-{n}"} for n in range(12)]
+
+    def pull_requests(slug, page):
+        prs = [{"id": page, "title": f"{slug} #{page}", "state": "OPEN", "author": {"display_name": "Dev"},
+                "updated_on": f"2024-01-{page:02d}T00:00:00", "links": {"html": {"href": f"https://bb/{slug}/{page}"}}}]
+        return {"values": prs, "next": f"https://api.bitbucket.org/2.0/repositories/ws/{slug}/pullrequests?page=2"} if page == 1 else {"values": prs}
+
+    def get(url, **kwargs):
+        if url.endswith("/2.0/user"):
+            return _json_response({"account_id": "acc-me"})
+        if url.endswith(f"/repositories/{bitbucket_provider.workspace}"):
+            return _json_response({"values": repos})
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            slug = url.split("/repositories/")[1].split("/")[1]
+            if url.endswith("/pullrequests"):
+                params = kwargs["params"]
+                assert ("q", 'reviewers.account_id="acc-me"') in params and ("state", "OPEN") in params
+                time.sleep(0.01)
+                return _json_response(pull_requests(slug, 1))
+            return _json_response(pull_requests(slug, 2))
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.list_my_pull_requests()
+
+    assert result["count"] == 24 and result["repositories_scanned"] == 12
+    assert result["pull_requests"][0]["updated_on"] == "2024-01-02T00:00:00"
+    assert {pr["repo_slug"] for pr in result["pull_requests"]} == {r["slug"] for r in repos}
+    assert 1 < in_flight["max"] <= 8
+    assert result["errors"] == {}
+
+    calls = bitbucket_provider.session.get.call_count
+    cached = await bitbucket_provider.list_my_pull_requests("reviewer", "open")
+    assert cached["cached"] is True and cached["count"] == 24
+    assert bitbucket_provider.session.get.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_list_my_pull_requests_filters_participants_by_user(bitbucket_provider):
+    def get(url, **kwargs):
+        if url.endswith("/2.0/user"):
+            return _json_response({"account_id": "acc-me"})
+        if url.endswith(f"/repositories/{bitbucket_provider.workspace}"):
+            return _json_response({"values": [{"slug": "api"}]})
+        # Participants are {'user': ..., 'role': ...} entries
+        assert ("q", 'participants.user.account_id="acc-me"') in kwargs["params"]
+        return _json_response({"values": [{"id": 3, "title": "Commented on"}]})
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.list_my_pull_requests("participant")
+
+    assert result["errors"] == {}
+    assert [pr["title"] for pr in result["pull_requests"]] == ["Commented on"]
+
+
+@pytest.mark.asyncio
+async def test_list_my_pull_requests_reports_failed_repositories_and_validates(bitbucket_provider):
+    def get(url, **kwargs):
+        if url.endswith("/2.0/user"):
+            return _json_response({"account_id": "acc-me"})
+        if url.endswith(f"/repositories/{bitbucket_provider.workspace}"):
+            return _json_response({"values": [{"slug": "ok"}, {"slug": "locked"}]})
+        if "/locked/" in url:
+            raise Exception("403 Forbidden")
+        assert [v for k, v in kwargs["params"] if k == "state"] == ["OPEN", "MERGED", "DECLINED", "SUPERSEDED"]
+        return _json_response({"values": [{"id": 1, "title": "Mine"}]})
+
+    bitbucket_provider.session.get = Mock(side_effect=get)
+    result = await bitbucket_provider.list_my_pull_requests("AUTHOR", "ALL")
+    assert result["errors"] == {"locked": "403 Forbidden"}
+    assert [pr["title"] for pr in result["pull_requests"]] == ["Mine"]
+
+    # A partial result is not reused
+    assert "cached" not in await bitbucket_provider.list_my_pull_requests("AUTHOR", "ALL")
+    assert "role must be one of" in (await bitbucket_provider.list_my_pull_requests("OWNER"))["error"]
+
+
+@pytest.mark.asyncio
+async def test_search_filters_server_side_and_follows_pages(bitbucket_provider):
+    pages = [_json_response({"values": [{"slug": "api", "name": "API", "full_name": "workspace/api"}],
+                             "next": "https://api.bitbucket.org/2.0/repositories/workspace?page=2"}),
+             _json_response({"values": [{"slug": "api-gateway", "name": "API Gateway"}]})]
+    bitbucket_provider.session.get = Mock(side_effect=pages)
+
+    result = await bitbucket_provider.search('a"pi')
+
+    first, second = bitbucket_provider.session.get.call_args_list
+    assert first.kwargs["params"]["q"] == 'name ~ "a\\"pi"'
+    assert second.kwargs["params"] is None
+    assert [r["slug"] for r in result["results"]] == ["api", "api-gateway"]
+    assert result["results"][0]["full_name"] == "workspace/api"
+
+
+@pytest.mark.asyncio
+async def test_search_stops_paging_at_limit(bitbucket_provider):
+    page = _json_response({"values": [{"slug": "api", "name": "API"}, {"slug": "api-docs", "name": "API Docs"}],
+                           "next": "https://api.bitbucket.org/2.0/repositories/workspace?page=2"})
+    bitbucket_provider.session.get = Mock(return_value=page)
+
+    result = await bitbucket_provider.search("api", limit=1)
+
+    assert bitbucket_provider.session.get.call_count == 1
+    assert [r["slug"] for r in result["results"]] == ["api"]
+    assert "at least 1" in (await bitbucket_provider.search("api", limit=0))["error"]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_builds_catalog_once(bitbucket_provider):
+    repos = {"values": [{"slug": "payments-service", "name": "Payments Service"},
+                        {"slug": "web-frontend", "name": "Web Frontend"}]}
+    bitbucket_provider.session.get = Mock(return_value=_json_response(repos))
+
+    result = await bitbucket_provider.search("paymnts", match="fuzzy")
+    assert [r["slug"] for r in result["results"]] == ["payments-service"]
+    assert "q" not in bitbucket_provider.session.get.call_args.kwargs["params"]
+
+    result = await bitbucket_provider.search("front", match="fuzzy")
+    assert [r["slug"] for r in result["results"]] == ["web-frontend"]
+    assert result["total_repositories"] == 2
+    assert bitbucket_provider.session.get.call_count == 1
+
+    # Substring searches always ask Bitbucket, even while the catalog is fresh
+    await bitbucket_provider.search("front")
+    assert bitbucket_provider.session.get.call_count == 2
+    assert bitbucket_provider.session.get.call_args.kwargs["params"]["q"] == 'name ~ "front"'
+
+    assert "Invalid match mode" in (await bitbucket_provider.search("x", match="glob"))["error"]
@@ -0,0 +1,36 @@
+import gzip
+import json
+from mcp_server.common.catalog import ToolCatalog, get_catalog, merge_tool_schemas
+from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+
+
+def test_catalog_matches_tool_schemas():
+    catalog = get_catalog()
+    assert get_catalog() is catalog
+    assert len(catalog.tools) == 105
+    assert json.loads(catalog.body)['tools'] == catalog.tools
+    assert all(t['inputSchema'] == TOOL_SCHEMAS.get(t['name'], {"type": "object", "properties": {}}) for t in catalog.tools)
+    assert json.loads(gzip.decompress(catalog.gzip_body)) == {'tools': catalog.tools}
+
+
+def test_etag_tracks_content():
+    tools = merge_tool_schemas([{'name': 'a', 'description': 'A'}], {})
+    first, same = ToolCatalog(tools), ToolCatalog([dict(t) for t in tools])
+    changed = ToolCatalog([{**tools[0], 'description': 'A, updated'}])
+    assert first.etag == same.etag
+    assert first.etag != changed.etag
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+def test_if_none_match_and_accept_encoding():
+    catalog = get_catalog()
+    assert catalog.not_modified(catalog.etag)
+    assert catalog.not_modified(f'"stale", W/{catalog.etag}')
+    assert catalog.not_modified('*')
+    assert not catalog.not_modified('"stale"')
+    assert not catalog.not_modified(None)
+
+    assert catalog.wants_gzip('gzip, deflate, br')
+    assert not catalog.wants_gzip('gzip;q=0')
+    assert not catalog.wants_gzip('br')
+    assert not ToolCatalog([{'name': 'a', 'description': 'tiny'}]).wants_gzip('gzip')
@@ -0,0 +1,33 @@
+import time
+import pytest
+from mcp_server.common.concurrency import gather_in_threads, run_in_thread
+
+
+async def blocking_call(value, delay=0.2):
+    # Mimics a provider method: async signature, blocking I/O inside
+    time.sleep(delay)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_run_in_thread_returns_result():
+    assert await run_in_thread(blocking_call('ok', 0)) == 'ok'
+
+
+@pytest.mark.asyncio
+async def test_gather_in_threads_overlaps_blocking_calls():
+    start = time.perf_counter()
+    results = await gather_in_threads(blocking_call(1), blocking_call(2), blocking_call(3))
+    elapsed = time.perf_counter() - start
+    assert results == [1, 2, 3]
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_gather_in_threads_limit_and_exceptions():
+    async def failing():
+        raise ValueError('boom')
+
+    results = await gather_in_threads(blocking_call('a', 0), failing(), limit=1, return_exceptions=True)
+    assert results[0] == 'a'
+    assert isinstance(results[1], ValueError)
@@ -0,0 +1,140 @@
+import os
+import pytest
+from unittest.mock import Mock, patch
+from mcp_server.common import config as config_module
+from mcp_server.common.config import ConfigWatcher, ServerConfig, apply_env, changed_components, load_config
+from mcp_server.common.runtime import ProviderRuntime
+
+CONFIG_YAML = """
+deployment_type: cloud
+cloud:
+  atlassian_base_url: https://file.atlassian.net
+  atlassian_username: file-user
+  atlassian_api_token: file-token
+  bitbucket_workspace: ws
+  bitbucket_api_token: bb-token
+ticket_support_agent:
+  primary_team_members: [{account_id: a1, name: A}]
+  secondary_team_members: []
+  troubleshooting_parent: Guides
+  assignee_scoring_weights: {current_load: -1.0}
+tool_profile: jira-readonly
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'config.yaml'
+    path.write_text(CONFIG_YAML)
+    return path
+
+
+def test_load_config_parses_file_once(config_file):
+    import yaml
+    with patch.object(yaml, 'safe_load', wraps=yaml.safe_load) as safe_load:
+        config = load_config(config_file, environ={})
+    assert safe_load.call_count == 1
+    assert config.platform == 'cloud'
+    assert config.credentials['ATLASSIAN_BASE_URL'] == 'https://file.atlassian.net'
+    assert config.ticket_support.enabled
+    assert config.ticket_support.troubleshooting_parent == 'Guides'
+    assert config.ticket_support.scoring_weights == {'current_load': -1.0}
+    assert config.ticket_support.support_jql == config_module.DEFAULT_SUPPORT_JQL
+    assert config.tool_profile == 'jira-readonly'
+    assert config.source == str(config_file)
+
+
+def test_environment_wins_over_file(config_file):
+    environ = {
+        'ATLASSIAN_API_TOKEN': 'env-token',
+        'AGENT_PRIMARY_TEAM': '[{"account_id": "env"}]',
+        'AGENT_SUPPORT_JQL': 'project = SUP',
+        'TOOL_PROFILE': 'code-review',
+        'TOOL_PROFILES': '{"mine": {"tools": ["get_issue"]}}',
+    }
+    config = load_config(config_file, environ=environ)
+    assert config.credentials['ATLASSIAN_API_TOKEN'] == 'env-token'
+    assert config.ticket_support.primary_team_members == [{'account_id': 'env'}]
+    assert config.ticket_support.support_jql == 'project = SUP'
+    assert (config.tool_profile, config.tool_profiles) == ('code-review', {'mine': {'tools': ['get_issue']}})
+
+
+def test_platform_detection(tmp_path):
+    missing = tmp_path / 'missing.yaml'
+    assert load_config(missing, environ={}).platform == 'cloud'
+    assert load_config(missing, environ={'JIRA_PAT_TOKEN': 't'}).platform == 'datacenter'
+    assert load_config(None, environ={'DEPLOYMENT_TYPE': 'Cloud', 'JIRA_PAT_TOKEN': 't'}).platform == 'cloud'
+
+
+def test_invalid_config_raises_value_error(tmp_path):
+    path = tmp_path / 'config.yaml'
+    path.write_text('cloud: [unclosed')
+    with pytest.raises(ValueError):
+        load_config(path, environ={})
+    with pytest.raises(ValueError, match='AGENT_EXCLUDED_TYPES'):
+        load_config(None, environ={'AGENT_EXCLUDED_TYPES': 'not json'})
+
+
+def test_apply_env_only_manages_its_own_variables(monkeypatch):
+    monkeypatch.setattr(config_module, '_managed_env', set())
+    environ = {'ATLASSIAN_USERNAME': 'from-client'}
+    apply_env(ServerConfig(credentials={'ATLASSIAN_USERNAME': 'file', 'ATLASSIAN_BASE_URL': 'https://a'}), environ)
+    assert environ == {'ATLASSIAN_USERNAME': 'from-client', 'ATLASSIAN_BASE_URL': 'https://a'}
+    apply_env(ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://b'}), environ)
+    assert environ['ATLASSIAN_BASE_URL'] == 'https://b'
+    apply_env(ServerConfig(), environ)
+    assert environ == {'ATLASSIAN_USERNAME': 'from-client'}
+
+
+def test_changed_components():
+    base = ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://a', 'BITBUCKET_WORKSPACE': 'ws'})
+    assert changed_components(base, base) == frozenset()
+    workspace = ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://a', 'BITBUCKET_WORKSPACE': 'other'})
+    assert changed_components(base, workspace) == {'bitbucket'}
+    site = ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://b', 'BITBUCKET_WORKSPACE': 'ws'})
+    assert changed_components(base, site) == {'jira', 'confluence', 'bitbucket', 'ticket_support'}
+    profile = ServerConfig(credentials=base.credentials, tool_profile='code-review')
+    assert changed_components(base, profile) == {'tool_profiles'}
+    assert changed_components(base, ServerConfig(platform='datacenter')) >= {'jira', 'confluence', 'bitbucket'}
+
+
+def test_config_watcher(tmp_path):
+    path = tmp_path / 'config.yaml'
+    watcher = ConfigWatcher(path)
+    assert not watcher.changed()
+    path.write_text('a: 1')
+    assert watcher.changed()
+    assert not watcher.changed()
+    path.write_text('a: 22')
+    assert watcher.changed()
+    path.unlink()
+    assert watcher.changed()
+
+
+def test_runtime_rebuilds_changed_providers_after_calls_drain(monkeypatch):
+    monkeypatch.setattr(config_module, '_managed_env', set())
+    monkeypatch.setattr(os, 'environ', {})
+    built = []
+
+    def factory(platform, name):
+        provider = Mock(name=name, session=Mock())
+        built.append((name, provider))
+        return provider
+
+    init_agent = Mock(return_value=True)
+    first = ServerConfig(credentials={'BITBUCKET_WORKSPACE': 'ws'})
+    runtime = ProviderRuntime(first, factory=factory, init_agent=init_agent)
+    assert [name for name, _ in built] == ['jira', 'confluence', 'bitbucket']
+
+    with runtime.acquire() as pinned:
+        old_bitbucket = pinned.bitbucket
+        changed = runtime.reload(ServerConfig(credentials={'BITBUCKET_WORKSPACE': 'other'}))
+        assert changed == {'bitbucket'}
+        # The in-flight call keeps its providers; new calls see the rebuilt one
+        assert pinned.bitbucket is old_bitbucket
+        assert runtime.current.bitbucket is not old_bitbucket
+        assert runtime.current.jira is pinned.jira
+        old_bitbucket.session.close.assert_not_called()
+    old_bitbucket.session.close.assert_called_once()
+    assert len(built) == 4
+    init_agent.assert_called_once()  # agent unaffected by a Bitbucket change
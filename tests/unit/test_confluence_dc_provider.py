@@ -216,6 +216,22 @@ async def test_get_descendants_success(confluence_dc_provider, mock_response):
     confluence_dc_provider.session.get.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_descendants_returns_one_result_page(confluence_dc_provider):
+    listing = {"results": [{"id": "1"}, {"id": "2"}], "start": 25, "limit": 25, "size": 2,
+               "_links": {"next": "/rest/api/content/12345/descendant/page?start=50"}}
+    response = Mock(status_code=200)
+    response.json = Mock(return_value=listing)
+    confluence_dc_provider.session.get = Mock(return_value=response)
+
+    result = await confluence_dc_provider.get_descendants("12345", expand="version", start=25)
+
+    # The listing is returned as is; the next page is left to the caller
+    assert result == listing
+    confluence_dc_provider.session.get.assert_called_once()
+    assert confluence_dc_provider.session.get.call_args.kwargs["params"] == {"expand": "version", "start": 25}
+
+
 @pytest.mark.asyncio
 async def test_get_ancestors_success(confluence_dc_provider, mock_response):
     mock_response.json = Mock(return_value={"ancestors": [{"id": "123", "title": "Parent"}]})
@@ -0,0 +1,95 @@
+"""Unit tests for shared description parsers"""
+
+import pytest
+from mcp_server.common import description_parsers
+from mcp_server.common.description_parsers import (
+    custom_field_text, extract_bitbucket_reference, is_alert, option_labels, parse_issue_description
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    description_parsers.clear_memo()
+    yield
+    description_parsers.clear_memo()
+
+
+def test_extract_dc_browse_url():
+    ref = extract_bitbucket_reference("See https://git.company.com/projects/PROJ/repos/alerts/browse/sql/check.sql for details")
+
+    assert ref['repo_slug'] == 'alerts'
+    assert ref['file_path'] == 'sql/check.sql'
+    assert ref['branch'] is None
+
+
+def test_extract_dc_browse_url_with_branch():
+    ref = extract_bitbucket_reference("https://git.company.com/projects/P/repos/etl/browse/jobs/run.py?at=refs%2Fheads%2Frelease%2F2.0")
+
+    assert ref['repo_slug'] == 'etl'
+    assert ref['file_path'] == 'jobs/run.py'
+    assert ref['branch'] == 'release/2.0'
+
+
+def test_extract_cloud_src_url():
+    ref = extract_bitbucket_reference("Code: https://bitbucket.org/acme/alerts/src/main/sql/check.sql")
+
+    assert ref['repo_slug'] == 'alerts'
+    assert ref['branch'] == 'main'
+    assert ref['file_path'] == 'sql/check.sql'
+
+
+def test_extract_unescapes_html_href():
+    ref = extract_bitbucket_reference('<a href="https://git.co/projects/P/repos/r/browse/a.sql?at=dev&amp;x=1">link</a> &lt;b&gt;')
+
+    assert ref['description'].endswith('<b>')
+    assert ref['repo_slug'] == 'r'
+    assert ref['branch'] == 'dev'
+
+
+def test_extract_no_url():
+    ref = extract_bitbucket_reference("Nothing to see")
+
+    assert ref['bitbucket_url'] is None
+    assert ref['description'] == "Nothing to see"
+
+
+def test_parse_issue_description_memoizes_on_key_and_updated():
+    issue = {'key': 'T-1', 'fields': {'updated': '2024-01-01T00:00:00', 'description': 'https://git.co/repos/a/browse/x.sql'}}
+
+    first = parse_issue_description(issue)
+    second = parse_issue_description(issue)
+    issue['fields']['updated'] = '2024-01-02T00:00:00'
+    issue['fields']['description'] = 'https://git.co/repos/b/browse/y.sql'
+    third = parse_issue_description(issue)
+
+    assert first is second
+    assert third['repo_slug'] == 'b'
+    assert description_parsers.memo_stats()['hits'] == 1
+
+
+def test_memo_is_bounded():
+    memo = description_parsers._DescriptionMemo(maxsize=2)
+    for i in range(3):
+        memo.put(('T', i), {})
+
+    assert memo.get(('T', 0)) is None
+    assert memo.get(('T', 2)) == {}
+
+
+def test_option_labels_and_text():
+    cascading = [{'selectedOptionLabel': 'Data'}, {'selectedOptionLabel': 'Analysis'}]
+
+    assert option_labels(cascading) == ['Data', 'Analysis']
+    assert option_labels('[{"selectedOptionLabel": "Data"}]') == ['Data']
+    assert option_labels({'value': 'Access'}) == ['Access']
+    assert custom_field_text(cascading) == 'Data - Analysis'
+    assert custom_field_text('Plain') == 'Plain'
+    assert custom_field_text(None) == ''
+
+
+def test_is_alert():
+    assert is_alert('Alert - DB')
+    assert is_alert([{'selectedOptionLabel': 'Alert'}])
+    assert is_alert({'selectedOptionLabel': 'Alert'})
+    assert not is_alert({'selectedOptionLabel': 'Request'})
+    assert not is_alert(None)
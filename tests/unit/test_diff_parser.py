@@ -0,0 +1,153 @@
+import pytest
+
+from mcp_server.common.diff_parser import convert_dc_diff, is_generated, matches_paths, paginate_diff, parse_unified_diff, summarize_files
+
+DIFF = """diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,3 +1,4 @@ def main():
+ import os
+-print(1)
++print(2)
++print(3)
+ done()
+@@ -10 +11 @@
+-old
++new
+diff --git a/docs/new guide.md b/docs/new guide.md
+new file mode 100644
+--- /dev/null
++++ b/docs/new guide.md
+@@ -0,0 +1 @@
++hello
+diff --git a/old.txt b/old.txt
+deleted file mode 100644
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+\\ No newline at end of file
+diff --git a/lib/a.py b/lib/b.py
+similarity index 90%
+rename from lib/a.py
+rename to lib/b.py
+diff --git a/logo.png b/logo.png
+Binary files a/logo.png and b/logo.png differ
+"""
+
+
+def test_parse_unified_diff_files_and_hunks():
+    files = {f['path']: f for f in parse_unified_diff(DIFF.splitlines())}
+
+    app = files['src/app.py']
+    assert (app['status'], app['additions'], app['deletions']) == ('modified', 3, 2)
+    assert [h['header'] for h in app['hunks']] == ['@@ -1,3 +1,4 @@ def main():', '@@ -10 +11 @@']
+    assert app['hunks'][0]['lines'] == [' import os', '-print(1)', '+print(2)', '+print(3)', ' done()']
+    assert (app['hunks'][1]['old_start'], app['hunks'][1]['old_lines']) == (10, 1)
+    assert files['docs/new guide.md']['status'] == 'added'
+    assert files['old.txt']['status'] == 'deleted'
+    assert files['old.txt']['hunks'][0]['lines'][-1] == '\\ No newline at end of file'
+    assert (files['lib/b.py']['status'], files['lib/b.py']['old_path']) == ('renamed', 'lib/a.py')
+    assert files['logo.png']['binary'] is True
+
+
+def test_parse_unified_diff_unquotes_git_paths():
+    diff = [
+        'diff --git "a/docs/t\\303\\251st \\"x\\".md" "b/docs/t\\303\\251st \\"x\\".md"',
+        '--- "a/docs/t\\303\\251st \\"x\\".md"',
+        '+++ "b/docs/t\\303\\251st \\"x\\".md"',
+        '@@ -1 +1 @@',
+        '-a',
+        '+b',
+        'diff --git a/old name "b/tab\\there"',
+        'similarity index 90%',
+        'rename from old name',
+        'rename to "tab\\there"',
+    ]
+    first, second = parse_unified_diff(diff)
+
+    assert first['path'] == 'docs/tést "x".md' and first['old_path'] is None
+    assert first['hunks'][0]['lines'] == ['-a', '+b']
+    assert (second['status'], second['old_path'], second['path']) == ('renamed', 'old name', 'tab\there')
+
+
+def test_file_budget_truncates_hunks_but_keeps_counts():
+    lines = ['diff --git a/big.sql b/big.sql', '--- a/big.sql', '+++ b/big.sql', '@@ -0,0 +1,1000 @@']
+    lines += [f'+INSERT {n};' for n in range(1000)]
+
+    (big,) = parse_unified_diff(lines, max_file_bytes=200)
+
+    assert big['truncated'] is True
+    assert big['additions'] == 1000
+    assert sum(len(line) + 1 for h in big['hunks'] for line in h['lines']) <= 200
+
+
+def test_convert_dc_diff():
+    diff = {
+        'source': {'toString': 'src/Old.java'}, 'destination': {'toString': 'src/New.java'},
+        'hunks': [{'sourceLine': 3, 'sourceSpan': 2, 'destinationLine': 3, 'destinationSpan': 2, 'segments': [
+            {'type': 'CONTEXT', 'lines': [{'line': 'class A {'}]},
+            {'type': 'REMOVED', 'lines': [{'line': '  int x;'}]},
+            {'type': 'ADDED', 'lines': [{'line': '  long x;'}]},
+        ]}],
+    }
+
+    file = convert_dc_diff(diff)
+
+    assert (file['path'], file['old_path'], file['status']) == ('src/New.java', 'src/Old.java', 'renamed')
+    assert file['hunks'][0]['header'] == '@@ -3,2 +3,2 @@'
+    assert file['hunks'][0]['lines'] == [' class A {', '-  int x;', '+  long x;']
+    assert (file['additions'], file['deletions']) == (1, 1)
+    assert convert_dc_diff({'destination': {'toString': 'a.txt'}})['status'] == 'added'
+
+
+def test_generated_files_and_path_filters():
+    assert is_generated('package-lock.json')
+    assert is_generated('web/static/app.min.js')
+    assert is_generated('vendor/github.com/x/y.go')
+    assert not is_generated('src/build_tools.py')
+
+    file = {'path': 'src/api/users.py', 'old_path': 'src/users.py'}
+    assert matches_paths(file, ['src/api'])
+    assert matches_paths(file, ['*.py'])
+    assert matches_paths(file, ['src/users.py'])
+    assert not matches_paths(file, ['docs/'])
+
+
+@pytest.mark.asyncio
+async def test_paginate_diff_fetches_only_the_page():
+    files = [{'path': f'src/f{n}.py', 'old_path': None, 'status': 'modified', 'additions': 1, 'deletions': 0}
+             for n in range(5)]
+    files.append({'path': 'package-lock.json', 'old_path': None, 'status': 'modified', 'additions': 9000, 'deletions': 8000})
+    requested = []
+
+    async def fetch(paths):
+        requested.append(paths)
+        return [{'path': p, 'additions': 1, 'deletions': 0, 'binary': False, 'truncated': False,
+                 'hunks': [{'header': '@@ -1 +1 @@', 'lines': ['+x']}]} for p in paths]
+
+    first = await paginate_diff(files, fetch, start=0, limit=4)
+    last = await paginate_diff(files, fetch, start=4, limit=4)
+
+    assert [f['path'] for f in first['files']] == ['src/f0.py', 'src/f1.py', 'src/f2.py', 'src/f3.py']
+    assert first['next_start'] == 4 and first['total_files'] == 6
+    assert first['additions'] == 9005
+    assert last['next_start'] is None
+    assert last['files'][1] == {**files[5], 'skipped': 'generated'}
+    assert requested == [['src/f0.py', 'src/f1.py', 'src/f2.py', 'src/f3.py'], ['src/f4.py']]
+
+    filtered = await paginate_diff(files, fetch, paths=['*.json'], include_generated=True)
+    assert [f['path'] for f in filtered['files']] == ['package-lock.json']
+    assert filtered['files'][0]['hunks']
+
+
+def test_summarize_files_flags_generated_and_totals():
+    files = [{'path': 'src/app.py', 'old_path': None, 'status': 'modified', 'additions': 3, 'deletions': 1},
+             {'path': 'go.sum', 'old_path': None, 'status': 'modified', 'additions': 40, 'deletions': 2}]
+
+    summary = summarize_files(files)
+
+    assert [f['generated'] for f in summary['files']] == [False, True]
+    assert (summary['total_files'], summary['generated_files'], summary['additions'], summary['deletions']) == (2, 1, 43, 3)
+    assert 'additions' not in summarize_files([{**files[0], 'additions': None, 'deletions': None}])
@@ -0,0 +1,87 @@
+from mcp_server.common.file_window import read_window
+
+
+def chunked(data: bytes, size: int = 7):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+FILE = b''.join(f'line {n}\n'.encode() for n in range(1, 101))
+
+
+def test_whole_file_reports_size():
+    result = read_window(chunked(FILE))
+
+    assert result == {'content': FILE.decode(), 'size': len(FILE), 'truncated': False}
+
+
+def test_line_window_stops_reading_after_end_line():
+    consumed = []
+
+    def chunks():
+        for chunk in chunked(FILE):
+            consumed.append(chunk)
+            yield chunk
+
+    result = read_window(chunks(), start_line=10, end_line=12)
+
+    assert result['content'] == 'line 10\nline 11\nline 12\n'
+    assert (result['start_line'], result['end_line']) == (10, 12)
+    assert 'total_lines' not in result and result['size'] is None
+    assert sum(len(c) for c in consumed) < len(FILE) // 2
+
+
+def test_line_window_to_end_counts_lines():
+    result = read_window(chunked(FILE), start_line=99)
+
+    assert result['content'] == 'line 99\nline 100\n'
+    assert result['end_line'] == 100
+    assert result['total_lines'] == 100
+    assert result['size'] == len(FILE)
+    assert read_window([b'a\nb'], start_line=2)['total_lines'] == 2
+    assert read_window([], start_line=1)['total_lines'] == 0
+
+
+def test_line_window_past_the_end_is_empty():
+    result = read_window(chunked(FILE), start_line=500)
+
+    assert result['content'] == ''
+    assert result['end_line'] is None
+    assert result['total_lines'] == 100
+
+
+def test_max_bytes_truncates_a_window():
+    result = read_window(chunked(FILE), start_line=1, end_line=50, max_bytes=10)
+
+    assert result['content'] == 'line 1\nlin'
+    assert result['truncated'] is True
+
+
+def test_byte_window_reports_next_offset():
+    result = read_window(chunked(FILE), byte_offset=7, max_bytes=14)
+
+    assert result['content'] == 'line 2\nline 3\n'
+    assert result['truncated'] is True
+    assert result['next_byte_offset'] == 21
+    last = read_window(chunked(FILE), byte_offset=len(FILE) - 9, max_bytes=100)
+    assert last['content'] == 'line 100\n' and last['truncated'] is False
+
+
+def test_byte_window_from_a_server_side_range():
+    # The server already skipped to offset 7 and sent one byte past the window
+    result = read_window([FILE[7:22]], byte_offset=7, max_bytes=14, total_size=len(FILE), stream_offset=7)
+
+    assert result['content'] == 'line 2\nline 3\n'
+    assert result['next_byte_offset'] == 21
+    assert result['size'] == len(FILE)
+
+
+def test_binary_files_are_detected_without_decoding():
+    result = read_window([b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'], total_size=1234)
+
+    assert result == {'binary': True, 'size': 1234}
+
+
+def test_split_multibyte_characters_are_replaced():
+    result = read_window(['é'.encode() * 3], max_bytes=3)
+
+    assert result['content'] == 'é�'
@@ -0,0 +1,306 @@
+import hashlib
+import hmac
+import json
+import subprocess
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mcp_server.common.git_mirror import GitMirror, MirrorError, MirrorSet
+from mcp_server.common.object_cache import ObjectCache
+
+
+def git(cwd, *args):
+    return subprocess.run(['git', '-c', 'user.name=Alice Smith', '-c', 'user.email=alice@example.com',
+                           '-c', 'init.defaultBranch=main', *args],
+                          cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(repo, files, message, author=None):
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    git(repo, 'add', '-A')
+    args = ['commit', '-q', '-m', message]
+    if author:
+        args.append(f'--author={author}')
+    git(repo, *args)
+    return git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """A local repository standing in for Bitbucket: two commits on main, one on a feature branch"""
+    repo = tmp_path / 'origin' / 'test-repo'
+    repo.mkdir(parents=True)
+    git(repo, 'init', '-q')
+    first = commit(repo, {'README.md': 'hello\n', 'src/app.py': 'print(1)\n'}, 'Initial commit')
+    second = commit(repo, {'src/app.py': 'print(2)\n', 'src/util/helpers.py': 'x = 1\n'}, 'Update app',
+                    author='Bob Jones <bob@example.com>')
+    git(repo, 'checkout', '-q', '-b', 'feature')
+    feature = commit(repo, {'docs/guide.md': 'guide\n'}, 'Add guide')
+    git(repo, 'checkout', '-q', 'main')
+    return {'repo': repo, 'first': first, 'second': second, 'feature': feature}
+
+
+@pytest.fixture
+def mirrors(tmp_path, origin):
+    return MirrorSet(tmp_path / 'mirrors', f"file://{origin['repo'].parent}/{{repo_slug}}", ['test-repo'],
+                     background=False)
+
+
+def test_mirror_set_from_env_is_off_by_default():
+    with patch.dict('os.environ', {}, clear=True):
+        assert MirrorSet.from_env('https://example.com/{repo_slug}.git') is None
+
+
+def test_mirror_set_from_env_reads_repositories(tmp_path):
+    env = {'BITBUCKET_MIRROR_DIR': str(tmp_path), 'BITBUCKET_MIRROR_REPOS': 'api, web'}
+    with patch.dict('os.environ', env, clear=True):
+        mirrors = MirrorSet.from_env('https://example.com/{repo_slug}.git')
+    assert mirrors.mirrors('api') and mirrors.mirrors('web')
+    assert not mirrors.mirrors('other')
+
+
+def test_first_get_clones_the_mirror(mirrors, origin):
+    mirror = mirrors.get('test-repo')
+
+    assert mirror is not None and mirror.ready
+    assert mirror.resolve('main') == origin['second']
+    assert mirror.resolve('feature') == origin['feature']
+
+
+def test_unconfigured_or_invalid_repositories_are_not_mirrored(mirrors):
+    assert mirrors.get('other-repo') is None
+    all_repos = MirrorSet(mirrors.root, mirrors.url_template, ['*'], background=False)
+    assert all_repos.get('../escape') is None
+    assert all_repos.refresh('../escape') is False
+
+
+def test_unreachable_remote_leaves_mirror_unready(tmp_path):
+    mirrors = MirrorSet(tmp_path / 'mirrors', f"file://{tmp_path}/missing/{{repo_slug}}", ['*'], background=False)
+
+    assert mirrors.get('test-repo') is None
+
+
+def test_file_content_and_directory_listing(mirrors, origin):
+    mirror = mirrors.get('test-repo')
+
+    assert mirror.file_content('main', 'src/app.py') == b'print(2)\n'
+    assert mirror.file_content(origin['first'], 'src/app.py') == b'print(1)\n'
+    root = {e['path']: e for e in mirror.list_directory('main')}
+    assert root['README.md'] == {'path': 'README.md', 'name': 'README.md', 'type': 'file', 'size': 6}
+    assert root['src']['type'] == 'directory'
+    src = {e['name']: e['type'] for e in mirror.list_directory('main', 'src')}
+    assert src == {'app.py': 'file', 'util': 'directory'}
+
+
+def test_missing_paths_and_refs_raise(mirrors):
+    mirror = mirrors.get('test-repo')
+
+    with pytest.raises(MirrorError):
+        mirror.file_content('main', 'missing.txt')
+    with pytest.raises(MirrorError):
+        mirror.list_directory('main', 'missing')
+    with pytest.raises(MirrorError):
+        mirror.resolve('no-such-branch')
+    with pytest.raises(MirrorError):
+        mirror.resolve('--all')
+
+
+def test_log_filters_by_path_and_author(mirrors, origin):
+    mirror = mirrors.get('test-repo')
+
+    commits = mirror.log('main', 50)
+    assert [c['hash'] for c in commits] == [origin['second'], origin['first']]
+    assert commits[0]['author_name'] == 'Bob Jones'
+    assert commits[0]['message'] == 'Update app'
+    assert [c['hash'] for c in mirror.log('main', 50, path='README.md')] == [origin['first']]
+    assert [c['hash'] for c in mirror.log('main', 50, author='bob')] == [origin['second']]
+    assert len(mirror.log('main', 1)) == 1
+
+
+def test_commit_diff_and_compare(mirrors, origin):
+    mirror = mirrors.get('test-repo')
+
+    diff = mirror.commit_diff(origin['second'])
+    assert '-print(1)' in diff and '+print(2)' in diff
+    assert 'README.md' in mirror.commit_diff(origin['first'])
+    # Changes on the feature branch since it left main
+    compare = mirror.compare(origin['feature'], origin['second'])
+    assert 'docs/guide.md' in compare and 'app.py' not in compare
+
+
+def test_refresh_fetches_new_commits(mirrors, origin):
+    mirror = mirrors.get('test-repo')
+    newer = commit(origin['repo'], {'CHANGELOG.md': 'v2\n'}, 'Release')
+
+    assert mirror.resolve('main') == origin['second']
+    assert mirrors.refresh('test-repo')
+    assert mirror.resolve('main') == newer
+
+
+def test_refresh_without_clone_only_fetches_existing_mirrors(mirrors):
+    assert mirrors.refresh('test-repo', clone=False) is False
+    assert not mirrors._mirror('test-repo').ready
+
+    mirrors.get('test-repo')
+    assert mirrors.refresh('test-repo', clone=False) is True
+
+
+def test_stale_mirror_is_refreshed_on_read(mirrors, origin):
+    mirrors.get('test-repo')
+    newer = commit(origin['repo'], {'CHANGELOG.md': 'v2\n'}, 'Release')
+    mirrors.refresh_seconds = 0
+
+    assert mirrors.get('test-repo').resolve('main') == newer
+
+
+def test_credentials_stay_out_of_the_mirror_config(tmp_path, mirrors):
+    mirror = GitMirror(tmp_path / 'secret.git', mirrors.url_template.format(repo_slug='test-repo'), 'Bearer s3cret')
+    mirror.sync()
+
+    assert mirror._env['GIT_CONFIG_VALUE_0'] == 'Authorization: Bearer s3cret'
+    assert 's3cret' not in (tmp_path / 'secret.git' / 'config').read_text()
+
+
+# Providers
+
+
+@pytest.fixture
+def cloud_provider(mirrors):
+    from mcp_server.cloud.bitbucket_provider import BitbucketProvider
+    with patch.dict('os.environ', {'BITBUCKET_API_TOKEN': 'token', 'BITBUCKET_WORKSPACE': 'workspace',
+                                   'ATLASSIAN_USERNAME': 'user'}):
+        provider = BitbucketProvider()
+    provider.objects = ObjectCache(max_bytes=0)
+    provider.mirrors = mirrors
+    provider.session = Mock()
+    return provider
+
+
+@pytest.fixture
+def dc_provider(mirrors):
+    from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
+    with patch('mcp_server.datacenter.bitbucket_dc_provider.DataCenterAuth'):
+        provider = BitbucketDCProvider()
+    provider.base_url = 'https://bitbucket.company.com'
+    provider.objects = ObjectCache(max_bytes=0)
+    provider.mirrors = mirrors
+    provider.session = Mock()
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_cloud_reads_are_served_from_the_mirror(cloud_provider, origin):
+    content = await cloud_provider.get_file_content('test-repo', 'src/app.py', 'main')
+    listing = await cloud_provider.list_directory('test-repo', 'src', 'main')
+    commits = await cloud_provider.list_commits('test-repo', 'main')
+    by_author = await cloud_provider.list_commits_by_author('test-repo', 'Bob', 'main')
+    diff = await cloud_provider.get_commit_diff('test-repo', origin['second'])
+    compare = await cloud_provider.compare_commits('test-repo', origin['feature'], origin['second'])
+
+    assert content['content'] == 'print(2)\n' and content['path'] == 'src/app.py'
+    assert {v['path']: v['type'] for v in listing['values']} == {'src/app.py': 'commit_file',
+                                                                  'src/util': 'commit_directory'}
+    assert [v['hash'] for v in commits['values']] == [origin['second'], origin['first']]
+    assert commits['values'][0]['author']['raw'] == 'Bob Jones <bob@example.com>'
+    assert [v['hash'] for v in by_author['values']] == [origin['second']]
+    assert '+print(2)' in diff['diff']
+    assert 'docs/guide.md' in compare['diff']
+    cloud_provider.session.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_dc_reads_are_served_from_the_mirror(dc_provider, origin):
+    listing = await dc_provider.list_directory('test-repo', '', 'main')
+    commits = await dc_provider.list_commits('test-repo', 'main', path='README.md')
+
+    children = {c['path']['name']: c['type'] for c in listing['children']['values']}
+    assert children == {'README.md': 'FILE', 'src': 'DIRECTORY'}
+    assert commits['values'][0]['id'] == origin['first']
+    assert commits['values'][0]['author'] == {'name': 'Alice Smith', 'emailAddress': 'alice@example.com'}
+    assert commits['values'][0]['authorTimestamp'] % 1000 == 0
+    dc_provider.session.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_mirror_misses_fall_back_to_rest(cloud_provider, dc_provider):
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.text = 'from rest'
+    response.status_code = 200
+    response.headers = {}
+    response.iter_content = Mock(return_value=iter([b'from rest']))
+    cloud_provider.session.get = Mock(return_value=response)
+    dc_provider.session.get = Mock(return_value=response)
+
+    # A commit the mirror has not fetched yet, and a repository that is not mirrored
+    assert (await cloud_provider.get_commit_diff('test-repo', 'abcdef1234567'))['diff'] == 'from rest'
+    assert (await dc_provider.get_file_content('other-repo', 'README.md', 'main'))['content'] == 'from rest'
+    cloud_provider.session.get.assert_called_once()
+    dc_provider.session.get.assert_called_once()
+
+
+# Webhook
+
+
+def webhook_app(mirrors, secret='', token=''):
+    from mcp_server.common.config import ServerConfig
+    from mcp_server.common.runtime import ProviderRuntime
+    from mcp_server.http_server import McpHttpApp
+    runtime = ProviderRuntime(ServerConfig(), factory=lambda platform, name: Mock(name=name, mirrors=mirrors),
+                              init_agent=lambda config, confluence: False)
+    return McpHttpApp(runtime=runtime, config_path=None, webhook_secret=secret, auth_token=token)
+
+
+async def post_webhook(app, payload, headers=None):
+    body = json.dumps(payload).encode()
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return await app.handle('POST', '/hooks/bitbucket', {'content-type': 'application/json', **(headers or {})}, receive)
+
+
+@pytest.mark.asyncio
+async def test_webhook_refreshes_the_pushed_repository():
+    mirrors = Mock()
+    mirrors.refresh = Mock(return_value=True)
+    app = webhook_app(mirrors, token='secret-token')
+    auth = {'authorization': 'Bearer secret-token'}
+
+    status, _, body = await post_webhook(app, {'repository': {'full_name': 'workspace/test-repo'}}, auth)
+    ping_status, _, _ = await post_webhook(app, {'test': True}, auth)
+    unauthorized, _, _ = await post_webhook(app, {'repository': {'slug': 'test-repo'}})
+
+    assert status == 202
+    assert json.loads(body) == {'repository': 'test-repo', 'refreshing': True}
+    mirrors.refresh.assert_called_once_with('test-repo', clone=False)
+    assert ping_status == 202
+    assert unauthorized == 401
+
+
+@pytest.mark.asyncio
+async def test_webhook_is_refused_without_a_secret_or_token():
+    mirrors = Mock()
+    status, _, _ = await post_webhook(webhook_app(mirrors), {'repository': {'slug': 'test-repo'}})
+    assert status == 403
+    mirrors.refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_webhook_checks_the_signature_when_a_secret_is_set():
+    mirrors = Mock()
+    app = webhook_app(mirrors, secret='hook-secret')
+    payload = {'repository': {'slug': 'test-repo'}}
+
+    status, _, _ = await post_webhook(app, payload, {'x-hub-signature': 'sha256=bad'})
+    assert status == 401
+    mirrors.refresh.assert_not_called()
+
+    body = json.dumps(payload).encode()
+    signature = 'sha256=' + hmac.new(b'hook-secret', body, hashlib.sha256).hexdigest()
+    status, _, _ = await post_webhook(app, payload, {'x-hub-signature': signature})
+    assert status == 202
+    mirrors.refresh.assert_called_once_with('test-repo', clone=False)
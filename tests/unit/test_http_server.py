@@ -0,0 +1,260 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+from mcp_server import http_server
+from mcp_server.common.config import ServerConfig
+from mcp_server.common.profiles import ToolProfiles
+from mcp_server.common.runtime import ProviderRuntime
+from mcp_server.http_server import McpHttpApp, SessionStore, Session
+
+
+def make_app(**kwargs):
+    runtime = ProviderRuntime(ServerConfig(), factory=lambda platform, name: Mock(name=name),
+                              init_agent=lambda config, confluence: False)
+    return McpHttpApp(runtime=runtime, config_path=None, **kwargs)
+
+
+async def request(app, method, body=None, headers=None, path='/mcp'):
+    """Drive the ASGI app with one HTTP request and return (status, headers, parsed body)"""
+    scope = {'type': 'http', 'method': method, 'path': path,
+             'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]}
+    payload = json.dumps(body).encode() if body is not None else b''
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    response_headers = {k.decode(): v.decode() for k, v in sent[0]['headers']}
+    raw = sent[1]['body']
+    return sent[0]['status'], response_headers, json.loads(raw) if raw else None
+
+
+def rpc(method, params=None, request_id=1):
+    return {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params or {}}
+
+
+async def open_session(app, headers=None):
+    status, response_headers, body = await request(
+        app, 'POST', rpc('initialize', {'protocolVersion': '2025-03-26', 'capabilities': {},
+                                        'clientInfo': {'name': 'test', 'version': '1'}}), headers)
+    assert status == 200
+    assert body['result']['protocolVersion'] == '2025-03-26'
+    return response_headers['mcp-session-id']
+
+
+@pytest.mark.asyncio
+async def test_session_lifecycle():
+    app = make_app()
+    session_id = await open_session(app)
+    headers = {'Mcp-Session-Id': session_id}
+
+    status, _, body = await request(app, 'POST', {'jsonrpc': '2.0', 'method': 'notifications/initialized'}, headers)
+    assert status == 202 and body is None
+    status, _, body = await request(app, 'POST', rpc('ping'), headers)
+    assert status == 200 and body == {'jsonrpc': '2.0', 'id': 1, 'result': {}}
+
+    status, _, _ = await request(app, 'DELETE', headers=headers)
+    assert status == 200
+    status, _, body = await request(app, 'POST', rpc('ping'), headers)
+    assert status == 404
+
+
+@pytest.mark.asyncio
+async def test_requests_need_a_session():
+    app = make_app()
+    status, _, body = await request(app, 'POST', rpc('tools/list'))
+    assert status == 400
+    assert body['error']['code'] == http_server.INVALID_REQUEST
+    status, _, _ = await request(app, 'POST', rpc('tools/list'), {'Mcp-Session-Id': 'unknown'})
+    assert status == 404
+
+
+@pytest.mark.asyncio
+async def test_http_errors():
+    app = make_app(auth_token='secret')
+    status, _, _ = await request(app, 'POST', rpc('ping'))
+    assert status == 401
+    status, _, _ = await request(app, 'POST', rpc('ping'), {'Authorization': 'Bearer secret', 'Origin': 'https://evil.example'})
+    assert status == 403
+    status, _, _ = await request(app, 'GET', headers={'Authorization': 'Bearer secret'})
+    assert status == 405
+    status, _, body = await request(app, 'GET', path='/health')
+    assert status == 200 and body['status'] == 'healthy'
+
+
+@pytest.mark.asyncio
+async def test_tools_list_uses_session_profile():
+    app = make_app()
+    session_id = await open_session(app, {'X-MCP-Tool-Profile': 'jira-readonly'})
+    status, _, body = await request(app, 'POST', rpc('tools/list', request_id='a'), {'Mcp-Session-Id': session_id})
+    assert status == 200 and body['id'] == 'a'
+    assert {t['name'] for t in body['result']['tools']} == ToolProfiles().names('jira-readonly')
+
+    status, _, body = await request(app, 'POST', rpc('initialize'), {'X-MCP-Tool-Profile': 'nope'})
+    assert status == 400
+
+
+@pytest.mark.asyncio
+async def test_tools_call_routes_through_shared_runtime(mocker):
+    app = make_app()
+    route = mocker.patch('mcp_server.http_server.route_tool_call', return_value={'key': 'TEST-1'})
+    headers = {'Mcp-Session-Id': await open_session(app)}
+
+    status, _, body = await request(app, 'POST', rpc('tools/call', {'name': 'get_issue', 'arguments': {'issue_key': 'TEST-1'}}), headers)
+    assert status == 200
+    assert body['result'] == {'content': [{'type': 'text', 'text': '{"key": "TEST-1"}'}], 'isError': False}
+    args = route.call_args.args
+    assert args[:2] == ('get_issue', {'issue_key': 'TEST-1'})
+    assert args[2] is app.runtime.current.jira
+
+    route.return_value = {'error': 'Not found'}
+    _, _, body = await request(app, 'POST', rpc('tools/call', {'name': 'get_issue', 'arguments': {}}), headers)
+    assert body['result']['isError'] is True
+
+    route.side_effect = ValueError('Unknown tool: boom')
+    _, _, body = await request(app, 'POST', rpc('tools/call', {'name': 'boom'}), headers)
+    assert body['result'] == {'content': [{'type': 'text', 'text': 'Unknown tool: boom'}], 'isError': True}
+
+
+@pytest.mark.asyncio
+async def test_profile_blocks_tools_outside_it(mocker):
+    app = make_app()
+    route = mocker.patch('mcp_server.http_server.route_tool_call', return_value={})
+    headers = {'Mcp-Session-Id': await open_session(app, {'X-MCP-Tool-Profile': 'jira-readonly'})}
+    _, _, body = await request(app, 'POST', rpc('tools/call', {'name': 'create_issue', 'arguments': {}}), headers)
+    assert body['result']['isError'] is True
+    assert 'jira-readonly' in body['result']['content'][0]['text']
+    route.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_and_unknown_method():
+    app = make_app()
+    headers = {'Mcp-Session-Id': await open_session(app)}
+    status, _, body = await request(app, 'POST', [rpc('ping', request_id=1), rpc('nope', request_id=2),
+                                                  {'jsonrpc': '2.0', 'method': 'notifications/cancelled'}], headers)
+    assert status == 200
+    assert [r['id'] for r in body] == [1, 2]
+    assert body[1]['error']['code'] == http_server.METHOD_NOT_FOUND
+
+    status, _, body = await request(app, 'POST', [rpc('initialize'), rpc('ping')])
+    assert status == 400
+
+
+@pytest.mark.asyncio
+async def test_per_session_concurrency_limit(mocker):
+    app = make_app(session_concurrency=2)
+    active = []
+    peak = []
+
+    async def slow_call(*args):
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.pop()
+        return {}
+
+    mocker.patch('mcp_server.http_server.route_tool_call', side_effect=slow_call)
+    first = {'Mcp-Session-Id': await open_session(app)}
+    second = {'Mcp-Session-Id': await open_session(app)}
+    calls = [rpc('tools/call', {'name': 'get_issue', 'arguments': {'issue_key': 'A-1'}}, request_id=i) for i in range(6)]
+
+    await request(app, 'POST', calls, first)
+    assert max(peak) == 2
+
+    peak.clear()
+    await asyncio.gather(request(app, 'POST', calls, first), request(app, 'POST', calls, second))
+    # Each session is limited separately
+    assert max(peak) == 4
+
+
+def test_session_store_evicts_idle_and_expired(monkeypatch):
+    store = SessionStore(max_sessions=2, ttl=60)
+    first, second, third = (Session('2025-06-18', 'all', 1) for _ in range(3))
+    assert store.add(first) and store.add(second)
+    second.in_flight = 1
+    assert store.add(third)
+    assert store.get(first.id) is None  # least recently used idle session made room
+    assert store.get(second.id) is second
+
+    third.in_flight = 1
+    assert not store.add(Session('2025-06-18', 'all', 1))  # every session busy
+
+    second.in_flight = third.in_flight = 0
+    now = http_server.time.monotonic()
+    monkeypatch.setattr(http_server.time, 'monotonic', lambda: now + 61)
+    assert store.expire() == 2
+    assert len(store) == 0
+
+
+def test_reload_rebuilds_profiles(mocker):
+    app = make_app()
+    mocker.patch('mcp_server.http_server.load_config',
+                 return_value=ServerConfig(tool_profiles={'mine': {'tools': ['get_issue']}}, tool_profile='mine'))
+    app.config_path = 'config.yaml'
+    assert 'tool_profiles' in app.reload_config()
+    assert app.profiles.default == 'mine'
+    assert app.profiles.names() == {'get_issue'}
+
+
+@pytest.mark.asyncio
+async def test_shared_sessions_are_served_by_any_worker(tmp_path):
+    from mcp_server.common.shared_cache import SessionTable
+    from mcp_server.http_server import SharedSessionStore
+    path = tmp_path / 'state.sqlite'
+    worker_a = make_app(sessions=SharedSessionStore(SessionTable(path)))
+    worker_b = make_app(sessions=SharedSessionStore(SessionTable(path)))
+
+    session_id = await open_session(worker_a, {'X-MCP-Tool-Profile': 'jira-readonly'})
+    headers = {'Mcp-Session-Id': session_id}
+    status, _, body = await request(worker_b, 'POST', rpc('tools/list'), headers)
+    assert status == 200
+    assert {t['name'] for t in body['result']['tools']} == ToolProfiles().names('jira-readonly')
+
+    status, _, _ = await request(worker_b, 'DELETE', headers=headers)
+    assert status == 200
+    status, _, _ = await request(worker_a, 'POST', rpc('ping'), headers)
+    assert status == 404
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_serves_reads_and_writes_clear_it(mocker, tmp_path):
+    from mcp_server.common.shared_cache import SharedCache
+    cache = SharedCache(tmp_path / 'state.sqlite', ttl=30)
+    worker_a, worker_b = make_app(cache=cache), make_app(cache=SharedCache(cache.path, ttl=30))
+    route = mocker.patch('mcp_server.http_server.route_tool_call', return_value={'key': 'TEST-1'})
+    get_issue = rpc('tools/call', {'name': 'get_issue', 'arguments': {'issue_key': 'TEST-1'}})
+
+    _, _, first = await request(worker_a, 'POST', get_issue, {'Mcp-Session-Id': await open_session(worker_a)})
+    headers_b = {'Mcp-Session-Id': await open_session(worker_b)}
+    _, _, second = await request(worker_b, 'POST', get_issue, headers_b)
+    assert first['result'] == second['result']
+    assert route.call_count == 1
+
+    route.return_value = {'success': True}
+    await request(worker_b, 'POST', rpc('tools/call', {'name': 'add_comment', 'arguments': {
+        'issue_key': 'TEST-1', 'comment': 'hi'}}), headers_b)
+    assert len(cache) == 0
+
+    route.return_value = {'error': 'Not found'}
+    await request(worker_b, 'POST', get_issue, headers_b)
+    await request(worker_b, 'POST', get_issue, headers_b)
+    assert route.call_count == 4  # errors are not cached
+
+
+def test_create_app_uses_shared_state_for_workers(monkeypatch, tmp_path, mocker):
+    from mcp_server.http_server import SharedSessionStore, create_app
+    mocker.patch('mcp_server.http_server.McpHttpApp', side_effect=lambda **kwargs: kwargs)
+    monkeypatch.setenv('MCP_HTTP_STATE_DB', str(tmp_path / 'state.sqlite'))
+    monkeypatch.setenv('MCP_HTTP_WORKERS', '4')
+    kwargs = create_app()
+    assert isinstance(kwargs['sessions'], SharedSessionStore)
+    assert kwargs['cache'].path == tmp_path / 'state.sqlite'
+
+    monkeypatch.setenv('MCP_HTTP_WORKERS', '1')
+    assert create_app()['sessions'] is None
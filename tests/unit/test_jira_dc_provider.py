@@ -98,6 +98,20 @@ async def test_search_success(jira_dc_provider, mock_response):
     jira_dc_provider.session.get.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_search_pages_with_start_at(jira_dc_provider, mock_response):
+    mock_response.json = Mock(return_value={
+        "total": 120,
+        "issues": [{"key": f"TEST-{i}", "fields": {"summary": "Test"}} for i in range(50)]
+    })
+    jira_dc_provider.session.get = Mock(return_value=mock_response)
+
+    result = await jira_dc_provider.search("project = TEST", page_token="50")
+
+    assert jira_dc_provider.session.get.call_args.kwargs["params"]["startAt"] == 50
+    assert result["next_page_token"] == "100"
+
+
 @pytest.mark.asyncio
 async def test_list_projects_success(jira_dc_provider, mock_response):
     mock_response.json = Mock(return_value=[{"key": "TEST", "name": "Test Project"}])
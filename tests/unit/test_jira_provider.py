@@ -99,6 +99,20 @@ async def test_search_success(jira_provider, mock_response):
     jira_provider.session.get.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_search_pages_with_next_page_token(jira_provider, mock_response):
+    mock_response.json = Mock(return_value={
+        "issues": [{"key": "TEST-123", "fields": {"summary": "Test"}}],
+        "nextPageToken": "page-3", "isLast": False
+    })
+    jira_provider.session.get = Mock(return_value=mock_response)
+
+    result = await jira_provider.search("project = TEST", page_token="page-2")
+
+    assert jira_provider.session.get.call_args.kwargs["params"]["nextPageToken"] == "page-2"
+    assert result["next_page_token"] == "page-3"
+
+
 @pytest.mark.asyncio
 async def test_list_projects_success(jira_provider, mock_response):
     mock_response.json = Mock(return_value=[{"key": "TEST", "name": "Test Project"}])
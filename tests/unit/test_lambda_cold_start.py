@@ -0,0 +1,58 @@
+"""Cold start budget for the Lambda handler.
+
+Each check runs in a fresh interpreter. The deferred-module checks are the real
+guard and are deterministic. The import-time budget depends on the machine, so
+it only runs when LAMBDA_IMPORT_BUDGET_MS is set (see
+benchmarks/bench_lambda_import.py for real numbers).
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+
+# Cumulative `python -X importtime` budget for `import lambda_handler`
+IMPORT_BUDGET_MS = float(os.getenv('LAMBDA_IMPORT_BUDGET_MS') or 0)
+
+# Modules that must not be loaded before the first tools/call
+DEFERRED_MODULES = [
+    'requests', 'urllib3', 'numpy', 'yaml', 'boto3', 'asyncio',
+    'mcp_server.common.auth', 'mcp_server.cloud', 'mcp_server.datacenter',
+    'mcp_server.common.ticket_support_tools',
+]
+
+PROBE = """
+import json, sys
+import lambda_handler
+class Context:
+    aws_request_id = 'test'
+event = {'httpMethod': 'GET'} if sys.argv[1] == 'health' else {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/list'})}
+response = lambda_handler.lambda_handler(event, Context())
+print(json.dumps({'status': response['statusCode'], 'loaded': [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+
+def run_python(*args):
+    env = {k: v for k, v in os.environ.items()
+           if not k.startswith(('ATLASSIAN_', 'JIRA_', 'CONFLUENCE_', 'BITBUCKET_', 'AGENT_'))}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize('scenario', ['health', 'list'])
+def test_cold_path_defers_heavy_modules(scenario):
+    result = run_python('-c', PROBE, scenario, json.dumps(DEFERRED_MODULES))
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe['status'] == 200
+    assert probe['loaded'] == []
+
+
+@pytest.mark.skipif(IMPORT_BUDGET_MS <= 0, reason='set LAMBDA_IMPORT_BUDGET_MS to run the timing check')
+def test_import_time_budget():
+    result = run_python('-X', 'importtime', '-c', 'import lambda_handler')
+    line = next(l for l in result.stderr.splitlines() if l.rstrip().endswith('| lambda_handler'))
+    cumulative_ms = int(line.split('|')[1]) / 1000
+    assert cumulative_ms < IMPORT_BUDGET_MS, f"import lambda_handler took {cumulative_ms:.1f} ms"
@@ -0,0 +1,222 @@
+import asyncio
+import io
+import json
+import pytest
+
+import lambda_handler as handler
+
+
+class Context:
+    aws_request_id = 'req-1'
+
+
+def tool_event(name, arguments=None):
+    return {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/call', 'params': {'name': name, 'arguments': arguments or {}}})}
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    calls = []
+
+    async def fake_route(name, arguments, jira, confluence, bitbucket):
+        calls.append(asyncio.get_running_loop())
+        if name == 'boom':
+            raise RuntimeError('boom')
+        return {'ok': name}
+
+    monkeypatch.setattr(handler, 'route_tool_call', fake_route)
+    monkeypatch.setattr(handler, 'put_metric', lambda *args, **kwargs: None)
+    return calls
+
+
+def test_event_loop_reused_across_invocations(routed):
+    first = handler.lambda_handler(tool_event('get_issue'), Context())
+    second = handler.lambda_handler(tool_event('get_issue'), Context())
+    assert json.loads(first['body']) == {'result': {'ok': 'get_issue'}}
+    assert second['statusCode'] == 200
+    assert routed[0] is routed[1]
+    assert not routed[0].is_closed()
+
+
+def test_event_loop_survives_tool_failure(routed):
+    failed = handler.lambda_handler(tool_event('boom'), Context())
+    assert failed['statusCode'] == 500
+    handler.lambda_handler(tool_event('get_issue'), Context())
+    assert routed[0] is routed[1]
+
+
+def test_run_async_cancels_leftover_tasks():
+    started = []
+
+    async def spawn():
+        async def forever():
+            started.append(True)
+            await asyncio.sleep(3600)
+        task = asyncio.ensure_future(forever())
+        await asyncio.sleep(0)
+        return task
+
+    task = handler.run_async(spawn())
+    assert started and task.cancelled()
+    assert handler.run_async(asyncio.sleep(0, result='next')) == 'next'
+
+
+def test_closed_loop_is_replaced():
+    loop = handler.get_event_loop()
+    loop.close()
+    assert handler.get_event_loop() is not loop
+    assert handler.run_async(asyncio.sleep(0, result=1)) == 1
+
+
+def test_metrics_emitted_as_single_emf_line(monkeypatch):
+    async def fake_route(name, arguments, jira, confluence, bitbucket):
+        return {'ok': name}
+
+    stream = io.StringIO()
+    monkeypatch.setattr(handler, 'route_tool_call', fake_route)
+    monkeypatch.setattr(handler.metrics, 'stream', stream)
+    handler.lambda_handler(tool_event('get_issue'), Context())
+
+    [line] = stream.getvalue().splitlines()
+    doc = json.loads(line)
+    assert doc['ToolInvocation'] == 1
+    assert doc['Platform'] == handler.PLATFORM
+    assert {m['Name'] for d in doc['_aws']['CloudWatchMetrics'] for m in d['Metrics']} == {'ToolInvocation', 'ToolDuration'}
+
+
+def rpc_event(body):
+    return {'httpMethod': 'POST', 'body': json.dumps(body)}
+
+
+@pytest.fixture
+def slow_route(monkeypatch):
+    import time
+
+    async def fake_route(name, arguments, jira, confluence, bitbucket):
+        time.sleep(0.2)  # providers block inside their async methods
+        if name == 'boom':
+            raise RuntimeError('boom')
+        return {'tool': name, 'arguments': arguments}
+
+    monkeypatch.setattr(handler, 'route_tool_call', fake_route)
+    monkeypatch.setattr(handler, 'put_metric', lambda *args, **kwargs: None)
+
+
+def test_call_many_runs_concurrently_in_order(slow_route):
+    import time
+    calls = [{'name': 'get_issue', 'arguments': {'issue_key': f'T-{i}'}} for i in range(3)] + [{'name': 'boom'}]
+    start = time.perf_counter()
+    result = handler.lambda_handler(rpc_event({'method': 'tools/call_many', 'params': {'calls': calls}}), Context())
+    elapsed = time.perf_counter() - start
+
+    body = json.loads(result['body'])
+    assert result['statusCode'] == 200
+    assert elapsed < 0.6
+    assert [r['result']['arguments']['issue_key'] for r in body['results'][:3]] == ['T-0', 'T-1', 'T-2']
+    assert [r['status'] for r in body['results']] == ['success'] * 3 + ['error']
+    assert body['results'][3]['error'] == 'boom'
+    assert all(r['duration_ms'] >= 150 for r in body['results'])
+
+
+def test_call_many_rejects_bad_call_lists(slow_route):
+    for calls in (None, [], [{'arguments': {}}], [{'name': 'get_issue'}] * (handler.MAX_CALLS_PER_REQUEST + 1)):
+        result = handler.lambda_handler(rpc_event({'method': 'tools/call_many', 'params': {'calls': calls}}), Context())
+        assert result['statusCode'] == 400
+
+
+def test_jsonrpc_batch(slow_route):
+    batch = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call', 'params': {'name': 'get_issue', 'arguments': {'issue_key': 'T-1'}}},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/list'},
+        {'jsonrpc': '2.0', 'id': 3, 'method': 'tools/call', 'params': {'name': 'boom'}},
+        {'jsonrpc': '2.0', 'id': 4, 'method': 'nope'},
+    ]
+    result = handler.lambda_handler(rpc_event(batch), Context())
+    body = json.loads(result['body'])
+
+    assert result['statusCode'] == 200
+    assert [r['id'] for r in body] == [1, 2, 3, 4]
+    assert body[0]['result']['tool'] == 'get_issue'
+    assert len(body[1]['tools']) == handler.TOOL_COUNT
+    assert body[2]['status'] == 'error'
+    assert body[3]['error'] == 'Invalid method'
+    assert handler.lambda_handler(rpc_event([]), Context())['statusCode'] == 400
+
+
+def test_batch_rejects_nested_call_many(routed):
+    nested = {'calls': [{'name': 'get_issue'}] * handler.MAX_CALLS_PER_REQUEST}
+    batch = [{'id': i, 'method': 'tools/call_many', 'params': nested} for i in range(2)]
+    result = handler.lambda_handler(rpc_event(batch), Context())
+    body = json.loads(result['body'])
+
+    assert [r['error'] for r in body] == ['tools/call_many is not allowed inside a batch'] * 2
+    assert routed == []
+
+
+def test_profile_rejection_is_not_a_failure_metric(routed, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(handler, 'put_metric', lambda *args, **kwargs: recorded.append(kwargs))
+    headers = {'x-mcp-tool-profile': 'jira-readonly'}
+
+    single = handler.lambda_handler({**tool_event('create_issue'), 'headers': headers}, Context())
+    batch = handler.lambda_handler({**rpc_event([{'id': 1, 'method': 'tools/call', 'params': {'name': 'create_issue'}}]),
+                                    'headers': headers}, Context())
+
+    assert single['statusCode'] == 403
+    assert json.loads(batch['body'])[0]['rejected'] is True
+    assert recorded == []
+    assert routed == []
+
+
+def test_tools_list_etag_and_gzip():
+    import base64
+    import gzip
+    list_event = {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/list'})}
+
+    first = handler.lambda_handler(list_event, Context())
+    etag = first['headers']['ETag']
+    assert first['statusCode'] == 200
+    assert len(json.loads(first['body'])['tools']) == handler.TOOL_COUNT
+
+    cached = handler.lambda_handler({**list_event, 'headers': {'if-none-match': etag}}, Context())
+    assert cached['statusCode'] == 304
+    assert cached['body'] == ''
+    assert cached['headers']['ETag'] == etag
+
+    compressed = handler.lambda_handler({**list_event, 'headers': {'Accept-Encoding': 'gzip'}}, Context())
+    assert compressed['isBase64Encoded'] is True
+    assert compressed['headers']['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(base64.b64decode(compressed['body'])).decode() == first['body']
+
+
+def test_base64_encoded_request_body():
+    import base64
+    body = base64.b64encode(json.dumps({'method': 'tools/list'}).encode()).decode()
+    result = handler.lambda_handler({'httpMethod': 'POST', 'body': body, 'isBase64Encoded': True}, Context())
+    assert result['statusCode'] == 200
+
+
+def test_tool_profile_header_filters_list_and_routing(routed):
+    list_event = {'httpMethod': 'POST', 'body': json.dumps({'method': 'tools/list'}),
+                  'headers': {'x-mcp-tool-profile': 'jira-readonly'}}
+    listed = handler.lambda_handler(list_event, Context())
+    names = {t['name'] for t in json.loads(listed['body'])['tools']}
+    assert names == handler.get_profiles().names('jira-readonly')
+    assert listed['headers']['X-MCP-Catalog-Tools'] == str(len(names))
+    assert listed['headers']['ETag'] != handler.lambda_handler({**list_event, 'headers': {}}, Context())['headers']['ETag']
+
+    allowed = handler.lambda_handler({**tool_event('get_issue'), 'headers': list_event['headers']}, Context())
+    assert allowed['statusCode'] == 200
+    rejected = handler.lambda_handler({**tool_event('create_issue'), 'headers': list_event['headers']}, Context())
+    assert rejected['statusCode'] == 403
+    assert 'not available in tool profile' in json.loads(rejected['body'])['error']
+
+    unknown = handler.lambda_handler({**tool_event('get_issue'), 'headers': {'X-MCP-Tool-Profile': 'nope'}}, Context())
+    assert unknown['statusCode'] == 400
+
+
+def test_health_check_reports_profile_sizes():
+    body = json.loads(handler.lambda_handler({'httpMethod': 'GET'}, Context())['body'])
+    assert body['tool_profile'] == 'all'
+    assert body['profiles']['all'] == handler.TOOL_COUNT
+    assert body['profiles']['jira-readonly'] == 20
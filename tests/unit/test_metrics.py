@@ -0,0 +1,47 @@
+import io
+import json
+from mcp_server.common.metrics import MetricsLogger
+
+
+def flushed(logger):
+    stream = io.StringIO()
+    logger.stream = stream
+    count = logger.flush()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == count
+    return [json.loads(line) for line in lines]
+
+
+def test_tool_metrics_share_one_document():
+    logger = MetricsLogger()
+    logger.put_metric('ToolInvocation', 1, ToolName='get_issue', Platform='cloud', Status='Success')
+    logger.put_metric('ToolDuration', 12.5, unit='Milliseconds', ToolName='get_issue', Platform='cloud')
+
+    [doc] = flushed(logger)
+    assert doc['ToolName'] == 'get_issue'
+    assert doc['Status'] == 'Success'
+    assert doc['ToolInvocation'] == 1
+    assert doc['ToolDuration'] == 12.5
+    directives = doc['_aws']['CloudWatchMetrics']
+    assert [d['Dimensions'] for d in directives] == [[['ToolName', 'Platform', 'Status']], [['ToolName', 'Platform']]]
+    assert all(d['Namespace'] == 'AtlassianMCP' for d in directives)
+    assert directives[1]['Metrics'] == [{'Name': 'ToolDuration', 'Unit': 'Milliseconds'}]
+
+
+def test_repeated_metrics_batched_and_conflicts_split():
+    logger = MetricsLogger()
+    logger.put_metric('ToolInvocation', 1, ToolName='a', Platform='cloud', Status='Success')
+    logger.put_metric('ToolInvocation', 1, ToolName='a', Platform='cloud', Status='Success')
+    logger.put_metric('ToolInvocation', 1, ToolName='b', Platform='cloud', Status='Failure')
+
+    docs = flushed(logger)
+    assert len(docs) == 2
+    assert docs[0]['ToolInvocation'] == [1, 1]
+    assert (docs[1]['ToolName'], docs[1]['Status']) == ('b', 'Failure')
+
+
+def test_flush_clears_buffer():
+    logger = MetricsLogger()
+    logger.put_metric('ToolInvocation', 1, ToolName='a')
+    assert len(flushed(logger)) == 1
+    assert flushed(logger) == []
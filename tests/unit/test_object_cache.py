@@ -0,0 +1,72 @@
+import os
+import time
+from mcp_server.common.object_cache import ObjectCache
+
+KEY = ('cloud', 'workspace', 'repo', 'diff', 'abc1234')
+
+
+def test_put_get_and_fetch(tmp_path):
+    cache = ObjectCache(tmp_path, max_bytes=1024)
+    assert cache.get(KEY) is None
+    cache.put(KEY, b'diff --git a b')
+    assert cache.get(KEY) == b'diff --git a b'
+
+    calls = []
+    assert cache.fetch_text(('x',), lambda: calls.append(1) or 'text') == 'text'
+    assert cache.fetch_text(('x',), lambda: calls.append(1) or 'other') == 'text'
+    assert cache.fetch_json(('j',), lambda: {'hash': 'abc'}) == {'hash': 'abc'}
+    assert cache.fetch_json(('j',), lambda: {}) == {'hash': 'abc'}
+    assert calls == [1]
+
+    cache.put(('empty',), b'')
+    assert cache.get(('empty',)) == b''
+
+
+def test_cache_directory_is_private(tmp_path):
+    cache = ObjectCache(tmp_path / 'objects', max_bytes=1024)
+    cache.put(KEY, b'data')
+    assert (tmp_path / 'objects').stat().st_mode & 0o777 == 0o700
+    assert cache._path(cache.key(KEY)).parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_keys_are_content_addressed():
+    assert ObjectCache.key(KEY) == ObjectCache.key(list(KEY))
+    assert ObjectCache.key(KEY) != ObjectCache.key(('cloud', 'workspace', 'repo', 'diff', 'abc1235'))
+    assert ObjectCache.key(('a', 'bc')) != ObjectCache.key(('ab', 'c'))
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    cache = ObjectCache(tmp_path, max_bytes=400)
+    for name in ('a', 'b', 'c'):
+        cache.put((name,), b'x' * 100)
+    assert cache.get(('a',)) is not None  # a is now the most recently used
+    cache.put(('d',), b'x' * 100)
+    cache.put(('e',), b'x' * 100)
+    assert cache.get(('b',)) is None
+    assert all(cache.get((n,)) is not None for n in ('a', 'c', 'd', 'e'))
+    assert cache.total_bytes == 400
+
+    cache.put(('huge',), b'x' * 101)  # over a quarter of the cache is never stored
+    assert cache.get(('huge',)) is None
+
+
+def test_new_process_adopts_existing_objects_in_recency_order(tmp_path):
+    first = ObjectCache(tmp_path, max_bytes=400)
+    first.put(('old',), b'x' * 100)
+    first.put(('new',), b'x' * 100)
+    past = time.time() - 3600
+    os.utime(first._path(ObjectCache.key(('old',))), (past, past))
+
+    second = ObjectCache(tmp_path, max_bytes=400)
+    assert second.total_bytes == 200
+    for name in ('more', 'and', 'more'[::-1]):
+        second.put((name,), b'x' * 100)
+    assert second.get(('old',)) is None
+    assert second.get(('new',)) == b'x' * 100
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ObjectCache(tmp_path, max_bytes=0)
+    cache.put(KEY, b'data')
+    assert cache.get(KEY) is None
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,84 @@
+import pytest
+from mcp_server.common.path_index import PathIndex, PathIndexCache, is_full_commit_hash
+
+PATHS = [
+    "README.md",
+    "docs/setup.md",
+    "src/app/main.py",
+    "src/app/models/user_profile.py",
+    "src/app/utils/string_helpers.py",
+    "tests/test_user_profile.py",
+    "tests/fixtures/profile.json",
+]
+
+
+@pytest.fixture
+def index():
+    return PathIndex(PATHS)
+
+
+def test_substring_is_case_insensitive_and_each_path_once(index):
+    assert index.search("PROFILE") == [
+        "src/app/models/user_profile.py", "tests/fixtures/profile.json", "tests/test_user_profile.py"]
+    assert index.search("p") == sorted(p for p in PATHS if "p" in p.lower())
+    assert index.search("profile", limit=1) == ["src/app/models/user_profile.py"]
+    assert index.search("nothing") == []
+    assert index.search("md") == ["README.md", "docs/setup.md"]
+
+
+def test_glob_matches_file_name_or_full_path(index):
+    assert index.search("*.md", "glob") == ["README.md", "docs/setup.md"]
+    assert index.search("test_*.py", "glob") == ["tests/test_user_profile.py"]
+    assert index.search("src/*/models/*", "glob") == ["src/app/models/user_profile.py"]
+    assert index.search("*.MD", "glob") == ["README.md", "docs/setup.md"]
+
+
+def test_fuzzy_ranks_file_name_matches_first(index):
+    results = index.search("usrprof", "fuzzy")
+    assert set(results) == {"src/app/models/user_profile.py", "tests/test_user_profile.py"}
+    assert index.search("strhelp", "fuzzy")[0] == "src/app/utils/string_helpers.py"
+    assert index.search("main", "fuzzy")[0] == "src/app/main.py"
+    assert index.search("zzz", "fuzzy") == []
+
+
+def test_results_are_memoized(index):
+    first = index.search("profile")
+    first.append("mutated")
+    assert index.search("profile") == [
+        "src/app/models/user_profile.py", "tests/fixtures/profile.json", "tests/test_user_profile.py"]
+    with pytest.raises(ValueError):
+        index.search("x", "regex")
+
+
+def test_cache_builds_once_per_commit_and_evicts():
+    cache = PathIndexCache(max_indexes=2)
+    builds = []
+
+    def build(paths):
+        def _build():
+            builds.append(paths)
+            return paths
+        return _build
+
+    index, cached = cache.get_or_build(("repo", "c1"), build(["a.py"]))
+    assert not cached and len(index) == 1
+    assert cache.get_or_build(("repo", "c1"), build(["other.py"])) == (index, True)
+    cache.get_or_build(("repo", "c2"), build(["b.py"]))
+    cache.get_or_build(("repo", "c3"), build(["c.py"]))
+    _, cached = cache.get_or_build(("repo", "c1"), build(["a.py"]))
+    assert not cached
+    assert len(builds) == 4
+
+
+def test_cache_persists_to_disk(tmp_path):
+    PathIndexCache(directory=tmp_path).get_or_build(("repo", "c1"), lambda: PATHS)
+    reloaded, cached = PathIndexCache(directory=tmp_path).get_or_build(("repo", "c1"), lambda: pytest.fail("rebuilt"))
+    assert cached
+    assert reloaded.paths == tuple(sorted(PATHS))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_is_full_commit_hash():
+    assert is_full_commit_hash("0123456789abcdef0123456789abcdef01234567")
+    assert not is_full_commit_hash("main")
+    assert not is_full_commit_hash("abc1234")
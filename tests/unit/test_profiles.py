@@ -0,0 +1,51 @@
+import json
+import pytest
+from mcp_server.common.catalog import get_catalog
+from mcp_server.common.profiles import ALL_TOOL_NAMES, BUILTIN_PROFILES, ToolProfiles
+
+
+def test_builtin_profiles_name_real_tools():
+    profiles = ToolProfiles()
+    assert profiles.default == 'all'
+    assert profiles.profile_names() == ['all', 'code-review', 'jira-readonly', 'support-triage']
+    for name, definition in BUILTIN_PROFILES.items():
+        assert profiles.names(name) == set(definition['tools'])
+        assert profiles.names(name) <= set(ALL_TOOL_NAMES)
+    assert profiles.counts()['all'] == len(ALL_TOOL_NAMES) == 105
+
+
+def test_profile_catalog_is_filtered_and_versioned():
+    profiles = ToolProfiles()
+    catalog = profiles.catalog('jira-readonly')
+    assert profiles.catalog('jira-readonly') is catalog
+    assert profiles.catalog('all') is get_catalog()
+    assert [t['name'] for t in json.loads(catalog.body)['tools']] == [t['name'] for t in catalog.tools]
+    assert catalog.names == profiles.names('jira-readonly')
+    assert catalog.etag != get_catalog().etag
+    sizes = profiles.sizes()
+    assert sizes['jira-readonly']['bytes'] < sizes['all']['bytes'] / 4
+
+
+def test_custom_profiles_extend_glob_and_exclude():
+    profiles = ToolProfiles({
+        'triage-plus-prs': {'extends': 'support-triage', 'tools': ['*pull_request*'], 'exclude': ['merge_pull_request']},
+        'jira-readonly': {'tools': ['get_issue']}
+    }, default='triage-plus-prs')
+    names = profiles.names()
+    assert names >= profiles.names('support-triage')
+    assert 'get_pull_request_diff' in names and 'merge_pull_request' not in names
+    assert profiles.names('jira-readonly') == {'get_issue'}
+    assert profiles.allows(None, 'list_pull_requests')
+    assert not profiles.allows(None, 'create_issue')
+    assert profiles.allows('all', 'not_a_tool')  # left for the router to reject
+
+
+@pytest.mark.parametrize('custom, default', [
+    ({'typo': {'tools': ['get_isue']}}, 'all'),
+    ({'a': {'extends': 'b'}, 'b': {'extends': 'a'}}, 'all'),
+    ({'a': {'extends': 'missing'}}, 'all'),
+    ({}, 'missing'),
+])
+def test_invalid_profiles_fail_up_front(custom, default):
+    with pytest.raises(ValueError):
+        ToolProfiles(custom, default=default)
@@ -0,0 +1,64 @@
+import inspect
+import pytest
+from unittest.mock import AsyncMock, Mock
+from mcp_server.common.registry import REGISTRY, TOOL_SPECS, PROVIDERS, JIRA, CONFLUENCE, BITBUCKET, dispatch
+from mcp_server.common.profiles import ALL_TOOL_NAMES, ToolProfiles
+from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+from mcp_server.cloud.jira_provider import JiraProvider
+from mcp_server.cloud.confluence_provider import ConfluenceProvider
+from mcp_server.cloud.bitbucket_provider import BitbucketProvider
+from mcp_server.datacenter.jira_dc_provider import JiraDCProvider
+from mcp_server.datacenter.confluence_dc_provider import ConfluenceDCProvider
+from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
+import mcp_server.common.ticket_support_tools as ticket_support_tools
+
+PROVIDER_CLASSES = {
+    JIRA: (JiraProvider, JiraDCProvider),
+    CONFLUENCE: (ConfluenceProvider, ConfluenceDCProvider),
+    BITBUCKET: (BitbucketProvider, BitbucketDCProvider),
+}
+
+
+def test_registry_covers_every_advertised_tool():
+    assert len(REGISTRY) == len(TOOL_SPECS)
+    assert list(REGISTRY) == list(ALL_TOOL_NAMES)
+    assert all(spec.description and spec.schema == TOOL_SCHEMAS[name] for name, spec in REGISTRY.items())
+
+
+@pytest.mark.parametrize('spec', TOOL_SPECS, ids=lambda spec: spec.name)
+def test_spec_matches_schema_and_handler(spec):
+    mapped = {arg[0] if isinstance(arg, tuple) else arg for arg in spec.args if arg not in PROVIDERS}
+    required = {arg for arg in spec.args if isinstance(arg, str) and arg not in PROVIDERS}
+    assert mapped == set(spec.schema.get('properties', {}))
+    assert required == set(spec.schema.get('required', []))
+    for target in PROVIDER_CLASSES.get(spec.target, (ticket_support_tools,)):
+        handler = getattr(target, spec.method)
+        parameters = [p for p in inspect.signature(handler).parameters if p != 'self']
+        assert len(parameters) >= len(spec.args)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_maps_arguments_and_defaults():
+    bitbucket = Mock(list_commits=AsyncMock(return_value={'commits': []}))
+    assert await dispatch('list_commits', {'repo_slug': 'repo', 'path': 'src/app.py'}, None, None, bitbucket) == {'commits': []}
+    bitbucket.list_commits.assert_awaited_once_with('repo', 'main', 'src/app.py')
+
+    assert await dispatch('get_commit', {'repo_slug': 'repo'}, None, None, bitbucket) == {
+        'error': 'Invalid arguments for get_commit: Missing required argument: commit_hash'}
+    with pytest.raises(ValueError, match='Unknown tool'):
+        await dispatch('nope', {}, None, None, bitbucket)
+
+
+def test_side_effect_policy():
+    assert REGISTRY['get_issue'].read_only and REGISTRY['get_issue'].cacheable
+    assert not REGISTRY['merge_pull_request'].read_only and not REGISTRY['merge_pull_request'].idempotent
+    assert REGISTRY['assign_issue'].idempotent and not REGISTRY['assign_issue'].cacheable
+    # Ticket support tools read process-local snapshot state
+    assert REGISTRY['get_open_support_tickets'].read_only and not REGISTRY['get_open_support_tickets'].cacheable
+    assert REGISTRY['check_ticket_template'].cacheable
+    assert all(REGISTRY[name].read_only for name in ToolProfiles().names('jira-readonly'))
+
+    profiles = ToolProfiles({'review-readonly': {'extends': 'code-review', 'read_only': True}})
+    names = profiles.names('review-readonly')
+    assert 'get_pull_request_diff' in names
+    assert not names & {'approve_pull_request', 'add_pr_comment', 'request_changes'}
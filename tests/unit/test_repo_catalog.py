@@ -0,0 +1,55 @@
+import pytest
+
+from mcp_server.common.repo_catalog import RepoCatalog, RepoCatalogCache
+
+REPOS = [
+    {'slug': 'payments-service', 'name': 'Payments Service'},
+    {'slug': 'payment-gateway', 'name': 'Payment Gateway'},
+    {'slug': 'web-frontend', 'name': 'Web Frontend'},
+    {'slug': 'api', 'name': 'API'},
+    {'slug': 'api-docs', 'name': 'API Docs'},
+]
+
+
+def slugs(repos):
+    return [r['slug'] for r in repos]
+
+
+def test_substring_matches_names_and_slugs_in_name_order():
+    catalog = RepoCatalog(REPOS)
+
+    assert slugs(catalog.search('PAYMENT')) == ['payment-gateway', 'payments-service']
+    assert slugs(catalog.search('-fro')) == ['web-frontend']
+    assert slugs(catalog.search('api', limit=1)) == ['api']
+    assert catalog.search('  ') == []
+
+
+def test_fuzzy_ranks_exact_then_prefix_then_similar():
+    catalog = RepoCatalog(REPOS)
+
+    assert slugs(catalog.search('api', 'fuzzy')) == ['api', 'api-docs']
+    assert slugs(catalog.search('paymnts servce', 'fuzzy'))[0] == 'payments-service'
+    assert slugs(catalog.search('gatewy', 'fuzzy')) == ['payment-gateway']
+    assert slugs(catalog.search('we', 'fuzzy')) == ['web-frontend']
+    assert catalog.search('zzzz', 'fuzzy') == []
+    with pytest.raises(ValueError):
+        catalog.search('api', 'glob')
+
+
+def test_cache_rebuilds_after_ttl():
+    cache = RepoCatalogCache(ttl=60)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return REPOS
+
+    catalog, cached = cache.get_or_build(('cloud', 'ws'), build)
+    assert (len(catalog), cached) == (5, False)
+    assert cache.get_or_build(('cloud', 'ws'), build) == (catalog, True)
+    assert len(builds) == 1
+
+    cache.ttl = 0
+    assert cache.get(('cloud', 'ws')) is None
+    cache.get_or_build(('cloud', 'ws'), build)
+    assert len(builds) == 2
@@ -91,7 +91,7 @@ async def test_route_bitbucket_search(mock_providers):
     result = await route_tool_call("search_bitbucket", {"query": "test"}, jira, confluence, bitbucket)
     
     assert result == {"success": True}
-    bitbucket.search.assert_called_once_with("test")
+    bitbucket.search.assert_called_once_with("test", "substring", None)
 
 
 @pytest.mark.asyncio
@@ -213,18 +213,18 @@ async def test_bitbucket_tools(mock_providers):
         ("create_pull_request", {"repo_slug": "repo", "title": "test", "source_branch": "dev", "dest_branch": "main"}),
         ("get_file_content", {"repo_slug": "repo", "file_path": "test.txt"}),
         ("list_commits", {"repo_slug": "repo"}),
-        ("get_commit", {"repo_slug": "repo", "commit_hash": "abc123"}),
+        ("get_commit", {"repo_slug": "repo", "commit_hash": "abc1234"}),
         ("list_branches", {"repo_slug": "repo"}),
         ("get_pull_request_diff", {"repo_slug": "repo", "pr_id": 1}),
         ("get_pull_request_comments", {"repo_slug": "repo", "pr_id": 1}),
         ("add_pr_comment", {"repo_slug": "repo", "pr_id": 1, "comment": "test"}),
         ("approve_pull_request", {"repo_slug": "repo", "pr_id": 1}),
         ("merge_pull_request", {"repo_slug": "repo", "pr_id": 1}),
-        ("get_commit_diff", {"repo_slug": "repo", "commit_hash": "abc123"}),
+        ("get_commit_diff", {"repo_slug": "repo", "commit_hash": "abc1234"}),
         ("list_tags", {"repo_slug": "repo"}),
         ("list_directory", {"repo_slug": "repo"}),
         ("update_pull_request", {"repo_slug": "repo", "pr_id": 1}),
-        ("compare_commits", {"repo_slug": "repo", "from_commit": "abc123", "to_commit": "def456"}),
+        ("compare_commits", {"repo_slug": "repo", "from_commit": "abc1234", "to_commit": "def4567"}),
         ("add_pr_reviewer", {"repo_slug": "repo", "pr_id": 1, "account_id": "123"}),
         ("decline_pull_request", {"repo_slug": "repo", "pr_id": 1}),
         ("create_branch", {"repo_slug": "repo", "branch_name": "feature"}),
@@ -236,7 +236,7 @@ async def test_bitbucket_tools(mock_providers):
         ("list_commits_by_author", {"repo_slug": "repo", "author": "user"}),
         ("request_changes", {"repo_slug": "repo", "pr_id": 1}),
         ("get_branch_restrictions", {"repo_slug": "repo"}),
-        ("get_build_status", {"repo_slug": "repo", "commit_hash": "abc123"}),
+        ("get_build_status", {"repo_slug": "repo", "commit_hash": "abc1234"}),
         ("create_webhook", {"repo_slug": "repo", "url": "https://example.com"}),
     ]
     
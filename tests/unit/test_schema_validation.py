@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from mcp_server.common.router import route_tool_call
+from mcp_server.common.schema_validation import compile_schema, get_validators, validate_arguments
+from mcp_server.common.tool_schemas import TOOL_SCHEMAS
+
+
+def test_every_tool_schema_compiles_once():
+    validators = get_validators()
+    assert get_validators() is validators
+    assert set(validators) == set(TOOL_SCHEMAS)
+
+
+@pytest.mark.parametrize('name, arguments, error', [
+    ('get_issue', {'issue_key': 'PROJ-1'}, None),
+    ('get_issue', {}, "Missing required argument: issue_key"),
+    ('get_issue', {'issue_key': None}, "Missing required argument: issue_key"),
+    ('get_issue', ['PROJ-1'], "Arguments must be an object"),
+    ('get_pull_request', {'repo_slug': 'repo', 'pr_id': '7'}, "Argument 'pr_id' must be of type integer"),
+    ('get_pull_request', {'repo_slug': 'repo', 'pr_id': True}, "Argument 'pr_id' must be of type integer"),
+    ('list_pull_requests', {'repo_slug': 'repo', 'state': 'MERGED'}, None),
+    ('list_pull_requests', {'repo_slug': 'repo', 'state': 'BOGUS'}, "Argument 'state' must be one of: OPEN, MERGED, DECLINED"),
+    ('create_webhook', {'repo_slug': 'repo', 'url': 'https://x', 'events': ['repo:push', 1]}, "Items of argument 'events' must be of type string"),
+    ('suggest_assignee', {'issue_key': 'PROJ-1', 'rank_locally': 'yes'}, "Argument 'rank_locally' must be of type boolean"),
+    ('get_page', {'page_id': '1', 'chunk_size': None, 'extra': 'ignored'}, None),
+    ('get_issue', {'issue_key': 'proj 1'}, "Argument 'issue_key' has an invalid format (expected pattern ^[A-Z][A-Z0-9]+-\\d+$)"),
+    ('get_commit', {'repo_slug': 'repo', 'commit_hash': 'abc1234'}, None),
+    ('get_repository', {'repo_slug': 'Repo!'}, "Argument 'repo_slug' has an invalid format (expected pattern ^[a-z0-9_-]+$)"),
+    ('get_commit', {'repo_slug': 'repo', 'commit_hash': 'HEAD'}, "Argument 'commit_hash' has an invalid format (expected pattern ^[a-f0-9]{7,40}$)"),
+    ('get_space', {'space_key': '~557058:abc'}, None),
+    ('search_bitbucket', {'query': 'api', 'limit': 1}, None),
+    ('search_bitbucket', {'query': 'api', 'limit': 0}, "Argument 'limit' must be at least 1"),
+    # Labels may contain dots, and no provider checks them against a pattern
+    ('add_label', {'issue_key': 'PROJ-1', 'label': 'v1.2'}, None),
+    ('search_by_label', {'label': 'v1.2', 'space_key': ''}, None),
+    # An empty optional key is the router's own default, so it counts as omitted
+    ('search_by_assignee', {'assignee': 'me', 'project_key': ''}, None),
+    ('search_by_reporter', {'reporter': 'me', 'project_key': ''}, None),
+    ('get_recent_issues', {'project_key': ''}, None),
+    ('get_user_permissions', {'project_key': ''}, None),
+    ('copy_page', {'page_id': '1', 'new_title': 'Copy', 'space_key': ''}, None),
+    ('get_recent_content', {'space_key': ''}, None),
+    ('search_by_author', {'account_id': 'abc', 'space_key': ''}, None),
+    ('get_issue', {'issue_key': ''}, "Argument 'issue_key' has an invalid format (expected pattern ^[A-Z][A-Z0-9]+-\\d+$)"),
+])
+def test_validate_arguments(name, arguments, error):
+    assert validate_arguments(name, arguments) == error
+
+
+def test_identifier_patterns_match_provider_validation():
+    from mcp_server.common import validation
+    assert TOOL_SCHEMAS['get_issue']['properties']['issue_key']['pattern'] == validation._ISSUE_KEY.pattern
+    assert TOOL_SCHEMAS['compare_commits']['properties']['from_commit']['pattern'] == validation._COMMIT_HASH.pattern
+    assert 'pattern' not in TOOL_SCHEMAS['add_page_label']['properties']['label']
+    assert 'pattern' not in TOOL_SCHEMAS['get_issue_comments']['properties']['issue_key']
+
+
+def test_patterns_only_on_arguments_providers_validate():
+    import inspect
+    import re
+    from mcp_server.common import validation
+    from mcp_server.common.registry import REGISTRY
+    from mcp_server.cloud.bitbucket_provider import BitbucketProvider
+    from mcp_server.cloud.confluence_provider import ConfluenceProvider
+    from mcp_server.cloud.jira_provider import JiraProvider
+    from mcp_server.datacenter.bitbucket_dc_provider import BitbucketDCProvider
+    from mcp_server.datacenter.confluence_dc_provider import ConfluenceDCProvider
+    from mcp_server.datacenter.jira_dc_provider import JiraDCProvider
+
+    providers = {'jira': (JiraProvider, JiraDCProvider), 'confluence': (ConfluenceProvider, ConfluenceDCProvider),
+                 'bitbucket': (BitbucketProvider, BitbucketDCProvider)}
+    checks = {'ISSUE_KEY': 'issue_key', 'PROJECT_KEY': 'project_key', 'SPACE_KEY': 'space_key',
+              'REPO_SLUG': 'repo_slug', 'BRANCH_NAME': 'branch_name', 'COMMIT_HASH': 'commit_hash'}
+    by_pattern = {getattr(validation, f'_{name}').pattern: check for name, check in checks.items()}
+    for name, schema in TOOL_SCHEMAS.items():
+        for key, prop in schema['properties'].items():
+            if 'pattern' not in prop:
+                continue
+            spec = REGISTRY[name]
+            for provider in providers[spec.target]:
+                source = inspect.getsource(getattr(provider, spec.method))
+                assert re.search(rf'validate_{by_pattern[prop["pattern"]]}\({key}\b', source), f"{name}.{key} ({provider.__name__})"
+
+
+def test_compile_schema_rejects_unsupported_types():
+    with pytest.raises(ValueError, match='Unsupported schema type'):
+        compile_schema({'type': 'object', 'properties': {'x': {'type': 'date'}}})
+
+
+@pytest.mark.asyncio
+async def test_invalid_call_never_reaches_provider():
+    jira = Mock(get_issue=AsyncMock(return_value={'key': 'PROJ-1'}))
+    result = await route_tool_call('get_issue', {'issue_key': 42}, jira, None, None)
+    assert result == {'error': "Invalid arguments for get_issue: Argument 'issue_key' must be of type string"}
+    jira.get_issue.assert_not_called()
+    assert await route_tool_call('get_issue', {'issue_key': 'PROJ-1'}, jira, None, None) == {'key': 'PROJ-1'}
@@ -0,0 +1,70 @@
+import multiprocessing
+import time
+import pytest
+from mcp_server.common.config import ServerConfig
+from mcp_server.common.shared_cache import SessionTable, SharedCache, config_namespace
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return tmp_path / 'state.sqlite'
+
+
+def _write_from_child(path, key):
+    SharedCache(path).set(key, '{"from": "child"}')
+
+
+def test_cache_get_set_and_expiry(state_path, monkeypatch):
+    cache = SharedCache(state_path, ttl=30)
+    key = cache.key('ns', 'get_issue', {'issue_key': 'TEST-1'})
+    assert cache.get(key) is None
+    cache.set(key, '{"key": "TEST-1"}')
+    assert cache.get(key) == '{"key": "TEST-1"}'
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 31)
+    assert cache.get(key) is None
+
+
+def test_cache_key_is_canonical_and_namespaced():
+    key = SharedCache.key('ns', 'search_issues', {'jql': 'x', 'max_results': 5})
+    assert key == SharedCache.key('ns', 'search_issues', {'max_results': 5, 'jql': 'x'})
+    assert key != SharedCache.key('other', 'search_issues', {'jql': 'x', 'max_results': 5})
+    assert key != SharedCache.key('ns', 'search_issues', {'jql': 'x', 'max_results': 6})
+
+    cloud = ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://a.atlassian.net'})
+    assert config_namespace(cloud) == config_namespace(ServerConfig(credentials=dict(cloud.credentials)))
+    assert config_namespace(cloud) != config_namespace(ServerConfig(credentials={'ATLASSIAN_BASE_URL': 'https://b'}))
+
+
+def test_cache_prune_and_clear(state_path):
+    cache = SharedCache(state_path, ttl=30, max_entries=3)
+    for i in range(5):
+        cache.set(str(i), 'v')
+    cache.prune()
+    assert len(cache) == 3
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_is_shared_across_processes(state_path):
+    cache = SharedCache(state_path)
+    process = multiprocessing.get_context('spawn').Process(target=_write_from_child, args=(state_path, 'k'))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert cache.get('k') == '{"from": "child"}'
+
+
+def test_session_table(state_path):
+    table = SessionTable(state_path)
+    table.add('a', '2025-06-18', 'all', max_sessions=2)
+    table.add('b', '2025-06-18', 'code-review', max_sessions=2)
+    assert table.get('b')[:2] == ('2025-06-18', 'code-review')
+    table.add('c', '2025-06-18', 'all', max_sessions=2)
+    assert table.get('a') is None  # least recently seen made room
+    assert len(table) == 2
+
+    assert table.remove('b') and not table.remove('b')
+    assert table.expire(ttl=-1) == 1
+    assert len(table) == 0
@@ -0,0 +1,202 @@
+import pytest
+from mcp_server.agents.support_queue import (
+    SupportQueueSnapshot, build_delta_jql, build_touched_jql, strip_order_by
+)
+
+
+def ticket(key, updated='t1', summary='s', type='other'):
+    return {'key': key, 'summary': summary, 'type': type, 'updated': updated}
+
+
+def test_jql_builders():
+    jql = 'assignee is EMPTY AND status = Open ORDER BY created DESC'
+    assert strip_order_by(jql) == 'assignee is EMPTY AND status = Open'
+    assert build_delta_jql(jql, 3) == '(assignee is EMPTY AND status = Open) AND updated >= "-3m"'
+    assert build_touched_jql(['T-1', 'T-2'], 2) == 'key in (T-1, T-2) AND updated >= "-2m"'
+
+
+def test_snapshot_versions_and_delta():
+    snapshot = SupportQueueSnapshot()
+    assert snapshot.replace([ticket('T-1'), ticket('T-2', type='alert')])
+    v1 = snapshot.token
+    assert snapshot.view()['total_alerts'] == 1
+
+    # Unchanged tickets do not bump the version
+    assert not snapshot.apply([ticket('T-1')], [])
+    assert snapshot.token == v1
+
+    assert snapshot.apply([ticket('T-1', updated='t2'), ticket('T-3')], ['T-2'])
+    delta = snapshot.delta_since(snapshot.parse_token(v1))
+    assert [t['key'] for t in delta['added']] == ['T-3']
+    assert [t['key'] for t in delta['changed']] == ['T-1']
+    assert delta['removed'] == ['T-2']
+    assert delta['total'] == 2
+
+    # Nothing new since the current version
+    current = snapshot.delta_since(snapshot.parse_token(snapshot.token))
+    assert current['added'] == current['changed'] == current['removed'] == []
+
+
+def test_snapshot_rejects_foreign_and_pruned_tokens():
+    snapshot = SupportQueueSnapshot(max_tombstones=1)
+    snapshot.replace([ticket('T-1'), ticket('T-2')])
+    v1 = snapshot.token
+    assert snapshot.parse_token('other:1') is None
+    assert snapshot.parse_token(f'{snapshot.generation}:99') is None
+    assert snapshot.parse_token(None) is None
+
+    snapshot.apply([], ['T-1'])
+    snapshot.apply([], ['T-2'])
+    # T-1's tombstone was pruned, so v1 can no longer be diffed against
+    assert snapshot.parse_token(v1) is None
+
+
+def test_snapshot_accepts_tokens_from_another_process():
+    import time
+    worker_a, worker_b = SupportQueueSnapshot(), SupportQueueSnapshot()
+    worker_b.replace([ticket('T-1'), ticket('T-2')])
+    worker_b.mark_polled(time.monotonic() - 20, full=True)
+    worker_a.replace([ticket('T-1'), ticket('T-2')])
+    worker_a.mark_polled(time.monotonic() - 10, full=True)
+    token = worker_a.token
+
+    worker_b.apply([ticket('T-3')], ['T-1'])
+    worker_b.mark_polled(time.monotonic(), full=False)
+    delta = worker_b.delta_since(worker_b.parse_token(token))
+    assert [t['key'] for t in delta['added']] == ['T-3']
+    assert delta['removed'] == ['T-1']
+
+    # A token older than this process's first poll cannot be diffed against
+    assert SupportQueueSnapshot().parse_token(token) is None
+    assert worker_b.parse_token(f'other:1:{int((time.time() - 3600) * 1000)}') is None
+
+
+@pytest.mark.asyncio
+async def test_get_open_support_tickets_delta_polling():
+    from mcp_server.common.ticket_support_tools import initialize_agent, get_open_support_tickets
+
+    initialize_agent(
+        [{"account_id": "u1", "name": "User1"}], [],
+        {'Support Request': {'parent_page': 'Templates', 'custom_field': 'customfield_10001'}},
+        support_jql='assignee is EMPTY ORDER BY created DESC'
+    )
+
+    class MockJira:
+        def __init__(self):
+            self.queue = {'T-1': 'u1', 'T-2': 'u1'}
+            self.recent = set()
+            self.jqls = []
+            self.fetched = []
+
+        async def search(self, jql):
+            self.jqls.append(jql)
+            if jql.startswith('key in'):
+                keys = [k for k in jql[len('key in ('):jql.index(')')].split(', ') if k in self.recent]
+            elif 'updated >=' in jql:
+                keys = [k for k in self.queue if k in self.recent]
+            else:
+                keys = list(self.queue)
+            return {'total': len(keys), 'results': [{'key': k} for k in keys]}
+
+        async def get_issue(self, key):
+            self.fetched.append(key)
+            return {"key": key, "fields": {"summary": key, "updated": self.queue.get(key),
+                                           "customfield_10001": "Alert" if key == 'T-3' else "Request"}}
+
+    jira = MockJira()
+    first = await get_open_support_tickets(jira)
+    assert first['mode'] == 'full'
+    assert first['total'] == 2
+    assert sorted(jira.fetched) == ['T-1', 'T-2']  # fetched concurrently
+
+    # T-2 assigned (leaves queue), T-3 created, T-1 untouched
+    del jira.queue['T-2']
+    jira.queue['T-3'] = 'u1'
+    jira.recent = {'T-2', 'T-3'}
+    jira.fetched = []
+    second = await get_open_support_tickets(jira, since=first['version'])
+
+    assert second['mode'] == 'delta'
+    assert [t['key'] for t in second['added']] == ['T-3']
+    assert second['added'][0]['type'] == 'alert'
+    assert second['removed'] == ['T-2']
+    assert second['changed'] == []
+    assert second['total'] == 2
+    assert jira.fetched == ['T-3']
+    assert jira.jqls[1].startswith('(assignee is EMPTY) AND updated >= "-')
+    assert jira.jqls[2].startswith('key in (T-1, T-2)')
+
+    # Unknown token falls back to the full queue
+    third = await get_open_support_tickets(jira, since='stale:1')
+    assert third['mode'] == 'full'
+    assert 'note' in third
+    assert {t['key'] for t in third['alert_tickets'] + third['other_tickets']} == {'T-1', 'T-3'}
+
+
+@pytest.mark.asyncio
+async def test_get_open_support_tickets_full_delta_page_reloads():
+    from mcp_server.common import ticket_support_tools as tools
+
+    tools.initialize_agent(
+        [{"account_id": "u1", "name": "User1"}], [],
+        {'Support Request': {'parent_page': 'Templates', 'custom_field': 'customfield_10001'}},
+        support_jql='assignee is EMPTY'
+    )
+
+    class MockJira:
+        def __init__(self):
+            self.keys = ['T-1']
+            self.jqls = []
+
+        async def search(self, jql):
+            self.jqls.append(jql)
+            # Cloud's /search/jql reports no total
+            return {'total': 0, 'results': [{'key': k} for k in self.keys]}
+
+        async def get_issue(self, key):
+            return {"key": key, "fields": {"summary": key, "customfield_10001": "Request"}}
+
+    jira = MockJira()
+    first = await tools.get_open_support_tickets(jira)
+    jira.keys = [f'T-{i}' for i in range(tools.SEARCH_PAGE_SIZE)]
+    second = await tools.get_open_support_tickets(jira, since=first['version'])
+
+    # The full delta page is not trusted; the queue is reloaded with the configured JQL
+    assert 'updated >=' in jira.jqls[1]
+    assert jira.jqls[2] == 'assignee is EMPTY'
+    assert second['total'] == tools.SEARCH_PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_full_reload_pages_through_large_queue():
+    from mcp_server.common import ticket_support_tools as tools
+
+    tools.initialize_agent(
+        [{"account_id": "u1", "name": "User1"}], [],
+        {'Support Request': {'parent_page': 'Templates', 'custom_field': 'customfield_10001'}},
+        support_jql='assignee is EMPTY'
+    )
+
+    class MockJira:
+        def __init__(self):
+            self.keys = [f'T-{i}' for i in range(120)]
+            self.tokens = []
+
+        async def search(self, jql, page_token=None):
+            self.tokens.append(page_token)
+            start = int(page_token or 0)
+            page = self.keys[start:start + tools.SEARCH_PAGE_SIZE]
+            result = {'total': len(self.keys), 'results': [{'key': k} for k in page]}
+            if start + len(page) < len(self.keys):
+                result['next_page_token'] = str(start + len(page))
+            return result
+
+        async def get_issue(self, key):
+            return {"key": key, "fields": {"summary": key, "customfield_10001": "Request"}}
+
+    jira = MockJira()
+    result = await tools.get_open_support_tickets(jira)
+
+    assert jira.tokens == [None, '50', '100']
+    assert result['total'] == 120
+    assert len(tools._agent.support_queue.entries) == 120
@@ -0,0 +1,149 @@
+"""Unit tests for template compliance parsing and caching"""
+
+import pytest
+from mcp_server.agents.template_compliance import (
+    TemplateSchemaCache, build_template_schema, compare_sections, match_template,
+    parse_description_sections, parse_html_sections, parse_wiki_sections
+)
+from mcp_server.agents.ticket_support_agent import TicketSupportAgent
+
+
+TEMPLATE_HTML = (
+    "<p>Use this template for data requests.</p>"
+    "<h2>Summary</h2><p>Describe the request</p>"
+    "<h2>Business Impact:</h2><p>Who is affected?</p>"
+    "<h2>Due Date</h2>"
+)
+
+
+def test_parse_html_sections_headings():
+    sections = parse_html_sections(TEMPLATE_HTML)
+
+    assert [s['name'] for s in sections] == ['Summary', 'Business Impact:', 'Due Date']
+    assert sections[0]['text'] == 'Describe the request'
+    assert sections[2]['text'] == ''
+
+
+def test_parse_html_sections_bold_paragraph_fallback():
+    sections = parse_html_sections("<p><strong>Steps</strong></p><p>1. Run it</p><p><b>Expected</b></p>")
+
+    assert [s['name'] for s in sections] == ['Steps', 'Expected']
+    assert sections[0]['text'] == '1. Run it'
+
+
+def test_parse_wiki_sections():
+    sections = parse_wiki_sections("intro\nh2. Summary\nNeed a report\n\n*Due Date*\n## Business Impact\nFinance")
+
+    assert [s['name'] for s in sections] == ['Summary', 'Due Date', 'Business Impact']
+    assert sections[0]['text'] == 'Need a report'
+    assert sections[1]['text'] == ''
+
+
+def test_parse_description_detects_html():
+    assert parse_description_sections("<h3>Summary</h3><p>x</p>")[0]['name'] == 'Summary'
+    assert parse_description_sections("h3. Summary\nx")[0]['name'] == 'Summary'
+    assert parse_description_sections(None) == []
+
+
+def test_compare_sections_diff():
+    schema = build_template_schema({
+        'id': '10', 'title': 'Data Request', 'version': {'number': 3},
+        'body': {'storage': {'value': TEMPLATE_HTML}}
+    })
+    ticket = parse_wiki_sections("h2. summary\nDescribe the request\nh2. Due date:\nFriday\nh2. Notes\nextra")
+
+    diff = compare_sections(schema, ticket)
+
+    assert diff['compliant'] is False
+    assert diff['missing_sections'] == ['Business Impact:']
+    assert diff['empty_sections'] == ['Summary']  # placeholder left unchanged
+    assert diff['present_sections'] == ['Due Date']
+    assert diff['extra_sections'] == ['Notes']
+
+
+def test_match_template_prefers_deepest_label():
+    templates = [{'id': '1', 'title': 'Data Templates'}, {'id': '2', 'title': 'Data - Analysis Template'}, {'id': '3', 'title': 'Access'}]
+
+    assert match_template(templates, ['Data', 'Analysis'])['id'] == '2'
+    assert match_template(templates, ['Unknown']) is None
+    assert match_template([{'id': '9', 'title': 'Only'}], ['Unknown'])['id'] == '9'
+
+
+def test_schema_cache_evicts_oldest():
+    cache = TemplateSchemaCache(max_schemas=1)
+    cache.put_schema({'id': '1', 'version': 1})
+    cache.put_schema({'id': '2', 'version': 1})
+
+    assert cache.get_schema('1', 1) is None
+    assert cache.get_schema('2', 1) == {'id': '2', 'version': 1}
+
+
+@pytest.mark.asyncio
+async def test_agent_template_compliance_caches_by_version():
+    class MockConfluence:
+        def __init__(self):
+            self.page_fetches = 0
+            self.version = 1
+
+        async def get_page_by_title_or_id(self, identifier):
+            return {'id': '100', 'title': 'Templates'}
+
+        async def get_descendants(self, page_id, expand=None, start=0):
+            return {'results': [
+                {'id': '101', 'title': 'Data Request', 'version': {'number': self.version}},
+                {'id': '102', 'title': 'Access Request', 'version': {'number': 1}}
+            ]}
+
+        async def get_page_history(self, page_id):
+            return {'lastUpdated': {'number': self.version if page_id == '101' else 1}}
+
+        async def get_page(self, page_id, offset=0, chunk_size=80000):
+            self.page_fetches += 1
+            return {'id': page_id, 'title': 'Data Request', 'version': {'number': self.version},
+                    'body': {'storage': {'value': TEMPLATE_HTML}}}
+
+    confluence = MockConfluence()
+    agent = TicketSupportAgent([], [], {'Support': {'parent_page': '100', 'custom_field': 'cf'}}, confluence)
+    issue = {'key': 'T-1', 'fields': {
+        'issuetype': {'name': 'Support'},
+        'cf': {'selectedOptionLabel': 'Data'},
+        'description': 'h2. Summary\nNightly export\nh2. Business Impact\nFinance\nh2. Due Date\nMonday'
+    }}
+
+    context = await agent.get_template_context(issue)
+    first = await agent.get_template_compliance(issue, context)
+    second = await agent.get_template_compliance(issue, context)
+
+    assert first['compliant'] is True
+    assert first['template']['id'] == '101'
+    assert first['schema_cached'] is False
+    assert second['schema_cached'] is True
+    assert confluence.page_fetches == 1
+
+    # An edit is seen on the next check, while the listing is still cached
+    confluence.version = 2
+    third = await agent.get_template_compliance(issue, context)
+    assert third['template']['version'] == 2
+    assert confluence.page_fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_template_listing_pages_through_descendants():
+    class MockConfluence:
+        def __init__(self):
+            self.starts = []
+
+        async def get_descendants(self, page_id, expand=None, start=0):
+            self.starts.append(start)
+            if start == 0:
+                return {'results': [{'id': '101', 'title': 'Data Request', 'version': {'number': 1}}],
+                        '_links': {'next': '/rest/api/content/100/descendant/page?start=1'}}
+            return {'results': [{'id': '102', 'title': 'Access Request', 'version': {'number': 3}}], '_links': {}}
+
+    confluence = MockConfluence()
+    agent = TicketSupportAgent([], [], {}, confluence)
+
+    templates = await agent._get_template_listing('100')
+
+    assert confluence.starts == [0, 1]
+    assert [(t['id'], t['version']) for t in templates] == [('101', 1), ('102', 3)]
@@ -358,3 +358,149 @@ async def test_check_troubleshooting_tool():
     assert result['file_path'] == 'sql/check.sql'
     assert result['branch'] == 'main'
     assert len(result['troubleshooting_docs']) == 2
+
+
+@pytest.mark.asyncio
+async def test_check_troubleshooting_fetches_file_by_commit():
+    import mcp_server.common.ticket_support_tools as tools
+    from mcp_server.common.ticket_support_tools import initialize_agent, check_troubleshooting
+    
+    class MockConfluence:
+        available = True
+        
+        async def get_page(self, page_id):
+            return {'id': page_id, 'title': 'Troubleshooting Docs'}
+        
+        async def get_descendants(self, page_id):
+            return {'results': [{'id': '12346', 'title': 'Alert Guide'}]}
+    
+    initialize_agent([{"account_id": "u1", "name": "Alice"}], [], {}, MockConfluence(),
+                     troubleshooting_parent='12345')
+    tools._file_cache.clear()
+    
+    class MockJira:
+        async def get_issue(self, key):
+            return {
+                "key": key,
+                "fields": {
+                    "summary": "Database Alert",
+                    "updated": "2024-01-01T00:00:00.000+0000",
+                    "description": "See https://bitbucket.org/ws/alerts/src/main/sql/check.sql"
+                }
+            }
+    
+    class MockBitbucket:
+        available = True
+        
+        def __init__(self):
+            self.downloads = []
+        
+        async def get_repository(self, repo_slug):
+            raise AssertionError('branch is pinned by the URL')
+        
+        async def list_commits(self, repo_slug, branch, path=None):
+            assert (branch, path) == ('main', 'sql/check.sql')
+            return {'values': [{'hash': 'abc123'}]}
+        
+        async def get_file_content(self, repo_slug, file_path, branch, max_bytes=None):
+            self.downloads.append((branch, max_bytes))
+            return {'content': 'x' * max_bytes, 'size': None, 'truncated': True, 'path': file_path}
+    
+    bitbucket = MockBitbucket()
+    result = await check_troubleshooting("TEST-1", MockJira(), bitbucket)
+    
+    assert result['branch'] == 'main'
+    assert result['commit'] == 'abc123'
+    assert result['file']['truncated'] is True
+    assert result['file']['size'] is None
+    assert len(result['file']['content']) == tools.MAX_FILE_BYTES
+    assert result['file']['cached'] is False
+    assert result['doc_count'] == 1
+    assert 'file.content' in result['_ai_hints']['workflow'][2]
+    
+    # Same commit - served from cache without downloading again
+    result = await check_troubleshooting("TEST-1", MockJira(), bitbucket)
+    assert result['file']['cached'] is True
+    assert bitbucket.downloads == [('abc123', tools.MAX_FILE_BYTES)]
+
+@pytest.mark.asyncio
+async def test_suggest_assignee_rank_locally():
+    pytest.importorskip("numpy")
+    from mcp_server.common.ticket_support_tools import initialize_agent, suggest_assignee
+    
+    initialize_agent(
+        [{"account_id": "u1", "name": "Alice"}, {"account_id": "u2", "name": "Bob"}],
+        [{"account_id": "u3", "name": "Charlie"}],
+        {'Support Request': {'parent_page': 'Templates', 'custom_field': 'customfield_10001'}},
+        other_expertise_jql='assignee = "{account_id}" AND "Work Type" = "{custom_field_value}"'
+    )
+    
+    class MockJira:
+        def __init__(self):
+            self.jqls = []
+        
+        async def get_issue(self, key):
+            return {
+                "key": key,
+                "fields": {
+                    "issuetype": {"name": "Support Request"},
+                    "customfield_10001": {"selectedOptionLabel": "Data"},
+                    "summary": "Daily Report: failed"
+                }
+            }
+        
+        async def search_by_assignee(self, account_id, excluded_issue_types=None):
+            load = {"u1": 5, "u2": 1, "u3": 0}[account_id]
+            return {"results": [{"key": f"T-{i}"} for i in range(load)]}
+        
+        async def search(self, jql):
+            self.jqls.append(jql)
+            if '"u1"' in jql:
+                return {"total": 6, "results": [{"key": "D-1", "summary": "Daily Report: x"}] * 6}
+            return {"total": 0, "results": []}
+    
+    jira = MockJira()
+    result = await suggest_assignee("TEST-1", jira, rank_locally=True, top_k=2)
+    
+    assert 'team' not in result
+    assert result['ticket']['summary_prefix'] == 'Daily Report'
+    assert result['candidate_count'] == 3
+    assert len(result['ranking']) == 2
+    assert result['ranking'][0]['member']['account_id'] == 'u1'
+    assert result['ranking'][0]['breakdown']['prefix_matches']['value'] == 6
+    assert any('"Data"' in jql for jql in jira.jqls)
+
+
+@pytest.mark.asyncio
+async def test_suggest_assignee_counts_history_without_a_total():
+    pytest.importorskip("numpy")
+    from mcp_server.common.ticket_support_tools import initialize_agent, suggest_assignee
+
+    initialize_agent(
+        [{"account_id": "u1", "name": "Alice"}, {"account_id": "u2", "name": "Bob"}],
+        [],
+        {'Support Request': {'parent_page': 'Templates', 'custom_field': 'customfield_10001'}},
+        other_expertise_jql='assignee = "{account_id}" AND "Work Type" = "{custom_field_value}"'
+    )
+
+    class MockJira:
+        async def get_issue(self, key):
+            return {"key": key, "fields": {"issuetype": {"name": "Support Request"},
+                                           "customfield_10001": "Data", "summary": "Daily Report: failed"}}
+
+        async def search_by_assignee(self, account_id, excluded_issue_types=None):
+            return {"results": []}
+
+        async def search(self, jql):
+            # Cloud's /search/jql reports no total
+            if '"u2"' in jql:
+                return {"total": 0, "results": [{"key": "D-1", "summary": "Daily Report: x"},
+                                                {"key": "D-2", "summary": "Other"}]}
+            return {"total": 0, "results": []}
+
+    result = await suggest_assignee("TEST-1", MockJira(), rank_locally=True, top_k=2)
+
+    best = result['ranking'][0]
+    assert best['member']['account_id'] == 'u2'
+    assert best['breakdown']['category_resolutions']['value'] == 2
+    assert best['breakdown']['prefix_matches']['value'] == 1